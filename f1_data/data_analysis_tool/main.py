@@ -1,13 +1,30 @@
 import fastf1
 import os
 import shutil
-import difflib
 
 from practice import practice_export
 from practice import practice_downforce
 from practice import practice_laptime
 from practice import practice_dominance
 from practice import practice_longrun
+from practice import practice_strategy
+from practice import practice_speedtrap
+from practice import practice_race
+from practice import html_report
+from practice import telemetry_quality
+from practice import season_db
+from practice import run_compare
+from practice import braking
+from practice import powertrain
+from practice import drs
+from practice import pipeline
+from practice import low_memory
+from practice import team_evolution
+from practice import event_index
+from practice import report_bundle
+from practice.save_utils import DEFAULT_SAVE_DIR
+from practice.session_loader import SessionLoader, ANALYSIS_DATA_PARTS
+from practice import config
 
 # Create cache directory if it doesn't exist
 if not os.path.exists('cache'):
@@ -30,42 +47,60 @@ def _get_valid_year() -> int | None:
             print("[Error] 숫자로 입력해 주세요 (예: 2024).")
 
 
+def _get_valid_int(prompt: str) -> int:
+    """양의 정수 입력 — 유효한 값이 입력될 때까지 반복."""
+    while True:
+        value = input(prompt).strip()
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+        print("[Error] 양의 정수로 입력해 주세요.")
+
+
+def _get_valid_float(prompt: str, default: float) -> float:
+    """실수 입력 — 빈 입력은 default 사용."""
+    while True:
+        value = input(prompt).strip()
+        if not value:
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            print("[Error] 숫자로 입력해 주세요.")
+
+
 def _get_valid_gp(year: int) -> str | None:
     """
     1-1. GP 이름 검증
-    - get_event_schedule(year)로 유효 이벤트 목록 조회
-    - difflib fuzzy 매칭(n=3, cutoff=0.6)으로 후보 제안
-    - 유효 이름이 입력될 때까지 재입력 루프
+    - 로컬 이벤트 인덱스(event_index)로 조회 — 캐시된 일정은 오프라인에서도 즉시 사용
+    - 국가·지명·별칭(Brazil, Monza, COTA)·라운드 번호·오타 허용
+    - 후보가 애매하면 상위 후보를 제안하고 재입력
     """
     print(f"\n[System] {year} 이벤트 일정을 불러오는 중...")
-    try:
-        schedule = fastf1.get_event_schedule(year, include_testing=False)
-    except Exception as e:
-        print(f"[Error] 이벤트 일정 조회 실패: {e}")
+    index = event_index.EventIndex.load(year)
+    event_names = index.event_names(year)
+    if not event_names:
+        print("[Error] 이벤트 일정 조회 실패 (네트워크 및 캐시된 일정 없음)")
         return None
 
-    event_names = schedule['EventName'].tolist()
-    # 대소문자·공백 무시 비교용 정규화 맵  {normalized: original}
-    name_map = {n.lower().strip(): n for n in event_names}
-
     print("\n[사용 가능한 Grand Prix 목록]")
     for idx, name in enumerate(event_names, 1):
         print(f"  {idx:2}. {name}")
 
     while True:
         gp_input = input("\nGrand Prix (e.g. Brazil): ").strip()
-        normalized = gp_input.lower().strip()
-
-        # 정확 매칭 (대소문자 무시)
-        if normalized in name_map:
-            return name_map[normalized]
-
-        # Fuzzy 매칭
-        close = difflib.get_close_matches(normalized, name_map.keys(), n=3, cutoff=0.6)
-        if close:
-            print(f"[Warning] '{gp_input}'을(를) 찾을 수 없습니다. 혹시 이 중 하나인가요?")
-            for c in close:
-                print(f"  → {name_map[c]}")
+
+        name = index.resolve(gp_input, year)
+        if name:
+            if name.lower() != gp_input.lower():
+                print(f"[System] '{gp_input}' → {name}")
+            return name
+
+        # 애매하거나 점수가 낮은 경우 후보 제안
+        hits = index.search(gp_input, year, limit=3)
+        if not hits.empty:
+            print(f"[Warning] '{gp_input}'을(를) 특정할 수 없습니다. 혹시 이 중 하나인가요?")
+            for c in hits['EventName']:
+                print(f"  → {c}")
         else:
             print(f"[Warning] '{gp_input}'을(를) 찾을 수 없습니다. 위 목록에서 정확히 입력해 주세요.")
 
@@ -82,9 +117,11 @@ def _get_valid_session_type() -> str:
         print(f"[Error] '{session_input}'은(는) 유효하지 않습니다. 다음 중 하나를 입력하세요: {VALID_SESSION_TYPES}")
 
 
-def load_session_data():
+def load_session_data(loader: SessionLoader):
     """
     Prompts user for session details and loads the FastF1 session.
+    - 2-2. laps만 먼저 로드 (lap-only 분석은 즉시 시작 가능)
+    - telemetry는 메뉴 대기 중 백그라운드에서 prefetch
     """
     print("========================================")
     print("       F1 Grid Analysis Tool         ")
@@ -102,77 +139,244 @@ def load_session_data():
 
     print(f"\n[System] Loading data for {year} {gp} - {session_type}...")
     try:
-        session = fastf1.get_session(year, gp, session_type)
-        session.load()
-        return session
+        session = loader.ensure(year, gp, session_type, parts=('laps',))
     except Exception as e:
         print(f"[Error] Failed to download/load session: {e}")
         return None
 
-def clear_saved_photos():
+    # Telemetry is only needed by some menu items — fetch it while the user decides
+    loader.prefetch(session, parts=('telemetry',))
+    return session
+
+
+def _ensure_parts(loader: SessionLoader, session, analysis: str) -> bool:
     """
-    Clears all files and subdirectories inside the Saved_photos folder.
+    Wait until the data parts required by `analysis` are loaded.
+    For lap-only analyses this returns at once: the background telemetry prefetch
+    loads on a separate Session and does not touch session.laps.
     """
-    # Saved_photos is located at repository root alongside data_analysis_tool
-    saved_photos_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'Saved_photos')
+    try:
+        loader.ensure(session, parts=ANALYSIS_DATA_PARTS[analysis])
+        return True
+    except Exception as e:
+        print(f"[Error] Failed to load data for {analysis}: {e}")
+        return False
 
-    if not os.path.exists(saved_photos_path):
-        print(f"[Warning] Saved_photos directory not found at {saved_photos_path}")
+def clear_saved_photos(session):
+    """
+    Selectively prunes Saved_photos (loose charts) and the report bundles.
+    Bundles are only removed by age; their manifests keep them reproducible.
+    """
+    if not os.path.exists(DEFAULT_SAVE_DIR):
+        print(f"[Warning] Saved_photos directory not found at {DEFAULT_SAVE_DIR}")
         return
 
+    print("  1. Loose charts of this session")
+    print("  2. All loose charts (bundles are kept)")
+    print("  3. Orphaned bundle files (not in any manifest)")
+    print("  4. Loose charts and bundles older than N days")
+    choice = input("Clean >> ").strip()   # 빈 입력 = 취소
     try:
-        items_deleted = 0
-        for name in os.listdir(saved_photos_path):
-            path = os.path.join(saved_photos_path, name)
-            if os.path.isfile(path) or os.path.islink(path):
-                os.remove(path)
-                items_deleted += 1
-            elif os.path.isdir(path):
-                shutil.rmtree(path)
-                items_deleted += 1
-
-        print(f"[System] Deleted {items_deleted} item(s) from Saved_photos.")
+        if choice == '1':
+            report_bundle.clean_loose(DEFAULT_SAVE_DIR, session=session)
+        elif choice == '2':
+            report_bundle.clean_loose(DEFAULT_SAVE_DIR)
+        elif choice == '3':
+            removed = report_bundle.clean_bundles()
+            print(f"[System] Removed {len(removed)} orphaned bundle file(s).")
+        elif choice == '4':
+            days = _get_valid_float("Older than (days) [30]: ", default=30.0)
+            report_bundle.clean_loose(DEFAULT_SAVE_DIR, older_than_days=days)
+            removed = report_bundle.clean_bundles(orphans=False, older_than_days=days)
+            print(f"[System] Removed {len(removed)} bundle(s).")
+        elif choice:
+            print("Invalid input. Nothing was deleted.")
     except Exception as e:
-        print(f"[Error] Failed to clear Saved_photos: {e}")
+        print(f"[Error] Failed to clean Saved_photos: {e}")
+
+def _choose_pipeline() -> str | None:
+    """pipelines/ 폴더의 파일 번호 또는 경로 입력 — 빈 입력은 취소."""
+    files = []
+    if os.path.isdir(config.PIPELINE_DIR):
+        files = sorted(f for f in os.listdir(config.PIPELINE_DIR)
+                       if f.endswith(('.toml', '.yaml', '.yml')))
+    for idx, name in enumerate(files, 1):
+        print(f"  {idx:2}. {name}")
+    value = input("Pipeline (number or path): ").strip()
+    if value.isdigit() and 0 < int(value) <= len(files):
+        return os.path.join(config.PIPELINE_DIR, files[int(value) - 1])
+    return value or None
+
 
 def main():
-    session = load_session_data()
+    loader = SessionLoader()
+    session = load_session_data(loader)
     if session is None:
+        loader.shutdown()
         return
+    use_corrected = False  # 2-3. track-evolution 보정 랩타임 사용 여부 (메뉴 'e')
+    use_free_air = False   # 트래픽/토우 랩 제외 여부 (메뉴 't')
     while True:
         print("\n---------------- MENU ----------------")
         print("1. Lap Delta")
         print("2. Track Domination")
         print("3. Export Data")
         print("4. Downforce Map")
+        print("4b. Downforce Map (laps only, fast)")
         print("5. Long Runs")
-        print("c. Clear Saved_photos")
+        print("6. Strategy Simulation")
+        print("7. Grid Telemetry Overlay")
+        print("8. Speed Traps")
+        print("9. HTML Dashboard (all views, one file)")
+        print("r. Race Gaps / Positions / Pit Stops (R, S)")
+        print("v. Telemetry Quality Report")
+        print("w. Run Comparison (setup sweep, one team / driver)")
+        print("b. Braking Points / Deceleration (all laps)")
+        print("g. Gear Usage / Shift RPM / Gear Ratios")
+        print("d. DRS Zones / Effectiveness (all laps)")
+        print("p. Run Pipeline File (.toml / .yaml)")
+        print("s. Season Database (store session, long-run trend)")
+        print("y. Team Evolution (same circuit, several seasons)")
+        print("u. Update Report Bundle (rebuild changed outputs only)")
+        print(f"e. Track Evolution Correction [{'ON' if use_corrected else 'OFF'}]")
+        print(f"t. Free-Air Laps Only (Lap Delta / Long Runs) [{'ON' if use_free_air else 'OFF'}]")
+        print(f"m. Low-Memory Mode [{'ON' if config.LOW_MEMORY_MODE else 'OFF'}]")
+        print("c. Clean Saved_photos (selective)")
         print("q. Quit")
         
         choice = input("Select >> ")
 
         if choice == '1':
-            practice_laptime.analyze_all_drivers(session)
+            # 텔레메트리 prefetch는 별도 Session에 로드 — laps만 필요한 차트는 바로 시작
+            if _ensure_parts(loader, session, 'lap_gap'):
+                practice_laptime.plot_lap_gap(session, corrected=use_corrected,
+                                              free_air=use_free_air)
+                practice_laptime.plot_sector_ranking(session)
+            if _ensure_parts(loader, session, 'telemetry_metrics'):
+                practice_laptime.plot_telemetry_metrics(session)
             
         elif choice == '2':
-            practice_dominance.plot_track_dominance(session)
+            if _ensure_parts(loader, session, 'dominance'):
+                practice_dominance.plot_track_dominance(session)
             
         elif choice == '3':
             # Updated: calls practice_export instead of practice
             team = input("Team Name: ")
-            practice_export.export_telemetry_data(session, team)
+            if _ensure_parts(loader, session, 'export'):
+                practice_export.export_telemetry_data(session, team)
             
         elif choice == '4':
-            practice_downforce.analyze_grid_aero(session)
+            if _ensure_parts(loader, session, 'downforce'):
+                practice_downforce.analyze_grid_aero(session)
+            
+        elif choice == '4b':
+            if _ensure_parts(loader, session, 'downforce_laps'):
+                practice_downforce.analyze_grid_aero_laps(session)
             
         elif choice == '5':
-            practice_longrun.analyze_long_runs(session)
+            if _ensure_parts(loader, session, 'long_runs'):
+                practice_longrun.analyze_long_runs(session, corrected=use_corrected,
+                                                   free_air=use_free_air)
+            
+        elif choice == '6':
+            race_laps = _get_valid_int("Race laps (e.g. 71): ")
+            pit_loss = _get_valid_float(f"Pit loss seconds [{config.STRATEGY_PIT_LOSS}]: ",
+                                        default=config.STRATEGY_PIT_LOSS)
+            if _ensure_parts(loader, session, 'strategy'):
+                practice_strategy.simulate_race_strategies(session, race_laps, pit_loss=pit_loss)
+            
+        elif choice == '7':
+            if _ensure_parts(loader, session, 'grid_overlay'):
+                practice_dominance.plot_grid_overlay(session)
+            
+        elif choice == '8':
+            if _ensure_parts(loader, session, 'speed_traps'):
+                practice_speedtrap.analyze_speed_traps(session)
+            
+        elif choice == '9':
+            if _ensure_parts(loader, session, 'html_report'):
+                html_report.write_html_report(session, corrected=use_corrected)
+            
+        elif choice == 'r':
+            if _ensure_parts(loader, session, 'race'):
+                practice_race.analyze_race(session)
+            
+        elif choice == 'v':
+            if _ensure_parts(loader, session, 'quality'):
+                telemetry_quality.analyze_telemetry_quality(session)
+            
+        elif choice == 'w':
+            # 팀 이름 또는 드라이버 약어 (쉼표로 구분)
+            target = input("Team Name or Drivers (e.g. NOR,PIA): ").strip()
+            drivers = [d.strip() for d in target.split(',')] if ',' in target else target
+            if _ensure_parts(loader, session, 'run_compare'):
+                run_compare.analyze_run_comparison(session, drivers)
+            
+        elif choice == 'b':
+            if _ensure_parts(loader, session, 'braking'):
+                braking.analyze_braking(session)
+            
+        elif choice == 'g':
+            if _ensure_parts(loader, session, 'powertrain'):
+                powertrain.analyze_powertrain(session)
+            
+        elif choice == 'd':
+            if _ensure_parts(loader, session, 'drs'):
+                drs.analyze_drs(session)
+            
+        elif choice == 'p':
+            path = _choose_pipeline()
+            if path:
+                pipeline.analyze_pipeline(path, session, loader)
+            
+        elif choice == 's':
+            team = input("Team Name (Enter = fastest per event): ").strip()
+            if _ensure_parts(loader, session, 'season_db'):
+                season_db.analyze_season_db(session, team=team or None)
+            
+        elif choice == 'y':
+            team = input("Team Name: ").strip()
+            year = int(session.event.year)
+            default = list(range(year - config.TEAM_EVOLUTION_DEFAULT_YEARS + 1, year + 1))
+            # 쉼표로 구분한 시즌 목록 (빈 입력 = 최근 시즌들)
+            value = input(f"Seasons [{','.join(map(str, default))}]: ").replace(' ', '')
+            years = [int(y) for y in value.split(',') if y.isdigit()] or default
+            if team and _ensure_parts(loader, session, 'team_evolution'):
+                team_evolution.analyze_team_evolution(
+                    session.event['EventName'], season_db.session_code(session), years, team,
+                    loader=loader, current=session)
+            
+        elif choice == 'e':
+            # Weather (track temperature) improves the fit — load it on first use
+            if use_corrected or _ensure_parts(loader, session, 'track_evolution'):
+                use_corrected = not use_corrected
+            print(f"[System] Track evolution correction: {'ON' if use_corrected else 'OFF'}")
+            
+        elif choice == 't':
+            # Traffic flags need position data — load telemetry on first use
+            if use_free_air or _ensure_parts(loader, session, 'traffic'):
+                use_free_air = not use_free_air
+            print(f"[System] Free-air laps only: {'ON' if use_free_air else 'OFF'}")
+            
+        elif choice == 'm':
+            config.LOW_MEMORY_MODE = not config.LOW_MEMORY_MODE
+            # 이미 로드된 텔레메트리는 바로 축소 (로딩 중이면 로더가 완료 후 처리)
+            if config.LOW_MEMORY_MODE and 'telemetry' in loader.loaded_parts(session):
+                saved = low_memory.shrink_session(session)
+                print(f"[System] Telemetry downcast ({saved:.0f} MB freed)")
+            print(f"[System] Low-memory mode: {'ON' if config.LOW_MEMORY_MODE else 'OFF'}")
+            
+        elif choice == 'u':
+            report_bundle.analyze_report_bundle(session, loader)
             
         elif choice == 'c':
-            clear_saved_photos()
+            clear_saved_photos(session)
             
         elif choice == 'q':
             print("Exiting...")
+            loader.shutdown()
+            if config.LOW_MEMORY_MODE:
+                low_memory.check_budget('session')
             print("Cleaning up cache...")
             shutil.rmtree('cache', ignore_errors=True)
             print("[System] Cache deleted successfully.")
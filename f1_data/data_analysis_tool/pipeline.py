@@ -0,0 +1,72 @@
+"""
+Run an analysis pipeline file (see practice/pipeline.py).
+
+    python pipeline.py pipelines/practice_review.toml
+    python pipeline.py my.yaml --year 2024 --gp "Mexico City Grand Prix" --session FP2
+    python pipeline.py pipelines/practice_review.toml --recorded   # pickled sessions
+    python pipeline.py pipelines/practice_review.toml --low-memory --rss-budget 1500
+
+With --low-memory the exit status is 1 when peak RSS exceeds the budget.
+"""
+import argparse
+import os
+import sys
+
+import fastf1
+
+from practice import config
+from practice.event_index import resolve_event
+from practice.pipeline import load_pipeline, run_pipeline
+from practice.recorded_session import RecordedSessionLoader
+from practice.session_loader import SessionLoader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an F1 analysis pipeline")
+    parser.add_argument('file', help=".toml / .yaml pipeline definition")
+    parser.add_argument('--year', type=int)
+    parser.add_argument('--gp')
+    parser.add_argument('--session')
+    parser.add_argument('--recorded', nargs='?', const=config.RECORDED_SESSIONS_DIR,
+                        metavar='DIR', help="use pickled sessions from DIR instead of FastF1")
+    parser.add_argument('--low-memory', action='store_true',
+                        help="downcast / release telemetry, one step at a time")
+    parser.add_argument('--rss-budget', type=float, metavar='MB',
+                        help=f"peak RSS budget (default {config.LOW_MEMORY_RSS_BUDGET_MB:.0f})")
+    args = parser.parse_args()
+    if args.low_memory:
+        config.LOW_MEMORY_MODE = True
+    if args.rss_budget is not None:
+        config.LOW_MEMORY_RSS_BUDGET_MB = args.rss_budget
+
+    try:
+        spec = load_pipeline(args.file)
+    except Exception as e:
+        sys.exit(f"[Error] Invalid pipeline {args.file}: {e}")
+
+    target = spec.get('session', {})
+    year = args.year or target.get('year')
+    gp = args.gp or target.get('gp')
+    session_type = (args.session or target.get('session') or '').upper()
+    if not (year and gp and session_type):
+        sys.exit("[Error] Session missing: set [session] in the file or pass --year/--gp/--session")
+    # Round number, exact or approximate name ("brazil", "monza") → event name
+    gp = resolve_event(year, gp)
+
+    if args.recorded is None:
+        os.makedirs('cache', exist_ok=True)
+        fastf1.Cache.enable_cache('cache')
+    loader = RecordedSessionLoader(args.recorded) if args.recorded else SessionLoader()
+    try:
+        session = loader.ensure(int(year), gp, session_type, parts=('laps',))
+        # Recordings hold every data part; only the live loader loads the missing ones
+        run = run_pipeline(spec, session, None if args.recorded else loader)
+        print(run['report'].to_string(index=False))
+    finally:
+        loader.shutdown()
+    if run['within_budget'] is False:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
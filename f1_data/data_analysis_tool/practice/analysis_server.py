@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+"""
+analysis_server.py
+Local HTTP/JSON server for the practice analyses.
+
+Sessions and computed result tables stay warm in memory (LRU over
+SERVER_MAX_SESSIONS sessions), so after the first request for a session a
+chart is only re-rendered, not re-loaded or re-computed. Analyses run on a
+worker pool; pyplot is not thread-safe, so rendering itself is serialized.
+
+Endpoints (GET):
+    /health                      status + warm sessions
+    /analyses                    available analyses, their parameters and formats
+    /analysis/<name>?year=2024&gp=Mexico%20City%20Grand%20Prix&session=FP2
+                    [&format=json|csv|png|svg][&figure=<suffix>][&<param>=...]
+
+`figure` selects one chart when a renderer produces several (default: first).
+Run via `python server.py` (see --help); `--recorded` serves pickled
+sessions from practice/recorded_session.py without network access.
+"""
+
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from practice import braking
+from practice import config
+from practice import drs
+from practice import practice_dominance
+from practice import practice_downforce
+from practice import practice_export
+from practice import practice_laptime
+from practice import practice_longrun
+from practice import powertrain
+from practice import practice_race
+from practice import run_compare
+from practice import telemetry_quality
+from practice import practice_speedtrap
+from practice import practice_strategy
+from practice.event_index import resolve_event
+from practice.save_utils import apply_layout
+from practice.session_loader import ANALYSIS_DATA_PARTS
+
+# pyplot keeps global state; only one thread may build/serialize figures
+_RENDER_LOCK = threading.Lock()
+
+
+class NoDataError(Exception):
+    """The analysis ran but produced no result for this session."""
+
+
+# -----------------------------------------------------------------------------
+# 1. Analysis registry
+# -----------------------------------------------------------------------------
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"Expected a boolean, got '{value}'")
+
+
+def _parse_positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise ValueError(f"Expected a positive integer, got '{value}'")
+    return number
+
+
+def _parse_drivers(value: str):
+    """'NOR,PIA' → ['NOR', 'PIA']; a single value (e.g. a team name) stays a string."""
+    names = [v.strip() for v in value.split(',') if v.strip()]
+    if not names:
+        raise ValueError("Expected driver abbreviations or a team name")
+    return names if len(names) > 1 else names[0]
+
+
+# name → parts: ANALYSIS_DATA_PARTS key
+#        params: {name: (parser, default)}; None default = required, a callable
+#                default is read at call time (config values, see param_default)
+#        compute(session, **params) / render(session, result, **params) (None = tables only)
+ANALYSES = {
+    'lap_gap': {
+        'parts':   'lap_gap',
+        'params':  {'corrected': (_parse_bool, False), 'push_only': (_parse_bool, False),
+                    'free_air': (_parse_bool, False)},
+        'compute': practice_laptime.compute_lap_gap,
+        'render':  lambda s, r, corrected, push_only, free_air:
+                       practice_laptime.render_lap_gap(s, r, corrected=corrected, free_air=free_air),
+    },
+    'sector_ranking': {
+        'parts':   'sector_ranking',
+        'params':  {},
+        'compute': practice_laptime.compute_sector_ranking,
+        'render':  practice_laptime.render_sector_ranking,
+    },
+    'telemetry_metrics': {
+        'parts':   'telemetry_metrics',
+        'params':  {},
+        'compute': practice_laptime.compute_telemetry_metrics,
+        'render':  practice_laptime.render_telemetry_metrics,
+    },
+    'dominance': {
+        'parts':   'dominance',
+        'params':  {},
+        'compute': practice_dominance.compute_track_dominance,
+        'render':  practice_dominance.render_track_dominance,
+    },
+    'grid_overlay': {
+        'parts':   'grid_overlay',
+        'params':  {},
+        'compute': practice_dominance.compute_grid_overlay,
+        'render':  practice_dominance.render_grid_overlay,
+    },
+    'downforce': {
+        'parts':   'downforce',
+        'params':  {},
+        'compute': practice_downforce.compute_grid_aero,
+        'render':  practice_downforce.render_grid_aero,
+    },
+    'downforce_laps': {
+        'parts':   'downforce_laps',
+        'params':  {},
+        'compute': practice_downforce.compute_grid_aero_laps,
+        'render':  practice_downforce.render_grid_aero_laps,
+    },
+    'long_runs': {
+        'parts':   'long_runs',
+        'params':  {'corrected': (_parse_bool, False), 'free_air': (_parse_bool, False),
+                    'classified': (_parse_bool, True)},
+        'compute': practice_longrun.extract_long_run_laps,
+        'render':  lambda s, r, corrected, free_air, classified:
+                       practice_longrun.render_long_runs(s, r, corrected=corrected,
+                                                         free_air=free_air),
+    },
+    'strategy': {
+        'parts':   'strategy',
+        'params':  {'race_laps': (_parse_positive_int, None),
+                    'pit_loss': (float, lambda: config.STRATEGY_PIT_LOSS)},
+        'compute': practice_strategy.compute_race_strategies,
+        'render':  practice_strategy.render_race_strategies,
+    },
+    'race': {
+        'parts':   'race',
+        'params':  {},
+        'compute': practice_race.compute_race,
+        'render':  practice_race.render_race,
+    },
+    'braking': {
+        'parts':   'braking',
+        'params':  {},
+        'compute': braking.compute_braking,
+        'render':  braking.render_braking,
+    },
+    'powertrain': {
+        'parts':   'powertrain',
+        'params':  {},
+        'compute': powertrain.compute_powertrain,
+        'render':  powertrain.render_powertrain,
+    },
+    'drs': {
+        'parts':   'drs',
+        'params':  {},
+        'compute': drs.compute_drs,
+        'render':  drs.render_drs,
+    },
+    'run_compare': {
+        'parts':   'run_compare',
+        'params':  {'drivers': (_parse_drivers, None)},
+        'compute': run_compare.compute_run_comparison,
+        'render':  lambda s, r, drivers: run_compare.render_run_comparison(s, r),
+    },
+    'quality': {
+        'parts':   'quality',
+        'params':  {},
+        'compute': telemetry_quality.session_quality,
+        'render':  None,
+    },
+    'speed_traps': {
+        'parts':   'speed_traps',
+        'params':  {},
+        'compute': practice_speedtrap.compute_speed_traps,
+        'render':  practice_speedtrap.render_speed_traps,
+    },
+    'export': {
+        'parts':   'export',
+        'params':  {'team': (str, None)},
+        'compute': lambda s, team: practice_export.compute_team_telemetry(s, team),
+        'render':  None,
+    },
+}
+
+
+def param_default(default):
+    """Registry default value; callables defer config reads (pipeline [config] overrides)."""
+    return default() if callable(default) else default
+
+
+def parse_params(name: str, query: dict) -> dict:
+    """Validate query parameters of analysis `name` against the registry."""
+    spec = ANALYSES[name]['params']
+    params = {}
+    for key, (parser, default) in spec.items():
+        if key in query:
+            params[key] = parser(query[key])
+        elif default is None:
+            raise ValueError(f"Missing required parameter '{key}' for {name}")
+        else:
+            params[key] = param_default(default)
+    return params
+
+
+def _is_empty(result) -> bool:
+    if result is None:
+        return True
+    if isinstance(result, pd.DataFrame):
+        return result.empty
+    if isinstance(result, dict):
+        frames = [v for v in result.values() if isinstance(v, pd.DataFrame)]
+        return bool(frames) and all(f.empty for f in frames)
+    return False
+
+
+# -----------------------------------------------------------------------------
+# 2. Serialization
+# -----------------------------------------------------------------------------
+
+def _frame_records(df: pd.DataFrame) -> list:
+    """DataFrame → JSON-ready records (timedeltas in seconds, timestamps ISO)."""
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_timedelta64_dtype(out[col]):
+            out[col] = out[col].dt.total_seconds()
+        elif pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].astype(str)
+    return json.loads(out.to_json(orient='records'))
+
+
+def result_to_json(result) -> bytes:
+    """Result table, or dict of tables/plain values (non-serializable entries dropped)."""
+    if isinstance(result, pd.DataFrame):
+        payload = _frame_records(result)
+    else:
+        payload = {}
+        for key, value in result.items():
+            if isinstance(value, pd.DataFrame):
+                payload[key] = _frame_records(value)
+            elif isinstance(value, (dict, list, str, int, float, bool)) or value is None:
+                payload[key] = value
+    return json.dumps(payload, default=str).encode('utf-8')
+
+
+def result_to_csv(result) -> bytes:
+    if not isinstance(result, pd.DataFrame):
+        raise ValueError("CSV output is only available for single-table results")
+    return result.to_csv(index=False).encode('utf-8')
+
+
+def figure_bytes(fig, fmt: str, dpi: int = config.SERVER_DPI) -> bytes:
+    """Serialize a rendered figure the way save_figure would lay it out."""
+    apply_layout(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches='tight', facecolor='white')
+    return buf.getvalue()
+
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'csv':  'text/csv; charset=utf-8',
+    'png':  'image/png',
+    'svg':  'image/svg+xml',
+}
+
+
+# -----------------------------------------------------------------------------
+# 3. Warm session cache
+# -----------------------------------------------------------------------------
+
+class WarmSessionCache:
+    """
+    LRU of loaded sessions and their computed results.
+
+    - One entry per (year, gp, session_type): session, loaded parts,
+      {(analysis, params): result}, rendered chart bytes and a lock
+      serializing work on that session
+    - Evicting a session drops its results and releases it in the loader
+    - A session that fails to load is removed again, so bad requests never
+      evict warm sessions
+    """
+
+    def __init__(self, loader, max_sessions: int = config.SERVER_MAX_SESSIONS):
+        self.loader = loader
+        self.max_sessions = max_sessions
+        self._entries = OrderedDict()
+        self._guard = threading.Lock()
+
+    def _entry(self, key) -> dict:
+        with self._guard:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'session': None, 'parts': set(), 'results': {},
+                         'renders': {}, 'lock': threading.RLock()}
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            return entry
+
+    def _evict(self):
+        """Drop least recently used sessions beyond `max_sessions`."""
+        evicted = []
+        with self._guard:
+            loaded = [k for k, e in self._entries.items() if e['session'] is not None]
+            while len(loaded) > self.max_sessions:
+                old_key = loaded.pop(0)
+                del self._entries[old_key]
+                evicted.append(old_key)
+        for old_key in evicted:
+            self.loader.forget(*old_key)
+            print(f"[Server] Evicted session {old_key}")
+
+    def _discard(self, key, entry):
+        with self._guard:
+            if self._entries.get(key) is entry and entry['session'] is None:
+                del self._entries[key]
+
+    def result(self, key, analysis: str, params: dict):
+        """
+        Computed result of `analysis` for session `key` (cached).
+        Returns (session, result, renders, lock) where `renders` is the
+        {(fmt, figure): bytes} cache belonging to this result and `lock` the
+        session lock, to hold while reading the session (e.g. rendering).
+        """
+        spec = ANALYSES[analysis]
+        parts = set(ANALYSIS_DATA_PARTS[spec['parts']])
+        if params.get('free_air'):
+            # Traffic flags come from position data
+            parts |= set(ANALYSIS_DATA_PARTS['traffic'])
+        entry = self._entry(key)
+        with entry['lock']:
+            if entry['session'] is None or not parts <= entry['parts']:
+                try:
+                    session = self.loader.ensure(*key, parts=tuple(parts))
+                except Exception:
+                    self._discard(key, entry)
+                    raise
+                entry['session'] = session
+                self._evict()
+                try:
+                    entry['parts'] = set(self.loader.loaded_parts(session))
+                except Exception:
+                    entry['parts'] |= parts
+
+            result_key = (analysis, tuple(sorted(params.items())))
+            if result_key not in entry['results']:
+                entry['results'][result_key] = spec['compute'](entry['session'], **params)
+                entry['renders'][result_key] = {}
+            return (entry['session'], entry['results'][result_key],
+                    entry['renders'][result_key], entry['lock'])
+
+    def warm_sessions(self) -> list:
+        with self._guard:
+            return [{'year': k[0], 'gp': k[1], 'session': k[2],
+                     'parts': sorted(e['parts']), 'results': len(e['results'])}
+                    for k, e in self._entries.items()]
+
+
+# -----------------------------------------------------------------------------
+# 4. Service (worker pool)
+# -----------------------------------------------------------------------------
+
+class AnalysisService:
+    """Runs analysis requests on a worker pool against a WarmSessionCache."""
+
+    def __init__(self, loader, max_sessions: int = config.SERVER_MAX_SESSIONS,
+                 max_workers: int = config.SERVER_MAX_WORKERS):
+        self.cache = WarmSessionCache(loader, max_sessions)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='analysis')
+
+    def _run(self, name, key, params, fmt, figure):
+        session, result, renders, session_lock = self.cache.result(key, name, params)
+        if _is_empty(result):
+            raise NoDataError(f"No data for {name} in {key[0]} {key[1]} {key[2]}")
+
+        if fmt == 'json':
+            return result_to_json(result)
+        if fmt == 'csv':
+            return result_to_csv(result)
+
+        render = ANALYSES[name]['render']
+        if render is None:
+            raise ValueError(f"{name} has no chart; use format=json or csv")
+        # Session lock first: another request may be loading telemetry into it
+        with session_lock, _RENDER_LOCK:
+            # Every chart of a render is serialized at once, so sibling
+            # figures (e.g. dominance dashboard → DRS) are served warm
+            names = renders.get((fmt, None))
+            if names is None:
+                figures = render(session, result, **params)
+                try:
+                    for suffix, fig in figures.items():
+                        renders[(fmt, suffix)] = figure_bytes(fig, fmt)
+                finally:
+                    for fig in figures.values():
+                        plt.close(fig)
+                names = renders[(fmt, None)] = list(figures)
+
+        if not names:
+            raise NoDataError(f"{name} produced no chart")
+        if figure is None:
+            figure = names[0]
+        if figure not in names:
+            raise ValueError(f"Unknown figure '{figure}'; available: {names}")
+        return renders[(fmt, figure)]
+
+    def run(self, name: str, year: int, gp, session_type: str, params: dict,
+            fmt: str = 'json', figure: str | None = None,
+            timeout: float = config.SERVER_REQUEST_TIMEOUT) -> bytes:
+        if name not in ANALYSES:
+            raise KeyError(name)
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Unknown format '{fmt}'; use one of {list(CONTENT_TYPES)}")
+        key = (int(year), gp, session_type.upper())
+        future = self._executor.submit(self._run, name, key, params, fmt, figure)
+        return future.result(timeout=timeout)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.loader.shutdown()
+
+
+# -----------------------------------------------------------------------------
+# 5. HTTP layer
+# -----------------------------------------------------------------------------
+
+def _make_handler(service: AnalysisService):
+
+    class AnalysisRequestHandler(BaseHTTPRequestHandler):
+        server_version = 'F1AnalysisServer/1.0'
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, payload):
+            self._send(status, json.dumps(payload, default=str).encode('utf-8'),
+                       CONTENT_TYPES['json'])
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            parts = [p for p in url.path.split('/') if p]
+
+            if parts == ['health']:
+                return self._send_json(200, {'status': 'ok',
+                                             'sessions': service.cache.warm_sessions()})
+            if parts == ['analyses']:
+                return self._send_json(200, {
+                    name: {'parts': list(ANALYSIS_DATA_PARTS[spec['parts']]),
+                           'params': {k: param_default(d) for k, (_, d) in spec['params'].items()},
+                           'formats': ['json', 'csv'] + (['png', 'svg'] if spec['render'] else [])}
+                    for name, spec in ANALYSES.items()})
+            if len(parts) != 2 or parts[0] != 'analysis':
+                return self._send_json(404, {'error': f"Unknown path {url.path}"})
+
+            name = parts[1]
+            start = time.perf_counter()
+            try:
+                if name not in ANALYSES:
+                    raise KeyError(name)
+                for required in ('year', 'gp', 'session'):
+                    if required not in query:
+                        raise ValueError(f"Missing required parameter '{required}'")
+                gp = resolve_event(int(query['year']), query['gp'])
+                fmt = query.get('format', 'json').lower()
+                params = parse_params(name, query)
+                body = service.run(name, int(query['year']), gp, query['session'],
+                                   params, fmt=fmt, figure=query.get('figure'))
+            except KeyError as e:
+                return self._send_json(404, {'error': f"Unknown analysis {e}"})
+            except FileNotFoundError as e:
+                return self._send_json(404, {'error': str(e)})
+            except NoDataError as e:
+                return self._send_json(422, {'error': str(e)})
+            except ValueError as e:
+                return self._send_json(400, {'error': str(e)})
+            except FutureTimeout:
+                return self._send_json(504, {'error': 'Analysis timed out'})
+            except Exception as e:
+                return self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+            self._send(200, body, CONTENT_TYPES[fmt])
+            print(f"[Server] {name} {query['year']} {query['gp']} {query['session']} "
+                  f"{fmt} in {time.perf_counter() - start:.2f}s")
+
+        def log_message(self, format, *args):
+            pass  # one line per analysis is printed in do_GET
+
+    return AnalysisRequestHandler
+
+
+def serve(loader, host: str = config.SERVER_HOST, port: int = config.SERVER_PORT,
+          max_sessions: int = config.SERVER_MAX_SESSIONS,
+          max_workers: int = config.SERVER_MAX_WORKERS):
+    """Start the blocking HTTP server (Ctrl+C to stop)."""
+    service = AnalysisService(loader, max_sessions=max_sessions, max_workers=max_workers)
+    httpd = ThreadingHTTPServer((host, port), _make_handler(service))
+    print(f"[System] Analysis server on http://{host}:{port} "
+          f"({max_sessions} warm sessions, {max_workers} workers)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[System] Shutting down analysis server...")
+    finally:
+        httpd.server_close()
+        service.shutdown()
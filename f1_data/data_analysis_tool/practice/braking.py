@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+braking.py
+Braking points and deceleration of every lap in a session.
+
+All laps are processed as one concatenated telemetry frame
+(session_telemetry.concat_session_telemetry); events and their statistics come
+from boolean edges and ufunc.reduceat over flat arrays — no per-lap loop.
+
+Per braking event (brake pressed → released, same lap):
+    OnsetDistance / OnsetSpeed   where and how fast the driver hit the brakes
+    MinSpeed / MinSpeedDistance  slowest point until the car accelerates again
+    PeakDecel                    max deceleration (g) from the smoothed speed
+    Duration                     brake-on time (s)
+
+Onset distances of all laps are clustered into braking zones (a new zone
+starts after a gap of BRAKING_ZONE_GAP_M); each zone is named after the first
+corner apex following it (session.get_circuit_info()).
+"""
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice import config
+from practice.f1_colors import resolve_styles
+from practice.run_classifier import classify_runs
+from practice.save_utils import save_figures
+from practice.session_telemetry import concat_session_telemetry, lap_boundaries
+from practice.track_geometry import circuit_corners, get_circuit_geometry
+
+_G = 9.81
+
+
+# =========================================================
+# 1. Event Detection
+# =========================================================
+
+def _segment_reduce(ufunc, values: np.ndarray, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    """ufunc over values[start[i]:stop[i]] for non-overlapping, ordered segments."""
+    padded = np.r_[values, values[-1]]                    # stop may equal len(values)
+    bounds = np.column_stack([start, stop]).ravel()
+    return ufunc.reduceat(padded, bounds)[::2]
+
+
+def _segment_positions(start: np.ndarray, stop: np.ndarray) -> tuple:
+    """(segment number, sample position) of every sample in the segments."""
+    counts = stop - start
+    seg = np.repeat(np.arange(len(start)), counts)
+    return seg, start[seg] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+
+def _lap_moving_average(values: np.ndarray, first: np.ndarray, last: np.ndarray,
+                        lap_id: np.ndarray, window: int) -> np.ndarray:
+    """Centred moving average that never reaches across a lap boundary."""
+    half = window // 2
+    i = np.arange(len(values))
+    lo = np.maximum(i - half, np.flatnonzero(first)[lap_id])
+    hi = np.minimum(i + half, np.flatnonzero(last)[lap_id])
+    csum = np.r_[0.0, np.cumsum(values)]
+    return (csum[hi + 1] - csum[lo]) / (hi - lo + 1)
+
+
+def detect_braking_events(tel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Braking events of a concatenated telemetry frame (see module docstring).
+
+    Columns: LapIndex, Driver, LapNumber, OnsetDistance, ReleaseDistance,
+             OnsetSpeed, MinSpeed, MinSpeedDistance, PeakDecel (g), Duration (s).
+    Distances are scaled to the median lap length so laps are comparable.
+    """
+    columns = ['LapIndex', 'Driver', 'LapNumber', 'OnsetDistance', 'ReleaseDistance',
+               'OnsetSpeed', 'MinSpeed', 'MinSpeedDistance', 'PeakDecel', 'Duration']
+    tel = tel.dropna(subset=['Speed'])
+    if tel.empty:
+        return pd.DataFrame(columns=columns)
+
+    lap_id = pd.factorize(tel['LapIndex'])[0]
+    first, last = lap_boundaries(lap_id)
+    t = tel['SessionTime'].to_numpy(dtype=float)
+
+    # Smoothed speed and its derivative, restarted at every lap
+    v = _lap_moving_average(tel['Speed'].to_numpy(dtype=float), first, last, lap_id,
+                            config.BRAKING_SMOOTH_SAMPLES)
+    dt = np.diff(t)
+    dvdt = np.diff(v / 3.6) / np.where(dt > 0, dt, np.nan)
+    dvdt = np.r_[np.nan, dvdt]
+    dvdt[first] = np.nan
+    decel = np.nan_to_num(-dvdt / _G, nan=0.0)
+
+    lap_len = tel.groupby(lap_id)['Distance'].transform('max').to_numpy()
+    ref_len = float(np.median(lap_len[first]))
+    dist = tel['Distance'].to_numpy(dtype=float) * ref_len / np.where(lap_len > 0, lap_len, np.nan)
+
+    brake = tel['Brake'].fillna(0).to_numpy(dtype=float) > 0.5
+    prev = np.r_[False, brake[:-1]] & ~first
+    nxt = np.r_[brake[1:], False] & ~last
+    on = np.flatnonzero(brake & ~prev)
+    off = np.flatnonzero(brake & ~nxt)
+    if len(on) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Slowest point: until the first speed increase after release (same lap)
+    lap_last = np.flatnonzero(last)[lap_id[off]]
+    rising = np.flatnonzero(np.nan_to_num(dvdt) > 0)
+    nxt_rise = rising[np.minimum(np.searchsorted(rising, off, side='right'), len(rising) - 1)] \
+        if len(rising) else lap_last
+    apex_end = np.where(nxt_rise > off, np.minimum(nxt_rise, lap_last), lap_last) + 1
+
+    min_speed = _segment_reduce(np.minimum, v, on, apex_end)
+    # Position of the minimum: first sample of the segment at the minimum speed
+    seg, pos = _segment_positions(on, apex_end)
+    at_min = v[pos] <= min_speed[seg]
+    min_pos = pos[at_min][np.unique(seg[at_min], return_index=True)[1]]
+
+    events = pd.DataFrame({
+        'LapIndex':         tel['LapIndex'].to_numpy()[on],
+        'Driver':           tel['Driver'].to_numpy()[on],
+        'LapNumber':        tel['LapNumber'].to_numpy()[on],
+        'OnsetDistance':    dist[on],
+        'ReleaseDistance':  dist[off],
+        'OnsetSpeed':       tel['Speed'].to_numpy(dtype=float)[on],
+        'MinSpeed':         min_speed,
+        'MinSpeedDistance': dist[min_pos],
+        'PeakDecel':        _segment_reduce(np.maximum, decel, on, off + 1),
+        'Duration':         t[off] - t[on],
+    })
+    keep = ((events['Duration'] >= config.BRAKING_MIN_DURATION_S)
+            & (events['OnsetSpeed'] - events['MinSpeed'] >= config.BRAKING_MIN_SPEED_DROP))
+    return events[keep].reset_index(drop=True)[columns]
+
+
+# =========================================================
+# 2. Braking Zones
+# =========================================================
+
+def assign_zones(session, events: pd.DataFrame, n_laps: int) -> tuple:
+    """
+    Cluster onset distances into braking zones.
+
+    Returns (events with a Zone column, zones: Zone, Distance, Laps, Corner).
+    Zones braked on fewer than BRAKING_MIN_ZONE_SHARE of the laps are dropped;
+    multiple events of one lap in one zone are merged (first onset kept).
+    """
+    zone_cols = ['Zone', 'Distance', 'Laps', 'Corner']
+    if events.empty:
+        return events.assign(Zone=pd.Series(dtype=object)), pd.DataFrame(columns=zone_cols)
+
+    events = events.sort_values('OnsetDistance', ignore_index=True)
+    cluster = np.r_[0, np.cumsum(np.diff(events['OnsetDistance']) > config.BRAKING_ZONE_GAP_M)]
+    events['Cluster'] = cluster
+
+    merged = (events.sort_values(['LapIndex', 'OnsetDistance'])
+                    .groupby(['LapIndex', 'Cluster'], as_index=False)
+                    .agg(Driver=('Driver', 'first'), LapNumber=('LapNumber', 'first'),
+                         OnsetDistance=('OnsetDistance', 'first'),
+                         ReleaseDistance=('ReleaseDistance', 'last'),
+                         OnsetSpeed=('OnsetSpeed', 'first'), MinSpeed=('MinSpeed', 'min'),
+                         MinSpeedDistance=('MinSpeedDistance', 'last'),
+                         PeakDecel=('PeakDecel', 'max'), Duration=('Duration', 'sum')))
+
+    zones = (merged.groupby('Cluster')
+                   .agg(Distance=('OnsetDistance', 'median'), Laps=('LapIndex', 'nunique'))
+                   .reset_index())
+    zones = zones[zones['Laps'] >= config.BRAKING_MIN_ZONE_SHARE * n_laps].reset_index(drop=True)
+
+    # Name: first corner apex after the zone (within BRAKING_CORNER_MAX_M)
+    corners = circuit_corners(session)
+    names = [f"B{i + 1}" for i in range(len(zones))]
+    if not corners.empty:
+        apex = corners['Distance'].to_numpy()
+        k = np.searchsorted(apex, zones['Distance'].to_numpy())
+        for i, (j, d) in enumerate(zip(k, zones['Distance'])):
+            if j < len(apex) and apex[j] - d <= config.BRAKING_CORNER_MAX_M:
+                names[i] = corners['Label'].iloc[j]
+    zones['Corner'] = names
+    zones['Zone'] = names
+    # Two zones before one apex: keep them apart
+    dup = zones['Zone'].duplicated(keep=False)
+    zones.loc[dup, 'Zone'] = zones.loc[dup, 'Zone'] + '-' + \
+        (zones[dup].groupby('Zone').cumcount() + 1).astype(str)
+
+    merged = merged.merge(zones[['Cluster', 'Zone']], on='Cluster').drop(columns='Cluster')
+    return merged, zones[zone_cols]
+
+
+# =========================================================
+# 3. Session Analysis
+# =========================================================
+
+def compute_braking(session, laps=None, programmes=('push', 'long', 'other'), tel=None) -> dict:
+    """
+    Braking events of all laps and a per-corner comparison across drivers.
+
+    `laps` default: every lap of the session whose programme (run_classifier)
+    is in `programmes` — out / in / cool-down laps are left out. `tel`: an
+    already concatenated frame of those laps with Speed and Brake (pipeline
+    session_telemetry step); `laps` is then not used.
+
+    Returns a dict of DataFrames (empty without car data):
+        events  one row per lap and zone (detect_braking_events columns + Zone)
+        zones   Zone, Distance (median onset, m), Laps, Corner
+        table   Driver, Zone, Laps, OnsetDistance, OnsetSpeed, MinSpeed,
+                PeakDecel (medians), OnsetToLatest (m, negative = earlier than
+                the latest braker), MinSpeedToBest (km/h)
+    """
+    if tel is None:
+        if laps is None:
+            laps = classify_runs(session, use_telemetry=False)
+            laps = laps[laps['Programme'].isin(list(programmes))]
+        tel = concat_session_telemetry(session, laps, channels=('Speed', 'Brake'))
+    events, zones = assign_zones(session, detect_braking_events(tel),
+                                 tel['LapIndex'].nunique() if not tel.empty else 0)
+
+    table = (events.groupby(['Driver', 'Zone'])
+                   .agg(Laps=('LapIndex', 'size'), OnsetDistance=('OnsetDistance', 'median'),
+                        OnsetSpeed=('OnsetSpeed', 'median'), MinSpeed=('MinSpeed', 'median'),
+                        PeakDecel=('PeakDecel', 'median'))
+                   .reset_index())
+    if not table.empty:
+        by_zone = table.groupby('Zone')
+        table['OnsetToLatest'] = table['OnsetDistance'] - by_zone['OnsetDistance'].transform('max')
+        table['MinSpeedToBest'] = table['MinSpeed'] - by_zone['MinSpeed'].transform('max')
+        order = zones.set_index('Zone')['Distance']
+        table = (table.assign(_d=table['Zone'].map(order))
+                      .sort_values(['_d', 'OnsetToLatest'], ascending=[True, False])
+                      .drop(columns='_d').reset_index(drop=True))
+    else:
+        table = table.assign(OnsetToLatest=pd.Series(dtype=float),
+                             MinSpeedToBest=pd.Series(dtype=float))
+    return {'events': events, 'zones': zones, 'table': table}
+
+
+# =========================================================
+# 4. Visualization
+# =========================================================
+
+def _heatmap(ax, matrix: pd.DataFrame, cmap: str, label: str, fmt: str):
+    values = matrix.to_numpy(dtype=float)
+    im = ax.imshow(values, aspect='auto', cmap=cmap, interpolation='nearest')
+    ax.set_xticks(range(matrix.shape[1]))
+    ax.set_xticklabels(matrix.columns, rotation=45, fontsize=9)
+    ax.set_yticks(range(matrix.shape[0]))
+    ax.set_yticklabels(matrix.index, fontsize=9)
+    for (i, j), value in np.ndenumerate(values):
+        if not np.isnan(value):
+            ax.text(j, i, format(value, fmt), ha='center', va='center', fontsize=7)
+    plt.colorbar(im, ax=ax, shrink=0.8, label=label)
+
+
+def render_braking(session, result: dict) -> dict:
+    """Braking-point track map and per-corner heatmaps. Returns {suffix: Figure}."""
+    table, zones = result['table'], result['zones']
+    if table.empty:
+        return {}
+    title = f"{session.event.year} {session.event.EventName} {session.name}"
+    drivers = (table.groupby('Driver')['OnsetToLatest'].mean()
+                    .sort_values(ascending=False).index.tolist())
+    styles = resolve_styles(session, drivers)
+    figures = {}
+
+    # --- Track map: median onset of every driver per zone ---
+    try:
+        geom = get_circuit_geometry(session)
+    except Exception:
+        geom = None
+    if geom is not None:
+        fig, ax = plt.subplots(figsize=(12, 10), facecolor='white')
+        geom.plot(ax, linewidth=5)
+        for drv in drivers:
+            d = table[table['Driver'] == drv]
+            geom.mark(ax, d['OnsetDistance'], s=22,
+                      color=styles.at[drv, 'Color'], edgecolors='black', linewidths=0.3, label=drv)
+        for _, z in zones.iterrows():
+            x, y = geom.position([z['Distance']])
+            ax.annotate(z['Zone'], (x[0], y[0]), xytext=(8, 8), textcoords='offset points',
+                        fontsize=10, fontweight='bold')
+        ax.legend(ncol=2, fontsize=8, bbox_to_anchor=(1.01, 1), loc='upper left')
+        ax.set_title(f"{title} - Braking Points (median onset)", fontsize=15, fontweight='bold')
+        figures['BrakingMap'] = fig
+
+    # --- Heatmaps: drivers × zones ---
+    zone_order = zones['Zone'].tolist()
+    size = (max(10, 0.6 * len(zone_order) + 4), 0.4 * len(drivers) + 2.5)
+    for suffix, column, cmap, label, fmt in (
+            ('BrakingOnset', 'OnsetToLatest', 'RdYlGn', "Onset vs latest braker (m)", '.0f'),
+            ('BrakingDecel', 'PeakDecel', 'viridis', "Peak deceleration (g)", '.1f'),
+            ('BrakingMinSpeed', 'MinSpeedToBest', 'RdYlGn', "Min speed vs best (km/h)", '.0f')):
+        matrix = table.pivot(index='Driver', columns='Zone', values=column).reindex(
+            index=drivers, columns=zone_order)
+        fig, ax = plt.subplots(figsize=size, facecolor='white')
+        fig.set_layout_engine('tight')
+        _heatmap(ax, matrix, cmap, label, fmt)
+        ax.set_title(f"{title} - {label}", fontsize=14, fontweight='bold')
+        figures[suffix] = fig
+    return figures
+
+
+# =========================================================
+# 5. Main Wrapper
+# =========================================================
+
+def analyze_braking(session):
+    """
+    [Feature] Braking Analysis
+    - Braking events of every representative lap (one vectorized pass)
+    - Onset point, onset / minimum speed and peak deceleration per corner
+    - Track map of braking points and driver × corner heatmaps
+    Returns the compute_braking tables (None without braking events).
+    """
+    print(f"\n[Braking Analysis] Detecting braking events on all laps...")
+
+    result = compute_braking(session)
+    if result['table'].empty:
+        print("[Error] No braking events found.")
+        return None
+
+    print(f"[System] {len(result['events'])} braking events in {len(result['zones'])} zones")
+    latest = result['table'].groupby('Zone', sort=False).head(1)
+    print("\n[Latest braker per zone]")
+    print(latest[['Zone', 'Driver', 'OnsetDistance', 'OnsetSpeed', 'MinSpeed', 'PeakDecel']]
+          .round(1).to_string(index=False))
+
+    save_figures(session, render_braking(session, result), facecolor='white')
+    return result
@@ -18,3 +18,316 @@ LONG_RUN_OUTLIER_ABS_DELTA: float = 3.0
 
 # Minimum valid laps per stint (applied before AND after outlier removal)
 LONG_RUN_MIN_STINT_LAPS: int = 5
+
+# ---------------------------------------------------------------------------
+# Race Strategy Simulation (practice_strategy.py)
+# ---------------------------------------------------------------------------
+
+# Time lost per pit stop (pit-lane transit + stationary), seconds.
+# Circuit dependent — overridden from the menu prompt when known.
+STRATEGY_PIT_LOSS: float = 22.0
+
+# Lap-time gain per lap from fuel burn-off (s/lap). Practice long-run slopes
+# contain this gain, so degradation = fitted slope + fuel effect.
+STRATEGY_FUEL_EFFECT: float = 0.06
+
+# Minimum laps on one set of tyres in a simulated strategy
+STRATEGY_MIN_STINT_LAPS: int = 8
+
+# Monte Carlo sample count and RNG seed (fixed seed → reproducible ranking)
+STRATEGY_N_SIMS: int = 5000
+STRATEGY_RANDOM_SEED: int = 42
+
+# ---------------------------------------------------------------------------
+# Whole-Grid Telemetry Overlay (practice_dominance.py)
+# ---------------------------------------------------------------------------
+
+# Horizontal buckets per trace for min/max decimation (≈ panel width in
+# pixels). Each trace keeps at most 2 × this many vertices.
+GRID_OVERLAY_LOD_BUCKETS: int = 1200
+
+# ---------------------------------------------------------------------------
+# Track Evolution Normalization (track_evolution.py)
+# ---------------------------------------------------------------------------
+
+# Laps slower than this ratio of the driver's best are left out of the fit
+# (cool-down / traffic laps carry no track-evolution signal)
+TRACK_EVOLUTION_FIT_THRESHOLD: float = 1.07
+
+# Minimum number of representative laps required to fit the model
+TRACK_EVOLUTION_MIN_LAPS: int = 30
+
+# ---------------------------------------------------------------------------
+# Run / Programme Classifier (run_classifier.py)
+# ---------------------------------------------------------------------------
+
+# Lap-time ratio to the driver's session best
+RUN_PUSH_RATIO: float = 1.03    # ≤ → push lap (qualifying simulation)
+RUN_LONG_RATIO: float = 1.10    # ≤ → representative lap inside a long run
+RUN_COOL_RATIO: float = 1.10    # >  → cool-down / slow lap
+
+# A run with at least LONG_RUN_MIN_STINT_LAPS representative laps is a long run.
+# Runs with no representative lap, at most this many laps and little full
+# throttle are treated as aero-rake / installation runs.
+RUN_AERO_MAX_LAPS: int = 4
+RUN_AERO_MAX_FULL_THROTTLE: float = 40.0   # % of lap samples at ≥ 99 % throttle
+
+# ---------------------------------------------------------------------------
+# Circuit Geometry Cache (track_geometry.py)
+# ---------------------------------------------------------------------------
+
+# Centreline resolution (m per segment) and smoothing window (m)
+TRACK_GEOMETRY_STEP_M: float = 5.0
+TRACK_GEOMETRY_SMOOTH_M: float = 25.0
+
+# A cached layout is reused when its length is within this fraction of the
+# current lap distance; larger differences are treated as a new layout.
+TRACK_GEOMETRY_LAYOUT_TOLERANCE: float = 0.02
+
+# On-disk store (kept outside 'cache', which main.py deletes on exit)
+TRACK_GEOMETRY_DIR: str = 'track_geometry'
+
+# ---------------------------------------------------------------------------
+# Analysis Server (analysis_server.py)
+# ---------------------------------------------------------------------------
+
+SERVER_HOST: str = '127.0.0.1'
+SERVER_PORT: int = 8765
+
+# Warm sessions kept in memory (least recently used is evicted first)
+SERVER_MAX_SESSIONS: int = 4
+
+# Concurrent analysis jobs; requests beyond this queue up
+SERVER_MAX_WORKERS: int = 4
+
+# Resolution of PNG responses (saved charts use 300 dpi)
+SERVER_DPI: int = 110
+
+# Seconds a request waits for its analysis before returning 504
+SERVER_REQUEST_TIMEOUT: float = 600.0
+
+# Directory of pickled sessions used by the offline stand-in
+RECORDED_SESSIONS_DIR: str = 'recorded_sessions'
+
+# ---------------------------------------------------------------------------
+# HTML Dashboard (html_report.py)
+# ---------------------------------------------------------------------------
+
+# Decimated level-of-detail levels per telemetry trace (min/max buckets),
+# coarse → fine; the full-resolution trace is always added as the last level.
+# The page switches to a finer level as the user zooms in.
+HTML_REPORT_LOD_BUCKETS: tuple = (150, 600)
+
+# Drivers whose traces are shown (and decoded) when the page opens
+HTML_REPORT_INITIAL_DRIVERS: int = 3
+
+# ---------------------------------------------------------------------------
+# Traffic / Tow Detection (traffic.py)
+# ---------------------------------------------------------------------------
+
+# Common session-time grid all cars are resampled onto (s)
+TRAFFIC_SAMPLE_S: float = 0.5
+
+# Position samples farther than this from the centreline are pit lane /
+# run-off and do not count as cars on track (m)
+TRAFFIC_MAX_OFFSET_M: float = 25.0
+
+# Dirty air: car ahead closer than this in corners (below the tow speed)
+TRAFFIC_DIRTY_AIR_GAP_S: float = 1.0
+
+# Tow: car ahead closer than this on straights (at or above the tow speed)
+TRAFFIC_TOW_GAP_S: float = 1.0
+TRAFFIC_TOW_MIN_SPEED: float = 250.0   # km/h
+
+# A lap is flagged when the condition holds for this share of its samples
+TRAFFIC_MIN_LAP_SHARE: float = 0.10
+
+# ---------------------------------------------------------------------------
+# Race Gaps / Positions (practice_race.py)
+# ---------------------------------------------------------------------------
+
+# A stop counts as an undercut attempt when the car ahead pits within this
+# many laps after the attacker
+RACE_UNDERCUT_WINDOW: int = 3
+
+# Pit window per stop number = these quantiles of the stop laps
+RACE_PIT_WINDOW_QUANTILES: tuple = (0.1, 0.9)
+
+# Interval heatmap colour scale saturates at this gap (s)
+RACE_INTERVAL_CLIP_S: float = 5.0
+
+# ---------------------------------------------------------------------------
+# Telemetry Quality (telemetry_quality.py)
+# ---------------------------------------------------------------------------
+
+# Valid range per channel; values outside are treated as missing
+QUALITY_CHANNEL_RANGES: dict = {
+    'Speed':    (0.0, 400.0),
+    'Throttle': (0.0, 100.0),
+    'nGear':    (0.0, 8.0),
+    'RPM':      (0.0, 16000.0),
+}
+
+# Missing values are interpolated over at most this many consecutive samples
+QUALITY_MAX_FILL_SAMPLES: int = 5
+
+# A step in Time larger than this is a gap (car data arrives every ~0.25 s)
+QUALITY_MAX_GAP_S: float = 1.0
+
+# Distance may step back by this much (rounding) before it counts as a reset (m)
+QUALITY_DISTANCE_TOLERANCE_M: float = 1.0
+
+# A lap is unusable with fewer samples or more unfilled Speed values (%)
+QUALITY_MIN_SAMPLES: int = 50
+QUALITY_MAX_UNFILLED_PCT: float = 5.0
+
+# ---------------------------------------------------------------------------
+# Season Database (season_db.py)
+# ---------------------------------------------------------------------------
+
+# SQLite file with per-session summaries (kept outside 'cache', which
+# main.py deletes on exit)
+SEASON_DB_PATH: str = 'season_db/season.sqlite'
+
+# ---------------------------------------------------------------------------
+# Run / Setup-Sweep Comparison (run_compare.py)
+# ---------------------------------------------------------------------------
+
+# Common distance grid every lap is aligned on (m)
+RUN_COMPARE_GRID_M: float = 5.0
+
+# Equal-length mini-sectors per lap
+RUN_COMPARE_MINI_SECTORS: int = 25
+
+# Corner window around the apex distance from the circuit info (m)
+RUN_COMPARE_CORNER_BEFORE_M: float = 100.0
+RUN_COMPARE_CORNER_AFTER_M: float = 50.0
+
+# Runs with fewer aligned laps are not compared
+RUN_COMPARE_MIN_LAPS: int = 2
+
+# Bootstrap iterations, confidence level and RNG seed (reproducible intervals)
+RUN_COMPARE_BOOTSTRAP: int = 1000
+RUN_COMPARE_CI: float = 0.95
+RUN_COMPARE_SEED: int = 42
+
+# ---------------------------------------------------------------------------
+# Braking Analysis (braking.py)
+# ---------------------------------------------------------------------------
+
+# Centred moving average over this many samples before differentiating Speed
+BRAKING_SMOOTH_SAMPLES: int = 5
+
+# A brake application counts as a braking event only above these thresholds
+BRAKING_MIN_DURATION_S: float = 0.3
+BRAKING_MIN_SPEED_DROP: float = 20.0   # km/h, onset speed - minimum speed
+
+# Onset distances further apart than this start a new braking zone (m)
+BRAKING_ZONE_GAP_M: float = 100.0
+
+# Zones braked on fewer than this share of laps are noise (lifts, lock-ups)
+BRAKING_MIN_ZONE_SHARE: float = 0.3
+
+# A zone is named after the next corner apex if it lies within this distance (m)
+BRAKING_CORNER_MAX_M: float = 400.0
+
+# ---------------------------------------------------------------------------
+# Powertrain Analysis (powertrain.py)
+# ---------------------------------------------------------------------------
+
+# Gear-ratio proxy uses only full-throttle samples above this RPM (no wheel
+# spin off the line, no coasting)
+POWERTRAIN_FULL_THROTTLE: float = 98.0
+POWERTRAIN_MIN_RPM: float = 6000.0
+
+# Minimum samples per driver and gear for a ratio estimate
+POWERTRAIN_MIN_SAMPLES: int = 20
+
+# ---------------------------------------------------------------------------
+# Analysis Pipelines (pipeline.py)
+# ---------------------------------------------------------------------------
+
+# Directory with pipeline definitions (.toml / .yaml) offered by the menu
+PIPELINE_DIR: str = 'pipelines'
+
+# Steps executed in parallel unless the file sets [pipeline] workers
+PIPELINE_MAX_WORKERS: int = 4
+
+# ---------------------------------------------------------------------------
+# Low-Memory Mode (low_memory.py)
+# ---------------------------------------------------------------------------
+
+# Downcast telemetry after loading, run pipeline steps one at a time and
+# release telemetry when no remaining step needs it
+LOW_MEMORY_MODE: bool = False
+
+# Peak resident memory (MB) above which a low-memory run reports failure
+LOW_MEMORY_RSS_BUDGET_MB: float = 2048.0
+
+# Upper bound on the dpi of saved charts in low-memory mode
+LOW_MEMORY_MAX_DPI: int = 150
+
+# ---------------------------------------------------------------------------
+# Team Evolution (team_evolution.py)
+# ---------------------------------------------------------------------------
+
+# Per-season session summaries (one .pkl per year / event / session)
+TEAM_EVOLUTION_CACHE_DIR: str = 'team_evolution'
+
+# Points of the normalised lap-distance grid for speed traces
+TEAM_EVOLUTION_GRID_POINTS: int = 500
+
+# Seasons loaded in parallel when they are not cached yet
+TEAM_EVOLUTION_MAX_WORKERS: int = 3
+
+# Seasons offered by the menu (current season and the ones before it)
+TEAM_EVOLUTION_DEFAULT_YEARS: int = 3
+
+# ---------------------------------------------------------------------------
+# Event Index (event_index.py)
+# ---------------------------------------------------------------------------
+
+# Cached season schedules (one JSON per year)
+EVENT_INDEX_DIR: str = 'event_index'
+
+# The current season's schedule is re-fetched when older than this (days)
+EVENT_INDEX_REFRESH_DAYS: float = 7.0
+
+# A query resolves to the best event only if it scores at least this (0 … 1)
+# and beats the runner-up by the margin (otherwise candidates are suggested)
+EVENT_INDEX_MIN_SCORE: float = 0.5
+EVENT_INDEX_MIN_MARGIN: float = 0.1
+
+# Below EVENT_INDEX_MIN_SCORE a misspelt name ("Mexcio") still resolves when
+# difflib finds a single event with a similarity ratio of at least this
+EVENT_INDEX_FUZZY_CUTOFF: float = 0.8
+
+# ---------------------------------------------------------------------------
+# DRS Analysis (drs.py)
+# ---------------------------------------------------------------------------
+
+# DRS channel values at or above this mean the flap is open (8 = eligible)
+DRS_OPEN_MIN: int = 10
+
+# Shorter openings are glitches (s)
+DRS_MIN_OPEN_S: float = 1.0
+
+# Opening points further apart than this start a new zone (m)
+DRS_ZONE_GAP_M: float = 300.0
+
+# Zones opened on fewer laps than this are ignored
+DRS_MIN_ZONE_LAPS: int = 5
+
+# ---------------------------------------------------------------------------
+# Report Bundles (report_bundle.py)
+# ---------------------------------------------------------------------------
+
+# One directory per session with manifest.json, charts and result tables
+REPORT_BUNDLE_DIR: str = 'Saved_photos/bundles'
+
+# Analyses (analysis_server.ANALYSES) a new bundle is built with
+REPORT_BUNDLE_ANALYSES: tuple = ('lap_gap', 'sector_ranking', 'telemetry_metrics',
+                                 'dominance', 'long_runs', 'speed_traps', 'braking', 'drs')
+
+# Resolution of bundle charts (part of every output's params hash)
+REPORT_BUNDLE_DPI: int = 200
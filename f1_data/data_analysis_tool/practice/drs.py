@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+drs.py
+DRS zones and DRS effectiveness over all laps of a session.
+
+Works on one concatenated telemetry frame (session_telemetry) like braking.py:
+activations are the rising / falling edges of the DRS channel (flap open =
+DRS >= DRS_OPEN_MIN), and every lap × zone passage is measured with a single
+searchsorted on a lap-ordered distance axis — no per-lap loop.
+
+    activations  flap open → closed: open / close distance, speeds, duration
+    zones        activation points clustered into zones (DRS1, DRS2, ...):
+                 Start (earliest regular opening), End (median closing)
+    passages     every lap through every zone: zone time, entry / top / exit
+                 speed, flap open or not
+    table        per driver and zone: time gained and top-speed gain of
+                 DRS-open passages over closed ones (NaN without closed laps,
+                 e.g. practice with free DRS use), speed gained along the zone,
+                 activation distance after the zone start
+
+Activations already open at a lap's first sample continue a zone across the
+line and are not counted twice. Results are cached per session object.
+"""
+
+import weakref
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice import config
+from practice.f1_colors import resolve_styles
+from practice.run_classifier import classify_runs
+from practice.save_utils import save_figures
+from practice.session_telemetry import concat_session_telemetry, lap_boundaries
+from practice.track_geometry import get_circuit_geometry
+
+# {session: {programmes: result}}; dropped automatically with the session
+_DRS_CACHE = weakref.WeakKeyDictionary()
+
+
+# =========================================================
+# 1. Activations and Zones
+# =========================================================
+
+def _prepare(tel: pd.DataFrame) -> tuple:
+    """Lap ids, lap boundaries and distances scaled to the median lap length."""
+    lap_id = pd.factorize(tel['LapIndex'])[0]
+    first, last = lap_boundaries(lap_id)
+    lap_len = tel.groupby(lap_id)['Distance'].transform('max').to_numpy()
+    ref_len = float(np.median(lap_len[first]))
+    dist = tel['Distance'].to_numpy(dtype=float) * ref_len / np.where(lap_len > 0, lap_len, np.nan)
+    return lap_id, first, last, dist, ref_len
+
+
+def detect_activations(tel: pd.DataFrame) -> pd.DataFrame:
+    """
+    DRS activations of a concatenated telemetry frame.
+    Columns: LapIndex, Driver, LapNumber, OpenDistance, CloseDistance (m),
+             OpenSpeed, CloseSpeed, TopSpeed (km/h), Duration (s).
+    """
+    columns = ['LapIndex', 'Driver', 'LapNumber', 'OpenDistance', 'CloseDistance',
+               'OpenSpeed', 'CloseSpeed', 'TopSpeed', 'Duration']
+    tel = tel.dropna(subset=['Speed'])
+    if tel.empty:
+        return pd.DataFrame(columns=columns)
+    lap_id, first, last, dist, _ = _prepare(tel)
+
+    flap = np.nan_to_num(tel['DRS'].to_numpy(dtype=float)) >= config.DRS_OPEN_MIN
+    prev = np.r_[False, flap[:-1]] & ~first
+    nxt = np.r_[flap[1:], False] & ~last
+    on = np.flatnonzero(flap & ~prev)
+    off = np.flatnonzero(flap & ~nxt)
+    if len(on) == 0:
+        return pd.DataFrame(columns=columns)
+
+    speed = tel['Speed'].to_numpy(dtype=float)
+    t = tel['SessionTime'].to_numpy(dtype=float)
+    bounds = np.column_stack([on, off + 1]).ravel()
+    top = np.maximum.reduceat(np.r_[speed, speed[-1]], bounds)[::2]
+
+    activations = pd.DataFrame({
+        'LapIndex':      tel['LapIndex'].to_numpy()[on],
+        'Driver':        tel['Driver'].to_numpy()[on],
+        'LapNumber':     tel['LapNumber'].to_numpy()[on],
+        'OpenDistance':  dist[on],
+        'CloseDistance': dist[off],
+        'OpenSpeed':     speed[on],
+        'CloseSpeed':    speed[off],
+        'TopSpeed':      top,
+        'Duration':      t[off] - t[on],
+    })
+    keep = ~first[on] & (activations['Duration'] >= config.DRS_MIN_OPEN_S)
+    return activations[keep].reset_index(drop=True)[columns]
+
+
+def assign_zones(activations: pd.DataFrame) -> tuple:
+    """
+    Cluster opening distances into DRS zones.
+    Returns (activations with a Zone column, zones: Zone, Start, End, Length, Laps).
+    Zones opened on fewer than DRS_MIN_ZONE_LAPS laps are dropped.
+    """
+    zone_cols = ['Zone', 'Start', 'End', 'Length', 'Laps']
+    if activations.empty:
+        return activations.assign(Zone=pd.Series(dtype=object)), pd.DataFrame(columns=zone_cols)
+
+    activations = activations.sort_values('OpenDistance', ignore_index=True)
+    activations['Cluster'] = np.r_[0, np.cumsum(np.diff(activations['OpenDistance'])
+                                                > config.DRS_ZONE_GAP_M)]
+    zones = (activations.groupby('Cluster')
+                        .agg(Start=('OpenDistance', lambda d: d.quantile(0.05)),
+                             End=('CloseDistance', 'median'), Laps=('LapIndex', 'nunique'))
+                        .reset_index())
+    zones = zones[zones['Laps'] >= config.DRS_MIN_ZONE_LAPS].reset_index(drop=True)
+    zones['Length'] = zones['End'] - zones['Start']
+    zones['Zone'] = [f"DRS{i + 1}" for i in range(len(zones))]
+
+    activations = (activations.merge(zones[['Cluster', 'Zone']], on='Cluster')
+                              .drop(columns='Cluster'))
+    return activations, zones[zone_cols]
+
+
+# =========================================================
+# 2. Zone Passages
+# =========================================================
+
+def measure_passages(tel: pd.DataFrame, zones: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every lap through every zone (laps that cover the whole zone).
+    Columns: LapIndex, Driver, LapNumber, Zone, ZoneTime (s), EntrySpeed,
+             TopSpeed, ExitSpeed (km/h), Open (flap opened inside the zone).
+    """
+    columns = ['LapIndex', 'Driver', 'LapNumber', 'Zone', 'ZoneTime',
+               'EntrySpeed', 'TopSpeed', 'ExitSpeed', 'Open']
+    tel = tel.dropna(subset=['Speed'])
+    if tel.empty or zones.empty:
+        return pd.DataFrame(columns=columns)
+    lap_id, first, last, dist, ref_len = _prepare(tel)
+
+    # One ordered axis over all laps: lap k occupies [k * span, k * span + lap length]
+    span = 2.0 * ref_len
+    axis = np.maximum.accumulate(lap_id * span + np.nan_to_num(dist))
+    n_laps = lap_id[-1] + 1
+    lap_k = np.repeat(np.arange(n_laps), len(zones))
+    start = np.tile(zones['Start'].to_numpy(dtype=float), n_laps)
+    end = np.tile(zones['End'].to_numpy(dtype=float), n_laps)
+    covered = (dist[first][lap_k] <= start) & (dist[last][lap_k] >= end)
+
+    t = tel['SessionTime'].to_numpy(dtype=float)
+    speed = tel['Speed'].to_numpy(dtype=float)
+
+    def at(d):
+        x = lap_k * span + d
+        k = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+        step = axis[k + 1] - axis[k]
+        frac = np.clip((x - axis[k]) / np.where(step > 0, step, np.inf), 0.0, 1.0)
+        return k, t[k] + frac * (t[k + 1] - t[k]), speed[k] + frac * (speed[k + 1] - speed[k])
+
+    k_in, t_in, v_in = at(start)
+    k_out, t_out, v_out = at(end)
+    lap_k, k_in, k_out = lap_k[covered], k_in[covered], np.maximum(k_out[covered], k_in[covered])
+    bounds = np.column_stack([k_in, k_out + 1]).ravel()
+    flap = (np.nan_to_num(tel['DRS'].to_numpy(dtype=float)) >= config.DRS_OPEN_MIN).astype(int)
+
+    lap_pos = np.flatnonzero(first)[lap_k]
+    return pd.DataFrame({
+        'LapIndex':   tel['LapIndex'].to_numpy()[lap_pos],
+        'Driver':     tel['Driver'].to_numpy()[lap_pos],
+        'LapNumber':  tel['LapNumber'].to_numpy()[lap_pos],
+        'Zone':       np.tile(zones['Zone'].to_numpy(), n_laps)[covered],
+        'ZoneTime':   (t_out - t_in)[covered],
+        'EntrySpeed': v_in[covered],
+        'TopSpeed':   np.maximum.reduceat(np.r_[speed, speed[-1]], bounds)[::2],
+        'ExitSpeed':  v_out[covered],
+        'Open':       np.maximum.reduceat(np.r_[flap, 0], bounds)[::2] > 0,
+    })[columns]
+
+
+# =========================================================
+# 3. Session Analysis
+# =========================================================
+
+def _driver_table(activations: pd.DataFrame, passages: pd.DataFrame,
+                  zones: pd.DataFrame) -> pd.DataFrame:
+    columns = ['Driver', 'Zone', 'OpenLaps', 'ClosedLaps', 'TimeGained', 'TopSpeedGain',
+               'SpeedGainInZone', 'ActivationDistance', 'OpenLength']
+    if passages.empty:
+        return pd.DataFrame(columns=columns)
+    stats = (passages.assign(Gain=passages['TopSpeed'] - passages['EntrySpeed'])
+                     .groupby(['Driver', 'Zone', 'Open'])
+                     .agg(Laps=('ZoneTime', 'size'), ZoneTime=('ZoneTime', 'median'),
+                          TopSpeed=('TopSpeed', 'median'), Gain=('Gain', 'median'))
+                     .unstack('Open'))
+    opened = lambda col: stats[(col, True)] if (col, True) in stats else np.nan
+    closed = lambda col: stats[(col, False)] if (col, False) in stats else np.nan
+    table = pd.DataFrame({
+        'OpenLaps':        opened('Laps'),
+        'ClosedLaps':      closed('Laps'),
+        'TimeGained':      closed('ZoneTime') - opened('ZoneTime'),
+        'TopSpeedGain':    opened('TopSpeed') - closed('TopSpeed'),
+        'SpeedGainInZone': opened('Gain'),
+    }, index=stats.index).reset_index()
+    table[['OpenLaps', 'ClosedLaps']] = table[['OpenLaps', 'ClosedLaps']].fillna(0).astype(int)
+
+    starts = zones.set_index('Zone')['Start']
+    act = (activations.assign(Activation=activations['OpenDistance']
+                              - activations['Zone'].map(starts),
+                              OpenLength=activations['CloseDistance'] - activations['OpenDistance'])
+                      .groupby(['Driver', 'Zone'], as_index=False)
+                      .agg(ActivationDistance=('Activation', 'median'),
+                           OpenLength=('OpenLength', 'median')))
+    table = table.merge(act, on=['Driver', 'Zone'], how='left')
+    order = {z: i for i, z in enumerate(zones['Zone'])}
+    return (table.assign(_z=table['Zone'].map(order))
+                 .sort_values(['_z', 'TimeGained', 'SpeedGainInZone'], ascending=[True, False, False])
+                 .drop(columns='_z').reset_index(drop=True)[columns])
+
+
+def compute_drs(session, laps=None, programmes=('push', 'long', 'other'), tel=None) -> dict:
+    """
+    DRS zones and effectiveness of every driver (tables: see module docstring).
+
+    `laps` default: every lap whose programme (run_classifier) is in
+    `programmes`; that default result is cached per session. `tel`: an
+    already concatenated frame of those laps with Speed and DRS (pipeline
+    session_telemetry step); `laps` is then not used.
+    Returns a dict of DataFrames: activations (+ Zone), zones, passages, table.
+    """
+    cached = laps is None and tel is None
+    if cached:
+        hit = _DRS_CACHE.get(session, {}).get(tuple(programmes))
+        if hit is not None:
+            return hit
+        laps = classify_runs(session, use_telemetry=False)
+        laps = laps[laps['Programme'].isin(list(programmes))]
+
+    if tel is None:
+        tel = concat_session_telemetry(session, laps, channels=('Speed', 'DRS'))
+    activations, zones = assign_zones(detect_activations(tel))
+    passages = measure_passages(tel, zones)
+    result = {
+        'activations': activations,
+        'zones':       zones,
+        'passages':    passages,
+        'table':       _driver_table(activations, passages, zones),
+    }
+    if cached:
+        _DRS_CACHE.setdefault(session, {})[tuple(programmes)] = result
+    return result
+
+
+# =========================================================
+# 4. Visualization
+# =========================================================
+
+def render_drs(session, result: dict) -> dict:
+    """Zone map and per-zone driver comparison. Returns {suffix: Figure}."""
+    table, zones = result['table'], result['zones']
+    if table.empty:
+        return {}
+    title = f"{session.event.year} {session.event.EventName} {session.name}"
+    styles = resolve_styles(session, sorted(table['Driver'].unique()))
+    figures = {}
+
+    # --- Track map with the detected zones ---
+    try:
+        geom = get_circuit_geometry(session)
+    except Exception:
+        geom = None
+    if geom is not None:
+        fig, ax = plt.subplots(figsize=(12, 10), facecolor='white')
+        d = geom.vertex_distance()[:-1]
+        in_zone = np.zeros(len(d), dtype=bool)
+        for _, z in zones.iterrows():
+            in_zone |= (d >= z['Start']) & (d <= z['End'])
+        geom.plot(ax, colors=np.where(in_zone, 'limegreen', 'lightgrey'), linewidth=6)
+        geom.mark(ax, zones['Start'], color='black', s=30)
+        for _, z in zones.iterrows():
+            x, y = geom.position([(z['Start'] + z['End']) / 2])
+            ax.annotate(f"{z['Zone']}\n{z['Length']:.0f} m", (x[0], y[0]), xytext=(10, 10),
+                        textcoords='offset points', fontsize=10, fontweight='bold')
+        ax.set_title(f"{title} - DRS Zones", fontsize=15, fontweight='bold')
+        figures['DRSMap'] = fig
+
+    # --- One row per zone: time gained, speed gain, activation distance ---
+    metrics = [('TimeGained', "Time gained vs closed flap (s)"),
+               ('TopSpeedGain', "Top speed gain vs closed flap (km/h)"),
+               ('SpeedGainInZone', "Speed gained in zone, DRS open (km/h)"),
+               ('ActivationDistance', "Opening after zone start (m)")]
+    metrics = [m for m in metrics if table[m[0]].notna().any()]
+    fig, axes = plt.subplots(len(zones), len(metrics), squeeze=False, facecolor='white',
+                             figsize=(5 * len(metrics), 0.25 * table['Driver'].nunique()
+                                      * len(zones) + 2.5))
+    fig.set_layout_engine('tight', rect=[0, 0, 1, 1 - 0.6 / fig.get_figheight()])
+    for row, zone in zip(axes, zones['Zone']):
+        d = table[table['Zone'] == zone]
+        for ax, (column, label) in zip(row, metrics):
+            g = d.dropna(subset=[column]).sort_values(column, ascending=False)
+            ax.barh(g['Driver'], g[column], color=[styles.at[drv, 'Color'] for drv in g['Driver']])
+            ax.invert_yaxis()
+            ax.tick_params(axis='y', labelsize=8)
+            ax.grid(True, axis='x', linestyle='--', alpha=0.3)
+            ax.set_title(f"{zone} - {label}", fontsize=10)
+    fig.suptitle(f"{title} - DRS Effectiveness", fontsize=15, fontweight='bold')
+    figures['DRSZones'] = fig
+    return figures
+
+
+# =========================================================
+# 5. Main Wrapper
+# =========================================================
+
+def analyze_drs(session):
+    """
+    [Feature] DRS Effectiveness
+    - DRS zones detected from the DRS channel of every lap
+    - Time and speed gained per zone and driver, activation distance
+    Returns the compute_drs tables (None without DRS activations).
+    """
+    print(f"\n[DRS Analysis] Detecting DRS zones on all laps...")
+
+    result = compute_drs(session)
+    if result['table'].empty:
+        print("[Error] No DRS activations found.")
+        return None
+
+    print(f"[System] {len(result['activations'])} activations in {len(result['zones'])} zones")
+    print(result['zones'].round(0).to_string(index=False))
+    summary = (result['table'].groupby('Zone', sort=False)
+                              [['TimeGained', 'TopSpeedGain', 'SpeedGainInZone',
+                                'ActivationDistance']].median())
+    print("\n[Median over drivers]")
+    print(summary.round(2).to_string())
+
+    save_figures(session, render_drs(session, result), facecolor='white')
+    return result
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+event_index.py
+Offline event lookup: cached season schedules + alias / trigram search.
+
+`fastf1.get_event_schedule(year)` needs the network on every launch and only
+knows official names. Here each season's schedule is stored once as JSON
+(EVENT_INDEX_DIR); finished seasons are never fetched again, the current one
+is refreshed after EVENT_INDEX_REFRESH_DAYS (a stale file is used offline).
+
+Every event is searchable by name, official name, country, location, round
+number and the aliases in ALIASES ("Brazil", "Interlagos", "COTA", "Imola").
+Text is accent- and case-folded ("sao paulo" = "São Paulo"); queries are
+scored against each field with a trigram inverted index, so typos and partial
+names resolve without scanning every name. Short misspelt names that share
+few trigrams ("Mexcio") fall back to difflib over the season's names.
+
+Usage:
+>>> index = EventIndex.load(2024)
+>>> index.resolve('brazil', 2024)
+'São Paulo Grand Prix'
+>>> index.search('monza')                # all cached seasons
+"""
+
+import difflib
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+import fastf1
+import pandas as pd
+
+from practice import config
+
+# Circuit / colloquial names → text found in EventName, Country or Location
+ALIASES = {
+    'brazil': 'sao paulo', 'interlagos': 'sao paulo',
+    'usa': 'austin', 'us': 'austin', 'cota': 'austin',
+    'vegas': 'las vegas', 'imola': 'emilia romagna', 'spa': 'belgian',
+    'spa francorchamps': 'belgian', 'monza': 'italian', 'silverstone': 'british',
+    'suzuka': 'japanese', 'jeddah': 'saudi arabian', 'mexico': 'mexico city',
+    'hermanos rodriguez': 'mexico city', 'yas marina': 'abu dhabi', 'yas': 'abu dhabi',
+    'zandvoort': 'dutch', 'hungaroring': 'hungarian', 'red bull ring': 'austrian',
+    'spielberg': 'austrian', 'montreal': 'canadian', 'gilles villeneuve': 'canadian',
+    'catalunya': 'spanish', 'barcelona': 'spanish', 'albert park': 'australian',
+    'melbourne': 'australian', 'sakhir': 'bahrain', 'lusail': 'qatar',
+    'marina bay': 'singapore', 'shanghai': 'chinese', 'monte carlo': 'monaco',
+    'baku': 'azerbaijan', 'portimao': 'portuguese', 'mugello': 'tuscan',
+    'nurburgring': 'eifel', 'istanbul': 'turkish', 'sochi': 'russian',
+    'paul ricard': 'french', 'le castellet': 'french', 'hockenheim': 'german',
+}
+
+_INDEXES = {}   # {(year, cache_dir): EventIndex} for resolve_event
+
+_FIELDS = ('EventName', 'OfficialEventName', 'Country', 'Location')
+_COLUMNS = ['Year', 'RoundNumber', 'EventName', 'OfficialEventName', 'Country',
+            'Location', 'EventDate']
+
+
+# -----------------------------------------------------------------------------
+# 1. Text normalisation
+# -----------------------------------------------------------------------------
+
+def normalize(text) -> str:
+    """'São Paulo  Grand-Prix' → 'sao paulo grand prix'."""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of each word, padded (' br', 'bra', ..., 'il ')."""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# -----------------------------------------------------------------------------
+# 2. Schedule cache
+# -----------------------------------------------------------------------------
+
+def schedule_path(year: int, cache_dir: str | None = None) -> str:
+    cache_dir = config.EVENT_INDEX_DIR if cache_dir is None else cache_dir
+    return os.path.join(cache_dir, f"schedule_{int(year)}.json")
+
+
+def _is_final(year: int) -> bool:
+    # Schedules of finished seasons no longer change
+    return int(year) < time.localtime().tm_year
+
+
+def _fetch_schedule(year: int) -> pd.DataFrame:
+    schedule = fastf1.get_event_schedule(int(year), include_testing=False)
+    schedule = schedule[schedule['RoundNumber'] > 0]
+    return pd.DataFrame({
+        'Year':              int(year),
+        'RoundNumber':       schedule['RoundNumber'].astype(int),
+        'EventName':         schedule['EventName'],
+        'OfficialEventName': schedule['OfficialEventName'].fillna(''),
+        'Country':           schedule['Country'].fillna(''),
+        'Location':          schedule['Location'].fillna(''),
+        'EventDate':         schedule['EventDate'].astype(str),
+    })[_COLUMNS]
+
+
+def load_schedule(year: int, cache_dir: str | None = None,
+                  online: bool = True) -> pd.DataFrame | None:
+    """
+    Season schedule from the JSON cache; fetched (and cached) when missing or,
+    for the current season, older than EVENT_INDEX_REFRESH_DAYS.
+    A stale cache is used if the fetch fails. None if nothing is available.
+    """
+    cache_dir = config.EVENT_INDEX_DIR if cache_dir is None else cache_dir
+    path = schedule_path(year, cache_dir)
+    cached = None
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                cached = pd.DataFrame(json.load(f), columns=_COLUMNS)
+        except (OSError, ValueError) as e:
+            print(f"[Warning] Corrupt schedule cache {path}: {e}")
+        age_days = (time.time() - os.path.getmtime(path)) / 86400
+        if cached is not None and (_is_final(year) or age_days < config.EVENT_INDEX_REFRESH_DAYS):
+            return cached
+    if not online:
+        return cached
+
+    try:
+        schedule = _fetch_schedule(year)
+    except Exception as e:
+        if cached is None:
+            print(f"[Warning] {year} schedule not available offline: {e}")
+        return cached
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(schedule.to_dict(orient='records'), f, ensure_ascii=False, indent=1)
+    except OSError as e:
+        print(f"[Warning] Could not store schedule cache: {e}")
+    return schedule
+
+
+def cached_years(cache_dir: str | None = None) -> list:
+    """Seasons with a cached schedule."""
+    cache_dir = config.EVENT_INDEX_DIR if cache_dir is None else cache_dir
+    if not os.path.isdir(cache_dir):
+        return []
+    return sorted(int(m.group(1)) for m in
+                  (re.fullmatch(r'schedule_(\d{4})\.json', n) for n in os.listdir(cache_dir)) if m)
+
+
+# -----------------------------------------------------------------------------
+# 3. Index
+# -----------------------------------------------------------------------------
+
+class EventIndex:
+    """Trigram / alias search over the events of one or more seasons."""
+
+    def __init__(self, events: pd.DataFrame):
+        self.events = events.reset_index(drop=True)
+        self._keys = []                      # (event row, normalized text, trigram count)
+        self._postings = defaultdict(list)   # trigram → [key ids]
+        self._exact = defaultdict(set)       # normalized text → {event rows}
+
+        alias_targets = defaultdict(list)
+        for alias, target in ALIASES.items():
+            alias_targets[target].append(alias)
+
+        for row, event in enumerate(self.events.itertuples(index=False)):
+            texts = {normalize(getattr(event, f)) for f in _FIELDS}
+            texts.discard('')
+            joined = ' | '.join(sorted(texts))
+            texts |= {alias for target, aliases in alias_targets.items()
+                      if re.search(rf'\b{target}\b', joined) for alias in aliases}
+            for text in texts:
+                self._exact[text].add(row)
+                key = len(self._keys)
+                grams = trigrams(text)
+                self._keys.append((row, text, len(grams)))
+                for gram in grams:
+                    self._postings[gram].append(key)
+
+    @classmethod
+    def load(cls, years=None, cache_dir: str | None = None,
+             online: bool = True) -> "EventIndex":
+        """
+        Index of `years` (int or iterable; default: every cached season).
+        Missing seasons are fetched once when `online`.
+        """
+        cache_dir = config.EVENT_INDEX_DIR if cache_dir is None else cache_dir
+        if years is None:
+            years = cached_years(cache_dir)
+        elif isinstance(years, int):
+            years = [years]
+        frames = [s for s in (load_schedule(y, cache_dir, online) for y in years) if s is not None]
+        events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=_COLUMNS)
+        return cls(events)
+
+    def event_names(self, year: int) -> list:
+        """Event names of a season in round order."""
+        d = self.events[self.events['Year'] == int(year)]
+        return d.sort_values('RoundNumber')['EventName'].tolist()
+
+    def search(self, query: str, year: int | None = None, limit: int = 5) -> pd.DataFrame:
+        """
+        Best matching events (columns: Year, RoundNumber, EventName, Location,
+        Country, Score 0 … 1). A number matches the round of that season.
+        """
+        columns = ['Year', 'RoundNumber', 'EventName', 'Location', 'Country', 'Score']
+        mask = (self.events['Year'] == int(year)) if year is not None else \
+            pd.Series(True, index=self.events.index)
+        text = normalize(query)
+        if not text:
+            return pd.DataFrame(columns=columns)
+
+        scores = {}
+        if text.isdigit():
+            for row in self.events.index[mask & (self.events['RoundNumber'] == int(text))]:
+                scores[row] = 1.0
+        else:
+            exact = self.events.loc[sorted(self._exact.get(text, ())), 'Year']
+            for row, year_of_row in exact.items():
+                # Shared by several events of a season ('Italy', 'United States'): no sure hit
+                scores[row] = 1.0 if (exact == year_of_row).sum() == 1 else 0.75
+            grams = trigrams(text)
+            shared = Counter(key for gram in grams for key in self._postings.get(gram, ()))
+            for key, count in shared.items():
+                row, key_text, size = self._keys[key]
+                if key_text == text:
+                    continue   # scored as exact match above
+                # Mostly "how much of the query is in the field", Jaccard breaks ties
+                score = 0.7 * count / len(grams) + 0.3 * count / (len(grams) + size - count)
+                if score > scores.get(row, 0.0):
+                    scores[row] = score
+
+        hits = pd.DataFrame([(row, s) for row, s in scores.items() if mask.iloc[row]],
+                            columns=['Row', 'Score'])
+        if hits.empty:
+            return pd.DataFrame(columns=columns)
+        hits = hits.join(self.events, on='Row')
+        return (hits.sort_values(['Score', 'Year', 'RoundNumber'], ascending=[False, False, True])
+                    .head(limit)[columns].reset_index(drop=True))
+
+    def _close_match(self, query: str, year: int) -> str | None:
+        """difflib fallback: the one event of `year` with names close to `query`."""
+        rows = set(self.events.index[self.events['Year'] == int(year)])
+        texts = defaultdict(set)
+        for row, text, _ in self._keys:
+            if row in rows:
+                texts[text].add(row)
+        close = difflib.get_close_matches(normalize(query), list(texts), n=3,
+                                          cutoff=config.EVENT_INDEX_FUZZY_CUTOFF)
+        matched = set().union(*(texts[t] for t in close))
+        return self.events.at[matched.pop(), 'EventName'] if len(matched) == 1 else None
+
+    def resolve(self, query: str, year: int) -> str | None:
+        """
+        Event name of `year` for a non-exact query, or None if no event scores
+        at least EVENT_INDEX_MIN_SCORE (nor is a single close difflib match)
+        or the best two are too close to call.
+        """
+        hits = self.search(query, year, limit=2)
+        if hits.empty or hits['Score'].iloc[0] < config.EVENT_INDEX_MIN_SCORE:
+            return self._close_match(query, year)
+        if len(hits) > 1 and hits['Score'].iloc[0] < 1.0 and \
+                hits['Score'].iloc[0] - hits['Score'].iloc[1] < config.EVENT_INDEX_MIN_MARGIN:
+            return None
+        return hits['EventName'].iloc[0]
+
+
+def resolve_event(year: int, query, cache_dir: str | None = None):
+    """
+    Event name for batch callers (CLI / server): round numbers are kept as int,
+    names are resolved through the index; the query itself is returned when
+    it cannot be resolved (FastF1 then applies its own matching).
+    """
+    cache_dir = config.EVENT_INDEX_DIR if cache_dir is None else cache_dir
+    if isinstance(query, int) or str(query).isdigit():
+        return int(query)
+    try:
+        key = (int(year), cache_dir)
+        if key not in _INDEXES:
+            _INDEXES[key] = EventIndex.load(int(year), cache_dir)
+        name = _INDEXES[key].resolve(query, int(year))
+    except Exception as e:
+        print(f"[Warning] Event index unavailable: {e}")
+        return query
+    if name and name != query:
+        print(f"[System] '{query}' → {name}")
+    return name or query
@@ -4,7 +4,13 @@ F1 Team/Driver Color Mapping Module for FastF1 Analysis.
 Handles historical livery changes and mid-season driver transfers automatically.
 """
 
+import re
+import weakref
+from functools import lru_cache
+
 import fastf1
+import pandas as pd
+from matplotlib.colors import to_hex, to_rgb
 
 # -----------------------------------------------------------------------------
 # 1. Team Name & Color Mapping (2018 ~ 2026)
@@ -53,28 +59,236 @@ TEAM_COLORS_MAP = {
 
 DEFAULT_COLOR = '#808080'  # Grey color for failed matches
 
+# All keywords compiled into one pattern. Every alternative is a lookahead from
+# the start of the name, tried in map order, so the first keyword of the map
+# found anywhere in the name wins (not the leftmost one in the name);
+# match.lastindex is the position of that keyword in the map.
+_TEAM_KEYWORD_PATTERN = re.compile(
+    '|'.join(f"(?=.*?({re.escape(keyword)}))" for keyword in TEAM_COLORS_MAP), re.DOTALL)
+_TEAM_KEYWORD_COLORS = list(TEAM_COLORS_MAP.values())
+
+# Linestyle cycle shared by all modules: teammate slot (1st driver of a team =
+# solid, 2nd = dashed, ...) or any other per-series index (e.g. stint number)
+LINESTYLE_CYCLE = ['-', '--', ':', '-.']
+
+# Shade per teammate slot: > 0 mixes towards white, < 0 towards black
+TEAMMATE_SHADES = [0.0, 0.40, -0.35, 0.65]
+
 
 # -----------------------------------------------------------------------------
 # 2. Helper Functions
 # -----------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def get_team_color(team_name: str) -> str:
     """
     Returns the color code based on the team name string.
-    Uses substring matching.
+    Substring matching through the compiled keyword pattern; results are
+    memoized per team name.
     """
     if not team_name:
         return DEFAULT_COLOR
-    
-    name_lower = team_name.lower()
-    
-    # Check if keyword is in team name
-    for keyword, color in TEAM_COLORS_MAP.items():
-        if keyword in name_lower:
-            return color
-            
-    return DEFAULT_COLOR
+    match = _TEAM_KEYWORD_PATTERN.match(team_name.lower())
+    return _TEAM_KEYWORD_COLORS[match.lastindex - 1] if match else DEFAULT_COLOR
+
+
+@lru_cache(maxsize=None)
+def shade_color(color: str, amount: float) -> str:
+    """Lighten (amount > 0) or darken (amount < 0) a color; returns hex."""
+    if amount == 0:
+        return color
+    r, g, b = to_rgb(color)
+    if amount >= 0:
+        r, g, b = (c + (1.0 - c) * amount for c in (r, g, b))
+    else:
+        r, g, b = (c * (1.0 + amount) for c in (r, g, b))
+    return to_hex((r, g, b))
+
+
+@lru_cache(maxsize=64)
+def team_palette(season, team_slots: tuple) -> dict:
+    """
+    Color/linestyle per teammate slot, memoized per (season, team set).
+
+    `team_slots`: tuple of (TeamName, number of drivers), e.g. (('McLaren', 2), ...)
+    Returns {TeamName: [(Color, LineStyle), ...]} — slot 0 keeps the team color.
+    The season is part of the key because team names map to different liveries
+    over the years.
+    """
+    palette = {}
+    for team, n_slots in team_slots:
+        base = get_team_color(team)
+        palette[team] = [
+            (shade_color(base, TEAMMATE_SHADES[slot % len(TEAMMATE_SHADES)]),
+             LINESTYLE_CYCLE[slot % len(LINESTYLE_CYCLE)])
+            for slot in range(n_slots)
+        ]
+    return palette
+
+
+# -----------------------------------------------------------------------------
+# 3. Per-Session Driver Index
+# -----------------------------------------------------------------------------
+
+class DriverIndex:
+    """
+    Precomputed driver metadata for one session.
+
+    Built once from `session.results` (TeamName is per session, so mid-season
+    transfers resolve to the team the driver actually drove for). Lookups
+    accept either the driver number ('1') or the abbreviation ('VER').
+
+    Record keys: DriverNumber, Abbreviation, TeamName, Color (team color),
+                 DriverColor (teammate shade), LineStyle, Slot
+    """
+
+    def __init__(self, session):
+        results = session.results
+        team_names = results['TeamName'] if 'TeamName' in results else None
+        lap_teams = self._lap_teams(session)
+
+        records = []
+        for i, row in enumerate(results.itertuples(index=False)):
+            number = str(row.DriverNumber)
+            team = team_names.iloc[i] if team_names is not None else None
+            if not isinstance(team, str) or not team:
+                # Results without team name (e.g. some practice sessions) → laps table
+                team = lap_teams.get(row.Abbreviation, '')
+            records.append({
+                'DriverNumber': number,
+                'Abbreviation': row.Abbreviation,
+                'TeamName':     team,
+                'Color':        get_team_color(team),
+            })
+
+        # Teammate slot by driver number → stable shade/linestyle across sessions
+        by_team = {}
+        for rec in sorted(records, key=lambda r: _number_sort_key(r['DriverNumber'])):
+            by_team.setdefault(rec['TeamName'], []).append(rec)
+        palette = team_palette(_session_season(session),
+                               tuple(sorted((t, len(r)) for t, r in by_team.items())))
+        for team, team_records in by_team.items():
+            for slot, rec in enumerate(team_records):
+                rec['Slot'] = slot
+                rec['DriverColor'], rec['LineStyle'] = palette[team][slot]
+
+        self.records = records
+        self.teams = {team: [r['Abbreviation'] for r in recs] for team, recs in by_team.items()}
+        self._lookup = {}
+        for rec in records:
+            self._lookup[rec['DriverNumber']] = rec
+            self._lookup[rec['Abbreviation']] = rec
+
+    @staticmethod
+    def _lap_teams(session) -> dict:
+        try:
+            laps = session.laps
+        except Exception:
+            return {}
+        if laps is None or laps.empty:
+            return {}
+        return laps.dropna(subset=['Team']).groupby('Driver')['Team'].first().to_dict()
+
+    def __getitem__(self, identifier) -> dict:
+        return self._lookup[str(identifier)]
+
+    def __contains__(self, identifier) -> bool:
+        return str(identifier) in self._lookup
+
+    def abbreviation(self, identifier) -> str:
+        return self[identifier]['Abbreviation']
+
+    def team(self, identifier) -> str:
+        return self[identifier]['TeamName']
 
+    def color(self, identifier) -> str:
+        return self[identifier]['Color']
+
+    def driver_color(self, identifier) -> str:
+        return self[identifier]['DriverColor']
+
+    def linestyle(self, identifier) -> str:
+        return self[identifier]['LineStyle']
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+
+def _number_sort_key(number: str):
+    return (0, int(number)) if number.isdigit() else (1, number)
+
+
+def _session_season(session):
+    try:
+        return int(session.event['EventDate'].year)
+    except Exception:
+        try:
+            return int(session.event.year)
+        except Exception:
+            return None
+
+
+# One index per session object; dropped automatically with the session and
+# cleared by the SessionLoader whenever a load rewrites results / laps
+_DRIVER_INDEX_CACHE = weakref.WeakKeyDictionary()
+
+
+def get_driver_index(session) -> DriverIndex:
+    """
+    Returns the (cached) DriverIndex for `session`.
+
+    Usage:
+    >>> idx = get_driver_index(session)
+    >>> idx['VER']['TeamName'], idx.color('1')
+    """
+    index = _DRIVER_INDEX_CACHE.get(session)
+    if index is None:
+        index = DriverIndex(session)
+        _DRIVER_INDEX_CACHE[session] = index
+    return index
+
+
+def clear_driver_index(session):
+    """Drop the cached DriverIndex of `session` (after its results / laps were reloaded)."""
+    _DRIVER_INDEX_CACHE.pop(session, None)
+
+
+def resolve_styles(session, drivers=None) -> pd.DataFrame:
+    """
+    Batch style resolution for many series at once.
+
+    `drivers`: list of numbers/abbreviations, a Series, or a laps frame
+    (unique values of its 'Driver' column); None = every driver in the session.
+    Returns a frame indexed by the given identifiers (input order) with
+    Abbreviation, TeamName, TeamColor, Color (teammate shade), LineStyle.
+    Unknown drivers get DEFAULT_COLOR and a solid line instead of an error.
+
+    Usage:
+    >>> styles = resolve_styles(session, laps)
+    >>> ax.plot(x, y, color=styles.at['NOR', 'Color'], linestyle=styles.at['NOR', 'LineStyle'])
+    """
+    index = get_driver_index(session)
+    if drivers is None:
+        drivers = [rec['Abbreviation'] for rec in index.records]
+    elif isinstance(drivers, pd.DataFrame):
+        drivers = drivers['Driver'].dropna().unique()
+    drivers = [str(d) for d in pd.unique(pd.Series(list(drivers), dtype=object))]
+
+    rows = []
+    for drv in drivers:
+        rec = index._lookup.get(drv)
+        if rec is None:
+            rows.append((drv, '', DEFAULT_COLOR, DEFAULT_COLOR, LINESTYLE_CYCLE[0]))
+        else:
+            rows.append((rec['Abbreviation'], rec['TeamName'], rec['Color'],
+                         rec['DriverColor'], rec['LineStyle']))
+    return pd.DataFrame(rows, index=pd.Index(drivers, name='Driver'),
+                        columns=['Abbreviation', 'TeamName', 'TeamColor', 'Color', 'LineStyle'])
+
+
+# -----------------------------------------------------------------------------
+# 4. Driver Helpers (index-backed)
+# -----------------------------------------------------------------------------
 
 def get_driver_color(session, driver: str) -> str:
     """
@@ -85,10 +299,7 @@ def get_driver_color(session, driver: str) -> str:
     >>> color = get_driver_color(session, 'VER')
     """
     try:
-        # Load driver info from FastF1 session
-        drv_info = session.get_driver(driver)
-        team_name = drv_info['TeamName']
-        return get_team_color(team_name)
+        return get_driver_index(session).color(driver)
     except Exception as e:
         print(f"[Color Error] Could not find color for driver {driver}: {e}")
         return DEFAULT_COLOR
@@ -96,12 +307,18 @@ def get_driver_color(session, driver: str) -> str:
 def get_driver_style(session, driver: str):
     """
     (Optional)
-    Returns a style dictionary including color.
+    Returns a style dictionary including teammate shade and linestyle.
     Useful for unpacking into Matplotlib (**kwargs).
     """
-    color = get_driver_color(session, driver)
+    try:
+        rec = get_driver_index(session)[driver]
+        color, linestyle = rec['DriverColor'], rec['LineStyle']
+    except Exception as e:
+        print(f"[Color Error] Could not find style for driver {driver}: {e}")
+        color, linestyle = DEFAULT_COLOR, LINESTYLE_CYCLE[0]
     return {
         'color': color,
+        'linestyle': linestyle,
         'label': driver,
         'alpha': 0.8
     }
\ No newline at end of file
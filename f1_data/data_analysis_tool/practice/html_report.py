@@ -0,0 +1,561 @@
+# -*- coding: utf-8 -*-
+"""
+html_report.py
+One self-contained interactive HTML dashboard per session.
+
+Instead of a dozen PNGs rendered by matplotlib, the compute_* tables are
+embedded once as JSON and drawn by a small inline script (no external
+libraries, works offline):
+
+- Telemetry / dominance : fastest-lap Speed, Throttle, Brake, Gear and Delta
+                          traces plus a track map coloured by the fastest
+                          selected driver per geometry segment
+- Lap gap, sector ranking, downforce map and long runs
+
+Telemetry traces are stored as base64 Float32Array blobs, one per driver
+and level of detail (min/max decimated, see lod.py). A blob is only decoded
+when its driver is selected, and a finer level is picked as the user zooms.
+
+Usage:
+>>> write_html_report(session)            # Saved_photos/<Year>_<Event>_<Session>_Dashboard.html
+"""
+
+import base64
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from practice import config
+from practice.f1_colors import resolve_styles
+from practice.lod import multichannel_indices
+from practice.practice_dominance import compute_grid_overlay
+from practice.practice_downforce import compute_grid_aero, compute_grid_aero_laps
+from practice.practice_laptime import compute_lap_gap, compute_sector_ranking
+from practice.practice_longrun import extract_long_run_laps
+from practice.save_utils import DEFAULT_SAVE_DIR, ensure_save_dir, make_filename
+from practice.track_geometry import get_circuit_geometry
+
+# Channels of every trace blob (row-major: channel after channel)
+TRACE_CHANNELS = ('Distance', 'Time', 'Speed', 'Throttle', 'Brake', 'nGear')
+
+
+# =========================================================
+# 1. Encoding helpers
+# =========================================================
+
+def _seconds(value):
+    """Timedelta / number → float seconds (None for NaN / NaT)."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, (pd.Timedelta, np.timedelta64)):
+        return round(pd.Timedelta(value).total_seconds(), 3)
+    return round(float(value), 3)
+
+
+def _encode_blob(rows) -> str:
+    """Stack equally long channels into one little-endian float32 buffer (base64)."""
+    data = np.ascontiguousarray(np.vstack(rows), dtype='<f4')
+    return base64.b64encode(data.tobytes()).decode('ascii')
+
+
+def _trace_levels(trace: pd.DataFrame, lod_buckets) -> list:
+    """Index arrays of every level of detail, coarse → fine (full resolution last)."""
+    distance = trace['Distance'].to_numpy(dtype=float)
+    channels = [trace[c].to_numpy(dtype=float) for c in TRACE_CHANNELS[2:]]
+    levels = []
+    for n_buckets in sorted(lod_buckets):
+        keep = multichannel_indices(distance, channels, n_buckets)
+        if len(keep) < len(distance) and (not levels or len(keep) > len(levels[-1])):
+            levels.append(keep)
+    levels.append(np.arange(len(distance)))
+    return levels
+
+
+# =========================================================
+# 2. Report data (compute_* tables → JSON + binary blobs)
+# =========================================================
+
+def _section(name: str, build):
+    """Run one section builder; a failing section is left out of the page."""
+    try:
+        return build()
+    except Exception as e:
+        print(f"[Warning] HTML report: skipped {name} ({e})")
+        return None
+
+
+def _traces_section(session, blobs: dict, lod_buckets):
+    df = compute_grid_overlay(session)
+    if df.empty:
+        return None
+    drivers = list(pd.unique(df['Driver']))[::-1]          # fastest first
+    styles = resolve_styles(session, drivers)
+
+    records = []
+    for i, drv in enumerate(drivers):
+        trace = df[df['Driver'] == drv].dropna(subset=['Distance', 'Time'])
+        levels = []
+        for k, keep in enumerate(_trace_levels(trace, lod_buckets)):
+            blob_id = f"t{i}_{k}"
+            blobs[blob_id] = _encode_blob(
+                [trace[c].to_numpy(dtype=float)[keep] for c in TRACE_CHANNELS])
+            levels.append({'id': blob_id, 'n': int(len(keep))})
+        records.append({
+            'driver':  drv,
+            'color':   styles.at[drv, 'Color'],
+            'dash':    styles.at[drv, 'LineStyle'],
+            'lapTime': _seconds(trace['LapTime'].iloc[0]),
+            'length':  float(trace['Distance'].max()),
+            'levels':  levels,
+        })
+    return {'channels': list(TRACE_CHANNELS), 'drivers': records}
+
+
+def _track_section(session, blobs: dict):
+    geom = get_circuit_geometry(session)
+    blobs['track'] = _encode_blob([geom.x, geom.y])
+    return {'id': 'track', 'n': int(len(geom.x)), 'circuit': geom.circuit}
+
+
+def _lap_gap_section(session, corrected: bool):
+    df = compute_lap_gap(session, corrected=corrected)
+    return [{'driver': r.Driver, 'lapTime': _seconds(r.LapTime),
+             'gap': _seconds(r.Gap), 'color': r.Color}
+            for r in df.itertuples()] or None
+
+
+def _sector_section(session):
+    df = compute_sector_ranking(session)
+    return {str(sector): [{'driver': r.Driver, 'time': _seconds(r.Time), 'color': r.Color}
+                          for r in group.itertuples()]
+            for sector, group in df.groupby('Sector')} or None
+
+
+def _downforce_section(session):
+    df = compute_grid_aero(session)
+    x_label, y_label = 'Mean speed (km/h)', 'Top speed (km/h)'
+    if df.empty:
+        # Laps-only fallback: lap-time index and speed trap, one point per team (no Driver)
+        df = compute_grid_aero_laps(session)
+        x_label, y_label = 'Mean speed index (% of fastest team)', 'Speed trap P95 (km/h)'
+    points = [{'team': r.Team, 'driver': getattr(r, 'Driver', None),
+               'mean': round(float(r.MeanSpeed), 1), 'top': round(float(r.TopSpeed), 1),
+               'color': r.Color}
+              for r in df.itertuples()]
+    return {'xLabel': x_label, 'yLabel': y_label, 'points': points} if points else None
+
+
+def _long_run_section(session, corrected: bool):
+    df = extract_long_run_laps(session, corrected=corrected, classified=True)
+    if df.empty:
+        return None
+    runs = []
+    for stint_key, g in df.groupby('StintKey', sort=False):
+        g = g.sort_values('StintLap')
+        runs.append({
+            'key':      stint_key,
+            'driver':   g['Driver'].iloc[0],
+            'stint':    int(g['Stint'].iloc[0]),
+            'compound': str(g['Compound'].iloc[0]),
+            'color':    g['Color'].iloc[0],
+            'mean':     round(float(g['LapTimeSeconds'].mean()), 3),
+            'x':        g['StintLap'].astype(int).tolist(),
+            'y':        g['LapTimeSeconds'].round(3).tolist(),
+        })
+    return sorted(runs, key=lambda r: r['mean'])
+
+
+def build_report_data(session, corrected: bool = False,
+                      lod_buckets=None) -> tuple:
+    """
+    Everything the dashboard shows.
+    Returns (meta, blobs): JSON-able section dict and {blob_id: base64 string}.
+    Sections without data are None.
+    """
+    lod_buckets = config.HTML_REPORT_LOD_BUCKETS if lod_buckets is None else lod_buckets
+    blobs = {}
+    meta = {
+        'title':     f"{session.event.year} {session.event.EventName} {session.name}",
+        'corrected': bool(corrected),
+        'initial':   config.HTML_REPORT_INITIAL_DRIVERS,
+        'traces':    _section('telemetry traces', lambda: _traces_section(session, blobs, lod_buckets)),
+        'track':     _section('track map', lambda: _track_section(session, blobs)),
+        'lapGap':    _section('lap gap', lambda: _lap_gap_section(session, corrected)),
+        'sectors':   _section('sector ranking', lambda: _sector_section(session)),
+        'downforce': _section('downforce map', lambda: _downforce_section(session)),
+        'longRuns':  _section('long runs', lambda: _long_run_section(session, corrected)),
+    }
+    return meta, blobs
+
+
+# =========================================================
+# 3. Page
+# =========================================================
+
+def render_html(meta: dict, blobs: dict) -> str:
+    """Assemble the self-contained page."""
+    # '</' inside a <script> block would end it early
+    meta_json = json.dumps(meta, separators=(',', ':')).replace('</', '<\\/')
+    blob_tags = '\n'.join(
+        f'<script type="application/octet-stream" id="{blob_id}">{data}</script>'
+        for blob_id, data in blobs.items())
+    title = meta['title'].replace('&', '&amp;').replace('<', '&lt;')
+    return (_PAGE_TEMPLATE
+            .replace('%TITLE%', title)
+            .replace('%META%', meta_json)
+            .replace('%BLOBS%', blob_tags)
+            .replace('%SCRIPT%', _SCRIPT))
+
+
+def write_html_report(session, corrected: bool = False, filename: str | None = None,
+                      save_dir: str = DEFAULT_SAVE_DIR) -> str | None:
+    """
+    [Feature] Interactive HTML Dashboard
+    - One self-contained file per session (telemetry, dominance map, lap gap,
+      sectors, downforce, long runs); no matplotlib rendering involved
+    - Traces embedded as float32 blobs with min/max LOD levels, decoded per
+      driver on demand
+    Returns the written path (None if no section had data).
+    """
+    print(f"\n[HTML Report] Building dashboard...")
+    start = time.perf_counter()
+
+    meta, blobs = build_report_data(session, corrected=corrected)
+    sections = ('traces', 'lapGap', 'sectors', 'downforce', 'longRuns')
+    if all(meta[s] is None for s in sections):
+        print("[Error] No data available for the HTML report.")
+        return None
+
+    path = os.path.join(ensure_save_dir(save_dir),
+                        filename or make_filename(session, 'Dashboard', ext='html'))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_html(meta, blobs))
+
+    size_kb = os.path.getsize(path) / 1024
+    print(f"[System] Saved: {path} ({size_kb:.0f} KB, {time.perf_counter() - start:.1f}s)")
+    return path
+
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>%TITLE%</title>
+<style>
+body { font-family: -apple-system, 'Segoe UI', Helvetica, Arial, sans-serif; margin: 0; color: #222; background: #fafafa; }
+header { padding: 14px 24px; background: #15151e; color: #fff; }
+header h1 { margin: 0; font-size: 20px; font-weight: 600; }
+nav { display: flex; gap: 4px; padding: 8px 24px 0; background: #15151e; }
+nav button { border: 0; padding: 8px 14px; background: #2b2b38; color: #ccc; cursor: pointer; border-radius: 4px 4px 0 0; }
+nav button.active { background: #fafafa; color: #111; }
+section { display: none; padding: 16px 24px; }
+section.active { display: block; }
+canvas { width: 100%; display: block; background: #fff; border: 1px solid #e4e4e4; margin-bottom: 6px; }
+canvas.tel { height: 150px; cursor: crosshair; }
+canvas.big { height: 460px; }
+#track { height: 420px; }
+.drivers label { display: inline-block; margin: 2px 8px 2px 0; font-size: 13px; cursor: pointer; }
+.swatch { display: inline-block; width: 14px; height: 4px; margin: 0 4px 2px 2px; vertical-align: middle; }
+.note { color: #777; font-size: 12px; margin: 4px 0 10px; }
+.bars { display: grid; grid-template-columns: 48px 1fr 150px; gap: 3px 8px; align-items: center; font-size: 13px; max-width: 900px; }
+.bar { height: 14px; border-radius: 2px; }
+.sectors { display: grid; grid-template-columns: repeat(3, 1fr); gap: 24px; }
+.sectors .bars { grid-template-columns: 40px 1fr 110px; }
+.legend { font-size: 12px; columns: 4; }
+.empty { color: #999; }
+</style>
+</head>
+<body>
+<header><h1>%TITLE%</h1></header>
+<nav id="tabs"></nav>
+<section id="v-traces">
+  <div class="drivers" id="drivers"></div>
+  <div class="note">Drag on a chart to zoom, double-click to reset. Delta is measured against the first selected driver.</div>
+  <canvas id="track"></canvas>
+  <div id="panels"></div>
+</section>
+<section id="v-lapGap"><div class="bars" id="lapgap"></div></section>
+<section id="v-sectors"><div class="sectors" id="sectors"></div></section>
+<section id="v-downforce"><canvas class="big" id="downforce"></canvas></section>
+<section id="v-longRuns"><canvas class="big" id="longruns"></canvas><div class="legend" id="longruns-legend"></div></section>
+<script type="application/json" id="meta">%META%</script>
+%BLOBS%
+<script>
+%SCRIPT%
+</script>
+</body>
+</html>
+"""
+
+_SCRIPT = r"""'use strict';
+const M = JSON.parse(document.getElementById('meta').textContent);
+const DASH = {'-': [], '--': [6, 4], ':': [2, 3], '-.': [6, 3, 2, 3]};
+const PAD = {l: 56, r: 12, t: 10, b: 22};
+const esc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+const fmt = v => Math.abs(v) >= 100 ? v.toFixed(0) : String(+v.toFixed(2));
+const lapFmt = s => s == null ? '' : Math.floor(s / 60) + ':' + (s % 60).toFixed(3).padStart(6, '0');
+
+// ---- Binary blobs: decoded once, on first use ----
+const decoded = {};
+function blob(id) {
+  if (!decoded[id]) {
+    const s = atob(document.getElementById(id).textContent.trim());
+    const u = new Uint8Array(s.length);
+    for (let i = 0; i < s.length; i++) u[i] = s.charCodeAt(i);
+    decoded[id] = new Float32Array(u.buffer);
+  }
+  return decoded[id];
+}
+function rows(id, n, names) {
+  const a = blob(id), out = {};
+  names.forEach((c, i) => out[c] = a.subarray(i * n, (i + 1) * n));
+  return out;
+}
+function level(d, k) { return rows(d.levels[k].id, d.levels[k].n, M.traces.channels); }
+function pickLevel(d, x0, x1, px) {
+  // Coarsest level that still has ~2 samples per pixel in the visible window
+  const span = (x1 - x0) / d.length;
+  for (let k = 0; k < d.levels.length; k++) if (d.levels[k].n * span >= 2 * px) return k;
+  return d.levels.length - 1;
+}
+function interp(x, xs, ys) {
+  let lo = 0, hi = xs.length - 1;
+  if (x <= xs[lo]) return ys[lo];
+  if (x >= xs[hi]) return ys[hi];
+  while (hi - lo > 1) { const m = (lo + hi) >> 1; if (xs[m] <= x) lo = m; else hi = m; }
+  return ys[lo] + (ys[hi] - ys[lo]) * (x - xs[lo]) / (xs[hi] - xs[lo]);
+}
+
+// ---- Canvas charts ----
+function setup(cv) {
+  const r = window.devicePixelRatio || 1, w = cv.clientWidth, h = cv.clientHeight;
+  if (cv.width !== Math.round(w * r)) { cv.width = Math.round(w * r); cv.height = Math.round(h * r); }
+  const ctx = cv.getContext('2d');
+  ctx.setTransform(r, 0, 0, r, 0, 0);
+  ctx.clearRect(0, 0, w, h);
+  return [ctx, w, h];
+}
+function ticks(a, b, n) {
+  const raw = (b - a) / n, p = Math.pow(10, Math.floor(Math.log10(raw)));
+  const step = [1, 2, 5, 10].map(m => m * p).find(s => s >= raw), out = [];
+  for (let v = Math.ceil(a / step) * step; v <= b; v += step) out.push(v);
+  return out;
+}
+function axes(ctx, w, h, x0, x1, y0, y1, label) {
+  const sx = v => PAD.l + (v - x0) / (x1 - x0) * (w - PAD.l - PAD.r);
+  const sy = v => h - PAD.b - (v - y0) / (y1 - y0) * (h - PAD.t - PAD.b);
+  ctx.strokeStyle = '#e6e6e6'; ctx.fillStyle = '#555'; ctx.font = '11px sans-serif'; ctx.lineWidth = 1;
+  ticks(x0, x1, 8).forEach(v => {
+    const X = sx(v); ctx.beginPath(); ctx.moveTo(X, PAD.t); ctx.lineTo(X, h - PAD.b); ctx.stroke();
+    ctx.fillText(fmt(v), X - 10, h - 6);
+  });
+  ticks(y0, y1, 4).forEach(v => {
+    const Y = sy(v); ctx.beginPath(); ctx.moveTo(PAD.l, Y); ctx.lineTo(w - PAD.r, Y); ctx.stroke();
+    ctx.fillText(fmt(v), 4, Y + 4);
+  });
+  if (label) { ctx.fillStyle = '#222'; ctx.fillText(label, PAD.l + 6, PAD.t + 12); }
+  return [sx, sy];
+}
+function yRange(series, x0, x1) {
+  let y0 = Infinity, y1 = -Infinity;
+  series.forEach(s => {
+    for (let i = 0; i < s.x.length; i++) {
+      if (s.x[i] >= x0 && s.x[i] <= x1 && !isNaN(s.y[i])) { y0 = Math.min(y0, s.y[i]); y1 = Math.max(y1, s.y[i]); }
+    }
+  });
+  if (!isFinite(y0)) return [0, 1];
+  const m = (y1 - y0) * 0.06 || 1;
+  return [y0 - m, y1 + m];
+}
+function lineChart(cv, series, o) {
+  const [ctx, w, h] = setup(cv);
+  const [y0, y1] = o.y0 !== undefined ? [o.y0, o.y1] : yRange(series, o.x0, o.x1);
+  const [sx, sy] = axes(ctx, w, h, o.x0, o.x1, y0, y1, o.label);
+  ctx.save();
+  ctx.beginPath(); ctx.rect(PAD.l, PAD.t, w - PAD.l - PAD.r, h - PAD.t - PAD.b); ctx.clip();
+  series.forEach(s => {
+    ctx.strokeStyle = s.color; ctx.fillStyle = s.color; ctx.lineWidth = s.width || 1.2;
+    ctx.setLineDash(s.dash || []);
+    ctx.beginPath();
+    let pen = false;
+    for (let i = 0; i < s.x.length; i++) {
+      if (isNaN(s.y[i])) { pen = false; continue; }
+      if (s.x[i] < o.x0 && s.x[i + 1] < o.x0) continue;
+      const X = sx(s.x[i]), Y = sy(s.y[i]);
+      if (pen) ctx.lineTo(X, Y); else ctx.moveTo(X, Y);
+      pen = true;
+      if (s.x[i] > o.x1) break;
+    }
+    ctx.stroke();
+    if (s.marker) s.x.forEach((x, i) => { ctx.beginPath(); ctx.arc(sx(x), sy(s.y[i]), 2.5, 0, 2 * Math.PI); ctx.fill(); });
+  });
+  ctx.restore();
+  return {sx, sy, w, h};
+}
+
+// ---- Tabs (a view is drawn the first time it becomes visible) ----
+const VIEWS = [['traces', 'Telemetry & Dominance'], ['lapGap', 'Lap Gap'], ['sectors', 'Sectors'],
+               ['downforce', 'Downforce'], ['longRuns', 'Long Runs']];
+const drawn = {};
+function show(name) {
+  VIEWS.forEach(([v]) => {
+    document.getElementById('v-' + v).classList.toggle('active', v === name);
+    document.getElementById('tab-' + v).classList.toggle('active', v === name);
+  });
+  if (!drawn[name]) { drawn[name] = true; DRAW[name](); }
+}
+
+// ---- Telemetry & dominance ----
+const PANELS = [['Speed', 'Speed (km/h)'], ['Throttle', 'Throttle (%)'], ['Brake', 'Brake'],
+                ['nGear', 'Gear'], ['Delta', 'Delta to reference (s)']];
+const view = {x0: 0, x1: 1, full: 1};
+let boxes = [];
+function selected() { return M.traces.drivers.filter((d, i) => boxes[i].checked); }
+function drawTraces() {
+  const sel = selected(), canvases = document.querySelectorAll('canvas.tel');
+  const px = canvases[0].clientWidth;
+  const shown = sel.map(d => ({d, L: level(d, pickLevel(d, view.x0, view.x1, px))}));
+  const full = sel.map(d => level(d, d.levels.length - 1));
+  PANELS.forEach(([ch, label], p) => {
+    let series;
+    if (ch === 'Delta') {
+      const ref = full[0];
+      series = full.map((L, i) => ({x: L.Distance, color: sel[i].color, dash: DASH[sel[i].dash],
+        y: L.Time.map((t, j) => t - interp(L.Distance[j], ref.Distance, ref.Time))}));
+    } else {
+      series = shown.map(({d, L}) => ({x: L.Distance, y: L[ch], color: d.color, dash: DASH[d.dash]}));
+    }
+    lineChart(canvases[p], series, {x0: view.x0, x1: view.x1, label: label});
+  });
+  drawTrack(sel, full);
+}
+function drawTrack(sel, full) {
+  const cv = document.getElementById('track');
+  if (!M.track) { cv.style.display = 'none'; return; }
+  const [ctx, w, h] = setup(cv);
+  const g = rows(M.track.id, M.track.n, ['x', 'y']), n = M.track.n;
+  let xmin = Infinity, xmax = -Infinity, ymin = Infinity, ymax = -Infinity;
+  for (let i = 0; i < n; i++) {
+    xmin = Math.min(xmin, g.x[i]); xmax = Math.max(xmax, g.x[i]);
+    ymin = Math.min(ymin, g.y[i]); ymax = Math.max(ymax, g.y[i]);
+  }
+  const k = Math.min((w - 40) / (xmax - xmin), (h - 40) / (ymax - ymin));
+  const ox = (w - k * (xmax - xmin)) / 2, oy = (h - k * (ymax - ymin)) / 2;
+  const X = i => ox + (g.x[i] - xmin) * k, Y = i => h - oy - (g.y[i] - ymin) * k;
+  // Winner of each segment: least time spent between its two vertices
+  const times = full.map((L, j) => {
+    const t = new Float32Array(n), len = sel[j].length;
+    for (let i = 0; i < n; i++) t[i] = interp(i / (n - 1) * len, L.Distance, L.Time);
+    return t;
+  });
+  const paths = sel.map(() => new Path2D()), grey = new Path2D();
+  for (let i = 0; i < n - 1; i++) {
+    let best = -1, bestDt = Infinity;
+    times.forEach((t, j) => { const dt = t[i + 1] - t[i]; if (dt < bestDt) { bestDt = dt; best = j; } });
+    const p = best < 0 ? grey : paths[best];
+    p.moveTo(X(i), Y(i)); p.lineTo(X(i + 1), Y(i + 1));
+  }
+  ctx.lineWidth = 5; ctx.lineCap = 'round';
+  ctx.strokeStyle = '#bbb'; ctx.stroke(grey);
+  paths.forEach((p, j) => { ctx.strokeStyle = sel[j].color; ctx.stroke(p); });
+  // Visible zoom window on the map
+  if (view.x1 - view.x0 < view.full && sel.length) {
+    const len = sel[0].length, a = Math.max(0, Math.floor(view.x0 / len * (n - 1))),
+          b = Math.min(n - 1, Math.ceil(view.x1 / len * (n - 1)));
+    ctx.lineWidth = 11; ctx.strokeStyle = 'rgba(0, 0, 0, 0.15)'; ctx.beginPath();
+    for (let i = a; i <= b; i++) i === a ? ctx.moveTo(X(i), Y(i)) : ctx.lineTo(X(i), Y(i));
+    ctx.stroke();
+  }
+  ctx.fillStyle = '#222'; ctx.font = '12px sans-serif';
+  ctx.fillText('Fastest selected driver per segment', 8, 16);
+}
+function initTraces() {
+  const T = M.traces, box = document.getElementById('drivers'), panels = document.getElementById('panels');
+  if (!T) { box.innerHTML = '<p class="empty">No telemetry in this session.</p>'; return; }
+  box.innerHTML = T.drivers.map((d, i) =>
+    `<label><input type="checkbox"${i < M.initial ? ' checked' : ''}><span class="swatch" style="background:${esc(d.color)}"></span>${esc(d.driver)} ${lapFmt(d.lapTime)}</label>`).join('');
+  boxes = Array.from(box.querySelectorAll('input'));
+  boxes.forEach(b => b.addEventListener('change', drawTraces));
+  view.full = view.x1 = Math.max(...T.drivers.map(d => d.length));
+  panels.innerHTML = PANELS.map(() => '<canvas class="tel"></canvas>').join('');
+  panels.querySelectorAll('canvas').forEach(cv => {
+    let start = null;
+    const toX = e => {
+      const r = cv.getBoundingClientRect(), f = (e.clientX - r.left - PAD.l) / (r.width - PAD.l - PAD.r);
+      return view.x0 + Math.min(1, Math.max(0, f)) * (view.x1 - view.x0);
+    };
+    cv.addEventListener('mousedown', e => { start = toX(e); });
+    cv.addEventListener('mouseup', e => {
+      if (start === null) return;
+      const end = toX(e), a = Math.min(start, end), b = Math.max(start, end);
+      start = null;
+      if (b - a > 5) { view.x0 = a; view.x1 = b; drawTraces(); }
+    });
+    cv.addEventListener('dblclick', () => { view.x0 = 0; view.x1 = view.full; drawTraces(); });
+  });
+  drawTraces();
+}
+
+// ---- Lap gap and sectors (plain HTML bars) ----
+function bars(items, value, label) {
+  const max = Math.max(...items.map(value)) || 1;
+  return items.map(r => `<div>${esc(r.driver)}</div>` +
+    `<div><div class="bar" style="width:${Math.max(1, value(r) / max * 100)}%;background:${esc(r.color)}"></div></div>` +
+    `<div>${label(r)}</div>`).join('');
+}
+function drawLapGap() {
+  const el = document.getElementById('lapgap');
+  if (!M.lapGap) { el.innerHTML = '<p class="empty">No lap times.</p>'; return; }
+  el.innerHTML = bars(M.lapGap, r => r.gap, r => `${lapFmt(r.lapTime)} (+${r.gap.toFixed(3)})`);
+}
+function drawSectors() {
+  const el = document.getElementById('sectors');
+  if (!M.sectors) { el.innerHTML = '<p class="empty">No sector times.</p>'; return; }
+  el.innerHTML = Object.entries(M.sectors).map(([s, items]) => {
+    const best = items[0].time;
+    return `<div><h3>Sector ${esc(s)}</h3><div class="bars">` +
+      bars(items, r => r.time - best + 0.02, r => `${r.time.toFixed(3)} (+${(r.time - best).toFixed(3)})`) +
+      '</div></div>';
+  }).join('');
+}
+
+// ---- Downforce map (scatter) ----
+function drawDownforce() {
+  const cv = document.getElementById('downforce'), D = M.downforce && M.downforce.points;
+  if (!D) { cv.replaceWith(Object.assign(document.createElement('p'), {className: 'empty', textContent: 'No speed data.'})); return; }
+  const [ctx, w, h] = setup(cv);
+  const pts = {x: D.map(r => r.mean), y: D.map(r => r.top)};
+  const [x0, x1] = yRange([{x: pts.x, y: pts.x}], -Infinity, Infinity), [y0, y1] = yRange([pts], -Infinity, Infinity);
+  const [sx, sy] = axes(ctx, w, h, x0, x1, y0, y1, `${M.downforce.yLabel} vs ${M.downforce.xLabel}`);
+  D.forEach(r => {
+    ctx.fillStyle = r.color; ctx.beginPath(); ctx.arc(sx(r.mean), sy(r.top), 7, 0, 2 * Math.PI); ctx.fill();
+    ctx.fillStyle = '#222'; ctx.fillText(r.driver ? `${r.team} (${r.driver})` : r.team, sx(r.mean) + 10, sy(r.top) + 4);
+  });
+}
+
+// ---- Long runs ----
+function drawLongRuns() {
+  const cv = document.getElementById('longruns'), R = M.longRuns;
+  if (!R) { cv.replaceWith(Object.assign(document.createElement('p'), {className: 'empty', textContent: 'No long runs.'})); return; }
+  const dashes = Object.values(DASH);
+  const series = R.map(r => ({x: r.x, y: r.y, color: r.color, dash: dashes[(r.stint - 1) % dashes.length], marker: true, width: 1.6}));
+  lineChart(cv, series, {x0: 0.5, x1: Math.max(...R.map(r => r.x[r.x.length - 1])) + 0.5,
+                         label: `Lap time (s) by stint lap${M.corrected ? ' — track-evolution corrected' : ''}`});
+  document.getElementById('longruns-legend').innerHTML = R.map(r =>
+    `<div><span class="swatch" style="background:${esc(r.color)}"></span>${esc(r.key)} ${esc(r.compound)} ${r.mean.toFixed(3)}s</div>`).join('');
+}
+
+const DRAW = {traces: initTraces, lapGap: drawLapGap, sectors: drawSectors, downforce: drawDownforce, longRuns: drawLongRuns};
+document.getElementById('tabs').innerHTML = VIEWS.map(([v, t]) => `<button id="tab-${v}">${t}</button>`).join('');
+VIEWS.forEach(([v]) => document.getElementById('tab-' + v).addEventListener('click', () => show(v)));
+show('traces');
+// Canvas views are redrawn at the new size; HTML bar views resize themselves
+const REDRAW = {traces: () => M.traces && drawTraces(), downforce: drawDownforce, longRuns: drawLongRuns};
+window.addEventListener('resize', () => {
+  const active = VIEWS.map(([v]) => v).find(v => document.getElementById('v-' + v).classList.contains('active'));
+  if (REDRAW[active]) REDRAW[active]();
+});
+"""
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+lod.py
+Level-of-detail helpers for plotting long telemetry traces.
+
+min/max decimation keeps, for every horizontal bucket (≈ one pixel column),
+the lowest and highest sample. Peaks such as top speed, minimum corner speed
+or a single-sample brake application survive, while the number of plotted
+vertices drops to at most 2 × n_buckets per trace.
+"""
+
+import numpy as np
+
+
+def minmax_indices(x, y, n_buckets: int) -> np.ndarray:
+    """
+    Indices kept by min/max decimation of one trace (sorted, first/last included).
+    `x` must be monotonically increasing; NaN samples are never selected.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    x, y = x[valid], y[valid]
+
+    n = len(x)
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return valid
+    span = x[-1] - x[0]
+    if span <= 0:
+        return valid[[0, -1]]
+    bucket = np.minimum(((x - x[0]) / span * n_buckets).astype(int), n_buckets - 1)
+
+    # Sort by (bucket, y): first row of each bucket = min, last row = max
+    order = np.lexsort((y, bucket))
+    sorted_bucket = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    keep = np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+    return valid[keep]
+
+
+def minmax_decimate(x, y, n_buckets: int):
+    """
+    Min/max-preserving downsampling of one trace.
+
+    - `x` must be monotonically increasing (e.g. Distance); NaN pairs are dropped
+    - Returns (x_dec, y_dec) in original sample order, first/last sample kept
+    - Traces that already fit (len <= 2 * n_buckets) are returned unchanged
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = minmax_indices(x, y, n_buckets)
+    return x[keep], y[keep]
+
+
+def multichannel_indices(x, channels, n_buckets: int) -> np.ndarray:
+    """
+    Union of the min/max indices of several channels sharing one x axis, so a
+    decimated level keeps a single x array (≤ 2 × n_buckets × n_channels points).
+    """
+    keep = [minmax_indices(x, y, n_buckets) for y in channels]
+    return np.unique(np.concatenate(keep)) if keep else np.arange(len(x))
+
+
+def decimated_segments(traces, n_buckets: int) -> list:
+    """
+    Decimate several (x, y) traces and return them as vertex arrays ready for
+    `matplotlib.collections.LineCollection` (one (N, 2) array per trace).
+    """
+    segments = []
+    for x, y in traces:
+        xd, yd = minmax_decimate(x, y, n_buckets)
+        segments.append(np.column_stack([xd, yd]))
+    return segments
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+low_memory.py
+Memory-bounded mode for small report runners (config.LOW_MEMORY_MODE).
+
+A full race with telemetry keeps ~20 car-data and position streams of several
+hundred thousand float64 rows each in memory, plus the copies analyses make.
+In low-memory mode:
+
+    - streams are downcast once after loading (float64 → float32,
+      gear / DRS → int8, status text → category)               shrink_session
+    - channels no selected analysis reads can be dropped       ANALYSIS_CHANNELS
+    - telemetry is released once no remaining step needs it   release_telemetry
+    - or driver by driver while a single step concatenates it  release_driver_telemetry
+    - figures are saved at most at LOW_MEMORY_MAX_DPI and collected right
+      after saving (save_utils), pipeline steps run one at a time
+
+Peak resident memory is measured with the stdlib (resource / /proc) and
+compared with LOW_MEMORY_RSS_BUDGET_MB, so a CI run can fail when it grows.
+"""
+
+import gc
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from practice import config
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not available from the stdlib
+    resource = None
+
+# Columns every stream keeps (time base and FastF1 bookkeeping)
+_TIME_COLUMNS = ('Date', 'SessionTime', 'Time', 'Source')
+
+# Car-data / position channels read by each analysis (ANALYSIS_DATA_PARTS keys);
+# analyses not listed (export, quality) keep every channel
+ANALYSIS_CHANNELS = {
+    'telemetry_metrics': ('Speed', 'Throttle'),
+    'dominance':         ('Speed', 'Throttle', 'Brake', 'nGear', 'DRS', 'X', 'Y'),
+    'grid_overlay':      ('Speed', 'Throttle', 'Brake', 'nGear'),
+    'downforce':         ('Speed',),
+    'html_report':       ('Speed', 'Throttle', 'Brake', 'nGear', 'X', 'Y'),
+    'traffic':           ('Speed', 'X', 'Y', 'Status'),
+    'run_compare':       ('Speed',),
+    'braking':           ('Speed', 'Brake'),
+    'powertrain':        ('Speed', 'Throttle', 'nGear', 'RPM'),
+    'drs':               ('Speed', 'DRS'),
+}
+
+# Channels stored as int8 when they hold no missing values
+_SMALL_INT_CHANNELS = ('nGear', 'DRS')
+
+
+# -----------------------------------------------------------------------------
+# 1. Memory measurement
+# -----------------------------------------------------------------------------
+
+def current_rss_mb() -> float | None:
+    """Resident memory of this process now (MB); None where unsupported."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> float | None:
+    """Highest resident memory of this process so far (MB); None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def check_budget(label: str = '', budget_mb: float | None = None) -> bool:
+    """Print peak RSS; False (and a warning) if it exceeds the budget."""
+    budget_mb = config.LOW_MEMORY_RSS_BUDGET_MB if budget_mb is None else budget_mb
+    peak = peak_rss_mb()
+    if peak is None:
+        print("[Warning] Peak RSS measurement is not available on this platform.")
+        return True
+    within = peak <= budget_mb
+    prefix = "[System]" if within else "[Warning]"
+    print(f"{prefix} Peak RSS{' ' + label if label else ''}: {peak:.0f} MB "
+          f"(budget {budget_mb:.0f} MB{'' if within else ' EXCEEDED'})")
+    return within
+
+
+# -----------------------------------------------------------------------------
+# 2. Shrinking telemetry
+# -----------------------------------------------------------------------------
+
+def required_channels(analyses) -> set | None:
+    """Union of channels read by `analyses`; None if any of them needs all channels."""
+    channels = set()
+    for name in analyses:
+        if name not in ANALYSIS_CHANNELS:
+            return None
+        channels.update(ANALYSIS_CHANNELS[name])
+    return channels
+
+
+def downcast_telemetry(tel: pd.DataFrame, channels=None) -> pd.DataFrame:
+    """
+    Downcast one stream in place (the FastF1 Telemetry object is kept, so its
+    session / driver references stay valid). With `channels`, every other
+    channel is dropped. Returns `tel`.
+    """
+    if channels is not None:
+        drop = [c for c in tel.columns if c not in _TIME_COLUMNS and c not in channels]
+        if drop:
+            tel.drop(columns=drop, inplace=True)
+    for col in tel.columns:
+        values = tel[col]
+        if col in _SMALL_INT_CHANNELS and values.notna().all():
+            tel[col] = values.astype(np.int8)
+        elif pd.api.types.is_float_dtype(values) and values.dtype != np.float32:
+            tel[col] = values.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(values) and values.dtype.itemsize > 4:
+            tel[col] = pd.to_numeric(values, downcast='integer')
+        elif values.dtype == object and col not in _TIME_COLUMNS:
+            # 'Source' stays object: FastF1 writes new labels into it when merging
+            tel[col] = values.astype('category')
+    return tel
+
+
+def _streams(session, attr: str) -> dict:
+    try:
+        return getattr(session, attr)
+    except Exception:
+        return {}
+
+
+def shrink_session(session, channels=None) -> float:
+    """
+    Downcast (and optionally drop channels of) every car-data and position
+    stream of a session. Returns the memory saved (MB).
+    """
+    saved = 0
+    for attr in ('car_data', 'pos_data'):
+        for tel in _streams(session, attr).values():
+            before = tel.memory_usage(deep=True).sum()
+            downcast_telemetry(tel, channels)
+            saved += before - tel.memory_usage(deep=True).sum()
+    gc.collect()
+    return saved / 2 ** 20
+
+
+def release_driver_telemetry(session, drivers):
+    """Drop the car-data and position streams of `drivers` (driver numbers)."""
+    for attr in ('car_data', 'pos_data'):
+        streams = _streams(session, attr)
+        for drv in drivers:
+            streams.pop(str(drv), None)
+    gc.collect()
+
+
+def release_telemetry(session, loader=None):
+    """
+    Drop car-data and position streams once no analysis needs them.
+    With the SessionLoader that created the session, a later analysis
+    reloads them on demand.
+    """
+    for attr in ('_car_data', '_pos_data'):
+        if hasattr(session, attr):
+            delattr(session, attr)
+    if loader is not None:
+        loader.drop_parts(session, ('telemetry',))
+    gc.collect()
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+pipeline.py
+Declarative analysis pipelines (TOML or YAML) executed as a dependency DAG.
+
+A pipeline file names the analyses to run, their parameters, config
+overrides and how steps feed each other:
+
+    [pipeline]
+    dpi = 150                     # passed to save_figures (default 300)
+    workers = 4                   # parallel steps
+    save = true                   # render + save charts of steps that have them
+
+    [session]                     # optional; used by `python pipeline.py`
+    year = 2024
+    gp = "Mexico City Grand Prix"
+    session = "FP2"
+
+    [config]                      # practice/config.py overrides for this run
+    LONG_RUN_OUTLIER_THRESHOLD = 1.05
+
+    [steps.rep_laps]              # shared intermediate (see PROVIDERS)
+    provider = "representative_laps"
+
+    [steps.braking]
+    analysis = "braking"          # analysis_server.ANALYSES name
+    inputs = { laps = "rep_laps" }   # keyword argument ← result of another step
+
+    [steps.long_runs]
+    analysis = "long_runs"
+    params = { corrected = true }
+    after = ["braking"]           # ordering without data flow
+
+Every step is exactly one of `analysis` (registry entry: data parts, compute,
+render) or `provider` (intermediate shared by several steps, never rendered).
+Every data part the steps need is loaded through the SessionLoader before
+the first step starts (Session.load() rewrites the laps table, so no step may
+read the session while another part loads). Independent steps run in
+parallel; rendering is serialized (pyplot is not thread-safe). A failing step
+skips only the steps that depend on it.
+
+With LOW_MEMORY_MODE (config or a [config] override) steps run one at a time,
+telemetry is loaded once and downcast to the channels the steps read, and it
+is released after the last step that needs it (low_memory.py).
+"""
+
+import graphlib
+import os
+import threading
+import time
+import tomllib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+try:
+    import yaml
+except ImportError:  # YAML pipelines are optional; TOML needs only the stdlib
+    yaml = None
+
+from practice import config
+from practice.low_memory import (ANALYSIS_CHANNELS, check_budget, peak_rss_mb,
+                                 release_telemetry, required_channels, shrink_session)
+from practice.run_classifier import classify_runs
+from practice.save_utils import DEFAULT_SAVE_DIR, save_figures
+from practice.session_loader import ANALYSIS_DATA_PARTS
+from practice.session_telemetry import CAR_CHANNELS, concat_session_telemetry
+
+_RENDER_LOCK = threading.Lock()
+
+_STEP_KEYS = {'analysis', 'provider', 'params', 'inputs', 'after', 'save'}
+
+
+# -----------------------------------------------------------------------------
+# 1. Shared intermediates
+# -----------------------------------------------------------------------------
+
+def _representative_laps(session, programmes=('push', 'long', 'other')):
+    laps = classify_runs(session, use_telemetry=False)
+    return laps[laps['Programme'].isin(list(programmes))]
+
+
+def _session_telemetry(session, laps=None, channels=CAR_CHANNELS, release=False):
+    return concat_session_telemetry(session, laps, channels=tuple(channels), release=release)
+
+
+def _traffic_laps(session, laps=None):
+    from practice.traffic import detect_traffic
+    return detect_traffic(session, laps)
+
+
+# name → (data parts, function(session, **params))
+PROVIDERS = {
+    'classified_laps':     (('laps',), lambda s: classify_runs(s, use_telemetry=False)),
+    'representative_laps': (('laps',), _representative_laps),
+    'session_telemetry':   (('laps', 'telemetry'), _session_telemetry),
+    'traffic_laps':        (ANALYSIS_DATA_PARTS['traffic'], _traffic_laps),
+}
+
+
+# -----------------------------------------------------------------------------
+# 2. Loading and validation
+# -----------------------------------------------------------------------------
+
+def _registry() -> dict:
+    # Imported lazily: the server module switches matplotlib to Agg
+    from practice.analysis_server import ANALYSES
+    return ANALYSES
+
+
+# Settings read once per process (server, worker pool, paths): a per-run
+# override would silently do nothing, so validate_pipeline rejects them
+_PROCESS_CONFIG = ('SERVER_', 'PIPELINE_', 'RECORDED_SESSIONS_DIR', 'SEASON_DB_PATH',
+                   'REPORT_BUNDLE_DIR')
+
+
+def load_pipeline(path: str) -> dict:
+    """Read a .toml / .yaml pipeline file and validate it (ValueError on errors)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.toml':
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    elif ext in ('.yaml', '.yml'):
+        if yaml is None:
+            raise ValueError("YAML pipelines need PyYAML (pip install pyyaml); use TOML instead.")
+        with open(path, encoding='utf-8') as f:
+            spec = yaml.safe_load(f) or {}
+    else:
+        raise ValueError(f"Unknown pipeline format '{ext}' (use .toml, .yaml or .yml)")
+    validate_pipeline(spec)
+    return spec
+
+
+def _parse_param(parser, value):
+    # TOML / YAML values are already typed; strings go through the server parsers
+    return parser(value) if isinstance(value, str) else value
+
+
+def validate_pipeline(spec: dict):
+    """Check steps, parameters, references and config overrides; fill defaults in place."""
+    steps = spec.get('steps')
+    if not isinstance(steps, dict) or not steps:
+        raise ValueError("Pipeline has no [steps]")
+    analyses = _registry()
+
+    for key in spec.get('config', {}):
+        if not hasattr(config, key):
+            raise ValueError(f"Unknown config override '{key}'")
+        if key.startswith(_PROCESS_CONFIG):
+            raise ValueError(f"Config override '{key}' cannot change per pipeline run")
+
+    for name, step in steps.items():
+        unknown = set(step) - _STEP_KEYS
+        if unknown:
+            raise ValueError(f"Step '{name}': unknown keys {sorted(unknown)}")
+        if ('analysis' in step) == ('provider' in step):
+            raise ValueError(f"Step '{name}' needs exactly one of 'analysis' or 'provider'")
+        if 'analysis' in step and step['analysis'] not in analyses:
+            raise ValueError(f"Step '{name}': unknown analysis '{step['analysis']}'")
+        if 'provider' in step and step['provider'] not in PROVIDERS:
+            raise ValueError(f"Step '{name}': unknown provider '{step['provider']}' "
+                             f"(available: {sorted(PROVIDERS)})")
+
+        params = dict(step.get('params', {}))
+        if 'analysis' in step:
+            spec_params = analyses[step['analysis']]['params']
+            extra = set(params) - set(spec_params)
+            if extra:
+                raise ValueError(f"Step '{name}': unknown parameters {sorted(extra)}")
+            for key, (parser, default) in spec_params.items():
+                if key in params:
+                    params[key] = _parse_param(parser, params[key])
+                elif default is None:
+                    raise ValueError(f"Step '{name}': missing required parameter '{key}'")
+                elif not callable(default):
+                    params[key] = default   # config-backed ones: filled by _step_params
+        step['params'] = params
+
+        for ref in list(step.get('inputs', {}).values()) + list(step.get('after', [])):
+            if ref not in steps:
+                raise ValueError(f"Step '{name}' refers to unknown step '{ref}'")
+
+    try:
+        graphlib.TopologicalSorter(_graph(steps)).prepare()
+    except graphlib.CycleError as e:
+        raise ValueError(f"Pipeline steps form a cycle: {e.args[1]}") from None
+
+
+def _graph(steps: dict) -> dict:
+    return {name: set(step.get('inputs', {}).values()) | set(step.get('after', []))
+            for name, step in steps.items()}
+
+
+# -----------------------------------------------------------------------------
+# 3. Execution
+# -----------------------------------------------------------------------------
+
+@contextmanager
+def config_overrides(overrides: dict):
+    """Temporarily set practice.config constants (restored afterwards)."""
+    saved = {key: getattr(config, key) for key in overrides}
+    try:
+        for key, value in overrides.items():
+            setattr(config, key, tuple(value) if isinstance(getattr(config, key), tuple)
+                    else value)
+        yield
+    finally:
+        for key, value in saved.items():
+            setattr(config, key, value)
+
+
+def _step_parts(step: dict) -> tuple:
+    if 'provider' in step:
+        return tuple(PROVIDERS[step['provider']][0])
+    spec = _registry()[step['analysis']]
+    parts = set(ANALYSIS_DATA_PARTS[spec['parts']])
+    if step['params'].get('free_air'):
+        parts |= set(ANALYSIS_DATA_PARTS['traffic'])
+    return tuple(sorted(parts))
+
+
+def _step_channels(step: dict):
+    """Telemetry channels a step reads (None = all of them)."""
+    if step.get('provider') == 'session_telemetry':
+        return set(step['params'].get('channels', CAR_CHANNELS))
+    if step.get('provider') == 'traffic_laps':
+        return set(ANALYSIS_CHANNELS['traffic'])
+    names = [_registry()[step['analysis']]['parts']]
+    if step['params'].get('free_air'):
+        names.append('traffic')
+    return required_channels(names)
+
+
+def _prepare_low_memory(session, steps: dict) -> set:
+    """Keep only the telemetry channels the steps read; returns telemetry steps."""
+    # Steps fed a concatenated frame (tel input) do not read the streams
+    tel_steps = {name for name, step in steps.items()
+                 if 'telemetry' in _step_parts(step) and 'tel' not in step.get('inputs', {})}
+    if not tel_steps:
+        return tel_steps
+    channels = set()
+    for name in tel_steps:
+        needed = _step_channels(steps[name])
+        if needed is None:
+            channels = None
+            break
+        channels |= needed
+    saved = shrink_session(session, channels)
+    print(f"[System] Low-memory mode: telemetry reduced to "
+          f"{'all channels' if channels is None else ', '.join(sorted(channels))} "
+          f"({saved:.0f} MB freed)")
+    return tel_steps
+
+
+def _step_params(step: dict) -> dict:
+    """Step params with config-backed defaults read now (inside config_overrides)."""
+    if 'provider' in step:
+        return step['params']
+    from practice.analysis_server import param_default
+    spec_params = _registry()[step['analysis']]['params']
+    return {**{k: param_default(d) for k, (_, d) in spec_params.items()}, **step['params']}
+
+
+def _run_step(session, name: str, step: dict, inputs: dict, options: dict):
+    params = _step_params(step)
+    kwargs = {**params, **inputs}
+
+    if 'provider' in step:
+        return PROVIDERS[step['provider']][1](session, **kwargs)
+
+    spec = _registry()[step['analysis']]
+    result = spec['compute'](session, **kwargs)
+    if spec['render'] is not None and step.get('save', options['save']) and result is not None:
+        with _RENDER_LOCK:
+            figures = spec['render'](session, result, **params)
+            try:
+                save_figures(session, figures, dpi=options['dpi'], save_dir=options['save_dir'],
+                             facecolor='white')
+            finally:
+                for fig in figures.values():
+                    plt.close(fig)
+    return result
+
+
+def run_pipeline(spec, session, loader=None) -> dict:
+    """
+    Execute a pipeline (dict from load_pipeline, or a file path) on `session`.
+    `loader`: SessionLoader that created `session` (the parts all steps need
+    are loaded up front); without it the session must already hold every part.
+
+    Returns {'results': {step: result}, 'report': DataFrame with
+    Step, Kind, Status (ok / failed / skipped), Seconds, PeakRSS_MB, Error},
+    'within_budget': peak RSS check in low-memory mode (None otherwise)}.
+    """
+    if isinstance(spec, str):
+        spec = load_pipeline(spec)
+    steps = spec['steps']
+    options = spec.get('pipeline', {})
+    options = {
+        'dpi':      options.get('dpi', 300),
+        'save':     options.get('save', True),
+        'save_dir': options.get('save_dir', DEFAULT_SAVE_DIR),
+        'workers':  options.get('workers', config.PIPELINE_MAX_WORKERS),
+    }
+
+    sorter = graphlib.TopologicalSorter(_graph(steps))
+    sorter.prepare()
+    results, report, failed = {}, {}, set()
+    within_budget = None
+
+    with config_overrides(spec.get('config', {})):
+        if loader is not None:
+            # Serialized before the fan-out: a load must not run while steps read the session
+            loader.ensure(session, parts=set().union(*(_step_parts(s) for s in steps.values())))
+        low_memory = config.LOW_MEMORY_MODE
+        release_step = None
+        if low_memory:
+            options['workers'] = 1
+            tel_pending = _prepare_low_memory(session, steps)
+            # A lone session_telemetry step frees each driver's streams once cut
+            if loader is not None and len(tel_pending) == 1:
+                (only,) = tel_pending
+                if steps[only].get('provider') == 'session_telemetry':
+                    release_step = only
+        print(f"\n[Pipeline] {len(steps)} step(s), up to {options['workers']} in parallel")
+
+        def step_done(name):
+            sorter.done(name)
+            if low_memory and name in tel_pending:
+                tel_pending.discard(name)
+                # Without a loader telemetry could not be reloaded for the caller
+                if not tel_pending and loader is not None:
+                    release_telemetry(session, loader)
+                    print("[System] Low-memory mode: telemetry released")
+
+        with ThreadPoolExecutor(max_workers=options['workers'],
+                                thread_name_prefix='pipeline') as executor:
+            running = {}
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    step = steps[name]
+                    deps = _graph(steps)[name]
+                    if deps & failed:
+                        failed.add(name)
+                        report[name] = ('skipped', 0.0, f"needs {sorted(deps & failed)}")
+                        step_done(name)
+                        continue
+                    inputs = {arg: results[ref] for arg, ref in step.get('inputs', {}).items()}
+                    if name == release_step:
+                        inputs['release'] = True
+                    future = executor.submit(_run_step, session, name, step, inputs, options)
+                    running[future] = (name, time.perf_counter())
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, start = running.pop(future)
+                    elapsed = time.perf_counter() - start
+                    try:
+                        results[name] = future.result()
+                        report[name] = ('ok', elapsed, '')
+                        print(f"[System] Pipeline step '{name}' done ({elapsed:.1f}s)")
+                    except Exception as e:
+                        failed.add(name)
+                        report[name] = ('failed', elapsed, str(e))
+                        print(f"[Warning] Pipeline step '{name}' failed: {e}")
+                    # Process-wide peak so far; with one worker it attributes growth to steps
+                    report[name] += (peak_rss_mb(),)
+                    step_done(name)
+
+        if low_memory:
+            within_budget = check_budget('pipeline')
+
+    report = pd.DataFrame([
+        {'Step': name, 'Kind': steps[name].get('analysis') or steps[name]['provider'],
+         'Status': status, 'Seconds': round(seconds, 2),
+         'PeakRSS_MB': round(rss[0]) if rss and rss[0] is not None else None, 'Error': error}
+        for name, (status, seconds, error, *rss) in report.items()])
+    return {'results': results, 'report': report, 'within_budget': within_budget}
+
+
+def analyze_pipeline(path: str, session, loader=None):
+    """
+    [Feature] Analysis Pipeline
+    - Runs the steps of a TOML / YAML pipeline file on the current session
+    - Independent steps in parallel, shared intermediates computed once
+    Returns the run_pipeline output (None if the file is invalid).
+    """
+    try:
+        spec = load_pipeline(path)
+    except Exception as e:
+        print(f"[Error] Invalid pipeline {path}: {e}")
+        return None
+
+    run = run_pipeline(spec, session, loader)
+    print(run['report'].to_string(index=False))
+    return run
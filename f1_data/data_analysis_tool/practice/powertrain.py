@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+powertrain.py
+Gear usage, shift points and gear-ratio fingerprints of the whole grid.
+
+Works on one concatenated telemetry frame of all representative laps
+(session_telemetry.concat_session_telemetry). Shifts are a single diff on
+nGear over that frame (lap boundaries masked), so the whole grid costs about
+as much as one pass over the car data:
+
+    usage        time and share of lap time per gear
+    shifts       every gear change: from / to gear, RPM, speed, distance
+                 (upshift RPM = last sample before the change, downshift RPM =
+                 first sample after it, i.e. including the throttle blip)
+    shift_points median RPM / speed per driver and gear transition
+    ratios       km/h per 1000 rpm per gear at full throttle — a proxy for the
+                 gear-ratio choice — and top speed per gear
+"""
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice import config
+from practice.f1_colors import resolve_styles
+from practice.run_classifier import classify_runs
+from practice.save_utils import save_figures
+from practice.session_telemetry import concat_session_telemetry, lap_boundaries
+
+GEARS = tuple(range(1, 9))
+
+
+# =========================================================
+# 1. Gear Usage and Shift Detection
+# =========================================================
+
+def detect_shifts(tel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gear changes of a concatenated telemetry frame.
+    Columns: Driver, LapNumber, FromGear, ToGear, Kind ('up' / 'down'),
+             RPM, Speed, Distance.
+    """
+    columns = ['Driver', 'LapNumber', 'FromGear', 'ToGear', 'Kind', 'RPM', 'Speed', 'Distance']
+    if tel.empty:
+        return pd.DataFrame(columns=columns)
+    lap_id = pd.factorize(tel['LapIndex'])[0]
+    first, _ = lap_boundaries(lap_id)
+    gear = tel['nGear'].to_numpy(dtype=float)
+    valid = (gear >= GEARS[0]) & (gear <= GEARS[-1])
+
+    change = np.r_[False, gear[1:] != gear[:-1]] & ~first & valid & np.r_[False, valid[:-1]]
+    after = np.flatnonzero(change)
+    before = after - 1
+    up = gear[after] > gear[before]
+    rpm = tel['RPM'].to_numpy(dtype=float)
+
+    return pd.DataFrame({
+        'Driver':    tel['Driver'].to_numpy()[after],
+        'LapNumber': tel['LapNumber'].to_numpy()[after],
+        'FromGear':  gear[before].astype(int),
+        'ToGear':    gear[after].astype(int),
+        'Kind':      np.where(up, 'up', 'down'),
+        'RPM':       np.where(up, rpm[before], rpm[after]),
+        'Speed':     tel['Speed'].to_numpy(dtype=float)[after],
+        'Distance':  tel['Distance'].to_numpy(dtype=float)[after],
+    })[columns]
+
+
+def compute_gear_usage(tel: pd.DataFrame) -> pd.DataFrame:
+    """Time per gear and driver. Columns: Driver, Gear, Time (s), Share (% of time)."""
+    if tel.empty:
+        return pd.DataFrame(columns=['Driver', 'Gear', 'Time', 'Share'])
+    lap_id = pd.factorize(tel['LapIndex'])[0]
+    first, _ = lap_boundaries(lap_id)
+    # Each sample holds its gear until the next sample of the same lap
+    dt = np.r_[np.diff(tel['SessionTime'].to_numpy(dtype=float)), 0.0]
+    dt[np.r_[first[1:], True]] = 0.0
+    usage = (pd.DataFrame({'Driver': tel['Driver'], 'Gear': tel['nGear'], 'Time': dt})
+               .query('Gear >= @GEARS[0] and Gear <= @GEARS[-1]')
+               .astype({'Gear': int})
+               .groupby(['Driver', 'Gear'], as_index=False)['Time'].sum())
+    usage['Share'] = usage['Time'] / usage.groupby('Driver')['Time'].transform('sum') * 100.0
+    return usage
+
+
+def compute_gear_ratios(tel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gear-ratio proxy per driver and gear (full-throttle samples only).
+    Columns: Driver, Gear, KmhPer1000Rpm (median), TopSpeed (km/h), Samples.
+    """
+    full = tel[(tel['Throttle'] >= config.POWERTRAIN_FULL_THROTTLE)
+               & (tel['RPM'] >= config.POWERTRAIN_MIN_RPM)
+               & tel['nGear'].between(GEARS[0], GEARS[-1])]
+    ratios = (full.assign(Gear=full['nGear'].astype(int),
+                          Ratio=full['Speed'] / full['RPM'] * 1000.0)
+                  .groupby(['Driver', 'Gear'], as_index=False)
+                  .agg(KmhPer1000Rpm=('Ratio', 'median'), TopSpeed=('Speed', 'max'),
+                       Samples=('Ratio', 'size')))
+    return ratios[ratios['Samples'] >= config.POWERTRAIN_MIN_SAMPLES].reset_index(drop=True)
+
+
+def compute_powertrain(session, laps=None, programmes=('push', 'long', 'other'),
+                       tel=None) -> dict:
+    """
+    Gear usage, shift points and gear ratios of every driver.
+
+    `laps` default: every lap whose programme (run_classifier) is in
+    `programmes`. `tel`: an already concatenated frame of those laps with
+    Speed, Throttle, nGear and RPM (pipeline session_telemetry step); `laps`
+    is then not used. Returns a dict of DataFrames (see module docstring; all
+    empty without car data). shift_points columns: Driver, Kind, Transition
+    ('3-4'), RPM, Speed (medians), Count.
+    """
+    if tel is None:
+        if laps is None:
+            laps = classify_runs(session, use_telemetry=False)
+            laps = laps[laps['Programme'].isin(list(programmes))]
+        tel = concat_session_telemetry(session, laps,
+                                       channels=('Speed', 'Throttle', 'nGear', 'RPM'))
+
+    shifts = detect_shifts(tel)
+    # Single-step shifts only: skipped gears are sampling artefacts or rare
+    single = shifts[(shifts['ToGear'] - shifts['FromGear']).abs() == 1]
+    shift_points = (single.assign(Transition=single['FromGear'].astype(str) + '-'
+                                             + single['ToGear'].astype(str))
+                          .groupby(['Driver', 'Kind', 'Transition'], as_index=False)
+                          .agg(RPM=('RPM', 'median'), Speed=('Speed', 'median'),
+                               Count=('RPM', 'size')))
+    return {
+        'usage':        compute_gear_usage(tel),
+        'shifts':       shifts,
+        'shift_points': shift_points,
+        'ratios':       compute_gear_ratios(tel) if not tel.empty else
+                        pd.DataFrame(columns=['Driver', 'Gear', 'KmhPer1000Rpm', 'TopSpeed', 'Samples']),
+    }
+
+
+# =========================================================
+# 2. Visualization
+# =========================================================
+
+def render_powertrain(session, result: dict) -> dict:
+    """Gear usage, shift RPM and gear-ratio charts. Returns {suffix: Figure}."""
+    usage, points, ratios = result['usage'], result['shift_points'], result['ratios']
+    if usage.empty:
+        return {}
+    title = f"{session.event.year} {session.event.EventName} {session.name}"
+    share = (usage.pivot(index='Driver', columns='Gear', values='Share')
+                  .reindex(columns=list(GEARS)).fillna(0.0))
+    # Most time in top gear first (low-drag / long-geared cars at the top)
+    share = share.sort_values(list(GEARS)[::-1], ascending=False)
+    drivers = share.index.tolist()
+    styles = resolve_styles(session, drivers)
+    figures = {}
+
+    # --- Gear usage ---
+    fig, ax = plt.subplots(figsize=(14, 0.4 * len(drivers) + 2), facecolor='white')
+    fig.set_layout_engine('tight')
+    left = np.zeros(len(drivers))
+    cmap = plt.get_cmap('viridis', len(GEARS))
+    for k, gear in enumerate(GEARS):
+        ax.barh(drivers, share[gear], left=left, color=cmap(k), label=f"{gear}")
+        left += share[gear].to_numpy()
+    ax.invert_yaxis()
+    ax.set_xlim(0, 100)
+    ax.set_xlabel("Share of lap time (%)")
+    ax.legend(title="Gear", ncol=len(GEARS), bbox_to_anchor=(0.5, -0.08), loc='upper center')
+    ax.set_title(f"{title} - Time per Gear", fontsize=15, fontweight='bold')
+    figures['GearUsage'] = fig
+
+    # --- Shift RPM per transition ---
+    if not points.empty:
+        fig, axes = plt.subplots(1, 2, figsize=(16, 7), facecolor='white', sharey=True)
+        fig.set_layout_engine('tight')
+        for ax, kind in zip(axes, ('up', 'down')):
+            d = points[points['Kind'] == kind]
+            order = sorted(d['Transition'].unique(), key=lambda s: int(s.split('-')[0]),
+                           reverse=(kind == 'down'))
+            x = {tr: i for i, tr in enumerate(order)}
+            for drv, g in d.groupby('Driver'):
+                g = g.assign(x=g['Transition'].map(x)).sort_values('x')
+                ax.plot(g['x'], g['RPM'], marker='o', markersize=4, linewidth=1.2,
+                        color=styles.at[drv, 'Color'], linestyle=styles.at[drv, 'LineStyle'],
+                        label=drv)
+            ax.set_xticks(range(len(order)))
+            ax.set_xticklabels(order)
+            ax.set_xlabel("Gear change")
+            ax.set_title(f"{'Upshift' if kind == 'up' else 'Downshift'} RPM (median)", fontsize=12)
+            ax.grid(True, linestyle='--', alpha=0.3)
+        axes[0].set_ylabel("RPM")
+        axes[1].legend(ncol=1, fontsize=8, bbox_to_anchor=(1.01, 1), loc='upper left')
+        fig.suptitle(f"{title} - Shift Points", fontsize=15, fontweight='bold')
+        figures['ShiftRPM'] = fig
+
+    # --- Gear ratios ---
+    if not ratios.empty:
+        fig, (ax_ratio, ax_top) = plt.subplots(1, 2, figsize=(16, 7), facecolor='white')
+        fig.set_layout_engine('tight')
+        for drv, g in ratios.groupby('Driver'):
+            style = dict(color=styles.at[drv, 'Color'], linestyle=styles.at[drv, 'LineStyle'],
+                         marker='o', markersize=4, linewidth=1.2, label=drv)
+            ax_ratio.plot(g['Gear'], g['KmhPer1000Rpm'], **style)
+            ax_top.plot(g['Gear'], g['TopSpeed'], **style)
+        ax_ratio.set_ylabel("km/h per 1000 rpm (full throttle)")
+        ax_top.set_ylabel("Top speed in gear (km/h)")
+        for ax in (ax_ratio, ax_top):
+            ax.set_xlabel("Gear")
+            ax.set_xticks(list(GEARS))
+            ax.grid(True, linestyle='--', alpha=0.3)
+        ax_top.legend(ncol=1, fontsize=8, bbox_to_anchor=(1.01, 1), loc='upper left')
+        fig.suptitle(f"{title} - Gear Ratios", fontsize=15, fontweight='bold')
+        figures['GearRatios'] = fig
+    return figures
+
+
+# =========================================================
+# 3. Main Wrapper
+# =========================================================
+
+def analyze_powertrain(session):
+    """
+    [Feature] Powertrain Analysis
+    - Time per gear, upshift / downshift RPM per gear change
+    - Gear-ratio proxy (km/h per 1000 rpm) and top speed per gear
+    Returns the compute_powertrain tables (None without car data).
+    """
+    print(f"\n[Powertrain] Detecting gear changes on all laps...")
+
+    result = compute_powertrain(session)
+    if result['usage'].empty:
+        print("[Error] No car data found.")
+        return None
+
+    print(f"[System] {len(result['shifts'])} gear changes")
+    up = result['shift_points'][result['shift_points']['Kind'] == 'up']
+    if not up.empty:
+        print("\n[Upshift RPM (median)]")
+        print(up.pivot(index='Driver', columns='Transition', values='RPM').round(0).to_string())
+    if not result['ratios'].empty:
+        print("\n[km/h per 1000 rpm]")
+        print(result['ratios'].pivot(index='Driver', columns='Gear', values='KmhPer1000Rpm')
+              .round(2).to_string())
+
+    save_figures(session, render_powertrain(session, result), facecolor='white')
+    return result
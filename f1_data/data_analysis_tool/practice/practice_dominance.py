@@ -6,6 +6,7 @@ from matplotlib.collections import LineCollection
 import pandas as pd
 import numpy as np
 import os
+import time
 import warnings
 
 # --- Setup ---
@@ -16,15 +17,27 @@ pd.options.mode.chained_assignment = None
 # Custom Colors (Team/Driver mappings)
 # practice 폴더가 없거나 모듈 경로가 다르면 에러가 날 수 있으니 주의하세요.
 try:
-    from practice.f1_colors import get_driver_color, get_driver_style
-    from practice.save_utils import make_filename, save_figure
+    from practice.f1_colors import get_driver_color, get_driver_style, resolve_styles
+    from practice.save_utils import make_filename, save_figure, save_figures
 except ImportError:
     # Fallback if modules are missing (Test purposes)
     def get_driver_color(session, driver): return fastf1.plotting.driver_color(driver)
     def get_driver_style(driver): return {}
+    def resolve_styles(session, drivers=None):
+        return pd.DataFrame({'Color': [fastf1.plotting.driver_color(d) for d in drivers],
+                             'LineStyle': '-'}, index=list(drivers))
     def make_filename(session, suffix): return f"{session.event.year}_{session.event.EventName}_{suffix}.png"
     def save_figure(fig, filename, dpi=300, show=False, tight_rect=None): 
         fig.savefig(filename, dpi=dpi, bbox_inches='tight' if tight_rect is None else None)
+    def save_figures(session, figures, filenames=None, dpi=300):
+        filenames = filenames or {}
+        return [save_figure(fig, filenames.get(suffix) or make_filename(session, suffix), dpi=dpi)
+                for suffix, fig in figures.items()]
+
+from practice.lod import decimated_segments
+from practice.track_geometry import get_circuit_geometry
+from practice.telemetry_quality import TelemetryQualityError, clean_lap_telemetry
+from practice import config
 
 # =========================================================
 # 1. Helper Functions
@@ -85,376 +98,516 @@ def analyze_drs_effect(lap, telemetry):
 # 2. Main Logic
 # =========================================================
 
-def plot_track_dominance(session):
-    """
-    [Feature] Track Dominance & Telemetry Dashboard (Top 3 Unique Teams)
-    - Selects top 3 drivers from different teams.
-    - Generates comprehensive dashboard + 3 secondary charts.
-    """
-    print(f"\n[Dominance Analysis] Selecting Top 3 Unique Teams from the session...")
-
-    # --- 1. Filter Drivers ---
-    driver_numbers = session.drivers
+def _fastest_driver_laps(session) -> list:
+    """Fastest lap of every driver, quickest first."""
     valid_laps = []
-
-    for drv in driver_numbers:
+    for drv in session.drivers:
         try:
             lap = session.laps.pick_drivers(drv).pick_fastest()
             if pd.notna(lap['LapTime']):
                 valid_laps.append(lap)
         except Exception:
             continue
-
-    # Sort by lap time
     valid_laps.sort(key=lambda x: x['LapTime'])
+    return valid_laps
 
-    # Select Top 3 Unique Teams
-    selected_laps = []
-    selected_teams = set()
-    
-    print("\n--- [Selected Top 3 Drivers (Unique Teams)] ---")
-    rank = 1
-    for lap in valid_laps:
-        team = lap['Team']
-        driver = lap['Driver']
-        lap_time_str = str(lap['LapTime']).split()[-1][:-3]
-        
-        if team in selected_teams:
-            pass
-        else:
-            selected_teams.add(team)
+
+def select_top_team_laps(session, n_teams: int = 3) -> list:
+    """Fastest lap of the quickest driver of each of the `n_teams` fastest teams."""
+    # Keep the first lap of every team
+    selected_laps, selected_teams = [], set()
+    for lap in _fastest_driver_laps(session):
+        if lap['Team'] not in selected_teams:
+            selected_teams.add(lap['Team'])
             selected_laps.append(lap)
-            print(f" Rank {rank}: {driver} ({team}) - {lap_time_str}")
-        
-        if len(selected_laps) == 3:
+        if len(selected_laps) == n_teams:
             break
-    
-    if len(selected_laps) < 3:
-        print(f"[Error] Found only {len(selected_laps)} unique teams. Need at least 3 to generate comparison.")
-        return
-
-    # --- 2. Variable Mapping ---
-    bestlap_24 = selected_laps[0]  # Baseline (Fastest)
-    bestlap_25 = selected_laps[1]  # Comparison 1
-    bestlap_26 = selected_laps[2]  # Comparison 2
+    return selected_laps
 
-    # Assign Colors
-    color_24 = get_driver_color_custom(bestlap_24['Driver'], session)
-    color_25 = get_driver_color_custom(bestlap_25['Driver'], session)
-    color_26 = get_driver_color_custom(bestlap_26['Driver'], session)
 
-    # Event metadata
-    event_name = session.event.EventName
-    year = session.event.year
+def _select_team_telemetry(session, n_teams: int = 3) -> tuple:
+    """
+    select_top_team_laps with validated telemetry: a lap that fails the quality
+    checks is replaced by the team's next-best driver, else the team is skipped.
+    Returns (laps, telemetry) lists of equal length.
+    """
+    selected_laps, tels, selected_teams = [], [], set()
+    for lap in _fastest_driver_laps(session):
+        if lap['Team'] in selected_teams:
+            continue
+        try:
+            tel = clean_lap_telemetry(lap, merged=True)
+        except TelemetryQualityError as e:
+            print(f"[Warning] Dominance: {lap['Driver']} skipped ({e})")
+            continue
+        selected_teams.add(lap['Team'])
+        selected_laps.append(lap)
+        tels.append(tel)
+        if len(selected_laps) == n_teams:
+            break
+    return selected_laps, tels
 
-    # =========================================================
-    # 3. [Graph 1] Comprehensive Dashboard
-    # =========================================================
-    tel_24 = tel_25 = tel_26 = None  # 사전 초기화 — NameError 방지
 
+def compute_track_dominance(session) -> dict | None:
+    """
+    Data behind the dominance dashboard (top 3 drivers from different teams).
+
+    Returns a dict (None if fewer than 3 teams have a lap with valid telemetry):
+        laps       one row per driver, fastest first: Driver, Team, LapTime,
+                   Sector1-3Time, Color, TopSpeed, driving-style shares
+                   (Full Throttle, Partial Throttle, Braking, Lift (Coasting), %)
+                   and DRS On Speed / DRS Off Speed / DRS Delta
+        telemetry  long frame: Driver, Distance, Speed, Throttle, Brake, nGear, X, Y
+        delta      Distance (baseline lap) + one delta column per compared driver
+        map        per geometry segment: Segment, Driver, Color (who gained time)
+        geometry   CircuitGeometry used for the map
+        sectors    {'S1': m, 'S2': m, 'End': m}; S1/S2 None if sector times are missing
+    """
+    # Telemetry (validated / repaired)
+    selected_laps, tels = _select_team_telemetry(session, n_teams=3)
+    if len(selected_laps) < 3:
+        return None
+
+    bestlap_24, bestlap_25, bestlap_26 = selected_laps  # Baseline (Fastest), Comparison 1, 2
+    colors = [get_driver_color_custom(lap['Driver'], session) for lap in selected_laps]
+
+    # Deltas from the repaired telemetry: each lap's Time at the baseline's Distance
+    tel_24 = tels[0]
+    orig_distance = tel_24['Distance']
+    ref_time = tel_24['Time'].dt.total_seconds().to_numpy()
+    delta = pd.DataFrame({'Distance': orig_distance.to_numpy()})
+    for lap, tel in zip((bestlap_25, bestlap_26), tels[1:]):
+        lap_time = np.interp(orig_distance, tel['Distance'], tel['Time'].dt.total_seconds())
+        delta[lap['Driver']] = lap_time - ref_time
+
+    # Per-segment winner on the cached circuit geometry (built once per layout)
+    geom = get_circuit_geometry(session, bestlap_24)
+    lap_length = tel_24['Distance'].max()
+    vertex_dist = geom.vertex_distance(lap_length)
+    pace_gains = np.vstack([np.zeros(geom.n_segments)] + [
+        np.diff(np.interp(vertex_dist, orig_distance, delta[lap['Driver']]))
+        for lap in (bestlap_25, bestlap_26)
+    ])
+    winner = np.argmin(pace_gains, axis=0)
+    drivers = [lap['Driver'] for lap in selected_laps]
+    segment_map = pd.DataFrame({
+        'Segment': np.arange(geom.n_segments),
+        'Driver':  np.array(drivers, dtype=object)[winner],
+        'Color':   np.array(colors, dtype=object)[winner],
+    })
+
+    # Sector split distances on the baseline lap
+    s1_dist = s2_dist = None
     try:
-        print("\n--- 1. Generating Comprehensive Dashboard... ---")
-
-        # Load Telemetry
-        tel_24 = bestlap_24.get_telemetry().add_distance()
-        tel_25 = bestlap_25.get_telemetry().add_distance()
-        tel_26 = bestlap_26.get_telemetry().add_distance()
-
-        # Calculate Deltas
-        delta_t_ver_nor, ref_tel_ver_nor, comp_tel_ver_nor = fastf1.utils.delta_time(bestlap_24, bestlap_25)
-        delta_t_sai_nor, ref_tel_sai_nor, comp_tel_sai_nor = fastf1.utils.delta_time(bestlap_24, bestlap_26)
-
-        # Interpolate Deltas
-        orig_distance = tel_24['Distance']
-        delta_ver_nor_interpolated = np.interp(orig_distance, ref_tel_ver_nor['Distance'], delta_t_ver_nor.fillna(0))
-        delta_sai_nor_interpolated = np.interp(orig_distance, ref_tel_sai_nor['Distance'], delta_t_sai_nor.fillna(0))
-
-        # Setup Layout
-        fig = plt.figure(figsize=(15, 20), facecolor='white')
-        gs = fig.add_gridspec(6, 1, height_ratios=[1.5, 1, 1, 1, 1, 1])
-        ax_map = fig.add_subplot(gs[0])
-        ax_speed = fig.add_subplot(gs[1])
-        ax_throttle = fig.add_subplot(gs[2], sharex=ax_speed)
-        ax_brake = fig.add_subplot(gs[3], sharex=ax_speed)
-        ax_gear = fig.add_subplot(gs[4], sharex=ax_speed) # Gear subplot
-        ax_delta = fig.add_subplot(gs[5], sharex=ax_speed)
-
-        # Draw Track Map (Dominance based on instantaneous delta)
-        drivers_label = f"{bestlap_24.Driver} vs {bestlap_25.Driver} vs {bestlap_26.Driver}"
-        ax_map.set_title(f"Track Dominance: {drivers_label}", fontsize=14)
-        
-        d_delta_ver_nor = np.diff(delta_ver_nor_interpolated)
-        d_delta_sai_nor = np.diff(delta_sai_nor_interpolated)
-
-        colors_map = []
-        for i in range(len(d_delta_ver_nor)):
-            # Determine who gained time in this segment
-            pace_gains = [0, d_delta_ver_nor[i], d_delta_sai_nor[i]]
-            min_pace_idx = np.argmin(pace_gains)
-            
-            if min_pace_idx == 0: colors_map.append(color_24)
-            elif min_pace_idx == 1: colors_map.append(color_25)
-            else: colors_map.append(color_26)
-
-        x = tel_24['X'].values
-        y = tel_24['Y'].values
-        points = np.array([x, y]).T.reshape(-1, 1, 2)
-        segments = np.concatenate([points[:-1], points[1:]], axis=1)
-        lc = LineCollection(segments, colors=colors_map, linewidth=2.5)
-        ax_map.add_collection(lc)
-        ax_map.axis('equal'); ax_map.set_xticks([]); ax_map.set_yticks([]); ax_map.axis('off')
-
-        # Calculate Sector Positions
-        track_end_dist = tel_24['Distance'].max()
+        s1_time = bestlap_24.Sector1Time.total_seconds()
+        s2_time = bestlap_24.Sector2Time.total_seconds() + s1_time
+        tel_time = tel_24['Time'].dt.total_seconds()
+        s1_dist = float(np.interp(s1_time, tel_time, tel_24['Distance']))
+        s2_dist = float(np.interp(s2_time, tel_time, tel_24['Distance']))
+    except Exception:
         s1_dist, s2_dist = None, None
-        try:
-            s1_time = bestlap_24.Sector1Time.total_seconds()
-            s2_time = bestlap_24.Sector2Time.total_seconds() + s1_time
-            tel_time = tel_24['Time'].dt.total_seconds()
-            tel_dist = tel_24['Distance']
-            s1_dist = np.interp(s1_time, tel_time, tel_dist)
-            s2_dist = np.interp(s2_time, tel_time, tel_dist)
-            print(f"Sector Split: {s1_dist:.0f}m, {s2_dist:.0f}m")
-        except Exception:
-            s1_dist, s2_dist = None, None
-
-        # Plot Data
-        fig.suptitle(f"Telemetry Comparison: {drivers_label} - {year} {event_name}", fontsize=16, y=1.02)
-
-        # Speed
-        ax_speed.plot(tel_24['Distance'], tel_24['Speed'], label=bestlap_24.Driver, color=color_24)
-        ax_speed.plot(tel_25['Distance'], tel_25['Speed'], label=bestlap_25.Driver, color=color_25)
-        ax_speed.plot(tel_26['Distance'], tel_26['Speed'], label=bestlap_26.Driver, color=color_26)
-        ax_speed.set_ylabel('Speed (km/h)'); ax_speed.legend()
-        plt.setp(ax_speed.get_xticklabels(), visible=False)
-
-        # Throttle
-        ax_throttle.plot(tel_24['Distance'], tel_24['Throttle'], label=bestlap_24.Driver, color=color_24)
-        ax_throttle.plot(tel_25['Distance'], tel_25['Throttle'], label=bestlap_25.Driver, color=color_25)
-        ax_throttle.plot(tel_26['Distance'], tel_26['Throttle'], label=bestlap_26.Driver, color=color_26)
-        ax_throttle.set_ylabel('Throttle (%)')
-        plt.setp(ax_throttle.get_xticklabels(), visible=False)
-
-        # Brake
-        ax_brake.plot(tel_24['Distance'], tel_24['Brake'].astype(int), label=bestlap_24.Driver, color=color_24)
-        ax_brake.plot(tel_25['Distance'], tel_25['Brake'].astype(int), label=bestlap_25.Driver, color=color_25)
-        ax_brake.plot(tel_26['Distance'], tel_26['Brake'].astype(int), label=bestlap_26.Driver, color=color_26)
-        ax_brake.set_ylabel('Brake')
-        plt.setp(ax_brake.get_xticklabels(), visible=False)
-
-        # Gear
-        ax_gear.plot(tel_24['Distance'], tel_24['nGear'], label=bestlap_24.Driver, color=color_24)
-        ax_gear.plot(tel_25['Distance'], tel_25['nGear'], label=bestlap_25.Driver, color=color_25)
-        ax_gear.plot(tel_26['Distance'], tel_26['nGear'], label=bestlap_26.Driver, color=color_26)
-        ax_gear.set_ylabel('Gear')
-        plt.setp(ax_gear.get_xticklabels(), visible=False)
-
-        # Delta
-        ax_delta.plot(tel_24['Distance'], np.zeros_like(tel_24['Distance']), label=f'{bestlap_24.Driver} (Base)', color=color_24)
-        ax_delta.plot(tel_24['Distance'], delta_ver_nor_interpolated, label=f'{bestlap_25.Driver} vs Base', color=color_25)
-        ax_delta.plot(tel_24['Distance'], delta_sai_nor_interpolated, label=f'{bestlap_26.Driver} vs Base', color=color_26)
-        ax_delta.axhline(0, color='grey', linestyle='-')
-        ax_delta.set_ylabel('Delta (s)')
-        ax_delta.set_xlabel('Distance (m)')
-        ax_delta.legend()
-
-        # Grid and Ticks
-        major_ticks = np.arange(0, track_end_dist, 500)
-        minor_ticks = np.arange(0, track_end_dist, 250)
-
-        for ax in [ax_speed, ax_throttle, ax_brake, ax_gear, ax_delta]:
-            ax.set_facecolor('white')
-            ax.set_xticks(major_ticks)
-            ax.set_xticks(minor_ticks, minor=True)
-            ax.grid(which='major', axis='x', linestyle=':', linewidth=0.5, color='#888888')
-            ax.grid(which='minor', axis='x', linestyle=':', linewidth=0.5, color='#555555')
-            if s1_dist and s2_dist:
-                ax.axvline(s1_dist, color='grey', linestyle='--', linewidth=1.0)
-                ax.axvline(s2_dist, color='grey', linestyle='--', linewidth=1.0)
-
-        # Sector Background Colors
+
+    # Per-driver summary
+    rows = []
+    for lap, tel, color in zip(selected_laps, tels, colors):
+        row = {
+            'Driver':      lap['Driver'],
+            'Team':        lap['Team'],
+            'LapTime':     lap['LapTime'],
+            'Sector1Time': lap['Sector1Time'],
+            'Sector2Time': lap['Sector2Time'],
+            'Sector3Time': lap['Sector3Time'],
+            'Color':       color,
+            'TopSpeed':    tel['Speed'].max(),
+        }
+        row.update(analyze_lap_sections(lap, tel))
+        row.update(analyze_drs_effect(lap, tel))
+        rows.append(row)
+
+    channels = ['Distance', 'Speed', 'Throttle', 'Brake', 'nGear', 'X', 'Y']
+    telemetry = pd.concat(
+        [tel[[c for c in channels if c in tel.columns]].assign(Driver=lap['Driver'])
+         for lap, tel in zip(selected_laps, tels)], ignore_index=True)
+
+    return {
+        'laps':      pd.DataFrame(rows),
+        'telemetry': telemetry[['Driver'] + [c for c in channels if c in telemetry.columns]],
+        'delta':     delta,
+        'map':       segment_map,
+        'geometry':  geom,
+        'sectors':   {'S1': s1_dist, 'S2': s2_dist, 'End': float(lap_length)},
+    }
+
+
+def _render_dashboard(session, result):
+    """[Graph 1] Track map + speed/throttle/brake/gear/delta traces."""
+    laps, tels, delta = result['laps'], result['telemetry'], result['delta']
+    drivers = list(laps['Driver'])
+    colors = list(laps['Color'])
+    traces = [tels[tels['Driver'] == drv] for drv in drivers]
+    tel_24 = traces[0]
+    s1_dist, s2_dist = result['sectors']['S1'], result['sectors']['S2']
+    track_end_dist = result['sectors']['End']
+
+    # Setup Layout
+    fig = plt.figure(figsize=(15, 20), facecolor='white')
+    fig.set_layout_engine('tight', rect=[0, 0, 1, 0.98])
+    gs = fig.add_gridspec(6, 1, height_ratios=[1.5, 1, 1, 1, 1, 1])
+    ax_map = fig.add_subplot(gs[0])
+    ax_speed = fig.add_subplot(gs[1])
+    ax_throttle = fig.add_subplot(gs[2], sharex=ax_speed)
+    ax_brake = fig.add_subplot(gs[3], sharex=ax_speed)
+    ax_gear = fig.add_subplot(gs[4], sharex=ax_speed) # Gear subplot
+    ax_delta = fig.add_subplot(gs[5], sharex=ax_speed)
+
+    # Draw Track Map (Dominance based on instantaneous delta)
+    drivers_label = " vs ".join(drivers)
+    ax_map.set_title(f"Track Dominance: {drivers_label}", fontsize=14)
+    geom = result['geometry']
+    geom.plot(ax_map, colors=result['map']['Color'].to_numpy(), linewidth=2.5)
+    if s1_dist and s2_dist:
+        print(f"Sector Split: {s1_dist:.0f}m, {s2_dist:.0f}m")
+        geom.mark(ax_map, [s1_dist, s2_dist], lap_length=track_end_dist,
+                  color='black', marker='|', s=120)
+
+    # Plot Data
+    fig.suptitle(f"Telemetry Comparison: {drivers_label} - "
+                 f"{session.event.year} {session.event.EventName}", fontsize=16, y=1.02)
+
+    for tel, drv, color in zip(traces, drivers, colors):
+        ax_speed.plot(tel['Distance'], tel['Speed'], label=drv, color=color)
+        ax_throttle.plot(tel['Distance'], tel['Throttle'], label=drv, color=color)
+        ax_brake.plot(tel['Distance'], tel['Brake'].astype(int), label=drv, color=color)
+        ax_gear.plot(tel['Distance'], tel['nGear'], label=drv, color=color)
+
+    ax_speed.set_ylabel('Speed (km/h)'); ax_speed.legend()
+    ax_throttle.set_ylabel('Throttle (%)')
+    ax_brake.set_ylabel('Brake')
+    ax_gear.set_ylabel('Gear')
+    for ax in (ax_speed, ax_throttle, ax_brake, ax_gear):
+        plt.setp(ax.get_xticklabels(), visible=False)
+
+    # Delta
+    ax_delta.plot(tel_24['Distance'], np.zeros_like(tel_24['Distance']), label=f'{drivers[0]} (Base)', color=colors[0])
+    for drv, color in zip(drivers[1:], colors[1:]):
+        ax_delta.plot(delta['Distance'], delta[drv], label=f'{drv} vs Base', color=color)
+    ax_delta.axhline(0, color='grey', linestyle='-')
+    ax_delta.set_ylabel('Delta (s)')
+    ax_delta.set_xlabel('Distance (m)')
+    ax_delta.legend()
+
+    # Grid and Ticks
+    major_ticks = np.arange(0, track_end_dist, 500)
+    minor_ticks = np.arange(0, track_end_dist, 250)
+
+    for ax in [ax_speed, ax_throttle, ax_brake, ax_gear, ax_delta]:
+        ax.set_facecolor('white')
+        ax.set_xticks(major_ticks)
+        ax.set_xticks(minor_ticks, minor=True)
+        ax.grid(which='major', axis='x', linestyle=':', linewidth=0.5, color='#888888')
+        ax.grid(which='minor', axis='x', linestyle=':', linewidth=0.5, color='#555555')
         if s1_dist and s2_dist:
-            laps_list = [bestlap_24, bestlap_25, bestlap_26]
-            colors_list = [color_24, color_25, color_26]
-
-            def get_fastest_color(sector_attr):
-                times = [getattr(lap, sector_attr) for lap in laps_list]
-                valid_times = [t for t in times if t is not None]
-                if not valid_times: return 'grey'
-                min_t = min(valid_times)
-                idx = times.index(min_t)
-                return colors_list[idx]
-
-            c_s1 = get_fastest_color('Sector1Time')
-            c_s2 = get_fastest_color('Sector2Time')
-            c_s3 = get_fastest_color('Sector3Time')
-
-            ax_speed.axvspan(0, s1_dist, color=c_s1, alpha=0.2)
-            ax_speed.axvspan(s1_dist, s2_dist, color=c_s2, alpha=0.2)
-            ax_speed.axvspan(s2_dist, track_end_dist, color=c_s3, alpha=0.2)
-            
-            # Sector Labels
-            y_pos = ax_speed.get_ylim()[1] * 0.95
-            ax_speed.text(s1_dist/2, y_pos, 'S1', ha='center', color='black', fontweight='bold')
-            ax_speed.text((s1_dist+s2_dist)/2, y_pos, 'S2', ha='center', color='black', fontweight='bold')
-            ax_speed.text((s2_dist+track_end_dist)/2, y_pos, 'S3', ha='center', color='black', fontweight='bold')
-
-        # [MODIFIED] Save Dashboard (show=False)
-        filename_dash = f"{session.event.year}_{event_name.replace(' ','_')}_Dashboard.png"
-        save_figure(fig, filename_dash, dpi=300, show=False, tight_rect=[0, 0, 1, 0.98])
-        plt.close(fig) # Memory cleanup
+            ax.axvline(s1_dist, color='grey', linestyle='--', linewidth=1.0)
+            ax.axvline(s2_dist, color='grey', linestyle='--', linewidth=1.0)
 
-    except Exception as e:
-        print(f"[Error] Graph 1 Failed: {e}")
+    # Sector Background Colors
+    if s1_dist and s2_dist:
+        def get_fastest_color(sector_attr):
+            times = laps[sector_attr]
+            if times.isna().all(): return 'grey'
+            return colors[int(np.argmin(times.fillna(pd.Timedelta.max)))]
 
-    # =========================================================
-    # 4. Calculate Data for Secondary Charts
-    # =========================================================
-    try:
-        if tel_24 is None or tel_25 is None or tel_26 is None:
-            print("[Error] Telemetry data unavailable — secondary charts skipped.")
-            return
-
-        # Top Speed
-        max_speed_24 = tel_24['Speed'].max()
-        max_speed_25 = tel_25['Speed'].max()
-        max_speed_26 = tel_26['Speed'].max()
-
-        # Driving Style
-        sections_24 = analyze_lap_sections(bestlap_24, tel_24)
-        sections_25 = analyze_lap_sections(bestlap_25, tel_25)
-        sections_26 = analyze_lap_sections(bestlap_26, tel_26)
-        df_sections = pd.DataFrame({
-            bestlap_24.Driver: sections_24, 
-            bestlap_25.Driver: sections_25, 
-            bestlap_26.Driver: sections_26
-        })
-
-        # DRS Stats
-        drs_24 = analyze_drs_effect(bestlap_24, tel_24)
-        drs_25 = analyze_drs_effect(bestlap_25, tel_25)
-        drs_26 = analyze_drs_effect(bestlap_26, tel_26)
-        
-        print("\n--- Secondary Charts Data Calculated ---")
+        c_s1 = get_fastest_color('Sector1Time')
+        c_s2 = get_fastest_color('Sector2Time')
+        c_s3 = get_fastest_color('Sector3Time')
 
-    except Exception as e:
-        print(f"[Error] Data Calculation Failed: {e}")
-        return
+        ax_speed.axvspan(0, s1_dist, color=c_s1, alpha=0.2)
+        ax_speed.axvspan(s1_dist, s2_dist, color=c_s2, alpha=0.2)
+        ax_speed.axvspan(s2_dist, track_end_dist, color=c_s3, alpha=0.2)
 
-    # =========================================================
-    # 5. [Graph 2] Top Speed Comparison
-    # =========================================================
-    try:
-        top_drivers = [bestlap_24.Driver, bestlap_25.Driver, bestlap_26.Driver]
-        speeds = [max_speed_24, max_speed_25, max_speed_26]
-        colors = [color_24, color_25, color_26]
+        # Sector Labels
+        y_pos = ax_speed.get_ylim()[1] * 0.95
+        ax_speed.text(s1_dist/2, y_pos, 'S1', ha='center', color='black', fontweight='bold')
+        ax_speed.text((s1_dist+s2_dist)/2, y_pos, 'S2', ha='center', color='black', fontweight='bold')
+        ax_speed.text((s2_dist+track_end_dist)/2, y_pos, 'S3', ha='center', color='black', fontweight='bold')
 
-        fig, ax = plt.subplots(figsize=(10, 6), facecolor='white')
+    return fig
+
+
+def _render_top_speed(session, result):
+    """[Graph 2] Top Speed Comparison"""
+    laps = result['laps']
+    speeds = list(laps['TopSpeed'])
+
+    fig, ax = plt.subplots(figsize=(10, 6), facecolor='white')
+    ax.set_facecolor('white')
+    bars = ax.bar(laps['Driver'], speeds, color=list(laps['Color']))
+    ax.set_title('Top Speed Comparison (Fastest Lap)', fontsize=16)
+    ax.set_ylabel('Top Speed (km/h)')
+    ax.set_ylim(min(speeds)*0.95, max(speeds)*1.05)
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2.0, height + 0.5, f'{height:.1f}', ha='center', va='bottom', fontsize=12)
+
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    return fig
+
+
+def _render_driving_style(session, result):
+    """[Graph 3] Driving Style Analysis"""
+    laps = result['laps']
+    categories = ['Full Throttle', 'Partial Throttle', 'Braking', 'Lift (Coasting)']
+
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8), facecolor='white')
+    fig.set_layout_engine('tight', rect=[0, 0.03, 1, 0.95])
+    for ax in axes.flat:
         ax.set_facecolor('white')
-        bars = ax.bar(top_drivers, speeds, color=colors)
-        ax.set_title('Top Speed Comparison (Fastest Lap)', fontsize=16)
-        ax.set_ylabel('Top Speed (km/h)')
-        ax.set_ylim(min(speeds)*0.95, max(speeds)*1.05) 
+    fig.suptitle('% of Lap Time Analysis', fontsize=18)
+
+    for ax, category in zip(axes.flat, categories):
+        values = list(laps[category])
+        bars = ax.bar(laps['Driver'], values, color=list(laps['Color']))
+
+        ax.set_title(category, fontsize=14)
+        ax.set_ylabel('% of Lap Time')
 
         for bar in bars:
             height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2.0, height + 0.5, f'{height:.1f}', ha='center', va='bottom', fontsize=12)
-
-        plt.grid(axis='y', linestyle='--', alpha=0.3)
-        
-        # [MODIFIED] show=False
-        filename = make_filename(session, suffix='TopSpeed')
-        save_figure(fig, filename, dpi=300, show=False)
-        plt.close(fig) # Memory cleanup
-    except Exception as e:
-        print(f"[Error] Graph 2 Failed: {e}")
+            ax.text(bar.get_x() + bar.get_width()/2.0, height, f'{height:.1f}%', ha='center', va='bottom', fontsize=10)
+
+        # Auto-scale Y axis
+        max_val = max(values) if values else 0
+        if max_val > 0:
+            ax.set_ylim(top=max_val * 1.25)
+        else:
+            ax.set_ylim(top=10)
+
+        ax.grid(axis='y', linestyle='--', alpha=0.3)
+    return fig
+
+
+def _render_drs(session, result):
+    """[Graph 4] DRS Effect Analysis"""
+    laps = result['laps']
+    categories = list(laps['Driver'])
+    drs_off_speeds = list(laps['DRS Off Speed'])
+    drs_deltas = list(laps['DRS Delta'])
+    drs_on_speeds = list(laps['DRS On Speed'])
+
+    colors_bottom = list(laps['Color'])
+    colors_top = ['orange', 'cyan', 'lime'] # Distinct colors for delta
+
+    fig, ax = plt.subplots(figsize=(10, 7), facecolor='white')
+    ax.set_facecolor('white')
+    ax.bar(categories, drs_off_speeds, label='DRS Off', color=colors_bottom, alpha=0.7)
+    ax.bar(categories, drs_deltas, bottom=drs_off_speeds, label='DRS Delta', color=colors_top)
+
+    ax.set_title('DRS Effect Comparison (Top Speed)', fontsize=16)
+    ax.set_ylabel('Speed (km/h)')
+
+    # Scale Y axis
+    min_y = min(drs_off_speeds) * 0.95
+    max_y = max(drs_on_speeds) * 1.05
+    ax.set_ylim(min_y, max_y)
+    ax.legend()
+
+    for i, cat in enumerate(categories):
+        on_speed = drs_on_speeds[i]
+        off_speed = drs_off_speeds[i]
+        delta = drs_deltas[i]
+
+        delta_pos = off_speed + (delta / 2) if delta > 0 else off_speed
+        off_pos = off_speed - 2
+
+        ax.text(cat, on_speed + 1, f"{on_speed:.0f}", ha='center', va='bottom', fontsize=12, weight='bold', color='black')
+        ax.text(cat, delta_pos, f"[+{delta:.0f}]", ha='center', va='center', fontsize=11, color='black', fontweight='bold')
+        ax.text(cat, off_pos, f"{off_speed:.0f}", ha='center', va='top', fontsize=11, color='black', fontweight='bold')
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    return fig
+
+
+def render_track_dominance(session, result: dict) -> dict:
+    """
+    Dashboard + 3 secondary charts from compute_track_dominance.
+    Returns {suffix: Figure}; a chart that fails is reported and left out.
+    """
+    renderers = [
+        ('Dashboard',    'Graph 1', _render_dashboard),
+        ('TopSpeed',     'Graph 2', _render_top_speed),
+        ('DrivingStyle', 'Graph 3', _render_driving_style),
+        ('DRS',          'Graph 4', _render_drs),
+    ]
+    figures = {}
+    for suffix, label, render in renderers:
+        try:
+            figures[suffix] = render(session, result)
+        except Exception as e:
+            print(f"[Error] {label} Failed: {e}")
+    return figures
+
+
+def plot_track_dominance(session):
+    """
+    [Feature] Track Dominance & Telemetry Dashboard (Top 3 Unique Teams)
+    - Selects top 3 drivers from different teams.
+    - Generates comprehensive dashboard + 3 secondary charts.
+    - Returns the compute_track_dominance result (None on failure).
+    """
+    print(f"\n[Dominance Analysis] Selecting Top 3 Unique Teams from the session...")
 
-    # =========================================================
-    # 6. [Graph 3] Driving Style Analysis
-    # =========================================================
     try:
-        categories = ['Full Throttle', 'Partial Throttle', 'Braking', 'Lift (Coasting)']
-        data_24 = df_sections[bestlap_24.Driver]
-        data_25 = df_sections[bestlap_25.Driver]
-        data_26 = df_sections[bestlap_26.Driver]
-
-        fig, axes = plt.subplots(2, 2, figsize=(12, 8), facecolor='white')
-        for ax in axes.flat:
-            ax.set_facecolor('white')
-        fig.suptitle('% of Lap Time Analysis', fontsize=18)
-
-        drivers_list = [bestlap_24.Driver, bestlap_25.Driver, bestlap_26.Driver]
-        colors_list = [color_24, color_25, color_26]
-
-        for i, (ax, category) in enumerate(zip(axes.flat, categories)):
-            values = [data_24[category], data_25[category], data_26[category]]
-            bars = ax.bar(drivers_list, values, color=colors_list)
-
-            ax.set_title(category, fontsize=14)
-            ax.set_ylabel('% of Lap Time')
-
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2.0, height, f'{height:.1f}%', ha='center', va='bottom', fontsize=10)
-
-            # Auto-scale Y axis
-            max_val = max(values) if values else 0
-            if max_val > 0:
-                ax.set_ylim(top=max_val * 1.25)
-            else:
-                ax.set_ylim(top=10)
-            
-            ax.grid(axis='y', linestyle='--', alpha=0.3)
-
-        # [MODIFIED] show=False
-        filename = make_filename(session, suffix='DrivingStyle')
-        save_figure(fig, filename, dpi=300, show=False, tight_rect=[0, 0.03, 1, 0.95])
-        plt.close(fig) # Memory cleanup
+        result = compute_track_dominance(session)
     except Exception as e:
-        print(f"[Error] Graph 3 Failed: {e}")
+        print(f"[Error] Data Calculation Failed: {e}")
+        return None
 
-    # =========================================================
-    # 7. [Graph 4] DRS Effect Analysis
-    # =========================================================
-    try:
-        categories = [bestlap_24.Driver, bestlap_25.Driver, bestlap_26.Driver]
-        drs_off_speeds = [drs_24['DRS Off Speed'], drs_25['DRS Off Speed'], drs_26['DRS Off Speed']]
-        drs_deltas = [drs_24['DRS Delta'], drs_25['DRS Delta'], drs_26['DRS Delta']]
-        drs_on_speeds = [drs_24['DRS On Speed'], drs_25['DRS On Speed'], drs_26['DRS On Speed']]
-        
-        colors_bottom = [color_24, color_25, color_26] 
-        colors_top = ['orange', 'cyan', 'lime'] # Distinct colors for delta
-
-        fig, ax = plt.subplots(figsize=(10, 7), facecolor='white')
+    if result is None:
+        print(f"[Error] Found fewer than 3 unique teams. Need at least 3 to generate comparison.")
+        return None
+
+    print("\n--- [Selected Top 3 Drivers (Unique Teams)] ---")
+    for rank, row in enumerate(result['laps'].itertuples(), start=1):
+        lap_time_str = str(row.LapTime).split()[-1][:-3]
+        print(f" Rank {rank}: {row.Driver} ({row.Team}) - {lap_time_str}")
+
+    print("\n--- Generating Dashboard & Secondary Charts... ---")
+    figures = render_track_dominance(session, result)
+
+    # Dashboard keeps its historical file name (no session name)
+    dashboard_name = f"{session.event.year}_{session.event.EventName.replace(' ','_')}_Dashboard.png"
+    save_figures(session, figures, filenames={'Dashboard': dashboard_name}, dpi=300)
+    return result
+
+# =========================================================
+# 3. Whole-Grid Telemetry Overlay
+# =========================================================
+
+def compute_grid_overlay(session) -> pd.DataFrame:
+    """
+    Fastest-lap car data of every driver on a common distance axis.
+
+    Long frame, drivers ordered slowest → fastest:
+    Driver, LapTime, Distance, Time (s into the lap), Speed, Throttle,
+    Brake, nGear, Delta (s, to the session's fastest lap at the same distance).
+    Empty DataFrame if fewer than 2 drivers have telemetry.
+    """
+    traces = []
+    for drv in session.drivers:
+        try:
+            lap = session.laps.pick_drivers(drv).pick_fastest()
+            if lap is None or pd.isna(lap['LapTime']):
+                continue
+            tel = clean_lap_telemetry(lap)
+            traces.append({'Driver': lap['Driver'], 'LapTime': lap['LapTime'], 'Tel': tel})
+        except TelemetryQualityError as e:
+            print(f"[Warning] Grid overlay: {lap['Driver']} skipped ({e})")
+        except Exception:
+            continue
+
+    columns = ['Driver', 'LapTime', 'Distance', 'Time', 'Speed', 'Throttle', 'Brake', 'nGear', 'Delta']
+    if len(traces) < 2:
+        return pd.DataFrame(columns=columns)
+
+    # Slowest first → fastest drivers are drawn on top
+    traces.sort(key=lambda t: t['LapTime'], reverse=True)
+    ref = traces[-1]['Tel']
+    ref_dist = ref['Distance'].to_numpy()
+    ref_time = ref['Time'].dt.total_seconds().to_numpy()
+
+    frames = []
+    for t in traces:
+        tel = t['Tel']
+        dist = tel['Distance'].to_numpy()
+        lap_time = tel['Time'].dt.total_seconds().to_numpy()
+        frames.append(pd.DataFrame({
+            'Driver':   t['Driver'],
+            'LapTime':  t['LapTime'],
+            'Distance': dist,
+            'Time':     lap_time,
+            'Speed':    tel['Speed'].to_numpy(),
+            'Throttle': tel['Throttle'].to_numpy(),
+            'Brake':    tel['Brake'].astype(int).to_numpy(),
+            'nGear':    tel['nGear'].to_numpy(),
+            'Delta':    lap_time - np.interp(dist, ref_dist, ref_time),
+        }))
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def render_grid_overlay(session, df: pd.DataFrame,
+                        lod_buckets: int | None = None) -> dict:
+    """
+    Speed / Throttle / Brake / Gear / Delta panels of compute_grid_overlay.
+    One LineCollection per panel; every trace min/max-decimated to
+    `lod_buckets` columns. Returns {suffix: Figure}.
+    """
+    lod_buckets = config.GRID_OVERLAY_LOD_BUCKETS if lod_buckets is None else lod_buckets
+    drivers = list(pd.unique(df['Driver']))
+    traces = [df[df['Driver'] == drv] for drv in drivers]
+
+    driver_styles = resolve_styles(session, drivers)
+    colors = driver_styles['Color'].tolist()
+    styles = driver_styles['LineStyle'].tolist()
+
+    # --- Layout ---
+    panels = [
+        ('Speed', 'Speed (km/h)'),
+        ('Throttle', 'Throttle (%)'),
+        ('Brake', 'Brake'),
+        ('nGear', 'Gear'),
+        ('Delta', 'Delta to P1 (s)'),
+    ]
+    fig, axes = plt.subplots(len(panels), 1, figsize=(15, 16), sharex=True, facecolor='white')
+    fig.set_layout_engine('tight', rect=[0, 0, 1, 0.92])
+
+    for ax, (column, ylabel) in zip(axes, panels):
+        segments = decimated_segments(
+            [(t['Distance'], t[column]) for t in traces], lod_buckets)
+        lc = LineCollection(segments, colors=colors, linestyles=styles,
+                            linewidths=1.0, alpha=0.85)
+        ax.add_collection(lc, autolim=True)
+        ax.autoscale_view()
+        ax.set_ylabel(ylabel)
         ax.set_facecolor('white')
-        ax.bar(categories, drs_off_speeds, label='DRS Off', color=colors_bottom, alpha=0.7)
-        ax.bar(categories, drs_deltas, bottom=drs_off_speeds, label='DRS Delta', color=colors_top)
-
-        ax.set_title('DRS Effect Comparison (Top Speed)', fontsize=16)
-        ax.set_ylabel('Speed (km/h)')
-        
-        # Scale Y axis
-        min_y = min(drs_off_speeds) * 0.95
-        max_y = max(drs_on_speeds) * 1.05
-        ax.set_ylim(min_y, max_y)
-        ax.legend()
-
-        for i, cat in enumerate(categories):
-            on_speed = drs_on_speeds[i]
-            off_speed = drs_off_speeds[i]
-            delta = drs_deltas[i]
-            
-            delta_pos = off_speed + (delta / 2) if delta > 0 else off_speed
-            off_pos = off_speed - 2 
-
-            ax.text(cat, on_speed + 1, f"{on_speed:.0f}", ha='center', va='bottom', fontsize=12, weight='bold', color='black')
-            ax.text(cat, delta_pos, f"[+{delta:.0f}]", ha='center', va='center', fontsize=11, color='black', fontweight='bold')
-            ax.text(cat, off_pos, f"{off_speed:.0f}", ha='center', va='top', fontsize=11, color='black', fontweight='bold')
-        plt.grid(axis='y', linestyle='--', alpha=0.3)
-        
-        # [MODIFIED] show=False
-        filename = make_filename(session, suffix='DRS')
-        save_figure(fig, filename, dpi=300, show=False)
-        plt.close(fig) # Memory cleanup
-    except Exception as e:
-        print(f"[Error] Graph 4 Failed: {e}")
\ No newline at end of file
+        ax.grid(which='major', axis='x', linestyle=':', linewidth=0.5, color='#888888')
+
+    axes[-1].axhline(0, color='grey', linestyle='-', linewidth=0.8)
+    axes[-1].set_xlabel('Distance (m)')
+    axes[-1].set_xlim(0, df['Distance'].max())
+
+    # Legend: fastest → slowest
+    handles = [plt.Line2D([0], [0], color=c, linestyle=ls, lw=2)
+               for c, ls in zip(colors[::-1], styles[::-1])]
+    labels = drivers[::-1]
+    # Figure-level legend: tight_layout ignores it, so panel spacing stays compact
+    fig.legend(handles, labels, loc='upper center', bbox_to_anchor=(0.5, 0.965),
+               ncol=10, fontsize=9, facecolor='white', edgecolor='lightgray')
+
+    fig.suptitle(f"Whole-Grid Telemetry Overlay (Fastest Laps) - "
+                 f"{session.event.year} {session.event.EventName} {session.name}",
+                 fontsize=16, y=0.99)
+    return {'GridOverlay': fig}
+
+
+def plot_grid_overlay(session, lod_buckets: int | None = None):
+    """
+    [Feature] Whole-Grid Telemetry Overlay (fastest lap of every driver)
+    - Speed / Throttle / Brake / Gear / Delta panels
+    - One LineCollection per panel instead of one ax.plot per driver
+    - Every trace min/max-decimated to `lod_buckets` columns before plotting
+    - Delta measured against the session's fastest lap on a common distance axis
+    Returns the compute_grid_overlay table (None if fewer than 2 drivers).
+    """
+    lod_buckets = config.GRID_OVERLAY_LOD_BUCKETS if lod_buckets is None else lod_buckets
+    print(f"\n[Grid Overlay] Loading fastest-lap telemetry for the whole grid...")
+    start = time.perf_counter()
+
+    df = compute_grid_overlay(session)
+    n_drivers = df['Driver'].nunique()
+    if n_drivers < 2:
+        print(f"[Error] Found only {n_drivers} driver(s) with telemetry. Need at least 2.")
+        return None
+
+    save_figures(session, render_grid_overlay(session, df, lod_buckets=lod_buckets), dpi=300)
+    print(f"[System] Grid overlay: {n_drivers} drivers in {time.perf_counter() - start:.1f}s")
+    return df
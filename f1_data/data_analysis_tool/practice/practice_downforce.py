@@ -8,30 +8,19 @@ import numpy as np
 # Setup
 fastf1.plotting.setup_mpl()
 
-from practice.f1_colors import get_driver_color, get_driver_style
-from practice.save_utils import make_filename, save_figure
+from practice.f1_colors import DEFAULT_COLOR, resolve_styles
+from practice.practice_speedtrap import compute_speed_traps, speed_trap_percentiles
+from practice.save_utils import save_figures
+from practice.telemetry_quality import TelemetryQualityError, clean_lap_telemetry
 
 
-def analyze_grid_aero(session):
+def compute_grid_aero(session) -> pd.DataFrame:
     """
-    [Feature 4] Downforce Positioning — Mean Speed vs Top Speed
-
-    Axes:
-      X-axis: Mean Speed — average speed over fastest-lap telemetry
-      Y-axis: Top Speed  — maximum speed in fastest-lap telemetry
-
-    Quadrants:
-      Top-Left     Low MeanSpeed  + High TopSpeed  → "High Downforce"
-      Top-Right    High MeanSpeed + High TopSpeed  → "Balanced"
-      Bottom-Right High MeanSpeed + Low TopSpeed   → "Low Downforce"
-      Bottom-Left  Low MeanSpeed  + Low TopSpeed   → "Underperforming"
-
-    Centre axes: median of MeanSpeed and median of TopSpeed across teams.
+    Mean speed and top speed of each team's best driver (fastest-lap telemetry).
     Best-driver selection per team: highest TopSpeed.
-    """
-    print(f"\n[Aero Analysis] Calculating Team Downforce Positioning "
-          f"(Mean Speed vs Top Speed)...")
 
+    Columns: Team, Driver, MeanSpeed, TopSpeed, Color.
+    """
     teams      = session.results['TeamName'].unique()
     team_stats = []
 
@@ -45,7 +34,7 @@ def analyze_grid_aero(session):
         for drv in drivers:
             try:
                 lap = session.laps.pick_drivers(drv).pick_fastest()
-                tel = lap.get_car_data().add_distance()
+                tel = clean_lap_telemetry(lap)
 
                 # X-axis: Mean Speed — average over full lap telemetry
                 mean_speed = tel['Speed'].mean()
@@ -59,6 +48,8 @@ def analyze_grid_aero(session):
                         'MeanSpeed': mean_speed,
                         'TopSpeed':  top_speed,
                     })
+            except TelemetryQualityError as e:
+                print(f"[Warning] Downforce map: {drv} skipped ({e})")
             except Exception:
                 continue
 
@@ -66,21 +57,131 @@ def analyze_grid_aero(session):
         if len(drivers_in_team) > 0:
             best_drv = sorted(
                 drivers_in_team, key=lambda x: x['TopSpeed'], reverse=True)[0]
-            color = get_driver_color(session, best_drv['Driver'])
 
             team_stats.append({
                 'Team':      team,
                 'Driver':    best_drv['Driver'],
                 'MeanSpeed': best_drv['MeanSpeed'],
                 'TopSpeed':  best_drv['TopSpeed'],
-                'Color':     color,
             })
-            print(f" -> {team} ({best_drv['Driver']}): "
-                  f"MeanSpeed {best_drv['MeanSpeed']:.1f}  "
-                  f"TopSpeed {best_drv['TopSpeed']:.1f}")
 
-    df = pd.DataFrame(team_stats)
+    df = pd.DataFrame(team_stats, columns=['Team', 'Driver', 'MeanSpeed', 'TopSpeed'])
+    # One point per team: team color (not the teammate shade of whichever driver
+    # was quicker), same as compute_grid_aero_laps
+    df['Color'] = resolve_styles(session, df['Driver'])['TeamColor'].reindex(df['Driver']).to_numpy()
+    return df
+
+
+def render_grid_aero(session, df: pd.DataFrame) -> dict:
+    """Quadrant map of compute_grid_aero. Returns {suffix: Figure}."""
+    return {'Downforce': _render_aero_map(
+        session, df,
+        x_label="Mean Speed (km/h)",
+        title="Downforce Positioning — Mean Speed vs Top Speed")}
+
+
+def analyze_grid_aero(session):
+    """
+    [Feature 4] Downforce Positioning — Mean Speed vs Top Speed
+
+    Axes:
+      X-axis: Mean Speed — average speed over fastest-lap telemetry
+      Y-axis: Top Speed  — maximum speed in fastest-lap telemetry
+
+    Quadrants:
+      Top-Left     Low MeanSpeed  + High TopSpeed  → "High Downforce"
+      Top-Right    High MeanSpeed + High TopSpeed  → "Balanced"
+      Bottom-Right High MeanSpeed + Low TopSpeed   → "Low Downforce"
+      Bottom-Left  Low MeanSpeed  + Low TopSpeed   → "Underperforming"
+
+    Centre axes: median of MeanSpeed and median of TopSpeed across teams.
+    Returns the compute_grid_aero table (None if no data).
+    """
+    print(f"\n[Aero Analysis] Calculating Team Downforce Positioning "
+          f"(Mean Speed vs Top Speed)...")
+
+    df = compute_grid_aero(session)
+    if df.empty:
+        print("[Error] No telemetry data found.")
+        return None
+
+    for row in df.itertuples():
+        print(f" -> {row.Team} ({row.Driver}): "
+              f"MeanSpeed {row.MeanSpeed:.1f}  TopSpeed {row.TopSpeed:.1f}")
+
+    save_figures(session, render_grid_aero(session, df), facecolor='white')
+    return df
+
+
+def compute_grid_aero_laps(session) -> pd.DataFrame:
+    """
+    Mean Speed Index and speed-trap P95 per team from the laps table.
+
+    Columns: Team, MeanSpeed (index, % of fastest team), TopSpeed (ST P95), Color.
+    Empty DataFrame when speed traps or lap times are missing.
+    """
+    columns = ['Team', 'MeanSpeed', 'TopSpeed', 'Color']
+    traps = compute_speed_traps(session)
+    if traps.empty:
+        return pd.DataFrame(columns=columns)
+    trap_stats = speed_trap_percentiles(traps, trap='ST')
+
+    laps = session.laps.pick_accurate()
+    best_by_team = laps.groupby('Team')['LapTime'].min().dropna()
+    if best_by_team.empty:
+        return pd.DataFrame(columns=columns)
+    index = best_by_team.min() / best_by_team * 100.0
+
+    df = pd.DataFrame({
+        'Team':      index.index,
+        'MeanSpeed': index.values,
+        'TopSpeed':  trap_stats.reindex(index.index)['P95'].values,
+    }).dropna()
+    team_colors = resolve_styles(session).groupby('TeamName')['TeamColor'].first()
+    df['Color'] = df['Team'].map(team_colors).fillna(DEFAULT_COLOR)
+    return df.reset_index(drop=True)
+
+
+def render_grid_aero_laps(session, df: pd.DataFrame) -> dict:
+    """Quadrant map of compute_grid_aero_laps. Returns {suffix: Figure}."""
+    return {'Downforce_Laps': _render_aero_map(
+        session, df,
+        x_label="Mean Speed Index (% of fastest team)",
+        title="Downforce Positioning (Laps) — Mean Speed Index vs Speed Trap")}
+
+
+def analyze_grid_aero_laps(session):
+    """
+    [Feature 4-b] Downforce Positioning from the laps table only (no car data)
+
+    Axes:
+      X-axis: Mean Speed Index — grid best lap / team best lap × 100
+              (same ordering as mean speed over the lap; lap length cancels)
+      Y-axis: Top Speed — team speed-trap P95 over all laps (SpeedST),
+              see practice_speedtrap.compute_speed_traps
+
+    Runs straight after a laps-only session load; telemetry is only touched
+    for drivers without speed-trap data.
+    Returns the compute_grid_aero_laps table (None if no data).
+    """
+    print(f"\n[Aero Analysis] Calculating Team Downforce Positioning "
+          f"(laps only: Mean Speed Index vs Speed Trap)...")
+
+    df = compute_grid_aero_laps(session)
+    if df.empty:
+        print("[Error] No speed-trap or lap data found.")
+        return None
+
+    for row in df.sort_values('MeanSpeed', ascending=False).itertuples():
+        print(f" -> {row.Team}: MeanSpeedIndex {row.MeanSpeed:.2f}  "
+              f"SpeedTrap P95 {row.TopSpeed:.1f}")
+
+    save_figures(session, render_grid_aero_laps(session, df), facecolor='white')
+    return df
+
 
+def _render_aero_map(session, df, x_label: str, title: str):
+    """Quadrant scatter shared by the telemetry and laps-only variants."""
     # --- Visualization ---
     fig, ax = plt.subplots(figsize=(16, 10))
     fig.patch.set_facecolor('white')
@@ -184,9 +285,9 @@ def analyze_grid_aero(session):
     # A-4: Axis labels & title
     session_name = f"{session.event.year} {session.event.EventName} {session.name}"
     ax.set_title(
-        f"{session_name} — Downforce Positioning — Mean Speed vs Top Speed",
+        f"{session_name} — {title}",
         fontsize=18, fontweight='bold', color='black', pad=20)
-    ax.set_xlabel("Mean Speed (km/h)", fontsize=12, color='black')
+    ax.set_xlabel(x_label, fontsize=12, color='black')
     ax.set_ylabel("Top Speed (km/h)", fontsize=12, color='black')
 
     ax.spines['top'].set_visible(False)
@@ -195,6 +296,4 @@ def analyze_grid_aero(session):
     ax.spines['left'].set_color('black')
     ax.tick_params(colors='black')
 
-    # Save
-    filename = make_filename(session, suffix='Downforce')
-    save_figure(fig, filename, facecolor='white', show=False)
+    return fig
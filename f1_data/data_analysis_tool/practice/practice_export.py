@@ -3,40 +3,57 @@ import fastf1
 import pandas as pd
 import os
 
+# Exported channels (same order as the CSV columns)
+EXPORT_COLUMNS = ['Date', 'RPM', 'Speed', 'nGear', 'Throttle', 'Brake', 'DRS', 'Distance']
+
+def compute_team_telemetry(session, team_name) -> pd.DataFrame:
+    """
+    Fastest-lap car telemetry of every driver of `team_name`.
+
+    Columns: Driver + EXPORT_COLUMNS. Drivers whose telemetry cannot be
+    extracted are skipped; empty DataFrame if none is left.
+    """
+    drivers = session.laps.pick_team(team_name)['Driver'].unique()
+    frames = []
+    for drv in drivers:
+        try:
+            lap = session.laps.pick_drivers(drv).pick_fastest()
+            tel = lap.get_car_data().add_distance()
+            frame = tel[EXPORT_COLUMNS].copy()
+            frame.insert(0, 'Driver', drv)
+            frames.append(frame)
+        except Exception as e:
+            print(f" -> Failed to export {drv}: {e}")
+
+    if not frames:
+        return pd.DataFrame(columns=['Driver'] + EXPORT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
 def export_telemetry_data(session, team_name):
     """
     [Feature 3] Export Team Telemetry Data to CSV
     - Extracts Speed, RPM, Gear, Throttle, Brake, DRS data
     - Saves as CSV file in the current directory
+    - Returns the compute_team_telemetry table (None if nothing was exported)
     """
     print(f"\n[Export] Extracting telemetry data for {team_name}...")
     
     try:
-        # Get drivers from the specific team
-        drivers = session.laps.pick_team(team_name)['Driver'].unique()
+        df = compute_team_telemetry(session, team_name)
         
-        if len(drivers) == 0:
-            print(f"[Error] No drivers found for team: {team_name}")
-            return
+        if df.empty:
+            print(f"[Error] No telemetry found for team: {team_name}")
+            return None
 
-        for drv in drivers:
-            try:
-                # Get fastest lap and telemetry
-                lap = session.laps.pick_drivers(drv).pick_fastest()
-                tel = lap.get_car_data().add_distance()
-                
-                # Select columns
-                save_df = tel[['Date', 'RPM', 'Speed', 'nGear', 'Throttle', 'Brake', 'DRS', 'Distance']]
-                
-                # Save to CSV
-                filename = f"{team_name}_{drv}_telemetry.csv"
-                save_df.to_csv(filename, index=False)
-                print(f" -> Saved: {filename}")
-                
-            except Exception as e:
-                print(f" -> Failed to export {drv}: {e}")
+        for drv, save_df in df.groupby('Driver', sort=False):
+            # Save to CSV
+            filename = f"{team_name}_{drv}_telemetry.csv"
+            save_df[EXPORT_COLUMNS].to_csv(filename, index=False)
+            print(f" -> Saved: {filename}")
                 
         print("[System] Data export complete.")
+        return df
 
     except Exception as e:
-        print(f"[Error] Export process failed: {e}")
\ No newline at end of file
+        print(f"[Error] Export process failed: {e}")
+        return None
\ No newline at end of file
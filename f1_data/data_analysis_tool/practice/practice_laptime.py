@@ -10,38 +10,72 @@ fastf1.plotting.setup_mpl()
 # Try importing custom modules from the 'practice' package
 # If running standalone or files missing, use basic fallbacks
 try:
-    from practice.f1_colors import get_driver_color
-    from practice.save_utils import make_filename, save_figure
+    from practice.f1_colors import get_driver_index, resolve_styles
+    from practice.save_utils import make_filename, save_figure, save_figures
+    from practice.track_evolution import corrected_laps
+    from practice.run_classifier import classify_runs, pick_programme
+    from practice.traffic import detect_traffic, pick_free_air
+    from practice.telemetry_quality import TelemetryQualityError, clean_lap_telemetry
 except ImportError:
     # Fallback if custom modules are not found
-    def get_driver_color(session, abb): return fastf1.plotting.driver_color(abb)
+    def get_driver_index(session): return {d: session.get_driver(d) for d in session.drivers}
+    def resolve_styles(session, drivers=None):
+        abbs = [session.get_driver(d)['Abbreviation'] for d in session.drivers]
+        return pd.DataFrame({'Color': [fastf1.plotting.driver_color(a) for a in abbs]}, index=abbs)
+    def corrected_laps(session, verbose=True): return session.laps
+    classify_runs = pick_programme = None
+    detect_traffic = pick_free_air = None
+    class TelemetryQualityError(Exception): pass
+    def clean_lap_telemetry(lap, merged=False): return lap.get_car_data().add_distance()
     def make_filename(session, suffix): return f"{session.event.year}_{session.event.EventName}_{suffix}.png"
     def save_figure(fig, filename, facecolor, show): 
         fig.savefig(filename, facecolor=facecolor)
         if show: plt.show()
+    def save_figures(session, figures, **kwargs):
+        return [save_figure(fig, make_filename(session, suffix), 'white', False)
+                for suffix, fig in figures.items()]
 
 # ==========================================
 # 1. Lap Delta Analysis (Gap to Leader)
 # ==========================================
-def plot_lap_gap(session):
+def compute_lap_gap(session, corrected: bool = False, push_only: bool = False,
+                    free_air: bool = False) -> pd.DataFrame:
     """
-    Calculates and plots the gap to the leader for the fastest lap of each driver.
-    """
-    print(f"\n[1/3] Calculating Whole Grid Lap Delta...")
+    Fastest lap of each driver and its gap to the leader.
+    - corrected=True: lap times normalized for track evolution / weather
+      (see practice/track_evolution.py)
+    - push_only=True: fastest lap taken from push laps (qualifying simulations)
+      only, see practice/run_classifier.py; falls back to all laps per driver
+    - free_air=True: laps in traffic or in a tow are ignored
+      (see practice/traffic.py, needs position data)
 
+    Columns: Driver, LapTime, Gap (s), Color — sorted fastest first.
+    Empty DataFrame when no driver has a valid lap.
+    """
     drivers = session.drivers
+    driver_index = get_driver_index(session)
+    driver_styles = resolve_styles(session)
+    laps = corrected_laps(session) if corrected else session.laps
+    if push_only and classify_runs is not None:
+        laps = classify_runs(session, laps, use_telemetry=False)
+    if free_air and detect_traffic is not None:
+        laps = pick_free_air(detect_traffic(session, laps))
     results = []
 
     for drv in drivers:
         try:
-            driver_info = session.get_driver(drv)
-            abb = driver_info['Abbreviation']
+            abb = driver_index[drv]['Abbreviation']
             
             # Get fastest lap
-            lap = session.laps.pick_drivers(drv).pick_fastest()
+            drv_laps = laps.pick_drivers(drv)
+            if 'Programme' in drv_laps.columns:
+                push_laps = pick_programme(drv_laps, 'push')
+                if not push_laps.empty:
+                    drv_laps = push_laps
+            lap = drv_laps.pick_fastest()
             
             if pd.notna(lap['LapTime']):
-                color = get_driver_color(session, abb)
+                color = driver_styles.at[abb, 'Color']
                 results.append({
                     'Driver': abb,
                     'LapTime': lap['LapTime'],
@@ -51,15 +85,19 @@ def plot_lap_gap(session):
             continue
     
     if not results:
-        print("[Error] No valid lap data found.")
-        return
+        return pd.DataFrame(columns=['Driver', 'LapTime', 'Gap', 'Color'])
 
     # Create DataFrame and calculate gap
     df = pd.DataFrame(results)
     df = df.sort_values(by='LapTime').reset_index(drop=True)
     p1_time = df.loc[0, 'LapTime']
     df['Gap'] = (df['LapTime'] - p1_time).dt.total_seconds()
-    
+    return df[['Driver', 'LapTime', 'Gap', 'Color']]
+
+
+def render_lap_gap(session, df: pd.DataFrame, corrected: bool = False,
+                   free_air: bool = False) -> dict:
+    """Horizontal gap-to-leader bars. Returns {suffix: Figure}."""
     fig, ax = plt.subplots(figsize=(12, 8))
     fig.patch.set_facecolor('white')
     ax.set_facecolor('white')
@@ -74,7 +112,8 @@ def plot_lap_gap(session):
     ax.set_xlabel("Gap to Leader (seconds)", color='black', fontsize=11)
 
     session_name = f"{session.event.year} {session.event.EventName} {session.name}"
-    ax.set_title(f"{session_name} - Lap Delta", fontsize=16, fontweight='bold', color='black', pad=20)
+    title_suffix = (" (Track-Evolution Corrected)" if corrected else "") + (" (Free Air)" if free_air else "")
+    ax.set_title(f"{session_name} - Lap Delta{title_suffix}", fontsize=16, fontweight='bold', color='black', pad=20)
 
     # Styling
     ax.grid(axis='x', linestyle='--', alpha=0.3, color='gray')
@@ -98,42 +137,62 @@ def plot_lap_gap(session):
         ax.text(bar.get_width() + 0.02, bar.get_y() + bar.get_height()/2,
                 label, va='center', fontsize=10, color='black', fontweight='bold')
 
-    filename = make_filename(session, suffix='LapDelta')
-    save_figure(fig, filename, facecolor='white', show=False)
+    tag = ('_Corrected' if corrected else '') + ('_FreeAir' if free_air else '')
+    return {f'LapDelta{tag}': fig}
+
+
+def plot_lap_gap(session, corrected: bool = False, push_only: bool = False, free_air: bool = False):
+    """
+    Calculates and plots the gap to the leader for the fastest lap of each driver.
+    Returns the compute_lap_gap table (None if no data).
+    """
+    print(f"\n[1/3] Calculating Whole Grid Lap Delta...")
+
+    df = compute_lap_gap(session, corrected=corrected, push_only=push_only, free_air=free_air)
+    if df.empty:
+        print("[Error] No valid lap data found.")
+        return None
+
+    save_figures(session, render_lap_gap(session, df, corrected=corrected, free_air=free_air),
+                 facecolor='white')
+    return df
 
 # ==========================================
 # 2. Sector Ranking Analysis
 # ==========================================
-def plot_sector_ranking(session):
+def compute_sector_ranking(session) -> pd.DataFrame:
     """
-    Plots the fastest sector times for each driver.
+    Fastest time of each driver in each sector.
+
+    Columns: Sector (1-3), Driver, Time, Color — sorted by sector, then time.
     """
-    print(f"\n[2/3] Calculating Best Sector Times...")
-    
     drivers = session.drivers
-    s1_data, s2_data, s3_data = [], [], []
+    driver_index = get_driver_index(session)
+    driver_styles = resolve_styles(session)
+    rows = []
 
     # Collect sector times
     for drv in drivers:
         try:
-            driver_info = session.get_driver(drv)
-            abb = driver_info['Abbreviation']
-            color = get_driver_color(session, abb)
+            abb = driver_index[drv]['Abbreviation']
+            color = driver_styles.at[abb, 'Color']
             laps = session.laps.pick_drivers(drv)
-            
-            s1 = laps['Sector1Time'].min()
-            s2 = laps['Sector2Time'].min()
-            s3 = laps['Sector3Time'].min()
-            
-            if pd.notna(s1): s1_data.append({'Driver': abb, 'Time': s1, 'Color': color})
-            if pd.notna(s2): s2_data.append({'Driver': abb, 'Time': s2, 'Color': color})
-            if pd.notna(s3): s3_data.append({'Driver': abb, 'Time': s3, 'Color': color})
+
+            for sector in (1, 2, 3):
+                best = laps[f'Sector{sector}Time'].min()
+                if pd.notna(best):
+                    rows.append({'Sector': sector, 'Driver': abb, 'Time': best, 'Color': color})
         except Exception:
             continue
 
-    s1_df = pd.DataFrame(s1_data).sort_values('Time').reset_index(drop=True)
-    s2_df = pd.DataFrame(s2_data).sort_values('Time').reset_index(drop=True)
-    s3_df = pd.DataFrame(s3_data).sort_values('Time').reset_index(drop=True)
+    df = pd.DataFrame(rows, columns=['Sector', 'Driver', 'Time', 'Color'])
+    return df.sort_values(['Sector', 'Time']).reset_index(drop=True)
+
+
+def render_sector_ranking(session, df: pd.DataFrame) -> dict:
+    """Three ranked sector panels. Returns {suffix: Figure}."""
+    s1_df, s2_df, s3_df = (df[df['Sector'] == sector].reset_index(drop=True)
+                           for sector in (1, 2, 3))
 
     # Plot Setup
     fig, axes = plt.subplots(1, 3, figsize=(18, 11))
@@ -188,31 +247,42 @@ def plot_sector_ranking(session):
 
     plt.tight_layout()
     plt.subplots_adjust(top=0.75)
-    
-    filename = make_filename(session, suffix='SectorRanks')
-    save_figure(fig, filename, facecolor='white', show=False)
+    return {'SectorRanks': fig}
+
+
+def plot_sector_ranking(session):
+    """
+    Plots the fastest sector times for each driver.
+    Returns the compute_sector_ranking table.
+    """
+    print(f"\n[2/3] Calculating Best Sector Times...")
+
+    df = compute_sector_ranking(session)
+    save_figures(session, render_sector_ranking(session, df), facecolor='white')
+    return df
 
 # ==========================================
 # 3. Telemetry Metrics (Top Speed & Throttle) - Separate & Zoomed
 # ==========================================
-def plot_telemetry_metrics(session):
+def compute_telemetry_metrics(session) -> pd.DataFrame:
     """
-    [Analysis 3] Top Speed & Full Throttle % (Separated & Zoomed)
+    Top speed and full-throttle share (Throttle > 98 %) on each driver's fastest lap.
+
+    Columns: Driver, TopSpeed (km/h), ThrottlePct (%), Color.
     """
-    print(f"\n[3/3] Calculating Telemetry Metrics (Speed & Throttle)...")
-    
     drivers = session.drivers
+    driver_index = get_driver_index(session)
+    driver_styles = resolve_styles(session)
     results = []
 
     for drv in drivers:
         try:
-            driver_info = session.get_driver(drv)
-            abb = driver_info['Abbreviation']
-            color = get_driver_color(session, abb)
+            abb = driver_index[drv]['Abbreviation']
+            color = driver_styles.at[abb, 'Color']
             
             # Fastest Lap & Telemetry
             lap = session.laps.pick_drivers(drv).pick_fastest()
-            telemetry = lap.get_car_data().add_distance()
+            telemetry = clean_lap_telemetry(lap)
             
             if not telemetry.empty:
                 # 1. Top Speed
@@ -229,16 +299,18 @@ def plot_telemetry_metrics(session):
                     'ThrottlePct': throttle_pct,
                     'Color': color
                 })
+        except TelemetryQualityError as e:
+            print(f"[Warning] Telemetry metrics: {abb} skipped ({e})")
         except Exception:
             continue
-            
-    if not results:
-        print("[Error] No telemetry data found.")
-        return
 
-    # Create DataFrame
-    df = pd.DataFrame(results)
-    
+    return pd.DataFrame(results, columns=['Driver', 'TopSpeed', 'ThrottlePct', 'Color'])
+
+
+def render_telemetry_metrics(session, df: pd.DataFrame) -> dict:
+    """One zoomed bar chart per metric. Returns {suffix: Figure}."""
+    figures = {}
+
     # ---------------------------------------------------------
     # settings for each metric
     # ---------------------------------------------------------
@@ -318,10 +390,26 @@ def plot_telemetry_metrics(session):
                     ha='center', va='bottom',
                     fontsize=13, fontweight='bold', color='black')
 
-        # --- Save ---
         plt.tight_layout()
-        filename = make_filename(session, suffix=config['suffix'])
-        save_figure(fig, filename, facecolor='white', show=False)
+        figures[config['suffix']] = fig
+
+    return figures
+
+
+def plot_telemetry_metrics(session):
+    """
+    [Analysis 3] Top Speed & Full Throttle % (Separated & Zoomed)
+    Returns the compute_telemetry_metrics table (None if no data).
+    """
+    print(f"\n[3/3] Calculating Telemetry Metrics (Speed & Throttle)...")
+
+    df = compute_telemetry_metrics(session)
+    if df.empty:
+        print("[Error] No telemetry data found.")
+        return None
+
+    save_figures(session, render_telemetry_metrics(session, df), facecolor='white')
+    return df
 
 # ==========================================
 # Main Entry Point
@@ -329,8 +417,10 @@ def plot_telemetry_metrics(session):
 def analyze_all_drivers(session):
     """
     Main function called from main.py
-    Executes all analysis plots in sequence.
+    Executes all analysis plots in sequence and returns their tables.
     """
-    plot_lap_gap(session)
-    plot_sector_ranking(session)
-    plot_telemetry_metrics(session)
\ No newline at end of file
+    return {
+        'lap_gap':           plot_lap_gap(session),
+        'sector_ranking':    plot_sector_ranking(session),
+        'telemetry_metrics': plot_telemetry_metrics(session),
+    }
\ No newline at end of file
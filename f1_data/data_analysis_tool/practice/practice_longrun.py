@@ -10,12 +10,12 @@ import os
 # Setup FastF1 plotting
 fastf1.plotting.setup_mpl()
 
-from practice.f1_colors import get_driver_color, get_driver_style
-from practice.save_utils import make_filename, save_figure
+from practice.f1_colors import get_driver_index, resolve_styles, LINESTYLE_CYCLE
+from practice.save_utils import save_figures
 from practice import config
-
-# Linestyle cycle for distinguishing multiple stints of the same driver
-_LINESTYLES = ['-', '--', ':', '-.']
+from practice.track_evolution import corrected_laps
+from practice.run_classifier import classify_runs, pick_programme
+from practice.traffic import compute_track_gaps, detect_traffic, pick_free_air
 
 
 def style_plot(fig, ax):
@@ -33,31 +33,44 @@ def style_plot(fig, ax):
     ax.title.set_color('black')
 
 
-def analyze_long_runs(session):
+def extract_long_run_laps(session, corrected: bool = False,
+                          classified: bool = False, free_air: bool = False) -> pd.DataFrame:
     """
-    [Feature 5] Long Run Analysis
-
-    Changes vs. original:
-    B-1  Session filter strengthened: pick_accurate() + pick_quicklaps(1.05)
-    B-2  Compound extracted via mode() over dropna() — tolerates NaN/dirty data
-    B-3  Dual-threshold outlier removal: 104 % AND median+3 s (AND condition)
-         Constants live in practice/config.py
-    B-4  Driver_Stint granularity: one line per stint, not per driver
-         Legend format: "VER S1 (SOFT)  Mean: 1:32.456"
-         Same-driver stints share colour; linestyle cycles solid/dash/dot/dashdot
+    Cleaned long-run laps, one row per lap (shared by the charts below and
+    by practice_strategy).
+    corrected=True uses track-evolution corrected lap times.
+    classified=True keeps only laps the run classifier labels 'long'
+    (push / cool-down / aero laps inside a stint are dropped up front);
+    the long-run chart opts in, strategy and the season DB keep the plain
+    stint filter.
+    free_air=True drops laps flagged in traffic or in a tow (practice/traffic.py,
+    needs position data).
+
+    Columns: Driver, Team, Stint, StintKey, StintLap, LapTimeSeconds,
+             Compound, Color
+    Empty DataFrame when no stint survives the filters.
     """
-    print(f"\n[Long Run Analysis] Extracting and cleaning race pace data...")
-
     # B-1: strengthen session filter
-    laps = session.laps.pick_accurate().pick_quicklaps(threshold=1.05)
+    laps = corrected_laps(session) if corrected else session.laps
+    if classified:
+        laps = classify_runs(session, laps, use_telemetry=False)
+    laps = laps.pick_accurate().pick_quicklaps(threshold=1.05)
+    if classified:
+        laps = pick_programme(laps, 'long')
+    if free_air:
+        # Gaps over every car on track: the car ahead is often on a push or out lap
+        gaps = compute_track_gaps(session, session.laps)
+        laps = pick_free_air(detect_traffic(session, laps, gaps=gaps))
 
     drivers = session.drivers
+    driver_index = get_driver_index(session)
+    driver_styles = resolve_styles(session)
     long_run_data = []
 
     for drv in drivers:
         try:
-            driver_info = session.get_driver(drv)
-            abb = driver_info['Abbreviation']
+            abb = driver_index.abbreviation(drv)
+            team = driver_index.team(drv)
 
             drv_laps = laps.pick_drivers(drv)
             if drv_laps.empty:
@@ -87,7 +100,7 @@ def analyze_long_runs(session):
                 if len(clean_stint) < config.LONG_RUN_MIN_STINT_LAPS:
                     continue
 
-                color      = get_driver_color(session, abb)
+                color      = driver_styles.at[abb, 'Color']
                 clean_stint = clean_stint.reset_index(drop=True)
 
                 # B-4: StintKey for per-stint separation
@@ -96,6 +109,7 @@ def analyze_long_runs(session):
                 for idx, lap in clean_stint.iterrows():
                     long_run_data.append({
                         'Driver':         abb,
+                        'Team':           team,
                         'Stint':          int(stint),
                         'StintKey':       stint_key,
                         'StintLap':       idx + 1,
@@ -106,17 +120,19 @@ def analyze_long_runs(session):
         except Exception:
             continue
 
-    if not long_run_data:
-        print("[Error] No valid long run data found.")
-        return
+    return pd.DataFrame(long_run_data)
+
 
-    df = pd.DataFrame(long_run_data)
+def render_long_runs(session, df: pd.DataFrame, corrected: bool = False,
+                     free_air: bool = False) -> dict:
+    """Pace-trend and consistency charts of extract_long_run_laps. Returns {suffix: Figure}."""
+    df = df.copy()
 
     # B-4: Build per-StintKey lookup dicts
     unique_stintkeys     = df['StintKey'].unique()
     stintkey_color       = {sk: df[df['StintKey'] == sk]['Color'].iloc[0]    for sk in unique_stintkeys}
     stintkey_stint_num   = {sk: df[df['StintKey'] == sk]['Stint'].iloc[0]    for sk in unique_stintkeys}
-    stintkey_ls          = {sk: _LINESTYLES[(stintkey_stint_num[sk] - 1) % len(_LINESTYLES)]
+    stintkey_ls          = {sk: LINESTYLE_CYCLE[(stintkey_stint_num[sk] - 1) % len(LINESTYLE_CYCLE)]
                                for sk in unique_stintkeys}
     stintkey_compound    = {sk: df[df['StintKey'] == sk]['Compound'].iloc[0] for sk in unique_stintkeys}
 
@@ -156,13 +172,13 @@ def analyze_long_runs(session):
                labelcolor='black', fontsize=10)
 
     ax1.set_title(
-        f"{session.event.year} {session.event.EventName} — Long Run Pace Trend",
+        f"{session.event.year} {session.event.EventName} — Long Run Pace Trend"
+        + (" (Track-Evolution Corrected)" if corrected else "")
+        + (" (Free Air)" if free_air else ""),
         fontsize=16, fontweight='bold', pad=15)
     ax1.set_ylabel("Lap Time (s)", fontsize=12)
     ax1.set_xlabel("Laps into Stint", fontsize=12)
 
-    filename1 = make_filename(session, suffix='Longrun_Trend')
-    save_figure(fig1, filename1, facecolor='white', show=False)
 
     # =====================================================================
     # GRAPH 2: Pace Consistency (Box Plot) — per StintKey              [B-4]
@@ -207,7 +223,40 @@ def analyze_long_runs(session):
     ax2.set_ylabel("Lap Time (s)", fontsize=12)
     ax2.set_xlabel("Stint (Compound) (Laps)", fontsize=12)
 
-    filename2 = make_filename(session, suffix='Longrun_Consistency')
-    save_figure(fig2, filename2, facecolor='white', show=False)
+    tag = ('_Corrected' if corrected else '') + ('_FreeAir' if free_air else '')
+    return {f'Longrun_Trend{tag}': fig1, f'Longrun_Consistency{tag}': fig2}
+
+
+def analyze_long_runs(session, corrected: bool = False, free_air: bool = False,
+                      classified: bool = True):
+    """
+    [Feature 5] Long Run Analysis
+
+    Changes vs. original:
+    B-1  Session filter strengthened: pick_accurate() + pick_quicklaps(1.05)
+    B-2  Compound extracted via mode() over dropna() — tolerates NaN/dirty data
+    B-3  Dual-threshold outlier removal: 104 % AND median+3 s (AND condition)
+         Constants live in practice/config.py
+    B-4  Driver_Stint granularity: one line per stint, not per driver
+         Legend format: "VER S1 (SOFT)  Mean: 1:32.456"
+         Same-driver stints share colour (teammates get distinct shades);
+         linestyle cycles solid/dash/dot/dashdot
+    corrected=True: lap times normalized for track evolution / weather
+    free_air=True: laps in traffic or in a tow are left out (needs position data)
+    classified=True: only laps the run classifier labels 'long' (no push /
+    cool-down laps of the same tyre stint)
+    Returns the extract_long_run_laps table (None if no data).
+    """
+    print(f"\n[Long Run Analysis] Extracting and cleaning race pace data...")
+
+    df = extract_long_run_laps(session, corrected=corrected, classified=classified,
+                               free_air=free_air)
+
+    if df.empty:
+        print("[Error] No valid long run data found.")
+        return None
 
+    save_figures(session, render_long_runs(session, df, corrected=corrected, free_air=free_air),
+                 facecolor='white')
     print("[System] Long run analysis complete.")
+    return df
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+practice_race.py
+Race / Sprint analysis: gap to leader, intervals, positions and pit stops.
+
+Everything is derived from one drivers × laps matrix of cumulative race time,
+built with a single pivot + cumsum over session.laps:
+
+    time[d, n]      race time of driver d at the end of lap n (s)
+    gap             time - column minimum (leader at that lap)
+    position        rank within each lap column
+    interval        difference to the next smaller value in the column
+
+Pit stops, pit windows per stop number and undercut attempts are read off the
+same matrix, so a 20 × 70 race is computed in milliseconds.
+"""
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice.f1_colors import DEFAULT_COLOR, resolve_styles
+from practice.save_utils import save_figures
+from practice import config
+
+
+# =========================================================
+# 1. Race-Time Matrix
+# =========================================================
+
+def _lap_durations(laps: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drivers × laps matrix of lap durations (s).
+    Missing LapTime (lap 1, red flags, timing gaps) falls back to
+    Time - LapStartTime, then to the difference of consecutive lap end times.
+    """
+    time_end = laps.pivot_table(index='Driver', columns='LapNumber',
+                                values='Time', aggfunc='first')
+    time_end = time_end.apply(lambda c: pd.to_timedelta(c).dt.total_seconds())
+
+    duration = laps['LapTime'].dt.total_seconds()
+    duration = duration.fillna((laps['Time'] - laps['LapStartTime']).dt.total_seconds())
+    durations = (laps.assign(Duration=duration)
+                     .pivot_table(index='Driver', columns='LapNumber',
+                                  values='Duration', aggfunc='first')
+                     .reindex(columns=time_end.columns))
+    return durations.fillna(time_end.diff(axis=1))
+
+
+def _column_ranks(values: np.ndarray) -> tuple:
+    """(order, position, interval) of every lap column; NaN rows rank last."""
+    order = np.argsort(np.where(np.isnan(values), np.inf, values), axis=0)
+    ranked = np.take_along_axis(values, order, axis=0)
+
+    position = np.empty_like(values)
+    np.put_along_axis(position, order,
+                      np.broadcast_to(np.arange(1, len(values) + 1)[:, None], values.shape).astype(float),
+                      axis=0)
+    position[np.isnan(values)] = np.nan
+
+    interval = np.empty_like(values)
+    np.put_along_axis(interval, order, np.vstack([np.zeros((1, values.shape[1])),
+                                                  np.diff(ranked, axis=0)]), axis=0)
+    interval[np.isnan(values)] = np.nan
+    return order, position, interval
+
+
+def compute_race_matrix(session) -> pd.DataFrame:
+    """
+    Cumulative race time of every driver at the end of every lap.
+
+    Long frame: Driver, LapNumber, RaceTime (s), Gap (s, to the leader of
+    that lap), Interval (s, to the car directly ahead), Position.
+    Rows only for laps a driver completed; empty DataFrame without laps.
+    """
+    columns = ['Driver', 'LapNumber', 'RaceTime', 'Gap', 'Interval', 'Position']
+    laps = session.laps
+    if laps.empty:
+        return pd.DataFrame(columns=columns)
+
+    durations = _lap_durations(laps)
+    race_time = durations.cumsum(axis=1, skipna=False).to_numpy()
+    _, position, interval = _column_ranks(race_time)
+    gap = race_time - np.nanmin(np.where(np.isnan(race_time), np.inf, race_time), axis=0)
+
+    drivers = durations.index.to_numpy()
+    lap_numbers = durations.columns.to_numpy()
+    valid = ~np.isnan(race_time)
+    rows, cols = np.nonzero(valid)
+    df = pd.DataFrame({
+        'Driver':    drivers[rows],
+        'LapNumber': lap_numbers[cols].astype(int),
+        'RaceTime':  race_time[valid],
+        'Gap':       gap[valid],
+        'Interval':  interval[valid],
+        'Position':  position[valid].astype(int),
+    })
+    return df[columns]
+
+
+# =========================================================
+# 2. Pit Stops, Windows and Undercuts
+# =========================================================
+
+def compute_pit_stops(session, matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per stop (in-laps, not counting the driver's final lap).
+    Columns: Driver, Stop, Lap, Compound (fitted), PositionBefore, PositionAfter
+    """
+    columns = ['Driver', 'Stop', 'Lap', 'Compound', 'PositionBefore', 'PositionAfter']
+    if matrix.empty:
+        return pd.DataFrame(columns=columns)
+    laps = session.laps.sort_values(['Driver', 'LapNumber'])
+    last_lap = laps.groupby('Driver')['LapNumber'].transform('max')
+    next_compound = laps.groupby('Driver')['Compound'].shift(-1)
+
+    in_laps = laps['PitInTime'].notna() & (laps['LapNumber'] < last_lap)
+    stops = pd.DataFrame({
+        'Driver':   laps.loc[in_laps, 'Driver'],
+        'Lap':      laps.loc[in_laps, 'LapNumber'].astype(int),
+        'Compound': next_compound[in_laps].fillna('?'),
+    })
+    if stops.empty:
+        return pd.DataFrame(columns=columns)
+    stops['Stop'] = stops.groupby('Driver').cumcount() + 1
+
+    position = matrix.set_index(['Driver', 'LapNumber'])['Position']
+    before = pd.MultiIndex.from_arrays([stops['Driver'], stops['Lap'] - 1])
+    after = pd.MultiIndex.from_arrays([stops['Driver'], stops['Lap'] + 1])
+    stops['PositionBefore'] = position.reindex(before).to_numpy()
+    stops['PositionAfter'] = position.reindex(after).to_numpy()
+    return stops[columns].reset_index(drop=True)
+
+
+def compute_pit_windows(stops: pd.DataFrame,
+                        quantiles=None) -> pd.DataFrame:
+    """Columns: Stop, Count, FirstLap, MedianLap, LastLap (quantile window)."""
+    quantiles = config.RACE_PIT_WINDOW_QUANTILES if quantiles is None else quantiles
+    if stops.empty:
+        return pd.DataFrame(columns=['Stop', 'Count', 'FirstLap', 'MedianLap', 'LastLap'])
+    lo, hi = quantiles
+    g = stops.groupby('Stop')['Lap']
+    return pd.DataFrame({
+        'Count':     g.size(),
+        'FirstLap':  g.quantile(lo),
+        'MedianLap': g.median(),
+        'LastLap':   g.quantile(hi),
+    }).reset_index()
+
+
+def compute_undercuts(matrix: pd.DataFrame, stops: pd.DataFrame,
+                      window: int | None = None) -> pd.DataFrame:
+    """
+    Stops made while the car directly ahead stayed out, with that car pitting
+    within `window` laps. Gap = attacker race time - rival race time.
+
+    Columns: Driver, Rival, Lap, RivalLap, GapBefore (lap before the first
+    stop), GapAfter (lap after the second stop), Gain (s), Success (passed)
+    """
+    window = config.RACE_UNDERCUT_WINDOW if window is None else window
+    columns = ['Driver', 'Rival', 'Lap', 'RivalLap', 'GapBefore', 'GapAfter', 'Gain', 'Success']
+    if stops.empty:
+        return pd.DataFrame(columns=columns)
+
+    race_time = matrix.set_index(['Driver', 'LapNumber'])['RaceTime']
+    ahead = (matrix.assign(Position=matrix['Position'] + 1)
+                   .set_index(['LapNumber', 'Position'])['Driver'])
+
+    # Rival = car one position ahead on the lap before the stop
+    attempts = stops[['Driver', 'Lap']].copy()
+    key = pd.MultiIndex.from_arrays([stops['Lap'] - 1, stops['PositionBefore']])
+    attempts['Rival'] = ahead.reindex(key).to_numpy()
+    attempts = attempts.dropna(subset=['Rival'])
+
+    # Rival's first stop after the attacker's stop
+    pairs = attempts.merge(stops[['Driver', 'Lap']].rename(columns={'Driver': 'Rival', 'Lap': 'RivalLap'}),
+                           on='Rival')
+    pairs = pairs[(pairs['RivalLap'] > pairs['Lap']) & (pairs['RivalLap'] <= pairs['Lap'] + window)]
+    pairs = pairs.sort_values('RivalLap').drop_duplicates(['Driver', 'Lap'])
+    if pairs.empty:
+        return pd.DataFrame(columns=columns)
+
+    def _gap(lap):
+        own = race_time.reindex(pd.MultiIndex.from_arrays([pairs['Driver'], lap])).to_numpy()
+        rival = race_time.reindex(pd.MultiIndex.from_arrays([pairs['Rival'], lap])).to_numpy()
+        return own - rival
+
+    pairs['GapBefore'] = _gap(pairs['Lap'] - 1)
+    pairs['GapAfter'] = _gap(pairs['RivalLap'] + 1)
+    pairs['Gain'] = pairs['GapBefore'] - pairs['GapAfter']
+    pairs['Success'] = pairs['GapAfter'] < 0
+    return pairs.dropna(subset=['GapBefore', 'GapAfter'])[columns].reset_index(drop=True)
+
+
+def compute_race(session) -> dict:
+    """
+    All race tables (empty frames without laps):
+        laps       compute_race_matrix
+        stops      compute_pit_stops
+        windows    compute_pit_windows
+        undercuts  compute_undercuts
+    """
+    matrix = compute_race_matrix(session)
+    stops = compute_pit_stops(session, matrix)
+    return {
+        'laps':      matrix,
+        'stops':     stops,
+        'windows':   compute_pit_windows(stops),
+        'undercuts': compute_undercuts(matrix, stops),
+    }
+
+
+# =========================================================
+# 3. Charts
+# =========================================================
+
+def _compound_color(compound: str, session) -> str:
+    try:
+        return fastf1.plotting.get_compound_color(compound, session=session)
+    except Exception:
+        return DEFAULT_COLOR
+
+
+def _finishing_order(matrix: pd.DataFrame) -> list:
+    """Drivers by laps completed (desc), then race time (asc)."""
+    last = matrix.sort_values('LapNumber').groupby('Driver').tail(1)
+    return last.sort_values(['LapNumber', 'RaceTime'], ascending=[False, True])['Driver'].tolist()
+
+
+def render_race(session, result: dict) -> dict:
+    """
+    Gap-to-leader, interval heatmap, position traces and pit-stop charts
+    of compute_race. Returns {suffix: Figure}.
+    """
+    matrix = result['laps']
+    stops = result['stops']
+    order = _finishing_order(matrix)
+    styles = resolve_styles(session, order)
+    title = f"{session.event.year} {session.event.EventName} {session.name}"
+    pit_laps = stops.set_index(['Driver', 'Lap']).index
+
+    def pivot(column):
+        return matrix.pivot(index='Driver', columns='LapNumber', values=column).reindex(order)
+
+    gap, position = pivot('Gap'), pivot('Position')
+    figures = {}
+
+    # --- Gap to leader ---
+    fig, ax = plt.subplots(figsize=(15, 8), facecolor='white')
+    for drv in order:
+        g = gap.loc[drv].dropna()
+        ax.plot(g.index, g.values, color=styles.at[drv, 'Color'],
+                linestyle=styles.at[drv, 'LineStyle'], linewidth=1.4, label=drv)
+        pitted = [lap for lap in g.index if (drv, lap) in pit_laps]
+        ax.scatter(pitted, g.loc[pitted], color=styles.at[drv, 'Color'], marker='v', s=30, zorder=3)
+    ax.invert_yaxis()
+    ax.set_xlabel("Lap")
+    ax.set_ylabel("Gap to Leader (s)")
+    ax.set_title(f"{title} - Gap to Leader (▼ = pit stop)", fontsize=15, fontweight='bold')
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend(ncol=1, fontsize=8, bbox_to_anchor=(1.01, 1), loc='upper left')
+    figures['RaceGap'] = fig
+
+    # --- Interval heatmap ---
+    interval = pivot('Interval')
+    fig, ax = plt.subplots(figsize=(15, 0.4 * len(order) + 2), facecolor='white')
+    im = ax.imshow(interval.to_numpy(dtype=float), aspect='auto', cmap='RdYlGn',
+                   vmin=0, vmax=config.RACE_INTERVAL_CLIP_S, interpolation='nearest',
+                   extent=[interval.columns.min() - 0.5, interval.columns.max() + 0.5,
+                           len(order) - 0.5, -0.5])
+    ax.set_yticks(range(len(order)))
+    ax.set_yticklabels(order)
+    ax.set_xlabel("Lap")
+    ax.set_title(f"{title} - Interval to Car Ahead", fontsize=15, fontweight='bold')
+    fig.colorbar(im, ax=ax, label=f"Interval (s, clipped at {config.RACE_INTERVAL_CLIP_S:g})")
+    figures['RaceInterval'] = fig
+
+    # --- Position traces ---
+    fig, ax = plt.subplots(figsize=(15, 9), facecolor='white')
+    for drv in order:
+        p = position.loc[drv].dropna()
+        color = styles.at[drv, 'Color']
+        ax.plot(p.index, p.values, color=color, linestyle=styles.at[drv, 'LineStyle'], linewidth=1.8)
+        ax.text(p.index[-1] + 0.6, p.values[-1], drv, color=color, va='center',
+                fontsize=9, fontweight='bold')
+        pitted = [lap for lap in p.index if (drv, lap) in pit_laps]
+        ax.scatter(pitted, p.loc[pitted], color=color, marker='o', s=25,
+                   edgecolors='black', linewidths=0.5, zorder=3)
+    ax.set_ylim(len(order) + 0.5, 0.5)
+    ax.set_yticks(range(1, len(order) + 1))
+    ax.set_xlabel("Lap")
+    ax.set_ylabel("Position")
+    ax.set_title(f"{title} - Position Changes (● = pit stop)", fontsize=15, fontweight='bold')
+    ax.grid(True, axis='y', linestyle='--', alpha=0.3)
+    figures['RacePositions'] = fig
+
+    # --- Pit stops and windows ---
+    if not stops.empty:
+        fig, ax = plt.subplots(figsize=(15, 0.4 * len(order) + 2), facecolor='white')
+        for w in result['windows'].itertuples():
+            ax.axvspan(w.FirstLap - 0.5, w.LastLap + 0.5, color='grey', alpha=0.08 + 0.06 * (w.Stop % 2))
+            ax.text((w.FirstLap + w.LastLap) / 2, -0.9, f"Stop {w.Stop} window",
+                    ha='center', fontsize=9, color='dimgray')
+        row = {drv: i for i, drv in enumerate(order)}
+        for s in stops.itertuples():
+            if s.Driver not in row:
+                continue
+            ax.scatter(s.Lap, row[s.Driver], s=90, color=_compound_color(s.Compound, session),
+                       edgecolors='black', linewidths=0.6, zorder=3)
+        ax.set_yticks(range(len(order)))
+        ax.set_yticklabels(order)
+        ax.set_ylim(len(order) - 0.5, -1.5)
+        ax.set_xlim(0.5, matrix['LapNumber'].max() + 0.5)
+        ax.set_xlabel("Lap (marker = compound fitted)")
+        ax.set_title(f"{title} - Pit Stops", fontsize=15, fontweight='bold')
+        ax.grid(True, axis='x', linestyle='--', alpha=0.3)
+        figures['PitStops'] = fig
+
+    return figures
+
+
+def analyze_race(session):
+    """
+    [Feature] Race / Sprint Analysis
+    - Gap to leader, intervals and positions from one cumsum over session.laps
+    - Pit stops with compound fitted, pit windows per stop number
+    - Undercut attempts (rival ahead pitting within RACE_UNDERCUT_WINDOW laps)
+    Returns the compute_race tables (None if the session has no laps).
+    """
+    print(f"\n[Race Analysis] Building race-time matrix...")
+
+    result = compute_race(session)
+    if result['laps'].empty:
+        print("[Error] No lap data found.")
+        return None
+
+    matrix = result['laps']
+    print(f"[System] {matrix['Driver'].nunique()} drivers × {matrix['LapNumber'].max()} laps, "
+          f"{len(result['stops'])} pit stops")
+    if not result['windows'].empty:
+        print(result['windows'].to_string(index=False))
+    if not result['undercuts'].empty:
+        print("\n[Undercuts]")
+        print(result['undercuts'].round(3).to_string(index=False))
+
+    save_figures(session, render_race(session, result), facecolor='white')
+    return result
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice.f1_colors import get_team_color
+from practice.save_utils import save_figures
+
+# Trap name → laps column (km/h). I1/I2: intermediate points, FL: finish line,
+# ST: speed trap on the longest straight.
+SPEED_TRAPS = {
+    'I1': 'SpeedI1',
+    'I2': 'SpeedI2',
+    'FL': 'SpeedFL',
+    'ST': 'SpeedST',
+}
+
+
+def compute_speed_traps(session, laps=None, telemetry_fallback: bool = True) -> pd.DataFrame:
+    """
+    Speed-trap values for every lap, long format.
+
+    - Source 'laps': SpeedI1/I2/FL/ST columns of the laps table (no telemetry)
+    - Source 'telemetry': drivers without any SpeedST value fall back to the
+      max car-data speed of their fastest lap (only if car data is loaded)
+
+    Columns: Driver, Team, LapNumber, Trap, Speed, Source
+    """
+    laps = (session.laps if laps is None else laps).pick_wo_box()
+
+    cols = ['Driver', 'Team', 'LapNumber'] + list(SPEED_TRAPS.values())
+    long = laps[cols].melt(id_vars=['Driver', 'Team', 'LapNumber'],
+                           var_name='Trap', value_name='Speed')
+    long['Trap'] = long['Trap'].map({v: k for k, v in SPEED_TRAPS.items()})
+    long = long.dropna(subset=['Speed'])
+    long['Source'] = 'laps'
+
+    if telemetry_fallback:
+        have_st = set(long.loc[long['Trap'] == 'ST', 'Driver'])
+        fallback = []
+        for drv in sorted(set(laps['Driver'].dropna()) - have_st):
+            try:
+                lap = laps.pick_drivers(drv).pick_fastest()
+                top = lap.get_car_data()['Speed'].max()
+                if pd.notna(top):
+                    fallback.append({'Driver': drv, 'Team': lap['Team'],
+                                     'LapNumber': lap['LapNumber'], 'Trap': 'ST',
+                                     'Speed': top, 'Source': 'telemetry'})
+            except Exception:
+                continue
+        if fallback:
+            print(f"[System] Speed trap: telemetry fallback for "
+                  f"{', '.join(f['Driver'] for f in fallback)}")
+            long = pd.concat([long, pd.DataFrame(fallback)], ignore_index=True)
+
+    long['Speed'] = long['Speed'].astype(float)
+    return long.reset_index(drop=True)
+
+
+def speed_trap_percentiles(traps: pd.DataFrame, trap: str = 'ST',
+                           by: str = 'Team') -> pd.DataFrame:
+    """
+    Per-team (or per-driver, by='Driver') distribution of one trap.
+    Columns: Count, Mean, P50, P90, P95, Max — sorted by P95 descending.
+    Empty DataFrame when the trap has no values.
+    """
+    sub = traps[traps['Trap'] == trap]
+    if sub.empty:
+        return pd.DataFrame(columns=['Count', 'Mean', 'P50', 'P90', 'P95', 'Max'])
+    g = sub.groupby(by)['Speed']
+    q = g.quantile([0.5, 0.9, 0.95]).unstack()
+    q.columns = ['P50', 'P90', 'P95']
+    stats = pd.concat([g.count().rename('Count'), g.mean().rename('Mean'), q,
+                       g.max().rename('Max')], axis=1)
+    return stats.sort_values('P95', ascending=False)
+
+
+def render_speed_traps(session, traps: pd.DataFrame) -> dict:
+    """Per-team distributions of every trap (box = IQR, whisker 5–95 %). Returns {suffix: Figure}."""
+    # Teams by ST top speed; by mean speed of all traps without ST values
+    order = (list(speed_trap_percentiles(traps, trap='ST').index)
+             or list(traps.groupby('Team')['Speed'].mean().sort_values(ascending=False).index))
+    palette = {team: get_team_color(team) for team in traps['Team'].dropna().unique()}
+
+    fig, axes = plt.subplots(2, 2, figsize=(18, 12), facecolor='white')
+    fig.set_layout_engine('tight', rect=[0, 0, 1, 0.96])
+    for ax, trap in zip(axes.flat, SPEED_TRAPS):
+        sub = traps[traps['Trap'] == trap]
+        ax.set_facecolor('white')
+        if sub.empty:
+            ax.set_title(f"{trap} — no data", fontsize=14, color='black')
+            ax.axis('off')
+            continue
+        sns.boxplot(data=sub, x='Team', y='Speed', hue='Team', order=order,
+                    palette=palette, whis=(5, 95), showfliers=False,
+                    dodge=False, ax=ax, boxprops=dict(alpha=0.8))
+        if ax.get_legend():
+            ax.get_legend().remove()
+        ax.set_title(f"Speed {trap} ({SPEED_TRAPS[trap]})", fontsize=14,
+                     fontweight='bold', color='black')
+        ax.set_xlabel('')
+        ax.set_ylabel('Speed (km/h)', color='black')
+        ax.tick_params(axis='x', labelrotation=45, colors='black', labelsize=9)
+        ax.grid(axis='y', linestyle='--', alpha=0.3, color='gray')
+
+    fig.suptitle(f"{session.event.year} {session.event.EventName} {session.name} — "
+                 f"Speed Trap Distributions (All Laps)",
+                 fontsize=18, fontweight='bold', color='black')
+    return {'SpeedTraps': fig}
+
+
+def analyze_speed_traps(session):
+    """
+    [Feature 8] Straight-Line Efficiency — speed traps over all laps
+
+    - Distributions of I1 / I2 / FL / ST per team (box = IQR, whisker 5–95 %)
+    - Teams ordered by ST P95 (robust top speed, single tows don't dominate)
+    - Prints the per-team percentile table for the main speed trap
+    Returns the compute_speed_traps table (None if no data).
+    """
+    print(f"\n[Speed Trap] Collecting speed-trap values over all laps...")
+
+    traps = compute_speed_traps(session)
+    if traps.empty:
+        print("[Error] No speed-trap data found.")
+        return None
+
+    print(speed_trap_percentiles(traps, trap='ST').round(1).to_string())
+
+    save_figures(session, render_speed_traps(session, traps), facecolor='white')
+    print("[System] Speed trap analysis complete.")
+    return traps
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice.f1_colors import get_team_color
+from practice.practice_longrun import extract_long_run_laps
+from practice.save_utils import save_figures
+from practice import config
+
+# Slick compounds considered for race strategies (wet running is not simulated)
+DRY_COMPOUNDS = ('SOFT', 'MEDIUM', 'HARD')
+
+
+# =========================================================
+# 1. Pace Model — per (Team, Compound) linear fit
+# =========================================================
+
+def _grouped_linear_fit(df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """
+    Least-squares fit LapTime = Base + Slope * StintLap for every group in
+    one vectorized pass (closed-form sums per group, no per-group polyfit).
+
+    Returns columns: *keys, Laps, Base, Slope, Sigma, BaseStd, SlopeStd
+    """
+    work = df[keys].copy()
+    x = df['StintLap'].astype(float)
+    y = df['LapTimeSeconds'].astype(float)
+    work['x'], work['y'] = x, y
+    work['xx'], work['xy'] = x * x, x * y
+
+    g = work.groupby(keys)
+    sums = g[['x', 'y', 'xx', 'xy']].sum()
+    n = g.size().rename('Laps')
+    sums = sums.join(n)
+
+    sxx = sums['xx'] - sums['x'] ** 2 / sums['Laps']
+    sxy = sums['xy'] - sums['x'] * sums['y'] / sums['Laps']
+    valid = (sums['Laps'] >= 3) & (sxx > 0)
+
+    slope = (sxy / sxx).where(valid)
+    base = (sums['y'] - slope * sums['x']) / sums['Laps']
+
+    # Residual spread → lap-to-lap noise and parameter standard errors
+    fit = work.join(pd.DataFrame({'Base': base, 'Slope': slope}), on=keys)
+    fit['r2'] = (fit['y'] - fit['Base'] - fit['Slope'] * fit['x']) ** 2
+    sse = fit.groupby(keys)['r2'].sum()
+    sigma = np.sqrt(sse / (sums['Laps'] - 2).clip(lower=1))
+    x_mean = sums['x'] / sums['Laps']
+
+    out = pd.DataFrame({
+        'Laps':     sums['Laps'],
+        'Base':     base,
+        'Slope':    slope,
+        'Sigma':    sigma,
+        'SlopeStd': sigma / np.sqrt(sxx),
+        'BaseStd':  sigma * np.sqrt(1.0 / sums['Laps'] + x_mean ** 2 / sxx),
+    })
+    return out[valid].reset_index()
+
+
+def fit_compound_models(long_runs: pd.DataFrame,
+                        fuel_effect: float | None = None) -> pd.DataFrame:
+    """
+    Per-team, per-compound pace model from cleaned long-run laps
+    (output of practice_longrun.extract_long_run_laps).
+
+    - Deg = fitted slope + fuel effect (fuel burn hides degradation in practice),
+      clipped at 0.
+    - Compounds a team did not run are filled from the grid-wide model plus the
+      team's median pace offset on the compounds it did run (Source='grid').
+
+    Returns columns: Team, Compound, Base, Deg, Sigma, BaseStd, DegStd, Laps, Source
+    """
+    fuel_effect = config.STRATEGY_FUEL_EFFECT if fuel_effect is None else fuel_effect
+    dry = long_runs[long_runs['Compound'].isin(DRY_COMPOUNDS)]
+    if dry.empty:
+        return pd.DataFrame(columns=['Team', 'Compound', 'Base', 'Deg', 'Sigma',
+                                     'BaseStd', 'DegStd', 'Laps', 'Source'])
+
+    team_fit = _grouped_linear_fit(dry, ['Team', 'Compound'])
+    grid_fit = _grouped_linear_fit(dry, ['Compound']).set_index('Compound')
+
+    team_fit['Source'] = 'team'
+    team_fit['GridBase'] = team_fit['Compound'].map(grid_fit['Base'])
+    team_offset = (team_fit['Base'] - team_fit['GridBase']).groupby(team_fit['Team']).median()
+
+    # Fill missing (Team, Compound) pairs from the grid model
+    teams = dry['Team'].unique()
+    full = pd.MultiIndex.from_product([teams, grid_fit.index], names=['Team', 'Compound'])
+    missing = full.difference(team_fit.set_index(['Team', 'Compound']).index)
+    filled = pd.DataFrame(index=missing).reset_index()
+    if not filled.empty:
+        g = grid_fit.loc[filled['Compound']].reset_index(drop=True)
+        filled['Base'] = g['Base'] + filled['Team'].map(team_offset).fillna(0.0).values
+        for col in ('Slope', 'Sigma', 'SlopeStd', 'Laps'):
+            filled[col] = g[col].values
+        # Unobserved compound → widen pace uncertainty
+        filled['BaseStd'] = np.hypot(g['BaseStd'].values, g['Sigma'].values)
+        filled['Source'] = 'grid'
+
+    models = pd.concat([team_fit.drop(columns='GridBase'), filled], ignore_index=True)
+    models['Deg'] = (models['Slope'] + fuel_effect).clip(lower=0.0)
+    models = models.rename(columns={'SlopeStd': 'DegStd'})
+    return models[['Team', 'Compound', 'Base', 'Deg', 'Sigma', 'BaseStd',
+                   'DegStd', 'Laps', 'Source']].sort_values(['Team', 'Compound'],
+                                                           ignore_index=True)
+
+
+# =========================================================
+# 2. Strategy Enumeration & Monte Carlo
+# =========================================================
+
+def _stint_splits(race_laps: int, n_stints: int, min_stint: int) -> np.ndarray:
+    """All stint-length combinations (rows) summing to race_laps."""
+    if n_stints == 2:
+        a = np.arange(min_stint, race_laps - min_stint + 1)
+        return np.column_stack([a, race_laps - a])
+    a, b = np.meshgrid(np.arange(min_stint, race_laps + 1),
+                       np.arange(min_stint, race_laps + 1), indexing='ij')
+    a, b = a.ravel(), b.ravel()
+    c = race_laps - a - b
+    keep = c >= min_stint
+    return np.column_stack([a[keep], b[keep], c[keep]])
+
+
+def _stint_time(lengths, base, deg):
+    """Sum over tyre ages 1..n of (base + deg * age)."""
+    return lengths * base + deg * lengths * (lengths + 1) / 2.0
+
+
+def simulate_team_strategies(models: pd.DataFrame, race_laps: int,
+                             pit_loss: float | None = None,
+                             n_sims: int | None = None,
+                             min_stint: int | None = None,
+                             fuel_effect: float | None = None,
+                             rng=None) -> pd.DataFrame:
+    """
+    Rank every one- and two-stop strategy for ONE team.
+
+    models: rows of fit_compound_models() for a single team.
+
+    1. Deterministic pass: for each compound set (at least two different
+       compounds, per the dry-tyre rule) evaluate every pit-lap split and keep
+       the fastest. Race time is linear in the pace parameters, so the best
+       split under mean pace is also the best split in expectation.
+       Stint order does not change the modelled time (fuel burn is the same
+       for every strategy), so each set is evaluated once, softest first.
+    2. Monte Carlo pass: n_sims draws of per-compound base/deg error plus lap
+       noise, shared by all strategies (common random numbers), evaluated as one
+       (n_sims × strategies) array.
+    """
+    pit_loss = config.STRATEGY_PIT_LOSS if pit_loss is None else pit_loss
+    n_sims = config.STRATEGY_N_SIMS if n_sims is None else n_sims
+    min_stint = config.STRATEGY_MIN_STINT_LAPS if min_stint is None else min_stint
+    fuel_effect = config.STRATEGY_FUEL_EFFECT if fuel_effect is None else fuel_effect
+    rng = rng if rng is not None else np.random.default_rng(config.STRATEGY_RANDOM_SEED)
+    m = models.set_index('Compound')
+    m = m.loc[[c for c in DRY_COMPOUNDS if c in m.index]]
+    compounds = list(m.index)
+    base, deg = m['Base'].to_numpy(), m['Deg'].to_numpy()
+
+    seqs, splits = [], []
+    for n_stints in (2, 3):
+        lengths = _stint_splits(race_laps, n_stints, min_stint)
+        if len(lengths) == 0:
+            continue
+        for seq in itertools.combinations_with_replacement(range(len(compounds)), n_stints):
+            if len(set(seq)) < 2:
+                continue
+            idx = np.array(seq)
+            total = _stint_time(lengths, base[idx], deg[idx]).sum(axis=1)
+            best = lengths[np.argmin(total)]
+            seqs.append(np.pad(idx, (0, 3 - n_stints), constant_values=-1))
+            splits.append(np.pad(best, (0, 3 - n_stints)))
+
+    if not seqs:
+        return pd.DataFrame()
+
+    K = np.array(seqs)            # (S, 3) compound index, -1 = no stint
+    L = np.array(splits, float)   # (S, 3) stint lengths, 0 = no stint
+    stops = (L > 0).sum(axis=1) - 1
+    Kc = np.where(K >= 0, K, 0)
+
+    # --- Monte Carlo draws: (n_sims, n_compounds) ---
+    d_base = rng.standard_normal((n_sims, len(compounds))) * m['BaseStd'].fillna(0).to_numpy()
+    d_deg = rng.standard_normal((n_sims, len(compounds))) * m['DegStd'].fillna(0).to_numpy()
+    sim_base = base + d_base
+    sim_deg = np.clip(deg + d_deg, 0.0, None)
+
+    # (n_sims, S, 3) stint times
+    stint = _stint_time(L[None], sim_base[:, Kc], sim_deg[:, Kc])
+    # Lap noise: sum of n iid N(0, σ²) laps = N(0, n σ²) per stint
+    sigma = m['Sigma'].fillna(0).to_numpy()[Kc]
+    stint += rng.standard_normal(stint.shape) * np.sqrt(L) * sigma
+    # Fuel burn is identical for every strategy: subtract once for absolute time
+    fuel_gain = fuel_effect * race_laps * (race_laps - 1) / 2.0
+    totals = stint.sum(axis=2) + stops * pit_loss - fuel_gain
+
+    mean = totals.mean(axis=0)
+    p10, p90 = np.percentile(totals, [10, 90], axis=0)
+    win = np.bincount(totals.argmin(axis=1), minlength=len(K)) / n_sims
+
+    names, pit_laps = [], []
+    for k, l in zip(K, L.astype(int)):
+        used = k >= 0
+        names.append('-'.join(compounds[c][0] for c in k[used]))
+        pit_laps.append(tuple(np.cumsum(l[used])[:-1].tolist()))
+
+    out = pd.DataFrame({
+        'Strategy':     names,
+        'Stops':        stops,
+        'PitLaps':      pit_laps,
+        'ExpectedTime': mean,
+        'Std':          totals.std(axis=0),
+        'P10':          p10,
+        'P90':          p90,
+        'WinProb':      win,
+    }).sort_values('ExpectedTime', ignore_index=True)
+    out['Delta'] = out['ExpectedTime'] - out['ExpectedTime'].iloc[0]
+    out.insert(0, 'Rank', np.arange(1, len(out) + 1))
+    return out
+
+
+# =========================================================
+# 3. Main Entry Point
+# =========================================================
+
+def compute_race_strategies(session, race_laps: int,
+                            pit_loss: float | None = None,
+                            n_sims: int | None = None) -> pd.DataFrame:
+    """
+    Ranked strategies for every team with long runs on at least two dry compounds.
+
+    Columns: Team + simulate_team_strategies columns (Rank, Strategy, Stops,
+    PitLaps, ExpectedTime, Std, P10, P90, WinProb, Delta).
+    Empty DataFrame when no team can be simulated.
+    """
+    pit_loss = config.STRATEGY_PIT_LOSS if pit_loss is None else pit_loss
+    n_sims = config.STRATEGY_N_SIMS if n_sims is None else n_sims
+    long_runs = extract_long_run_laps(session)
+    if long_runs.empty:
+        return pd.DataFrame()
+
+    models = fit_compound_models(long_runs)
+    if models.empty:
+        return pd.DataFrame()
+
+    rng = np.random.default_rng(config.STRATEGY_RANDOM_SEED)
+    results = []
+    for team, team_models in models.groupby('Team'):
+        if len(team_models) < 2:
+            continue
+        ranked = simulate_team_strategies(team_models, race_laps, pit_loss=pit_loss,
+                                          n_sims=n_sims, rng=rng)
+        if ranked.empty:
+            continue
+        ranked.insert(0, 'Team', team)
+        results.append(ranked)
+
+    if not results:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True)
+
+
+def render_race_strategies(session, df: pd.DataFrame, race_laps: int,
+                           pit_loss: float | None = None,
+                           top_n: int = 3) -> dict:
+    """Top-N strategies per team, delta to the team's best. Returns {suffix: Figure}."""
+    pit_loss = config.STRATEGY_PIT_LOSS if pit_loss is None else pit_loss
+    teams = df.groupby('Team')['ExpectedTime'].min().sort_values().index
+    n_cols = 2
+    n_rows = int(np.ceil(len(teams) / n_cols))
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(16, 2.2 * n_rows + 1),
+                             squeeze=False)
+    fig.patch.set_facecolor('white')
+    fig.set_layout_engine('tight', rect=[0, 0, 1, 0.95])
+
+    for ax, team in zip(axes.flat, teams):
+        sub = df[df['Team'] == team].head(top_n).iloc[::-1]
+        color = get_team_color(team)
+        labels = [f"{r.Strategy}  {list(r.PitLaps)}" for r in sub.itertuples()]
+        err = np.vstack([sub['Delta'] - (sub['P10'] - sub['ExpectedTime'].min()),
+                         (sub['P90'] - sub['ExpectedTime'].min()) - sub['Delta']])
+        ax.barh(labels, sub['Delta'], xerr=np.clip(err, 0, None), color=color,
+                edgecolor='black', linewidth=0.5, capsize=3, alpha=0.85)
+        ax.set_title(team, fontsize=12, fontweight='bold', color='black')
+        ax.set_facecolor('white')
+        ax.grid(axis='x', linestyle='--', alpha=0.3, color='gray')
+        ax.tick_params(colors='black', labelsize=9)
+
+    for ax in list(axes.flat)[len(teams):]:
+        ax.axis('off')
+
+    fig.suptitle(f"{session.event.year} {session.event.EventName} — Simulated Race Strategies "
+                 f"({race_laps} laps, pit loss {pit_loss:.0f}s)\n"
+                 f"Delta to team's best expected time (s), whiskers = P10–P90",
+                 fontsize=15, fontweight='bold', color='black')
+    return {'Strategy': fig}
+
+
+def simulate_race_strategies(session, race_laps: int,
+                             pit_loss: float | None = None,
+                             n_sims: int | None = None,
+                             top_n: int = 3) -> pd.DataFrame | None:
+    """
+    [Feature 6] Race Strategy Simulation from practice long runs
+
+    - Pace/degradation per team & compound fitted from analyze_long_runs data
+    - Every 1-stop / 2-stop strategy evaluated, Monte Carlo over pace noise
+    - Prints top strategies per team, saves a ranked chart, returns the table
+    """
+    pit_loss = config.STRATEGY_PIT_LOSS if pit_loss is None else pit_loss
+    n_sims = config.STRATEGY_N_SIMS if n_sims is None else n_sims
+    print(f"\n[Strategy] Fitting long-run pace models ({race_laps} laps, "
+          f"pit loss {pit_loss:.1f}s, {n_sims} sims)...")
+
+    df = compute_race_strategies(session, race_laps, pit_loss=pit_loss, n_sims=n_sims)
+    if df.empty:
+        print("[Error] No strategy could be simulated "
+              "(needs long runs on at least two dry compounds per team).")
+        return None
+
+    for team, ranked in df.groupby('Team', sort=False):
+        for row in ranked.head(top_n).itertuples():
+            print(f" -> {team:<24} #{row.Rank} {row.Strategy:<6} pit {list(row.PitLaps)}  "
+                  f"+{row.Delta:5.1f}s  ±{row.Std:4.1f}s  win {row.WinProb:4.0%}")
+
+    figures = render_race_strategies(session, df, race_laps, pit_loss=pit_loss, top_n=top_n)
+    save_figures(session, figures, facecolor='white')
+
+    print("[System] Strategy simulation complete.")
+    return df
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+recorded_session.py
+Offline stand-in for FastF1 sessions.
+
+A fully loaded session is pickled once (laps, telemetry, weather, messages)
+and can then be replayed without network access or the FastF1 cache — for
+the analysis server, batch jobs and offline testing.
+
+Usage:
+>>> record_session(2024, 'Mexico City Grand Prix', 'FP2')        # needs network once
+>>> loader = RecordedSessionLoader()
+>>> session = loader.ensure(2024, 'Mexico City Grand Prix', 'FP2')
+"""
+
+import os
+import pickle
+import re
+import threading
+
+import fastf1
+
+from practice import config
+from practice.session_loader import DATA_PARTS
+
+
+def recording_path(year: int, gp, session_type: str,
+                   directory: str = config.RECORDED_SESSIONS_DIR) -> str:
+    """File name of a recording: <year>_<gp>_<session>.pkl (spaces → '_')."""
+    gp_slug = re.sub(r'[^A-Za-z0-9]+', '_', str(gp)).strip('_')
+    return os.path.join(directory, f"{int(year)}_{gp_slug}_{session_type.upper()}.pkl")
+
+
+def record_session(year: int, gp, session_type: str,
+                   directory: str = config.RECORDED_SESSIONS_DIR) -> str:
+    """Load every data part of a session and pickle it. Returns the file path."""
+    session = fastf1.get_session(year, gp, session_type)
+    session.load(**{p: True for p in DATA_PARTS})
+    return save_recording(session, recording_path(year, gp, session_type, directory))
+
+
+def save_recording(session, path: str) -> str:
+    """Pickle an already loaded session to `path`."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(session, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"[System] Recorded session: {path}")
+    return path
+
+
+def load_recording(path: str):
+    """Unpickle a recorded session (only load files you created yourself)."""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class RecordedSessionLoader:
+    """
+    Drop-in replacement for SessionLoader.ensure()/forget() backed by recordings.
+    Recordings contain every data part, so `parts` is accepted and ignored.
+    """
+
+    def __init__(self, directory: str = config.RECORDED_SESSIONS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def available(self) -> list:
+        """File names of all recordings in the directory."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(n for n in os.listdir(self.directory) if n.endswith('.pkl'))
+
+    def ensure(self, year, gp=None, session_type=None, parts=('laps',)):
+        path = recording_path(year, gp, session_type, self.directory)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No recording for {year} {gp} {session_type} ({path})")
+        with self._lock:
+            return load_recording(path)
+
+    def loaded_parts(self, session) -> tuple:
+        return DATA_PARTS
+
+    def forget(self, year, gp=None, session_type=None):
+        """Recordings hold no loader state; nothing to release."""
+
+    def shutdown(self, wait: bool = False):
+        pass
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""
+report_bundle.py
+Reproducible report bundles with incremental rebuild.
+
+Charts saved by the menu go to Saved_photos as loose PNGs with no record of
+the session, parameters or code that produced them. A bundle is one
+directory per session (REPORT_BUNDLE_DIR/<year>_<event>_<session>/) holding
+the charts and result tables of registry analyses (analysis_server.ANALYSES)
+plus manifest.json:
+
+    {"version": 1,
+     "session": {"year": 2024, "gp": "Mexico City Grand Prix", "session": "FP2"},
+     "outputs": {
+        "braking": {
+            "analysis": "braking", "params": {}, "status": "ok",
+            "inputs_hash": "...",     laps timing columns + data parts + FastF1 version
+            "params_hash": "...",     params + config constants the code reads
+            "code_hash":   "...",     source of the analysis and the practice
+                                      modules it imports
+            "files": ["braking.json", "braking_Braking.png", ...],
+            "seconds": 2.4, "built_at": "2025-03-01T12:00:00"}}}
+
+A rebuild compares the stored hashes with the current ones and regenerates
+only outputs whose hashes differ or whose files are missing; up-to-date
+outputs do not even load their data parts. Telemetry is assumed to follow the
+laps table (a republished session changes both).
+
+clean_bundles / clean_loose prune selectively: files no manifest references,
+bundles or loose charts older than N days, the charts of one session.
+
+Usage:
+>>> report = build_bundle(session, loader=loader)            # default analyses
+>>> report = rebuild_bundle('Saved_photos/bundles/2024_Mexico_City_Grand_Prix_FP2', loader)
+>>> clean_bundles(older_than_days=30)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+
+import fastf1
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from practice import config
+from practice.recorded_session import RecordedSessionLoader
+from practice.save_utils import DEFAULT_SAVE_DIR, make_filename, save_figures
+from practice.season_db import session_code
+from practice.session_loader import ANALYSIS_DATA_PARTS
+
+MANIFEST = 'manifest.json'
+_MANIFEST_VERSION = 1
+
+_PRACTICE_DIR = os.path.dirname(os.path.abspath(__file__))
+_IMPORT_RE = re.compile(r'^\s*from practice(?:\.(\w+))? import \(?([\w, ]+)', re.MULTILINE)
+_CONFIG_RE = re.compile(r'\bconfig\.([A-Z][A-Z0-9_]*)\b')
+
+_FILE_HASHES = {}   # {path: (mtime, sha1)}
+
+# Laps columns of inputs_hash: timing data only, identical whichever parts are loaded
+_INPUT_COLUMNS = ('Driver', 'LapNumber', 'LapTime', 'Sector1Time', 'Sector2Time',
+                  'Sector3Time', 'Compound', 'TyreLife', 'PitInTime', 'PitOutTime',
+                  'SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST')
+
+
+def _registry() -> dict:
+    # Imported lazily: the server module switches matplotlib to Agg
+    from practice.analysis_server import ANALYSES
+    return ANALYSES
+
+
+def _defaults(name: str) -> dict:
+    from practice.analysis_server import param_default
+    return {k: param_default(d) for k, (_, d) in _registry()[name]['params'].items()}
+
+
+# -----------------------------------------------------------------------------
+# 1. Bundle paths and manifest
+# -----------------------------------------------------------------------------
+
+def session_key(session) -> tuple:
+    """(year, event name, session code) of a loaded session."""
+    return int(session.event.year), session.event['EventName'], session_code(session)
+
+
+def bundle_path(key, root: str = config.REPORT_BUNDLE_DIR) -> str:
+    year, gp, session_type = key
+    return os.path.join(root, f"{year}_{str(gp).replace(' ', '_')}_{session_type}")
+
+
+def read_manifest(path: str) -> dict | None:
+    """Manifest of the bundle directory `path`; None if missing or unreadable."""
+    try:
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[Warning] Unreadable manifest in {path}: {e}")
+        return None
+    if manifest.get('version') != _MANIFEST_VERSION:
+        print(f"[Warning] Manifest version {manifest.get('version')} in {path} is not supported")
+        return None
+    return manifest
+
+
+def write_manifest(path: str, manifest: dict):
+    # Written next to the target and swapped in, so an interrupted run never
+    # leaves a half-written manifest behind
+    tmp = os.path.join(path, MANIFEST + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, default=str)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def list_bundles(root: str = config.REPORT_BUNDLE_DIR) -> list:
+    """Bundle directories under `root` (those holding a manifest)."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(os.path.join(root, name) for name in os.listdir(root)
+                  if os.path.isfile(os.path.join(root, name, MANIFEST)))
+
+
+# -----------------------------------------------------------------------------
+# 2. Fingerprints
+# -----------------------------------------------------------------------------
+
+def _digest(payload) -> str:
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _file_hash(path: str) -> str:
+    mtime = os.path.getmtime(path)
+    cached = _FILE_HASHES.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = _FILE_HASHES[path] = (mtime, hashlib.sha1(f.read()).hexdigest())
+    return cached[1]
+
+
+def inputs_hash(session, parts=('laps',)) -> str:
+    """
+    Fingerprint of the session data an output was built from: the timing
+    columns of the laps table (not those FastF1 derives from other parts, e.g.
+    LapStartDate once telemetry is loaded) and the data parts the output reads.
+    """
+    columns = [c for c in _INPUT_COLUMNS if c in session.laps.columns]
+    laps = pd.DataFrame(session.laps)[columns]
+    rows = pd.util.hash_pandas_object(laps, index=False).values
+    return _digest({'laps': hashlib.sha1(rows.tobytes()).hexdigest(), 'columns': columns,
+                    'parts': sorted(parts), 'fastf1': fastf1.__version__})
+
+
+def _practice_module(name: str) -> str | None:
+    path = os.path.join(_PRACTICE_DIR, f"{name}.py")
+    return path if os.path.isfile(path) else None
+
+
+def code_files(name: str) -> list:
+    """
+    Source files analysis `name` depends on: the modules defining its compute /
+    render functions (or referenced by registry lambdas) and every practice
+    module they import, transitively. config.py is covered by the params hash.
+    """
+    spec = _registry()[name]
+    registry_file = _practice_module('analysis_server')
+    pending = set()
+    for fn in (spec['compute'], spec['render']):
+        if fn is None:
+            continue
+        source = os.path.abspath(inspect.getsourcefile(fn))
+        # A registry lambda depends on what it calls, not on everything the server imports
+        if source != registry_file:
+            pending.add(source)
+        refs = inspect.getclosurevars(fn).globals.values() if inspect.isfunction(fn) else ()
+        for ref in refs:
+            module = ref if inspect.ismodule(ref) else inspect.getmodule(ref)
+            if module is not None and module.__name__.startswith('practice.'):
+                pending.add(module.__file__)
+
+    files = set()
+    while pending:
+        path = os.path.abspath(pending.pop())
+        if path in files:
+            continue
+        files.add(path)
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        for module, names in _IMPORT_RE.findall(source):
+            candidates = [module] if module else [n.strip() for n in names.split(',')]
+            for candidate in candidates:
+                dep = _practice_module(candidate) if candidate else None
+                if dep and os.path.basename(dep) != 'config.py':
+                    pending.add(dep)
+    # The registry itself (lambdas, parameter parsers) is part of every analysis
+    files.add(registry_file)
+    return sorted(files)
+
+
+def code_hash(files) -> str:
+    return _digest({os.path.basename(path): _file_hash(path) for path in files})
+
+
+def params_hash(params: dict, files) -> str:
+    """Params + values of every config constant the code files read."""
+    names = set()
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            names.update(_CONFIG_RE.findall(f.read()))
+    used = {n: getattr(config, n) for n in sorted(names) if hasattr(config, n)}
+    return _digest({'params': params, 'config': used, 'dpi': config.REPORT_BUNDLE_DPI})
+
+
+def output_key(name: str, params: dict) -> str:
+    """Manifest key: the analysis name, plus a params hash for non-default params."""
+    if params == _defaults(name):
+        return name
+    return f"{name}-{_digest(params)[:8]}"
+
+
+def stale_reasons(entry: dict | None, current: dict, path: str) -> list:
+    """Why the output of manifest `entry` must be rebuilt ([] = up to date)."""
+    if entry is None:
+        return ['new']
+    reasons = [label for field, label in (('inputs_hash', 'inputs'),
+                                          ('params_hash', 'params'),
+                                          ('code_hash', 'code'))
+               if entry.get(field) != current[field]]
+    if entry.get('status') == 'failed':
+        reasons.append('failed')
+    if any(not os.path.exists(os.path.join(path, f)) for f in entry.get('files', [])):
+        reasons.append('missing files')
+    return reasons
+
+
+# -----------------------------------------------------------------------------
+# 3. Build / rebuild
+# -----------------------------------------------------------------------------
+
+def _write_result(path: str, key: str, session, name: str, result, params: dict) -> list:
+    from practice.analysis_server import _is_empty, result_to_json
+    if _is_empty(result):
+        return []
+    spec = _registry()[name]
+    files = [f"{key}.json"]
+    with open(os.path.join(path, files[0]), 'wb') as f:
+        f.write(result_to_json(result))
+    if spec['render'] is None:
+        return files
+
+    figures = spec['render'](session, result, **params)
+    try:
+        filenames = {suffix: f"{key}_{suffix}.png" for suffix in figures}
+        save_figures(session, figures, filenames=filenames, save_dir=path,
+                     dpi=config.REPORT_BUNDLE_DPI, facecolor='white')
+    finally:
+        for fig in figures.values():
+            plt.close(fig)
+    return files + list(filenames.values())
+
+
+def _output_parts(name: str, params: dict) -> tuple:
+    parts = set(ANALYSIS_DATA_PARTS[_registry()[name]['parts']])
+    if params.get('free_air'):
+        parts |= set(ANALYSIS_DATA_PARTS['traffic'])
+    return tuple(sorted(parts))
+
+
+def _build_output(path: str, key: str, session, loader, name: str, params: dict,
+                  current: dict, previous: dict | None) -> dict:
+    spec = _registry()[name]
+    start = time.perf_counter()
+    if loader is not None:
+        loader.ensure(session, parts=_output_parts(name, params))
+    result = spec['compute'](session, **params)
+    files = _write_result(path, key, session, name, result, params)
+
+    # Charts a previous build produced but this one did not (e.g. one driver fewer)
+    for old in set((previous or {}).get('files', [])) - set(files):
+        try:
+            os.remove(os.path.join(path, old))
+        except FileNotFoundError:
+            pass
+    return {'analysis': name, 'params': params, 'status': 'ok' if files else 'empty',
+            **current, 'files': files, 'seconds': round(time.perf_counter() - start, 2),
+            'built_at': datetime.now().isoformat(timespec='seconds')}
+
+
+def build_bundle(session, analyses=None, loader=None, key=None, force: bool = False,
+                 root: str = config.REPORT_BUNDLE_DIR) -> pd.DataFrame:
+    """
+    Build or update the bundle of `session`.
+
+    - `analyses`: analysis names, or {name: params} / [(name, params), ...] for
+      non-default params; None = the outputs already in the manifest
+      (REPORT_BUNDLE_ANALYSES for a new bundle)
+    - `loader`: SessionLoader that created `session`; data parts of stale
+      outputs are then loaded on demand, otherwise the session must hold them
+    - `force`: rebuild every output regardless of the manifest
+
+    Returns a report (Output, Status: built / up-to-date / empty / failed,
+    Reason, Seconds, Error); the manifest is written after every output.
+    """
+    registry = _registry()
+    key = tuple(key) if key is not None else session_key(session)
+    path = bundle_path(key, root)
+    os.makedirs(path, exist_ok=True)
+    manifest = read_manifest(path) or {
+        'version': _MANIFEST_VERSION,
+        'session': {'year': key[0], 'gp': key[1], 'session': key[2]},
+        'outputs': {}}
+
+    if analyses is None:
+        analyses = [(e['analysis'], e['params']) for e in manifest['outputs'].values()] \
+            or list(config.REPORT_BUNDLE_ANALYSES)
+    elif isinstance(analyses, dict):
+        analyses = list(analyses.items())
+    jobs = []
+    for item in analyses:
+        name, params = (item, None) if isinstance(item, str) else item
+        if name not in registry:
+            raise ValueError(f"Unknown analysis '{name}'; available: {sorted(registry)}")
+        params = {**_defaults(name), **(params or {})}
+        missing = [k for k, v in params.items() if v is None]
+        if missing:
+            raise ValueError(f"Missing required parameter(s) {missing} for {name}")
+        jobs.append((output_key(name, params), name, params))
+
+    print(f"\n[Bundle] {path}: {len(jobs)} output(s)")
+    if loader is not None:
+        # Waits for a background load of the session before its laps are hashed
+        loader.ensure(session, parts=('laps',))
+    rows = []
+    for out_key, name, params in jobs:
+        files = code_files(name)
+        current = {'inputs_hash': inputs_hash(session, _output_parts(name, params)),
+                   'params_hash': params_hash(params, files),
+                   'code_hash': code_hash(files)}
+        previous = manifest['outputs'].get(out_key)
+        reasons = ['forced'] if force else stale_reasons(previous, current, path)
+        if not reasons:
+            rows.append((out_key, 'up-to-date', '', 0.0, ''))
+            continue
+        try:
+            entry = _build_output(path, out_key, session, loader, name, params,
+                                  current, previous)
+        except Exception as e:
+            print(f"[Warning] Bundle output '{out_key}' failed: {e}")
+            entry = {**(previous or {'analysis': name, 'params': params, 'files': []}),
+                     'status': 'failed', 'error': str(e)}
+            rows.append((out_key, 'failed', ', '.join(reasons), 0.0, str(e)))
+        else:
+            status = 'built' if entry['status'] == 'ok' else 'empty'
+            rows.append((out_key, status, ', '.join(reasons), entry['seconds'], ''))
+            print(f"[System] Bundle output '{out_key}' {status} ({entry['seconds']:.1f}s)")
+        manifest['outputs'][out_key] = entry
+        manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        write_manifest(path, manifest)
+
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        write_manifest(path, manifest)
+    return pd.DataFrame(rows, columns=['Output', 'Status', 'Reason', 'Seconds', 'Error'])
+
+
+def rebuild_bundle(path: str, loader, force: bool = False) -> pd.DataFrame | None:
+    """
+    Re-check every output of the bundle at `path` against the current data and
+    code; only stale ones are regenerated. `loader`: SessionLoader (or
+    RecordedSessionLoader) used to load the session named in the manifest.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        print(f"[Error] No bundle manifest in {path}")
+        return None
+    target = manifest['session']
+    key = (int(target['year']), target['gp'], target['session'])
+    session = loader.ensure(*key, parts=('laps',))
+    # Recordings hold every data part; only the live loader loads per output
+    if isinstance(loader, RecordedSessionLoader):
+        loader = None
+    return build_bundle(session, None, loader=loader, key=key, force=force,
+                        root=os.path.dirname(os.path.normpath(path)))
+
+
+# -----------------------------------------------------------------------------
+# 4. Selective clean
+# -----------------------------------------------------------------------------
+
+def _age_days(path: str) -> float:
+    return (time.time() - os.path.getmtime(path)) / 86400
+
+
+def _remove(path: str, dry_run: bool) -> str:
+    if not dry_run:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    return path
+
+
+def clean_bundles(root: str = config.REPORT_BUNDLE_DIR, orphans: bool = True,
+                  older_than_days: float | None = None, dry_run: bool = False) -> list:
+    """
+    Prune bundles under `root`:
+    - `orphans`: files no manifest entry references (leftovers of renamed
+      outputs, interrupted writes) and entries whose files are all gone
+    - `older_than_days`: whole bundles not updated for that long
+    Bundles without a readable manifest are left alone. Returns removed paths.
+    """
+    removed = []
+    if not os.path.isdir(root):
+        return removed
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        manifest = read_manifest(path) if os.path.isdir(path) else None
+        if manifest is None:
+            continue
+        if older_than_days is not None and _age_days(os.path.join(path, MANIFEST)) > older_than_days:
+            removed.append(_remove(path, dry_run))
+            continue
+        if not orphans:
+            continue
+
+        referenced = {f for e in manifest['outputs'].values() for f in e.get('files', [])}
+        for file in sorted(os.listdir(path)):
+            if file != MANIFEST and file not in referenced:
+                removed.append(_remove(os.path.join(path, file), dry_run))
+        gone = [k for k, e in manifest['outputs'].items() if e.get('files')
+                and not any(os.path.exists(os.path.join(path, f)) for f in e['files'])]
+        if gone and not dry_run:
+            for k in gone:
+                del manifest['outputs'][k]
+            write_manifest(path, manifest)
+    for path in removed:
+        print(f"[System] {'Would remove' if dry_run else 'Removed'}: {path}")
+    return removed
+
+
+def clean_loose(save_dir: str = DEFAULT_SAVE_DIR, session=None,
+                older_than_days: float | None = None, dry_run: bool = False) -> list:
+    """
+    Remove loose charts (files directly in `save_dir`, not bundles):
+    those of `session` (make_filename prefix) and/or those older than
+    `older_than_days`. With neither filter every loose file is removed.
+    Returns removed paths.
+    """
+    removed = []
+    if not os.path.isdir(save_dir):
+        return removed
+    prefix = os.path.splitext(make_filename(session))[0] + '_' if session is not None else None
+    for name in sorted(os.listdir(save_dir)):
+        path = os.path.join(save_dir, name)
+        if not os.path.isfile(path):
+            continue
+        if prefix is not None and not name.startswith(prefix):
+            continue
+        if older_than_days is not None and _age_days(path) <= older_than_days:
+            continue
+        removed.append(_remove(path, dry_run))
+    print(f"[System] {'Would remove' if dry_run else 'Removed'} {len(removed)} loose file(s) "
+          f"from {save_dir}")
+    return removed
+
+
+# -----------------------------------------------------------------------------
+# 5. Wrapper
+# -----------------------------------------------------------------------------
+
+def analyze_report_bundle(session, loader=None, force: bool = False):
+    """
+    [Feature] Report Bundle
+    - Builds / updates the bundle of the current session (manifest + charts
+      + result tables); only outputs whose inputs, params or code changed
+      are regenerated
+    Returns the build report.
+    """
+    report = build_bundle(session, loader=loader, force=force)
+    print(report.to_string(index=False))
+    return report
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+run_classifier.py
+Segments every driver's practice laps into programmes.
+
+A *run* is the sequence of laps between leaving and returning to the pit lane
+(a new run starts at every out-lap). Each lap gets one Programme label:
+
+    out    out-lap (PitOutTime set)
+    in     in-lap  (PitInTime set)
+    long   representative lap of a long run (race simulation)
+    push   lap within RUN_PUSH_RATIO of the driver's best (qualifying simulation)
+    cool   slow lap between push laps
+    aero   lap of a short, slow, part-throttle run (aero rake / installation)
+    other  anything else (aborted push laps, mid-pace laps in short runs)
+
+All features are vectorized over the laps table; the optional full-throttle
+share per lap comes from session.car_data with one searchsorted per driver.
+"""
+
+import numpy as np
+import pandas as pd
+
+from practice import config
+
+PROGRAMMES = ('out', 'in', 'long', 'push', 'cool', 'aero', 'other')
+
+
+def _full_throttle_pct(session, laps: pd.DataFrame) -> pd.Series:
+    """% of car-data samples at ≥ 99 % throttle per lap (NaN without telemetry)."""
+    out = pd.Series(np.nan, index=laps.index)
+    try:
+        car_data = session.car_data
+    except Exception:
+        return out
+
+    for drv_num, drv_laps in laps.groupby('DriverNumber'):
+        tel = car_data.get(str(drv_num))
+        if tel is None or tel.empty:
+            continue
+        t = tel['SessionTime'].to_numpy()
+        full = np.r_[0, np.cumsum(tel['Throttle'].to_numpy() >= 99)]
+        valid = drv_laps['LapStartTime'].notna() & drv_laps['Time'].notna()
+        lo = np.searchsorted(t, drv_laps.loc[valid, 'LapStartTime'].to_numpy())
+        hi = np.searchsorted(t, drv_laps.loc[valid, 'Time'].to_numpy())
+        n = hi - lo
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = np.where(n > 0, (full[hi] - full[lo]) / n * 100.0, np.nan)
+        out.loc[drv_laps.index[valid.to_numpy()]] = pct
+    return out
+
+
+def classify_runs(session, laps=None, use_telemetry: bool = True):
+    """
+    Returns a copy of `laps` (default: session.laps) with added columns:
+        RunId, LapRatio, RunFastLaps, FullThrottlePct, Programme
+    """
+    laps = (session.laps if laps is None else laps).copy()
+    laps = laps.sort_values(['Driver', 'LapNumber'])
+
+    is_out = laps['PitOutTime'].notna().to_numpy()
+    is_in = laps['PitInTime'].notna().to_numpy()
+
+    # Run id: increments at every out-lap, per driver
+    laps['RunId'] = laps['PitOutTime'].notna().astype(int).groupby(laps['Driver']).cumsum()
+
+    lap_s = laps['LapTime'].dt.total_seconds()
+    timed = lap_s.where(~(is_out | is_in))
+    best = timed.groupby(laps['Driver']).transform('min')
+    laps['LapRatio'] = lap_s / best
+    ratio = laps['LapRatio'].to_numpy()
+
+    run_key = [laps['Driver'], laps['RunId']]
+    representative = pd.Series(~(is_out | is_in) & (ratio <= config.RUN_LONG_RATIO),
+                               index=laps.index)
+    laps['RunFastLaps'] = representative.groupby(run_key).transform('sum')
+    run_laps = laps.groupby(run_key)['LapNumber'].transform('size').to_numpy()
+    run_fast = laps['RunFastLaps'].to_numpy()
+
+    if use_telemetry:
+        laps['FullThrottlePct'] = _full_throttle_pct(session, laps)
+    else:
+        laps['FullThrottlePct'] = np.nan
+    run_throttle = laps.groupby(run_key)['FullThrottlePct'].transform('mean').to_numpy()
+    # Unknown throttle (no telemetry) is not evidence of an aero run → 'other'
+    with np.errstate(invalid='ignore'):
+        low_throttle = run_throttle < config.RUN_AERO_MAX_FULL_THROTTLE
+
+    conditions = [
+        is_out,
+        is_in,
+        (run_fast >= config.LONG_RUN_MIN_STINT_LAPS) & (ratio <= config.RUN_LONG_RATIO),
+        ratio <= config.RUN_PUSH_RATIO,
+        (run_fast == 0) & (run_laps <= config.RUN_AERO_MAX_LAPS) & low_throttle,
+        ratio > config.RUN_COOL_RATIO,
+    ]
+    choices = ['out', 'in', 'long', 'push', 'aero', 'cool']
+    laps['Programme'] = np.select(conditions, choices, default='other')
+    return laps.sort_index()
+
+
+def pick_programme(laps, programmes):
+    """Laps whose Programme is in `programmes` (str or iterable)."""
+    if isinstance(programmes, str):
+        programmes = [programmes]
+    return laps[laps['Programme'].isin(list(programmes))]
+
+
+def summarize_programmes(laps) -> pd.DataFrame:
+    """Lap count per driver and programme (rows = Driver)."""
+    return (laps.groupby(['Driver', 'Programme']).size()
+                .unstack(fill_value=0)
+                .reindex(columns=list(PROGRAMMES), fill_value=0))
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+run_compare.py
+Setup-sweep comparison of a driver's own runs within one session.
+
+Runs come from run_classifier (a new run starts at every out-lap). Every
+representative lap of the selected drivers is aligned on one common distance
+grid (lap distance scaled to the reference lap length), so elapsed time at any
+track position is a row of one laps × grid matrix. Section times for all laps
+and all sections are read off that matrix at once:
+
+    mini     RUN_COMPARE_MINI_SECTORS equal-length mini-sectors
+    corner   apex - RUN_COMPARE_CORNER_BEFORE_M … apex + RUN_COMPARE_CORNER_AFTER_M
+             (corner positions from session.get_circuit_info())
+
+Each later run of a driver is compared with the first run of the same
+programme (push vs push, long vs long): delta = median section time of the run
+- median of the baseline run. The confidence interval comes from a bootstrap
+over laps, vectorized over iterations and sections (RUN_COMPARE_BOOTSTRAP).
+"""
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.colors import TwoSlopeNorm, to_rgba
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice import config
+from practice.f1_colors import resolve_styles
+from practice.run_classifier import classify_runs
+from practice.save_utils import save_figures
+from practice.telemetry_quality import TelemetryQualityError, clean_lap_telemetry
+from practice.track_geometry import circuit_corners, get_circuit_geometry
+
+
+# =========================================================
+# 1. Lap Alignment
+# =========================================================
+
+def _select_laps(session, drivers, programmes) -> pd.DataFrame:
+    """Representative laps of `drivers` (abbreviations or one team name)."""
+    laps = classify_runs(session, use_telemetry=False)
+    if isinstance(drivers, str):
+        drivers = laps.loc[laps['Team'] == drivers, 'Driver'].unique().tolist() or [drivers]
+    laps = laps[laps['Driver'].isin(list(drivers))
+                & laps['Programme'].isin(list(programmes))
+                & laps['LapTime'].notna()]
+    return laps.sort_values(['Driver', 'LapNumber'])
+
+
+def _align_laps(laps: pd.DataFrame):
+    """
+    (laps kept, grid, T): elapsed time (s) of every lap at every grid distance.
+    Laps whose telemetry fails the quality check are dropped.
+    """
+    kept, distances, times = [], [], []
+    for idx, lap in laps.iterrows():
+        try:
+            tel = clean_lap_telemetry(lap)
+        except TelemetryQualityError as e:
+            print(f"[Warning] Run compare: {lap['Driver']} lap {lap['LapNumber']} skipped ({e})")
+            continue
+        except Exception:
+            continue
+        d = tel['Distance'].to_numpy(dtype=float)
+        if len(d) < 2 or d[-1] <= 0:
+            continue
+        kept.append(idx)
+        distances.append(d)
+        times.append(tel['Time'].dt.total_seconds().to_numpy())
+
+    if not kept:
+        return laps.iloc[:0], np.empty(0), np.empty((0, 0))
+
+    ref_len = float(np.median([d[-1] for d in distances]))
+    grid = np.arange(0.0, ref_len + config.RUN_COMPARE_GRID_M, config.RUN_COMPARE_GRID_M)
+    grid[-1] = ref_len
+    T = np.vstack([np.interp(grid, d * (ref_len / d[-1]), t) for d, t in zip(distances, times)])
+    return laps.loc[kept], grid, T
+
+
+def _time_at(grid: np.ndarray, T: np.ndarray, distance) -> np.ndarray:
+    """Elapsed time of every lap (rows of T) at arbitrary distances (linear, vectorized)."""
+    d = np.clip(np.asarray(distance, dtype=float), grid[0], grid[-1])
+    k = np.clip(np.searchsorted(grid, d, side='right') - 1, 0, len(grid) - 2)
+    frac = (d - grid[k]) / (grid[k + 1] - grid[k])
+    return T[:, k] + frac * (T[:, k + 1] - T[:, k])
+
+
+# =========================================================
+# 2. Sections
+# =========================================================
+
+def compute_sections(session, lap_length: float) -> pd.DataFrame:
+    """Mini-sectors and corner windows. Columns: Kind, Label, Start, End (m)."""
+    edges = np.linspace(0.0, lap_length, config.RUN_COMPARE_MINI_SECTORS + 1)
+    rows = [{'Kind': 'mini', 'Label': f"M{i + 1}", 'Start': a, 'End': b}
+            for i, (a, b) in enumerate(zip(edges[:-1], edges[1:]))]
+
+    for _, c in circuit_corners(session).iterrows():
+        rows.append({
+            'Kind':  'corner',
+            'Label': c['Label'],
+            'Start': max(c['Distance'] - config.RUN_COMPARE_CORNER_BEFORE_M, 0.0),
+            'End':   min(c['Distance'] + config.RUN_COMPARE_CORNER_AFTER_M, lap_length),
+        })
+    return pd.DataFrame(rows, columns=['Kind', 'Label', 'Start', 'End'])
+
+
+# =========================================================
+# 3. Run Deltas with Bootstrap Confidence
+# =========================================================
+
+def _bootstrap_medians(X: np.ndarray, rng, n_boot: int) -> np.ndarray:
+    """(n_boot, sections) medians of laps resampled with replacement."""
+    idx = rng.integers(0, len(X), size=(n_boot, len(X)))
+    return np.median(X[idx], axis=1)
+
+
+def compute_run_comparison(session, drivers, programmes=('push', 'long'),
+                           baseline_run: int | None = None) -> dict:
+    """
+    Compare every run of each driver with a baseline run of the same programme.
+
+    `drivers`: list of abbreviations, or a team name (both teammates).
+    `baseline_run`: RunId to compare against (default: first run per programme).
+
+    Returns a dict of DataFrames (all empty without comparable runs):
+        runs      Driver, RunId, Programme, Compound, Laps, MedianLap, BestLap, BaseRun
+        sections  Kind, Label, Start, End
+        deltas    Driver, Programme, BaseRun, Run, Kind, Label, Start, End,
+                  BaseTime, RunTime, Delta, CILow, CIHigh, Significant
+        traces    Driver, BaseRun, Run, Distance, Delta (median cumulative delta, s)
+    """
+    result = {
+        'runs':     pd.DataFrame(columns=['Driver', 'RunId', 'Programme', 'Compound', 'Laps',
+                                          'MedianLap', 'BestLap', 'BaseRun']),
+        'sections': pd.DataFrame(columns=['Kind', 'Label', 'Start', 'End']),
+        'deltas':   pd.DataFrame(columns=['Driver', 'Programme', 'BaseRun', 'Run', 'Kind', 'Label',
+                                          'Start', 'End', 'BaseTime', 'RunTime', 'Delta',
+                                          'CILow', 'CIHigh', 'Significant']),
+        'traces':   pd.DataFrame(columns=['Driver', 'BaseRun', 'Run', 'Distance', 'Delta']),
+    }
+    laps, grid, T = _align_laps(_select_laps(session, drivers, programmes))
+    if laps.empty:
+        return result
+
+    sections = compute_sections(session, float(grid[-1]))
+    # Section times of every lap: (laps, sections)
+    S = _time_at(grid, T, sections['End']) - _time_at(grid, T, sections['Start'])
+
+    # One programme label per run: the most common one among its kept laps
+    laps = laps.assign(Row=np.arange(len(laps)), LapSeconds=laps['LapTime'].dt.total_seconds())
+    runs = (laps.groupby(['Driver', 'RunId'])
+                .agg(Programme=('Programme', lambda p: p.mode().iloc[0]),
+                     Compound=('Compound', lambda c: c.mode().iloc[0] if c.notna().any() else None),
+                     Laps=('Row', 'size'), MedianLap=('LapSeconds', 'median'),
+                     BestLap=('LapSeconds', 'min'))
+                .reset_index())
+    runs = runs[runs['Laps'] >= config.RUN_COMPARE_MIN_LAPS].copy()
+    rows_of = laps.groupby(['Driver', 'RunId'])['Row'].apply(np.asarray)
+
+    rng = np.random.default_rng(config.RUN_COMPARE_SEED)
+    alpha = (1.0 - config.RUN_COMPARE_CI) / 2.0
+    runs['BaseRun'] = np.nan
+    deltas, traces = [], []
+    for (drv, programme), group in runs.groupby(['Driver', 'Programme']):
+        ids = group['RunId'].tolist()
+        base = baseline_run if baseline_run in ids else ids[0]
+        base_rows = rows_of[(drv, base)]
+        base_boot = _bootstrap_medians(S[base_rows], rng, config.RUN_COMPARE_BOOTSTRAP)
+        base_med = np.median(S[base_rows], axis=0)
+        base_trace = np.median(T[base_rows], axis=0)
+
+        for run in ids:
+            if run == base:
+                continue
+            run_rows = rows_of[(drv, run)]
+            boot = _bootstrap_medians(S[run_rows], rng, config.RUN_COMPARE_BOOTSTRAP) - base_boot
+            low, high = np.quantile(boot, [alpha, 1.0 - alpha], axis=0)
+            run_med = np.median(S[run_rows], axis=0)
+            deltas.append(sections.assign(
+                Driver=drv, Programme=programme, BaseRun=base, Run=run,
+                BaseTime=base_med, RunTime=run_med, Delta=run_med - base_med,
+                CILow=low, CIHigh=high, Significant=(low > 0) | (high < 0)))
+            traces.append(pd.DataFrame({
+                'Driver': drv, 'BaseRun': base, 'Run': run, 'Distance': grid,
+                'Delta': np.median(T[run_rows], axis=0) - base_trace}))
+            runs.loc[(runs['Driver'] == drv) & (runs['RunId'] == run), 'BaseRun'] = base
+
+    result['runs'] = runs.reset_index(drop=True)
+    result['sections'] = sections
+    if deltas:
+        result['deltas'] = pd.concat(deltas, ignore_index=True)[result['deltas'].columns]
+        result['traces'] = pd.concat(traces, ignore_index=True)
+    return result
+
+
+# =========================================================
+# 4. Visualization
+# =========================================================
+
+def render_run_comparison(session, result: dict) -> dict:
+    """
+    One figure per compared run: cumulative delta trace, track map coloured
+    by mini-sector delta and corner deltas with confidence whiskers.
+    Returns {suffix: Figure}.
+    """
+    deltas, traces = result['deltas'], result['traces']
+    if deltas.empty:
+        return {}
+    styles = resolve_styles(session, deltas['Driver'].unique().tolist())
+    title = f"{session.event.year} {session.event.EventName} {session.name}"
+    lap_length = float(result['sections']['End'].max())
+    try:
+        geom = get_circuit_geometry(session)
+    except Exception:
+        geom = None
+
+    figures = {}
+    for (drv, base, run), d in deltas.groupby(['Driver', 'BaseRun', 'Run'], sort=False):
+        color = styles.at[drv, 'Color']
+        fig = plt.figure(figsize=(16, 10), facecolor='white')
+        fig.set_layout_engine('tight', rect=[0, 0, 1, 0.96])
+        grid = fig.add_gridspec(2, 2, height_ratios=[1, 1.3], width_ratios=[1, 1.4])
+        ax_trace = fig.add_subplot(grid[0, :])
+        ax_map = fig.add_subplot(grid[1, 0])
+        ax_bar = fig.add_subplot(grid[1, 1])
+
+        # --- Cumulative delta ---
+        tr = traces[(traces['Driver'] == drv) & (traces['BaseRun'] == base) & (traces['Run'] == run)]
+        ax_trace.plot(tr['Distance'], tr['Delta'], color=color, linewidth=1.8)
+        ax_trace.fill_between(tr['Distance'], 0, tr['Delta'], where=tr['Delta'] > 0,
+                              color='tab:red', alpha=0.15)
+        ax_trace.fill_between(tr['Distance'], 0, tr['Delta'], where=tr['Delta'] < 0,
+                              color='tab:green', alpha=0.15)
+        ax_trace.axhline(0, color='black', linewidth=0.8)
+        ax_trace.set_xlabel("Distance (m)")
+        ax_trace.set_ylabel(f"Run {run} - Run {base} (s)")
+        ax_trace.grid(True, linestyle='--', alpha=0.3)
+
+        # --- Mini-sector map ---
+        mini = d[d['Kind'] == 'mini']
+        if geom is not None and not mini.empty:
+            mids = geom.vertex_distance(lap_length)[:-1] + geom.step / 2
+            k = np.clip(np.searchsorted(mini['End'].to_numpy(), mids), 0, len(mini) - 1)
+            values = mini['Delta'].to_numpy()[k]
+            limit = max(np.abs(values).max(), 1e-3)
+            lc = geom.plot(ax_map, values=values, cmap='RdYlGn_r',
+                           norm=TwoSlopeNorm(0.0, -limit, limit), linewidth=4)
+            fig.colorbar(lc, ax=ax_map, shrink=0.7, label="Mini-sector delta (s)")
+        else:
+            ax_map.axis('off')
+        ax_map.set_title("Mini-Sectors (green = run faster)", fontsize=11)
+
+        # --- Corner (or mini-sector) deltas with CI ---
+        bars = d[d['Kind'] == 'corner']
+        if bars.empty:
+            bars = mini
+        x = np.arange(len(bars))
+        err = np.vstack([bars['Delta'] - bars['CILow'], bars['CIHigh'] - bars['Delta']])
+        ax_bar.bar(x, bars['Delta'], color=[
+            to_rgba('tab:red' if delta > 0 else 'tab:green', 0.9 if sig else 0.35)
+            for delta, sig in zip(bars['Delta'], bars['Significant'])])
+        ax_bar.errorbar(x, bars['Delta'], yerr=np.clip(err, 0, None), fmt='none',
+                        ecolor='black', elinewidth=1, capsize=3)
+        ax_bar.axhline(0, color='black', linewidth=0.8)
+        ax_bar.set_xticks(x)
+        ax_bar.set_xticklabels(bars['Label'], rotation=45, fontsize=8)
+        ax_bar.set_ylabel("Median delta (s)")
+        ax_bar.set_title(f"{'Corner' if (d['Kind'] == 'corner').any() else 'Mini-sector'} deltas "
+                         f"({config.RUN_COMPARE_CI:.0%} CI, faded = not significant)", fontsize=11)
+        ax_bar.grid(True, axis='y', linestyle='--', alpha=0.3)
+
+        total = d[d['Kind'] == 'mini']['Delta'].sum()
+        fig.suptitle(f"{title} - {drv}: Run {run} vs Run {base} "
+                     f"({d['Programme'].iloc[0]}, {total:+.3f}s)", fontsize=15, fontweight='bold')
+        figures[f"RunCompare_{drv}_Run{run}_vs_Run{base}"] = fig
+    return figures
+
+
+# =========================================================
+# 5. Main Wrapper
+# =========================================================
+
+def analyze_run_comparison(session, drivers, programmes=('push', 'long'),
+                           baseline_run: int | None = None):
+    """
+    [Feature] Run / Setup-Sweep Comparison
+    - Aligns every push / long-run lap of the driver(s) on one distance grid
+    - Median mini-sector and corner deltas of each run vs the baseline run,
+      with bootstrap confidence intervals
+    Returns the compute_run_comparison tables (None without comparable runs).
+    """
+    print(f"\n[Run Comparison] Aligning laps of {drivers}...")
+
+    result = compute_run_comparison(session, drivers, programmes, baseline_run)
+    if result['deltas'].empty:
+        print(f"[Error] Need at least two runs of the same programme with "
+              f"{config.RUN_COMPARE_MIN_LAPS}+ laps.")
+        return None
+
+    print(result['runs'].round(3).to_string(index=False))
+    significant = result['deltas'][result['deltas']['Significant']
+                                   & (result['deltas']['Kind'] == 'corner')]
+    if not significant.empty:
+        print("\n[Significant corner deltas]")
+        print(significant[['Driver', 'BaseRun', 'Run', 'Label', 'Delta', 'CILow', 'CIHigh']]
+              .round(3).to_string(index=False))
+
+    save_figures(session, render_run_comparison(session, result), facecolor='white')
+    return result
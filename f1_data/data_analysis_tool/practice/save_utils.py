@@ -1,6 +1,9 @@
+import gc
 import os
 import matplotlib.pyplot as plt
 
+from practice import config
+
 DEFAULT_SAVE_DIR = 'Saved_photos'
 
 def ensure_save_dir(path: str = DEFAULT_SAVE_DIR):
@@ -8,8 +11,8 @@ def ensure_save_dir(path: str = DEFAULT_SAVE_DIR):
         os.makedirs(path, exist_ok=True)
     return path
 
-def make_filename(session, suffix: str = '') -> str:
-    """Make standardized filename: Year_EventName_session[_suffix].png
+def make_filename(session, suffix: str = '', ext: str = 'png') -> str:
+    """Make standardized filename: Year_EventName_session[_suffix].<ext>
 
     `suffix` should not include extension.
     """
@@ -18,8 +21,18 @@ def make_filename(session, suffix: str = '') -> str:
     session_name = getattr(session, 'name', '')
     base = f"{year}_{event.replace(' ', '_')}_{session_name}"
     if suffix:
-        return f"{base}_{suffix}.png"
-    return f"{base}.png"
+        return f"{base}_{suffix}.{ext}"
+    return f"{base}.{ext}"
+
+def apply_layout(fig, tight_rect=None):
+    """tight_layout unless the renderer already attached a layout engine."""
+    try:
+        if tight_rect is not None:
+            fig.tight_layout(rect=tight_rect)
+        elif fig.get_layout_engine() is None:
+            fig.tight_layout()
+    except Exception:
+        pass
 
 def save_figure(fig, filename: str, save_dir: str = DEFAULT_SAVE_DIR, dpi: int = 300,
                 facecolor='white', bbox_inches='tight', show: bool = True, tight_rect=None):
@@ -29,20 +42,38 @@ def save_figure(fig, filename: str, save_dir: str = DEFAULT_SAVE_DIR, dpi: int =
     - `filename`: just the file name (with .png)
     - `facecolor`: background color for saved PNG (default: 'white')
     - `show`: whether to call `plt.show()` after saving. If False, closes the figure.
+    - `tight_rect`: rect for tight_layout; if None, a layout engine set by the
+      renderer (`fig.set_layout_engine('tight', rect=...)`) is respected
     """
     ensure_save_dir(save_dir)
-    try:
-        if tight_rect is not None:
-            fig.tight_layout(rect=tight_rect)
-        else:
-            fig.tight_layout()
-    except Exception:
-        pass
+    apply_layout(fig, tight_rect)
     path = os.path.join(save_dir, filename)
+    if config.LOW_MEMORY_MODE:
+        dpi = min(dpi, config.LOW_MEMORY_MAX_DPI)
     fig.savefig(path, dpi=dpi, bbox_inches=bbox_inches, facecolor=facecolor)
     print(f"[System] Saved: {path}")
     if show:
         plt.show()
     else:
         plt.close(fig)
+        if config.LOW_MEMORY_MODE:
+            # Figures hold reference cycles; free their buffers before the next one
+            gc.collect()
     return path
+
+
+def save_figures(session, figures: dict, filenames: dict | None = None, **kwargs) -> list:
+    """Save the output of a `render_*` function.
+
+    - `figures`: {suffix: Figure} as returned by the renderers
+    - `filenames`: optional {suffix: filename} overrides (default: make_filename)
+    - remaining kwargs are passed to `save_figure` (show defaults to False)
+    Returns the list of saved paths.
+    """
+    kwargs.setdefault('show', False)
+    filenames = filenames or {}
+    paths = []
+    for suffix, fig in figures.items():
+        filename = filenames.get(suffix) or make_filename(session, suffix=suffix)
+        paths.append(save_figure(fig, filename, **kwargs))
+    return paths
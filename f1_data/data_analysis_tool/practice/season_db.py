@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+season_db.py
+Season-wide SQLite store of lap, stint and session summaries.
+
+Cross-event questions ("Alpine's FP2 long-run pace at every 2025 event")
+otherwise need ~24 FastF1 sessions loaded. Each session is ingested once from
+its laps table; afterwards the indexed tables answer such queries in
+milliseconds without touching FastF1.
+
+Tables (one row per ...):
+    sessions      session: year, round, event, session (FP1 … R), session_name
+    laps          lap: times, sectors, speed traps, tyre, pit flags, programme
+    stints        driver stint: compound, laps, mean / best lap
+    long_runs     cleaned long-run lap (practice_longrun.extract_long_run_laps)
+    sector_bests  driver and sector: best time
+    speed_traps   lap and trap: speed (practice_speedtrap.compute_speed_traps)
+
+Times are stored in seconds. Re-ingesting a session replaces its rows.
+
+Usage:
+>>> db = SeasonDB()
+>>> db.ingest_session(session)
+>>> db.long_run_pace(2025, 'FP2', team='Alpine')
+"""
+
+import os
+import sqlite3
+import time
+
+import fastf1
+import pandas as pd
+
+from practice import config
+from practice.practice_laptime import compute_sector_ranking
+from practice.practice_longrun import extract_long_run_laps
+from practice.practice_speedtrap import compute_speed_traps
+from practice.run_classifier import classify_runs
+
+# FastF1 session names → short codes used by the menu (VALID_SESSION_TYPES)
+SESSION_CODES = {
+    'Practice 1': 'FP1', 'Practice 2': 'FP2', 'Practice 3': 'FP3',
+    'Qualifying': 'Q', 'Sprint Qualifying': 'SQ', 'Sprint Shootout': 'SQ',
+    'Sprint': 'S', 'Race': 'R',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id   INTEGER PRIMARY KEY,
+    year         INTEGER NOT NULL,
+    round        INTEGER,
+    event        TEXT NOT NULL,
+    session      TEXT NOT NULL,
+    session_name TEXT,
+    ingested_at  TEXT,
+    UNIQUE (year, event, session)
+);
+CREATE TABLE IF NOT EXISTS laps (
+    session_id   INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    driver       TEXT, team TEXT, lap_number INTEGER, stint INTEGER,
+    compound     TEXT, tyre_life REAL, lap_time REAL,
+    sector1      REAL, sector2 REAL, sector3 REAL,
+    speed_i1     REAL, speed_i2 REAL, speed_fl REAL, speed_st REAL,
+    session_time REAL, pit_in INTEGER, pit_out INTEGER,
+    is_accurate  INTEGER, programme TEXT
+);
+CREATE TABLE IF NOT EXISTS stints (
+    session_id   INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    driver       TEXT, team TEXT, stint INTEGER, compound TEXT,
+    laps         INTEGER, first_lap INTEGER, mean_lap REAL, best_lap REAL
+);
+CREATE TABLE IF NOT EXISTS long_runs (
+    session_id   INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    driver       TEXT, team TEXT, stint INTEGER, compound TEXT,
+    stint_lap    INTEGER, lap_time REAL
+);
+CREATE TABLE IF NOT EXISTS sector_bests (
+    session_id   INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    driver       TEXT, team TEXT, sector INTEGER, time REAL
+);
+CREATE TABLE IF NOT EXISTS speed_traps (
+    session_id   INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,
+    driver       TEXT, team TEXT, lap_number INTEGER, trap TEXT, speed REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_lookup    ON sessions (year, session, event);
+CREATE INDEX IF NOT EXISTS laps_team          ON laps (team, session_id);
+CREATE INDEX IF NOT EXISTS laps_driver        ON laps (driver, session_id);
+CREATE INDEX IF NOT EXISTS laps_session       ON laps (session_id);
+CREATE INDEX IF NOT EXISTS stints_team        ON stints (team, session_id);
+CREATE INDEX IF NOT EXISTS stints_session     ON stints (session_id);
+CREATE INDEX IF NOT EXISTS long_runs_team     ON long_runs (team, session_id);
+CREATE INDEX IF NOT EXISTS long_runs_driver   ON long_runs (driver, session_id);
+CREATE INDEX IF NOT EXISTS long_runs_session  ON long_runs (session_id);
+CREATE INDEX IF NOT EXISTS sector_bests_team  ON sector_bests (team, session_id);
+CREATE INDEX IF NOT EXISTS sector_bests_session ON sector_bests (session_id);
+CREATE INDEX IF NOT EXISTS speed_traps_team   ON speed_traps (team, session_id);
+CREATE INDEX IF NOT EXISTS speed_traps_session ON speed_traps (session_id);
+"""
+
+
+def session_code(session) -> str:
+    """'Practice 2' → 'FP2' (unknown names are kept as they are)."""
+    return SESSION_CODES.get(session.name, session.name)
+
+
+def _seconds(series: pd.Series) -> pd.Series:
+    return pd.to_timedelta(series).dt.total_seconds()
+
+
+# -----------------------------------------------------------------------------
+# 1. Session → table rows
+# -----------------------------------------------------------------------------
+
+def _lap_rows(session) -> pd.DataFrame:
+    laps = classify_runs(session, use_telemetry=False)
+    return pd.DataFrame({
+        'driver':       laps['Driver'],
+        'team':         laps['Team'],
+        'lap_number':   laps['LapNumber'],
+        'stint':        laps['Stint'],
+        'compound':     laps['Compound'],
+        'tyre_life':    laps['TyreLife'],
+        'lap_time':     _seconds(laps['LapTime']),
+        'sector1':      _seconds(laps['Sector1Time']),
+        'sector2':      _seconds(laps['Sector2Time']),
+        'sector3':      _seconds(laps['Sector3Time']),
+        'speed_i1':     laps['SpeedI1'],
+        'speed_i2':     laps['SpeedI2'],
+        'speed_fl':     laps['SpeedFL'],
+        'speed_st':     laps['SpeedST'],
+        'session_time': _seconds(laps['Time']),
+        'pit_in':       laps['PitInTime'].notna().astype(int),
+        'pit_out':      laps['PitOutTime'].notna().astype(int),
+        'is_accurate':  laps['IsAccurate'].fillna(False).astype(int),
+        'programme':    laps['Programme'],
+    })
+
+
+def _stint_rows(lap_rows: pd.DataFrame) -> pd.DataFrame:
+    timed = lap_rows[(lap_rows['pit_in'] == 0) & (lap_rows['pit_out'] == 0)]
+    g = lap_rows.dropna(subset=['stint']).groupby(['driver', 'team', 'stint'])
+    stints = g.agg(compound=('compound', lambda c: c.dropna().mode().iloc[0] if c.notna().any() else None),
+                   laps=('lap_number', 'size'), first_lap=('lap_number', 'min')).reset_index()
+    pace = (timed.groupby(['driver', 'stint'])['lap_time']
+                 .agg(mean_lap='mean', best_lap='min').reset_index())
+    return stints.merge(pace, on=['driver', 'stint'], how='left')
+
+
+def _long_run_rows(session) -> pd.DataFrame:
+    df = extract_long_run_laps(session)
+    if df.empty:
+        return pd.DataFrame(columns=['driver', 'team', 'stint', 'compound', 'stint_lap', 'lap_time'])
+    return pd.DataFrame({
+        'driver': df['Driver'], 'team': df['Team'], 'stint': df['Stint'],
+        'compound': df['Compound'], 'stint_lap': df['StintLap'], 'lap_time': df['LapTimeSeconds'],
+    })
+
+
+def _sector_rows(session) -> pd.DataFrame:
+    df = compute_sector_ranking(session)
+    teams = session.laps.drop_duplicates('Driver').set_index('Driver')['Team']
+    return pd.DataFrame({
+        'driver': df['Driver'], 'team': df['Driver'].map(teams),
+        'sector': df['Sector'], 'time': _seconds(df['Time']),
+    })
+
+
+def _speed_trap_rows(session) -> pd.DataFrame:
+    df = compute_speed_traps(session, telemetry_fallback=False)
+    return pd.DataFrame({
+        'driver': df['Driver'], 'team': df['Team'], 'lap_number': df['LapNumber'],
+        'trap': df['Trap'], 'speed': df['Speed'],
+    })
+
+
+# -----------------------------------------------------------------------------
+# 2. Database
+# -----------------------------------------------------------------------------
+
+class SeasonDB:
+    """SQLite store of session summaries (see module docstring)."""
+
+    def __init__(self, path: str = config.SEASON_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Ingestion ---
+
+    def has_session(self, year: int, event: str, session: str) -> bool:
+        row = self.conn.execute(
+            'SELECT 1 FROM sessions WHERE year = ? AND event = ? AND session = ?',
+            (int(year), event, session)).fetchone()
+        return row is not None
+
+    def ingest_session(self, session) -> int:
+        """
+        Store one loaded session (laps only; no telemetry needed).
+        Replaces earlier rows of the same session. Returns the session_id.
+        """
+        start = time.perf_counter()
+        year = int(session.event.year)
+        event = session.event.EventName
+        code = session_code(session)
+
+        # Derive everything first, so a failing step leaves the DB untouched
+        laps = _lap_rows(session)
+        tables = {
+            'laps':         laps,
+            'stints':       _stint_rows(laps),
+            'long_runs':    _long_run_rows(session),
+            'sector_bests': _sector_rows(session),
+            'speed_traps':  _speed_trap_rows(session),
+        }
+
+        with self.conn:
+            self.conn.execute('DELETE FROM sessions WHERE year = ? AND event = ? AND session = ?',
+                              (year, event, code))
+            cur = self.conn.execute(
+                'INSERT INTO sessions (year, round, event, session, session_name, ingested_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (year, int(session.event.RoundNumber), event, code, session.name,
+                 pd.Timestamp.now().isoformat(timespec='seconds')))
+            session_id = cur.lastrowid
+            for name, df in tables.items():
+                if not df.empty:
+                    df.assign(session_id=session_id).to_sql(name, self.conn, if_exists='append',
+                                                            index=False)
+
+        print(f"[System] Season DB: {year} {event} {code} — {len(laps)} laps "
+              f"({time.perf_counter() - start:.1f}s)")
+        return session_id
+
+    def ingest_season(self, year: int, session_types=('FP1', 'FP2', 'FP3'),
+                      loader=None, refresh: bool = False) -> int:
+        """
+        Ingest every event of a season (testing excluded) through `loader`
+        (default: a new SessionLoader). Sessions already stored are skipped
+        unless refresh=True. Returns the number of sessions ingested.
+        """
+        if loader is None:
+            from practice.session_loader import SessionLoader
+            loader = SessionLoader()
+
+        schedule = fastf1.get_event_schedule(year, include_testing=False)
+        count = 0
+        for _, event in schedule.iterrows():
+            for code in session_types:
+                if not refresh and self.has_session(year, event['EventName'], code):
+                    continue
+                try:
+                    session = loader.ensure(year, event['EventName'], code, parts=('laps',))
+                    self.ingest_session(session)
+                    loader.forget(year, event['EventName'], code)
+                    count += 1
+                except Exception as e:
+                    print(f"[Warning] Season DB: {year} {event['EventName']} {code} skipped ({e})")
+        return count
+
+    # --- Queries ---
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        """Run any SELECT against the store."""
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def sessions(self, year: int | None = None) -> pd.DataFrame:
+        sql = 'SELECT * FROM sessions'
+        params = ()
+        if year is not None:
+            sql += ' WHERE year = ?'
+            params = (int(year),)
+        return self.query(sql + ' ORDER BY year, round, session', params)
+
+    @staticmethod
+    def _who(team, driver) -> tuple:
+        """Outer WHERE clause and parameters for optional team / driver filters."""
+        clauses, params = [], []
+        if team is not None:
+            clauses.append('team = ?')
+            params.append(team)
+        if driver is not None:
+            clauses.append('driver = ?')
+            params.append(driver)
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def long_run_pace(self, year: int, session: str = 'FP2', team: str | None = None,
+                      driver: str | None = None, compound: str | None = None) -> pd.DataFrame:
+        """
+        Long-run pace per event and team (per driver when `driver` is given).
+
+        Columns: round, event, team [, driver], laps, mean_lap, best_lap,
+                 gap_to_best (s behind the quickest team / driver of the event).
+        `compound` restricts the laps to one tyre before averaging.
+        """
+        keys = 'l.team, l.driver' if driver is not None else 'l.team'
+        tyre = 'AND l.compound = ?' if compound is not None else ''
+        where, params = self._who(team, driver)
+        sql = f"""
+            SELECT * FROM (
+                SELECT s.round, s.event, {keys},
+                       COUNT(*) AS laps, AVG(l.lap_time) AS mean_lap, MIN(l.lap_time) AS best_lap,
+                       AVG(l.lap_time) - MIN(AVG(l.lap_time)) OVER (PARTITION BY s.session_id)
+                           AS gap_to_best
+                FROM long_runs l JOIN sessions s USING (session_id)
+                WHERE s.year = ? AND s.session = ? {tyre}
+                GROUP BY s.session_id, {keys}
+            ) {where}
+            ORDER BY round, mean_lap
+        """
+        head = [int(year), session] + ([compound] if compound is not None else [])
+        return self.query(sql, head + params)
+
+    def best_laps(self, year: int, session: str, team: str | None = None,
+                  driver: str | None = None) -> pd.DataFrame:
+        """
+        Fastest lap per event and driver.
+        Columns: round, event, team, driver, best_lap, gap (s to the session best).
+        """
+        where, params = self._who(team, driver)
+        sql = f"""
+            SELECT * FROM (
+                SELECT s.round, s.event, l.team, l.driver, MIN(l.lap_time) AS best_lap,
+                       MIN(l.lap_time) - MIN(MIN(l.lap_time)) OVER (PARTITION BY s.session_id)
+                           AS gap
+                FROM laps l JOIN sessions s USING (session_id)
+                WHERE s.year = ? AND s.session = ? AND l.lap_time IS NOT NULL
+                GROUP BY s.session_id, l.driver
+            ) {where}
+            ORDER BY round, best_lap
+        """
+        return self.query(sql, [int(year), session] + params)
+
+    def top_speeds(self, year: int, session: str, trap: str = 'ST',
+                   team: str | None = None) -> pd.DataFrame:
+        """Maximum speed per event and team at one trap (I1, I2, FL, ST)."""
+        where, params = self._who(team, None)
+        sql = f"""
+            SELECT * FROM (
+                SELECT s.round, s.event, t.team, MAX(t.speed) AS top_speed, COUNT(*) AS laps
+                FROM speed_traps t JOIN sessions s USING (session_id)
+                WHERE s.year = ? AND s.session = ? AND t.trap = ?
+                GROUP BY s.session_id, t.team
+            ) {where}
+            ORDER BY round, top_speed DESC
+        """
+        return self.query(sql, [int(year), session, trap] + params)
+
+
+# -----------------------------------------------------------------------------
+# 3. Menu wrapper
+# -----------------------------------------------------------------------------
+
+def analyze_season_db(session, team: str | None = None, path: str = config.SEASON_DB_PATH):
+    """
+    [Feature] Season Database
+    - Stores the current session in the season database
+    - Prints the long-run pace of every stored event of this season / session
+      type (one team when `team` is given, else the leading team per event)
+    Returns the long_run_pace table.
+    """
+    print(f"\n[Season DB] Storing session in {path}...")
+    with SeasonDB(path) as db:
+        db.ingest_session(session)
+        year, code = int(session.event.year), session_code(session)
+        df = db.long_run_pace(year, code, team=team or None)
+        stored = len(db.sessions(year))
+
+    if df.empty:
+        print(f"[Warning] No long-run laps stored for {year} {code}.")
+        return df
+    if not team:
+        df = df[df['gap_to_best'] == 0.0]
+    print(f"[System] {stored} session(s) of {year} stored.")
+    print(df.round(3).to_string(index=False))
+    return df
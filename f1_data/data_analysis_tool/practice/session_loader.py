@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+session_loader.py
+Selective & concurrent FastF1 session loading.
+
+`Session.load()` without arguments pulls laps, telemetry, weather and race
+control messages in one blocking call. Most analyses only need a subset:
+lap gap / sector ranking / long runs work from the laps table alone, while
+dominance, downforce and export need car telemetry.
+
+This module lets every analysis declare the data parts it needs
+(ANALYSIS_DATA_PARTS) and loads only the missing parts on demand. Sessions
+can also be prefetched in a background thread pool, so the heavy telemetry
+download runs while the user is still looking at the menu.
+
+`Session.load()` rewrites the laps table and driver results even when only
+telemetry is requested. Once the laps are loaded, telemetry (and weather) are
+therefore loaded on a separate Session object and only its car / position
+streams are moved into the live session, so lap-only analyses never wait for
+the telemetry download. `ensure()` waits for the prefetches in flight that
+rewrite the live session or load one of the requested parts.
+
+Usage:
+>>> loader = SessionLoader()
+>>> session = loader.ensure(2024, 'Mexico City Grand Prix', 'FP2', parts=('laps',))
+>>> loader.prefetch(session, ANALYSIS_DATA_PARTS['dominance'])   # background
+>>> session = loader.ensure(session, ANALYSIS_DATA_PARTS['dominance'])  # waits if needed
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_for
+
+import fastf1
+
+from practice import config
+from practice.f1_colors import clear_driver_index
+from practice.low_memory import shrink_session
+
+# -----------------------------------------------------------------------------
+# 1. Data part declarations
+# -----------------------------------------------------------------------------
+# Names match the keyword arguments of fastf1.core.Session.load()
+DATA_PARTS = ('laps', 'telemetry', 'weather', 'messages')
+
+# Data parts required by each analysis (key = analysis name used by main.py)
+ANALYSIS_DATA_PARTS = {
+    'lap_gap':           ('laps',),
+    'sector_ranking':    ('laps',),
+    'telemetry_metrics': ('laps', 'telemetry'),
+    'dominance':         ('laps', 'telemetry'),
+    'grid_overlay':      ('laps', 'telemetry'),
+    'export':            ('laps', 'telemetry'),
+    'downforce':         ('laps', 'telemetry'),
+    'downforce_laps':    ('laps',),
+    'speed_traps':       ('laps',),
+    'long_runs':         ('laps',),
+    'strategy':          ('laps',),
+    'track_evolution':   ('laps', 'weather'),
+    'html_report':       ('laps', 'telemetry'),
+    'traffic':           ('laps', 'telemetry'),
+    'race':              ('laps',),
+    'season_db':         ('laps',),
+    'run_compare':       ('laps', 'telemetry'),
+    'braking':           ('laps', 'telemetry'),
+    'powertrain':        ('laps', 'telemetry'),
+    'team_evolution':    ('laps', 'telemetry'),
+    'drs':               ('laps', 'telemetry'),
+    'quality':           ('laps', 'telemetry'),
+}
+
+# Default number of sessions that may be downloaded in parallel
+DEFAULT_MAX_WORKERS = 4
+
+# Parts loaded on a separate Session once the laps are in, and the FastF1
+# attributes then moved into the live session
+_DETACHED_ATTRS = {
+    'telemetry': ('_car_data', '_pos_data', '_t0_date'),
+    'weather':   ('_weather_data',),
+}
+
+
+def _normalize_parts(parts) -> tuple:
+    """Validate part names and add implicit dependencies.
+
+    Telemetry is sliced per lap (`Lap.get_telemetry`), so it always
+    requires the laps table as well. Laps come with race control messages:
+    FastF1 flags deleted laps (track limits) from them only when both are
+    loaded in the same call.
+    """
+    parts = set(parts or ())
+    unknown = parts - set(DATA_PARTS)
+    if unknown:
+        raise ValueError(f"Unknown data part(s): {sorted(unknown)}. "
+                         f"Valid parts: {DATA_PARTS}")
+    if 'telemetry' in parts:
+        parts.add('laps')
+    if 'laps' in parts:
+        parts.add('messages')
+    return tuple(p for p in DATA_PARTS if p in parts)
+
+
+# -----------------------------------------------------------------------------
+# 2. Loader
+# -----------------------------------------------------------------------------
+
+class SessionLoader:
+    """
+    Keeps FastF1 session objects and tracks which data parts are loaded.
+
+    - One lock per session: a foreground `ensure()` call simply waits for a
+      background `prefetch()` of the same session instead of downloading twice,
+      even when the prefetch asked for parts the caller does not need.
+    - Different sessions load concurrently on a thread pool.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='session-loader')
+        self._guard = threading.Lock()
+        self._sessions = {}    # {key: Session}
+        self._loaded = {}      # {key: set of loaded parts}
+        self._locks = {}       # {key: threading.Lock}
+        self._keys = {}        # {id(Session): key}
+        self._pending = {}     # {key: {prefetch Future in flight: parts it writes}}
+        self._detached_locks = {}  # {key: threading.Lock} for detached loads
+
+    # --- Session bookkeeping ---------------------------------------------
+
+    def get_session(self, year: int, gp, session_type: str):
+        """Return the (possibly unloaded) session object for the given key."""
+        key = (int(year), gp, session_type)
+        with self._guard:
+            session = self._sessions.get(key)
+            if session is None:
+                session = fastf1.get_session(year, gp, session_type)
+                self._sessions[key] = session
+                self._loaded[key] = set()
+                self._locks[key] = threading.Lock()
+                self._detached_locks[key] = threading.Lock()
+                self._keys[id(session)] = key
+            return session
+
+    def _resolve(self, session_or_year, gp=None, session_type=None):
+        if gp is None and session_type is None:
+            key = self._keys.get(id(session_or_year))
+            if key is None:
+                raise ValueError("Session was not created by this loader.")
+            return key
+        self.get_session(session_or_year, gp, session_type)
+        return (int(session_or_year), gp, session_type)
+
+    def loaded_parts(self, session) -> tuple:
+        """Data parts that are already loaded for `session`."""
+        key = self._resolve(session)
+        return tuple(p for p in DATA_PARTS if p in self._loaded[key])
+
+    # --- Loading ---------------------------------------------------------
+
+    def _detached(self, key, parts) -> tuple | None:
+        """
+        Missing `parts` if they can load on a separate Session (laps already
+        loaded, only telemetry / weather missing), else None.
+        """
+        loaded = self._loaded[key]
+        missing = tuple(p for p in parts if p not in loaded)
+        if 'laps' in loaded and set(missing) <= set(_DETACHED_ATTRS):
+            return missing
+        return None
+
+    def _load(self, key, parts):
+        session = self._sessions[key]
+        with self._locks[key]:
+            missing = [p for p in parts if p not in self._loaded[key]]
+            if not missing:
+                return session
+            if self._detached(key, parts) is None:
+                self._load_parts(key, session, missing)
+                self._loaded[key].update(missing)
+                # Session.load() replaced results and laps: team names may differ
+                clear_driver_index(session)
+                return session
+        return self._load_detached(key, parts)
+
+    def _load_parts(self, key, session, missing):
+        """Session.load() of the `missing` parts only, with progress output."""
+        year, gp, session_type = key
+        print(f"[System] Loading {'/'.join(missing)} for "
+              f"{year} {gp} - {session_type}...")
+        start = time.perf_counter()
+        session.load(**{p: (p in missing) for p in DATA_PARTS})
+        print(f"[System] Loaded {'/'.join(missing)} for "
+              f"{year} {gp} - {session_type} "
+              f"in {time.perf_counter() - start:.1f}s")
+        if config.LOW_MEMORY_MODE and 'telemetry' in missing:
+            saved = shrink_session(session)
+            print(f"[System] Low-memory mode: telemetry downcast ({saved:.0f} MB freed)")
+
+    def _load_detached(self, key, parts):
+        """
+        Load telemetry / weather on a fresh Session and move the streams into
+        the live one: the live laps table is never rewritten, so readers of
+        the laps do not have to wait for the download.
+        """
+        session = self._sessions[key]
+        with self._detached_locks[key]:
+            with self._locks[key]:
+                missing = [p for p in parts if p not in self._loaded[key]]
+            if not missing:
+                return session
+            shadow = fastf1.get_session(*key)
+            self._load_parts(key, shadow, missing)
+            with self._locks[key]:
+                for part in missing:
+                    for attr in _DETACHED_ATTRS[part]:
+                        if hasattr(shadow, attr):
+                            setattr(session, attr, getattr(shadow, attr))
+                if 'telemetry' in missing:
+                    # Streams point back at their session (Telemetry.session)
+                    for attr in ('_car_data', '_pos_data'):
+                        for tel in getattr(session, attr, {}).values():
+                            tel.session = session
+                    laps = getattr(session, '_laps', None)
+                    if laps is not None and getattr(session, '_t0_date', None) is not None:
+                        laps['LapStartDate'] = laps['LapStartTime'] + session._t0_date
+                self._loaded[key].update(missing)
+        return session
+
+    def ensure(self, session_or_year, gp=None, session_type=None, parts=('laps',)):
+        """
+        Block until `parts` are loaded and no prefetch rewriting the session
+        is still running, then return the session.
+
+        A prefetch loading telemetry next to already loaded laps only holds
+        up callers that need telemetry. Accepts either a session created by
+        this loader or a (year, gp, session_type) key.
+        """
+        key = self._resolve(session_or_year, gp, session_type)
+        parts = _normalize_parts(parts)
+        with self._guard:
+            pending = [f for f, writes in self._pending.get(key, {}).items()
+                       if writes is None or set(writes) & set(parts)]
+        # A failed prefetch surfaces when its parts are ensured, not here
+        wait_for(pending)
+        return self._load(key, parts)
+
+    def prefetch(self, session_or_year, gp=None, session_type=None, parts=('laps',)):
+        """Start loading `parts` in the background. Returns a Future."""
+        key = self._resolve(session_or_year, gp, session_type)
+        parts = _normalize_parts(parts)
+        with self._guard:
+            # None: the load rewrites the live session (laps, results)
+            writes = self._detached(key, parts)
+            future = self._executor.submit(self._load, key, parts)
+            self._pending.setdefault(key, {})[future] = writes
+        future.add_done_callback(lambda f: self._prefetch_done(key, f))
+        return future
+
+    def _prefetch_done(self, key, future):
+        with self._guard:
+            self._pending.get(key, {}).pop(future, None)
+
+    def prefetch_many(self, keys, parts=('laps',)) -> dict:
+        """
+        Prefetch several sessions concurrently.
+        `keys`: iterable of (year, gp, session_type). Returns {key: Future}.
+        """
+        return {tuple(k): self.prefetch(*k, parts=parts) for k in keys}
+
+    def drop_parts(self, session, parts):
+        """
+        Mark `parts` as not loaded after their data was released
+        (low_memory.release_telemetry); the next ensure() reloads them.
+        """
+        key = self._resolve(session)
+        with self._locks[key]:
+            self._loaded[key].difference_update(parts)
+
+    def forget(self, session_or_year, gp=None, session_type=None):
+        """Drop a session so its memory can be reclaimed (e.g. LRU eviction)."""
+        if gp is None and session_type is None:
+            key = self._keys.get(id(session_or_year))
+        else:
+            key = (int(session_or_year), gp, session_type)
+        with self._guard:
+            session = self._sessions.pop(key, None)
+            self._loaded.pop(key, None)
+            self._locks.pop(key, None)
+            self._detached_locks.pop(key, None)
+            self._pending.pop(key, None)
+            if session is not None:
+                self._keys.pop(id(session), None)
+
+    def shutdown(self, wait: bool = False):
+        """Stop the worker pool (pending prefetches are cancelled)."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
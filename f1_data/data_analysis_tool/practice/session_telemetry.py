@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+session_telemetry.py
+Car data of many laps as one concatenated frame.
+
+Lap-by-lap lap.get_car_data() slices and copies the driver stream once per lap,
+which dominates whole-session analyses. Here every driver stream
+(session.car_data) is cut into laps with one searchsorted over all lap windows,
+and per-lap quantities (time into lap, integrated distance) come from cumulative
+sums reset at lap starts, so downstream code can work on flat arrays:
+
+    LapIndex   label of the lap in `laps` (join key back to the laps table)
+    Driver, LapNumber
+    SessionTime, Time   seconds (session / into the lap)
+    Distance            m, integrated from Speed per lap
+    + requested channels (Speed, Throttle, Brake, nGear, RPM, DRS)
+
+Samples with missing or non-increasing SessionTime are dropped and channel
+values outside QUALITY_CHANNEL_RANGES become NaN (see telemetry_quality).
+"""
+
+import numpy as np
+import pandas as pd
+
+from practice import config
+from practice.low_memory import release_driver_telemetry
+
+CAR_CHANNELS = ('Speed', 'Throttle', 'Brake', 'nGear', 'RPM', 'DRS')
+
+
+def lap_boundaries(lap_id: np.ndarray) -> tuple:
+    """(first, last) boolean masks of the samples that open / close a lap."""
+    change = np.r_[True, lap_id[1:] != lap_id[:-1]]
+    return change, np.r_[change[1:], True]
+
+
+def concat_session_telemetry(session, laps=None, channels=CAR_CHANNELS,
+                             release: bool = False) -> pd.DataFrame:
+    """
+    Car data of every lap in `laps` (default: session.laps) in one frame,
+    ordered by driver and session time (columns: see module docstring).
+    Empty DataFrame without car data. `release`: drop each driver's streams
+    from the session once its laps are cut (low-memory mode, last reader).
+    """
+    channels = list(channels)
+    columns = ['LapIndex', 'Driver', 'LapNumber', 'SessionTime', 'Time', 'Distance'] + channels
+    laps = (session.laps if laps is None else laps).dropna(subset=['LapStartTime', 'Time'])
+    try:
+        car_data = session.car_data
+    except Exception:
+        return pd.DataFrame(columns=columns)
+
+    frames = []
+    for drv_num, drv_laps in laps.groupby('DriverNumber'):
+        tel = car_data.get(str(drv_num))
+        if tel is None or tel.empty:
+            continue
+        t = tel['SessionTime'].dt.total_seconds().to_numpy()
+        keep = ~np.isnan(t)
+        keep[keep] = np.r_[True, np.diff(np.maximum.accumulate(t[keep])) > 0]
+        t = t[keep]
+
+        drv_laps = drv_laps.sort_values('LapStartTime')
+        starts = drv_laps['LapStartTime'].dt.total_seconds().to_numpy()
+        ends = drv_laps['Time'].dt.total_seconds().to_numpy()
+        # Half-open windows [start, end): a boundary sample belongs to the next lap only
+        lo = np.searchsorted(t, starts, side='left')
+        hi = np.maximum(np.searchsorted(t, ends, side='left'), lo)
+        counts = hi - lo
+        if counts.sum() == 0:
+            continue
+
+        # Sample positions of all laps at once: lo[k] … hi[k] - 1 for every lap k
+        lap_k = np.repeat(np.arange(len(lo)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pos = lo[lap_k] + offsets
+
+        frame = {
+            'LapIndex':    drv_laps.index.to_numpy()[lap_k],
+            'Driver':      drv_laps['Driver'].iloc[0],
+            'LapNumber':   drv_laps['LapNumber'].to_numpy()[lap_k],
+            'SessionTime': t[pos],
+            'Time':        t[pos] - starts[lap_k],
+        }
+        for ch in channels:
+            if ch not in tel.columns:
+                frame[ch] = np.nan
+                continue
+            values = tel[ch].to_numpy()[keep][pos]
+            if ch in config.QUALITY_CHANNEL_RANGES:
+                low, high = config.QUALITY_CHANNEL_RANGES[ch]
+                values = values.astype(float)
+                values[(values < low) | (values > high)] = np.nan
+            frame[ch] = values
+        df = pd.DataFrame(frame)
+
+        # Distance: trapezoid integral of Speed, restarted at every lap start
+        first, _ = lap_boundaries(lap_k)
+        v = pd.Series(df['Speed'].to_numpy(dtype=float) if 'Speed' in df else
+                      np.full(len(df), np.nan)).interpolate(limit_direction='both').to_numpy()
+        step = np.r_[0.0, np.diff(df['SessionTime'].to_numpy()) * (v[1:] + v[:-1]) / 2 / 3.6]
+        step[first] = 0.0
+        total = np.cumsum(step)
+        df['Distance'] = total - np.repeat(total[first], counts[counts > 0])
+        frames.append(df)
+        if release:
+            del tel
+            release_driver_telemetry(session, [drv_num])
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+team_evolution.py
+One team at one circuit across several seasons (e.g. Alpine, Mexico FP2 2023-2025).
+
+Every season's session is reduced once to a small summary of all drivers and
+cached on disk (TEAM_EVOLUTION_CACHE_DIR), so adding a season only loads and
+processes the new session; switching team reuses every cached summary.
+Sessions that are not cached yet are loaded concurrently.
+
+Session summary (all drivers, fastest lap each):
+    laps      LapTime, Sector1-3 (s), GapToPole (s / %), LapLength (m)
+    traps     max speed per trap (practice_speedtrap)
+    sections  Full / Partial Throttle, Braking, Lift (% of lap time)
+    trace     Speed on a normalised lap-distance grid (0 … 1)
+
+Resampling on the *fraction* of the lap (instead of metres) keeps traces of
+different years aligned when the layout or the measured lap length changed;
+laps whose length differs by more than TRACK_GEOMETRY_LAYOUT_TOLERANCE from
+the latest season are flagged (LayoutChanged), since sector boundaries may
+have moved as well.
+
+Usage:
+>>> seasons = load_season_summaries('Mexico City Grand Prix', 'FP2', [2023, 2024, 2025])
+>>> result = compute_team_evolution(seasons, 'Alpine')
+"""
+
+import os
+import pickle
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import fastf1
+import fastf1.plotting
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Setup
+fastf1.plotting.setup_mpl()
+
+from practice import config
+from practice.practice_dominance import analyze_lap_sections
+from practice.practice_speedtrap import compute_speed_traps
+from practice.save_utils import save_figures
+from practice.session_loader import ANALYSIS_DATA_PARTS
+from practice.telemetry_quality import clean_lap_telemetry
+
+SECTIONS = ('Full Throttle', 'Partial Throttle', 'Braking', 'Lift (Coasting)')
+
+# Bump when the summary layout changes: older cache files are rebuilt
+_CACHE_VERSION = 1
+
+
+# =========================================================
+# 1. Session Summary (cached per season)
+# =========================================================
+
+def _fastest_per_driver(session):
+    laps = session.laps.dropna(subset=['LapTime'])
+    return laps.loc[laps.groupby('Driver')['LapTime'].idxmin()].sort_values('LapTime')
+
+
+def summarize_session(session) -> dict:
+    """
+    Reduce a loaded session (laps + telemetry) to the season summary of every
+    driver (see module docstring). Drivers without usable car data keep their
+    lap / sector / trap rows but have no sections or trace.
+    """
+    fastest = _fastest_per_driver(session)
+    grid = np.linspace(0.0, 1.0, config.TEAM_EVOLUTION_GRID_POINTS)
+    pole = fastest['LapTime'].min().total_seconds() if not fastest.empty else np.nan
+
+    rows, sections, traces = [], [], []
+    for _, lap in fastest.iterrows():
+        lap_time = lap['LapTime'].total_seconds()
+        row = {'Driver': lap['Driver'], 'Team': lap['Team'], 'LapTime': lap_time,
+               'GapToPole': lap_time - pole, 'GapToPolePct': (lap_time / pole - 1.0) * 100.0,
+               'LapLength': np.nan}
+        for k in (1, 2, 3):
+            row[f'Sector{k}'] = lap[f'Sector{k}Time'].total_seconds()
+        try:
+            tel = clean_lap_telemetry(lap)
+            length = float(tel['Distance'].max())
+            if not length > 0:
+                raise ValueError("no distance")
+            row['LapLength'] = length
+            sections.append({'Driver': lap['Driver'], 'Team': lap['Team'],
+                             **analyze_lap_sections(lap, tel)})
+            traces.append(pd.DataFrame({
+                'Driver': lap['Driver'], 'Team': lap['Team'], 'Fraction': grid,
+                'Speed': np.interp(grid, tel['Distance'].to_numpy(dtype=float) / length,
+                                   tel['Speed'].to_numpy(dtype=float)),
+            }))
+        except Exception as e:
+            print(f"[Warning] {session.event.year} {lap['Driver']}: no usable car data ({e})")
+        rows.append(row)
+
+    traps = compute_speed_traps(session, telemetry_fallback=False)
+    traps = traps.groupby(['Driver', 'Team', 'Trap'], as_index=False)['Speed'].max()
+
+    return {
+        'version':  _CACHE_VERSION,
+        'year':     int(session.event.year),
+        'event':    session.event['EventName'],
+        'session':  session.name,
+        'laps':     pd.DataFrame(rows),
+        'traps':    traps,
+        'sections': pd.DataFrame(sections, columns=['Driver', 'Team', *SECTIONS]),
+        'trace':    (pd.concat(traces, ignore_index=True) if traces else
+                     pd.DataFrame(columns=['Driver', 'Team', 'Fraction', 'Speed'])),
+    }
+
+
+def summary_path(year: int, gp, session_type: str,
+                 cache_dir: str | None = None) -> str:
+    """Cache file of one season: <year>_<gp>_<session>.pkl (spaces → '_')."""
+    cache_dir = config.TEAM_EVOLUTION_CACHE_DIR if cache_dir is None else cache_dir
+    gp_slug = re.sub(r'[^A-Za-z0-9]+', '_', str(gp)).strip('_')
+    return os.path.join(cache_dir, f"{int(year)}_{gp_slug}_{session_type.upper()}.pkl")
+
+
+def _read_summary(path: str) -> dict | None:
+    try:
+        with open(path, 'rb') as f:
+            summary = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    return summary if summary.get('version') == _CACHE_VERSION else None
+
+
+def _build_summary(loader, year: int, gp, session_type: str, path: str, current=None) -> dict:
+    if current is not None:
+        summary = summarize_session(current)
+    else:
+        key = (year, gp, session_type)
+        session = loader.ensure(*key, parts=ANALYSIS_DATA_PARTS['team_evolution'])
+        try:
+            summary = summarize_session(session)
+        finally:
+            # Only the summary is kept; the full session would hold ~1 GB of telemetry
+            loader.forget(*key)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(summary, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return summary
+
+
+def load_season_summaries(gp, session_type: str, years, loader=None, refresh: bool = False,
+                          current=None,
+                          cache_dir: str | None = None) -> dict:
+    """
+    {year: summary} for the same event and session type in every year.
+    Cached seasons are read from disk; the others are loaded concurrently
+    (`loader`: SessionLoader / RecordedSessionLoader, default a new
+    SessionLoader) and cached. Seasons that fail to load are skipped.
+    `current`: an already loaded session (laps + telemetry) of one of the
+    years — summarized directly and left in its loader.
+    """
+    cache_dir = config.TEAM_EVOLUTION_CACHE_DIR if cache_dir is None else cache_dir
+    current_year = int(current.event.year) if current is not None else None
+    summaries, missing = {}, []
+    for year in sorted({int(y) for y in years}):
+        cached = None if refresh else _read_summary(summary_path(year, gp, session_type, cache_dir))
+        if cached is not None:
+            summaries[year] = cached
+        else:
+            missing.append(year)
+    if summaries:
+        print(f"[System] Cached seasons: {', '.join(map(str, summaries))}")
+    if not missing:
+        return summaries
+
+    own_loader = loader is None
+    if own_loader:
+        from practice.session_loader import SessionLoader
+        loader = SessionLoader()
+    print(f"[System] Loading {gp} {session_type} for {', '.join(map(str, missing))}...")
+    try:
+        with ThreadPoolExecutor(max_workers=config.TEAM_EVOLUTION_MAX_WORKERS,
+                                thread_name_prefix='team-evolution') as executor:
+            futures = {executor.submit(_build_summary, loader, year, gp, session_type,
+                                       summary_path(year, gp, session_type, cache_dir),
+                                       current if year == current_year else None): year
+                       for year in missing}
+            for future in as_completed(futures):
+                year = futures[future]
+                try:
+                    summaries[year] = future.result()
+                except Exception as e:
+                    print(f"[Warning] {year} {gp} {session_type} skipped: {e}")
+    finally:
+        if own_loader:
+            loader.shutdown()
+    return dict(sorted(summaries.items()))
+
+
+# =========================================================
+# 2. Team Evolution
+# =========================================================
+
+def _team_rows(df: pd.DataFrame, team: str) -> pd.DataFrame:
+    return df[df['Team'].astype(str).str.lower() == team.lower()]
+
+
+def compute_team_evolution(summaries: dict, team: str) -> dict:
+    """
+    Year-over-year tables of `team` from load_season_summaries output.
+    Returns a dict of DataFrames (empty if the team is in no season):
+
+    laps      Year, Driver, LapTime, GapToPole, GapToPolePct, Rank (team's best lap
+              among all drivers), LapLength, LayoutChanged
+    sectors   Year, Sector, Team (best), Best (session best), Delta (s),
+              DeltaToPrevYear (s, team best vs previous season)
+    traps     Year, Trap, Team (max), Best (session max), Delta (km/h)
+    sections  Year, Driver, Full Throttle, Partial Throttle, Braking, Lift (Coasting)
+    traces    Year, Driver, Fraction, Speed (team's fastest lap)
+    """
+    laps, sectors, traps, sections, traces = [], [], [], [], []
+    for year, s in sorted(summaries.items()):
+        all_laps = s['laps']
+        own = _team_rows(all_laps, team)
+        if own.empty:
+            continue
+        best = own.loc[own['LapTime'].idxmin()]
+        laps.append({'Year': year, 'Driver': best['Driver'], 'LapTime': best['LapTime'],
+                     'GapToPole': best['GapToPole'], 'GapToPolePct': best['GapToPolePct'],
+                     'Rank': int((all_laps['LapTime'] < best['LapTime']).sum()) + 1,
+                     'LapLength': best['LapLength']})
+        for k in (1, 2, 3):
+            col = f'Sector{k}'
+            sectors.append({'Year': year, 'Sector': f'S{k}', 'Team': own[col].min(),
+                            'Best': all_laps[col].min()})
+
+        all_traps = s['traps']
+        own_traps = _team_rows(all_traps, team).groupby('Trap')['Speed'].max()
+        for trap, speed in own_traps.items():
+            traps.append({'Year': year, 'Trap': trap, 'Team': speed,
+                          'Best': all_traps.loc[all_traps['Trap'] == trap, 'Speed'].max()})
+
+        sec = s['sections']
+        sections.append(sec[sec['Driver'] == best['Driver']].drop(columns='Team')
+                           .assign(Year=year))
+        tr = s['trace']
+        traces.append(tr[tr['Driver'] == best['Driver']].drop(columns='Team').assign(Year=year))
+
+    if not laps:
+        return {k: pd.DataFrame() for k in ('laps', 'sectors', 'traps', 'sections', 'traces')}
+
+    laps = pd.DataFrame(laps)
+    reference = laps['LapLength'].dropna()
+    reference = reference.iloc[-1] if not reference.empty else np.nan
+    laps['LayoutChanged'] = ((laps['LapLength'] - reference).abs()
+                             > reference * config.TRACK_GEOMETRY_LAYOUT_TOLERANCE)
+
+    sectors = pd.DataFrame(sectors)
+    sectors['Delta'] = sectors['Team'] - sectors['Best']
+    sectors['DeltaToPrevYear'] = sectors.groupby('Sector')['Team'].diff()
+
+    traps = pd.DataFrame(traps, columns=['Year', 'Trap', 'Team', 'Best'])
+    traps['Delta'] = traps['Team'] - traps['Best']
+
+    return {
+        'laps':     laps,
+        'sectors':  sectors,
+        'traps':    traps,
+        'sections': pd.concat(sections, ignore_index=True)[['Year', 'Driver', *SECTIONS]],
+        'traces':   pd.concat(traces, ignore_index=True)[['Year', 'Driver', 'Fraction', 'Speed']],
+    }
+
+
+# =========================================================
+# 3. Visualization
+# =========================================================
+
+def render_team_evolution(result: dict, team: str, title: str) -> dict:
+    """Gap / sector, speed and throttle-section charts. Returns {suffix: Figure}."""
+    laps = result['laps']
+    if laps.empty:
+        return {}
+    years = laps['Year'].tolist()
+    colors = dict(zip(years, plt.get_cmap('viridis', len(years) + 1)(range(len(years)))))
+    figures = {}
+
+    # --- Gap to pole + sector deltas ---
+    fig, (ax_gap, ax_sec) = plt.subplots(1, 2, figsize=(16, 6), facecolor='white')
+    fig.set_layout_engine('tight')
+    bars = ax_gap.bar([str(y) for y in years], laps['GapToPolePct'],
+                      color=[colors[y] for y in years])
+    for bar, (_, row) in zip(bars, laps.iterrows()):
+        label = f"+{row['GapToPole']:.3f}s\nP{row['Rank']} {row['Driver']}"
+        if row['LayoutChanged']:
+            label += "\n(layout)"
+        ax_gap.annotate(label, (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                        ha='center', va='bottom', fontsize=9)
+    ax_gap.margins(y=0.25)   # room for the annotations
+    ax_gap.set_ylabel("Gap to fastest lap (%)")
+    ax_gap.set_title("Best lap vs session best", fontsize=12)
+
+    sectors = result['sectors']
+    width = 0.8 / len(years)
+    for k, year in enumerate(years):
+        d = sectors[sectors['Year'] == year]
+        x = np.arange(len(d)) + (k - (len(years) - 1) / 2) * width
+        ax_sec.bar(x, d['Delta'], width=width, color=colors[year], label=str(year))
+    ax_sec.set_xticks(range(3))
+    ax_sec.set_xticklabels(['S1', 'S2', 'S3'])
+    ax_sec.set_ylabel("Gap to best sector (s)")
+    ax_sec.set_title("Sector deficit", fontsize=12)
+    ax_sec.legend()
+    for ax in (ax_gap, ax_sec):
+        ax.grid(True, axis='y', linestyle='--', alpha=0.3)
+    fig.suptitle(f"{title} - {team} Lap / Sector Evolution", fontsize=15, fontweight='bold')
+    figures['EvolutionGap'] = fig
+
+    # --- Speed traces on the normalised lap + trap speeds ---
+    fig, (ax_tr, ax_trap) = plt.subplots(1, 2, figsize=(18, 6), facecolor='white',
+                                         gridspec_kw={'width_ratios': [3, 1]})
+    fig.set_layout_engine('tight')
+    for year, g in result['traces'].groupby('Year'):
+        ax_tr.plot(g['Fraction'] * 100.0, g['Speed'], color=colors[year], linewidth=1.2,
+                   label=f"{year} {g['Driver'].iloc[0]}")
+    ax_tr.set_xlabel("Lap distance (%)")
+    ax_tr.set_ylabel("Speed (km/h)")
+    ax_tr.set_title("Fastest lap speed", fontsize=12)
+    ax_tr.legend()
+    ax_tr.grid(True, linestyle='--', alpha=0.3)
+
+    traps = result['traps']
+    trap_names = sorted(traps['Trap'].unique())
+    for k, year in enumerate(years):
+        d = traps[traps['Year'] == year].set_index('Trap').reindex(trap_names)
+        x = np.arange(len(trap_names)) + (k - (len(years) - 1) / 2) * width
+        ax_trap.bar(x, d['Delta'], width=width, color=colors[year], label=str(year))
+    ax_trap.set_xticks(range(len(trap_names)))
+    ax_trap.set_xticklabels(trap_names)
+    ax_trap.set_ylabel("Gap to fastest car (km/h)")
+    ax_trap.set_title("Speed traps", fontsize=12)
+    ax_trap.grid(True, axis='y', linestyle='--', alpha=0.3)
+    fig.suptitle(f"{title} - {team} Speed Evolution", fontsize=15, fontweight='bold')
+    figures['EvolutionSpeed'] = fig
+
+    # --- Throttle / brake sections ---
+    sections = result['sections']
+    if not sections.empty:
+        fig, ax = plt.subplots(figsize=(12, 0.6 * len(sections) + 2.5), facecolor='white')
+        fig.set_layout_engine('tight')
+        labels = [f"{r.Year} {r.Driver}" for r in sections.itertuples()]
+        left = np.zeros(len(sections))
+        cmap = plt.get_cmap('RdYlGn_r', len(SECTIONS))
+        for k, name in enumerate(SECTIONS):
+            ax.barh(labels, sections[name], left=left, color=cmap(k), label=name)
+            left += sections[name].to_numpy()
+        ax.invert_yaxis()
+        ax.set_xlim(0, 100)
+        ax.set_xlabel("Share of lap time (%)")
+        ax.legend(ncol=len(SECTIONS), bbox_to_anchor=(0.5, -0.15), loc='upper center')
+        ax.set_title(f"{title} - {team} Lap Sections", fontsize=15, fontweight='bold')
+        figures['EvolutionSections'] = fig
+    return figures
+
+
+# =========================================================
+# 4. Main Wrapper
+# =========================================================
+
+def analyze_team_evolution(gp, session_type: str, years, team: str, loader=None,
+                           refresh: bool = False, current=None):
+    """
+    [Feature] Team Evolution
+    - Same circuit and session type over several seasons (cached per season)
+    - Gap to fastest lap, sector and speed-trap deficits, throttle sections
+    Returns the compute_team_evolution tables (None if the team is in no season).
+    """
+    print(f"\n[Team Evolution] {team} - {gp} {session_type}, {', '.join(map(str, years))}")
+
+    summaries = load_season_summaries(gp, session_type, years, loader=loader, refresh=refresh,
+                                      current=current)
+    result = compute_team_evolution(summaries, team)
+    if result['laps'].empty:
+        print(f"[Error] No laps of '{team}' found.")
+        return None
+
+    print("\n[Best Lap]")
+    print(result['laps'].round(3).to_string(index=False))
+    print("\n[Sectors]")
+    print(result['sectors'].pivot(index='Year', columns='Sector', values='Delta')
+          .round(3).to_string())
+    if not result['traps'].empty:
+        print("\n[Speed Traps - gap to fastest car, km/h]")
+        print(result['traps'].pivot(index='Year', columns='Trap', values='Delta')
+              .round(1).to_string())
+
+    event = summaries[max(summaries)]['event']
+    title = f"{min(summaries)}-{max(summaries)} {event} {session_type}"
+    base = f"{min(summaries)}-{max(summaries)}_{event.replace(' ', '_')}_{session_type}_" \
+           f"{team.replace(' ', '_')}"
+    figures = render_team_evolution(result, team, title)
+    save_figures(None, figures, filenames={k: f"{base}_{k}.png" for k in figures},
+                 facecolor='white')
+    return result
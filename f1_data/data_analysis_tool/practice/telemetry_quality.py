@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+telemetry_quality.py
+Validation and repair of lap telemetry before it reaches the analyses.
+
+Live-timing telemetry regularly contains duplicate or backwards timestamps,
+missing Time values, out-of-range channel values (e.g. Throttle 104), NaN
+runs, gaps in Time and Distance resets after merging car and position data.
+Left alone they silently corrupt deltas and the dominance map, or make a
+driver drop out of a chart through a bare `except Exception: continue`.
+
+Per lap (repair_telemetry / repair_lap):
+    1. drop samples without Time, isolated forward Time spikes, then
+       duplicate or backwards Time
+    2. replace out-of-range values (QUALITY_CHANNEL_RANGES) by NaN
+    3. interpolate short NaN runs (≤ QUALITY_MAX_FILL_SAMPLES, gear: forward fill)
+    4. rebuild Distance from Speed when it resets or is missing values
+    5. measure gaps in Time
+and report every step with a 0-100 quality Score.
+
+Per session (session_quality): the same checks on each driver's full car-data
+stream with one vectorized pass, aggregated per lap.
+
+Score = 100 × (1 − (dropped + 0.5 × filled + unfilled) / samples − gap time / lap time)
+"""
+
+import numpy as np
+import pandas as pd
+
+from practice import config
+
+# Channels interpolated linearly / forward filled when values are missing
+_LINEAR_CHANNELS = ('Speed', 'Throttle', 'RPM', 'X', 'Y', 'Z')
+_STEP_CHANNELS = ('nGear', 'DRS')
+
+
+class TelemetryQualityError(Exception):
+    """A lap's telemetry is unusable even after repair (reason in the message)."""
+
+
+# -----------------------------------------------------------------------------
+# 1. Single lap: detect and repair
+# -----------------------------------------------------------------------------
+
+def _time_flags(t: np.ndarray) -> tuple:
+    """
+    (nan_time, spike, duplicate, backwards) masks.
+
+    A spike is one timestamp more than QUALITY_MAX_GAP_S ahead of both its
+    neighbours; it is left out first so it cannot make the rest of the lap
+    look backwards. Duplicates and backwards steps are then measured against
+    the previous kept sample (the running maximum of the others).
+    """
+    nan_time = np.isnan(t)
+    spike = np.zeros(len(t), dtype=bool)
+    valid = np.flatnonzero(~nan_time)
+    if len(valid) >= 3:
+        v = t[valid]
+        spike[valid[1:-1]] = v[1:-1] > np.maximum(v[:-2], v[2:]) + config.QUALITY_MAX_GAP_S
+    running = np.fmax.accumulate(np.where(nan_time | spike, -np.inf, t))
+    prev = np.r_[-np.inf, running[:-1]]
+    kept = ~nan_time & ~spike
+    return nan_time, spike, kept & (t == prev), kept & (t < prev)
+
+
+def _out_of_range(tel: pd.DataFrame) -> dict:
+    """{channel: mask} of values outside QUALITY_CHANNEL_RANGES."""
+    masks = {}
+    for channel, (lo, hi) in config.QUALITY_CHANNEL_RANGES.items():
+        if channel in tel.columns:
+            v = tel[channel].to_numpy(dtype=float)
+            masks[channel] = (v < lo) | (v > hi)
+    return masks
+
+
+def _integrated_distance(t: np.ndarray, speed: np.ndarray) -> np.ndarray:
+    """Trapezoidal integral of Speed (km/h) over Time (s), starting at 0 m."""
+    v = speed / 3.6
+    return np.r_[0.0, np.cumsum(np.diff(t) * (v[1:] + v[:-1]) / 2.0)]
+
+
+def _score(samples: int, dropped: int, filled: int, unfilled: int,
+           gap_time: float, span: float) -> float:
+    if samples == 0:
+        return 0.0
+    score = 1.0 - (dropped + 0.5 * filled + unfilled) / samples
+    if span and span > 0:
+        score -= gap_time / span
+    return round(float(np.clip(score, 0.0, 1.0)) * 100.0, 1)
+
+
+def repair_telemetry(tel, lap_time=None) -> tuple:
+    """
+    Validate and repair one lap of telemetry (car data or merged telemetry).
+
+    Returns (repaired telemetry, report). The report holds the counts
+    Samples, NanTime, Spikes, Duplicates, Backwards, OutOfRange, Filled, Unfilled,
+    Gaps, MaxGap (s), DistanceRebuilt, Score and a Reasons list describing
+    what was dropped or changed and why.
+    """
+    report = {'Samples': len(tel), 'NanTime': 0, 'Spikes': 0, 'Duplicates': 0, 'Backwards': 0,
+              'OutOfRange': 0, 'Filled': 0, 'Unfilled': 0, 'Gaps': 0, 'MaxGap': 0.0,
+              'DistanceRebuilt': False, 'Score': 0.0, 'Reasons': []}
+    reasons = report['Reasons']
+    if tel.empty or 'Time' not in tel.columns:
+        reasons.append('no samples' if tel.empty else 'no Time channel')
+        return tel, report
+
+    # --- 1. Time: missing, spiked, duplicate, backwards ---
+    t = tel['Time'].dt.total_seconds().to_numpy()
+    nan_time, spike, duplicate, backwards = _time_flags(t)
+    drop = nan_time | spike | duplicate | backwards
+    for key, mask, why in (('NanTime', nan_time, 'without Time'),
+                           ('Spikes', spike, 'with a spiked timestamp'),
+                           ('Duplicates', duplicate, 'with a duplicate timestamp'),
+                           ('Backwards', backwards, 'with Time going backwards')):
+        report[key] = int(mask.sum())
+        if report[key]:
+            reasons.append(f"{report[key]} samples {why} dropped")
+    tel = tel[~drop].copy()
+    t = t[~drop]
+
+    # --- 2. Out-of-range values → missing ---
+    bad = _out_of_range(tel)
+    for channel, mask in bad.items():
+        if mask.any():
+            tel[channel] = tel[channel].astype(float).mask(mask)
+            reasons.append(f"{int(mask.sum())} {channel} values outside "
+                           f"{config.QUALITY_CHANNEL_RANGES[channel]} replaced")
+    report['OutOfRange'] = int(sum(m.sum() for m in bad.values()))
+
+    # --- 3. Fill short NaN runs ---
+    filled_rows = np.zeros(len(tel), dtype=bool)
+    unfilled_rows = np.zeros(len(tel), dtype=bool)
+    index = pd.Index(t)
+    for channel in _LINEAR_CHANNELS + _STEP_CHANNELS:
+        if channel not in tel.columns:
+            continue
+        values = pd.Series(tel[channel].to_numpy(dtype=float), index=index)
+        missing = values.isna().to_numpy()
+        if not missing.any():
+            continue
+        if channel in _STEP_CHANNELS:
+            repaired = values.ffill(limit=config.QUALITY_MAX_FILL_SAMPLES)
+        else:
+            repaired = values.interpolate(method='index', limit=config.QUALITY_MAX_FILL_SAMPLES,
+                                          limit_area='inside')
+        still = repaired.isna().to_numpy()
+        filled_rows |= missing & ~still
+        unfilled_rows |= still
+        tel[channel] = repaired.to_numpy()
+    if 'Brake' in tel.columns and tel['Brake'].isna().any():
+        filled_rows |= tel['Brake'].isna().to_numpy()
+        tel['Brake'] = tel['Brake'].astype(object).fillna(False).astype(bool)
+    report['Filled'] = int(filled_rows.sum())
+    report['Unfilled'] = int(unfilled_rows.sum())
+    if report['Filled']:
+        reasons.append(f"{report['Filled']} samples with missing values interpolated")
+    if report['Unfilled']:
+        reasons.append(f"{report['Unfilled']} samples left with missing values "
+                       f"(runs > {config.QUALITY_MAX_FILL_SAMPLES} samples)")
+
+    # --- 4. Distance resets ---
+    if 'Distance' in tel.columns and 'Speed' in tel.columns and len(tel) > 1:
+        d = tel['Distance'].to_numpy(dtype=float)
+        resets = int((np.diff(d) < -config.QUALITY_DISTANCE_TOLERANCE_M).sum())
+        if resets or np.isnan(d).any():
+            start = d[0] if np.isfinite(d[0]) else 0.0
+            tel['Distance'] = start + _integrated_distance(
+                t, np.nan_to_num(tel['Speed'].to_numpy(dtype=float)))
+            report['DistanceRebuilt'] = True
+            reasons.append(f"Distance rebuilt from Speed ({resets} resets)")
+
+    # --- 5. Gaps in Time ---
+    dt = np.diff(t)
+    gaps = dt > config.QUALITY_MAX_GAP_S
+    report['Gaps'] = int(gaps.sum())
+    report['MaxGap'] = round(float(dt.max()), 3) if len(dt) else 0.0
+    if report['Gaps']:
+        reasons.append(f"{report['Gaps']} gaps > {config.QUALITY_MAX_GAP_S:g}s "
+                       f"(max {report['MaxGap']:.2f}s)")
+
+    span = pd.Timedelta(lap_time).total_seconds() if lap_time is not None and pd.notna(lap_time) \
+        else (t[-1] - t[0] if len(t) > 1 else 0.0)
+    report['Score'] = _score(report['Samples'], int(drop.sum()), report['Filled'],
+                             report['Unfilled'], float(dt[gaps].sum()), span)
+    return tel, report
+
+
+def check_usable(tel, report: dict):
+    """Raise TelemetryQualityError if the repaired lap cannot be analysed."""
+    if len(tel) < config.QUALITY_MIN_SAMPLES:
+        raise TelemetryQualityError(
+            f"only {len(tel)} usable samples (< {config.QUALITY_MIN_SAMPLES}); "
+            + ('; '.join(report['Reasons']) or 'no telemetry'))
+    if 'Speed' in tel.columns:
+        missing = float(tel['Speed'].isna().mean() * 100.0)
+        if missing > config.QUALITY_MAX_UNFILLED_PCT:
+            raise TelemetryQualityError(f"{missing:.0f}% of Speed missing after repair")
+
+
+def repair_lap(lap, merged: bool = False) -> tuple:
+    """
+    Repaired telemetry of one lap with Distance, and its report.
+    merged=False: lap.get_car_data(); merged=True: lap.get_telemetry() (adds X/Y).
+    Raises TelemetryQualityError if the lap is unusable.
+    """
+    raw = lap.get_telemetry() if merged else lap.get_car_data()
+    tel, report = repair_telemetry(raw, lap_time=lap['LapTime'])
+    check_usable(tel, report)
+    if 'Distance' not in tel.columns:
+        tel = tel.add_distance()
+    return tel, report
+
+
+def clean_lap_telemetry(lap, merged: bool = False):
+    """repair_lap without the report — drop-in for get_car_data().add_distance()."""
+    return repair_lap(lap, merged=merged)[0]
+
+
+# -----------------------------------------------------------------------------
+# 2. Whole session: per-lap quality from the raw car-data streams
+# -----------------------------------------------------------------------------
+
+def session_quality(session, laps=None) -> pd.DataFrame:
+    """
+    Quality of every lap's car data, one vectorized pass per driver stream.
+
+    Columns: Driver, LapNumber, Samples, NanTime, Spikes, Duplicates, Backwards,
+             OutOfRange, NanValues, Gaps, MaxGap (s), Score.
+    Empty DataFrame without car data.
+    """
+    columns = ['Driver', 'LapNumber', 'Samples', 'NanTime', 'Spikes', 'Duplicates', 'Backwards',
+               'OutOfRange', 'NanValues', 'Gaps', 'MaxGap', 'Score']
+    laps = (session.laps if laps is None else laps).dropna(subset=['LapStartTime', 'Time'])
+    try:
+        car_data = session.car_data
+    except Exception:
+        return pd.DataFrame(columns=columns)
+
+    frames = []
+    for drv_num, drv_laps in laps.groupby('DriverNumber'):
+        tel = car_data.get(str(drv_num))
+        if tel is None or tel.empty:
+            continue
+        t = tel['SessionTime'].dt.total_seconds().to_numpy()
+        nan_time, spike, duplicate, backwards = _time_flags(t)
+        out_of_range = np.zeros(len(t), dtype=bool)
+        for mask in _out_of_range(tel).values():
+            out_of_range |= mask
+        channels = [c for c in _LINEAR_CHANNELS + _STEP_CHANNELS if c in tel.columns]
+        nan_values = tel[channels].isna().to_numpy().any(axis=1) if channels else np.zeros(len(t), bool)
+        # Running maximum without spikes (sorted); a spike steps like its predecessor
+        t_sorted = np.fmax.accumulate(np.where(nan_time | spike, -np.inf, t))
+        step = np.r_[0.0, np.diff(np.where(spike, t_sorted, t))]
+        gap = step > config.QUALITY_MAX_GAP_S
+
+        # Sample → lap (searchsorted on the running maximum, which is sorted)
+        drv_laps = drv_laps.sort_values('LapStartTime')
+        starts = drv_laps['LapStartTime'].dt.total_seconds().to_numpy()
+        ends = drv_laps['Time'].dt.total_seconds().to_numpy()
+        i = np.searchsorted(starts, t_sorted, side='right') - 1
+        inside = (i >= 0) & (t_sorted <= ends[np.clip(i, 0, None)])
+
+        samples = pd.DataFrame({
+            'Lap':        i[inside],
+            'NanTime':    nan_time[inside],
+            'Spikes':     spike[inside],
+            'Duplicates': duplicate[inside],
+            'Backwards':  backwards[inside],
+            'OutOfRange': out_of_range[inside],
+            'NanValues':  nan_values[inside],
+            'Gaps':       gap[inside],
+            'GapTime':    np.where(gap, step, 0.0)[inside],
+            'Step':       np.nan_to_num(step)[inside],
+        })
+        agg = samples.groupby('Lap').agg(
+            Samples=('NanTime', 'size'), NanTime=('NanTime', 'sum'), Spikes=('Spikes', 'sum'),
+            Duplicates=('Duplicates', 'sum'), Backwards=('Backwards', 'sum'),
+            OutOfRange=('OutOfRange', 'sum'), NanValues=('NanValues', 'sum'),
+            Gaps=('Gaps', 'sum'), GapTime=('GapTime', 'sum'), MaxGap=('Step', 'max'))
+        agg['Driver'] = drv_laps['Driver'].iloc[0]
+        agg['LapNumber'] = drv_laps['LapNumber'].to_numpy()[agg.index]
+        span = (ends - starts)[agg.index]
+        dropped = agg['NanTime'] + agg['Spikes'] + agg['Duplicates'] + agg['Backwards']
+        score = 1.0 - (dropped + 0.5 * (agg['OutOfRange'] + agg['NanValues'])) / agg['Samples'] \
+            - agg['GapTime'] / np.where(span > 0, span, np.inf)
+        agg['Score'] = (score.clip(0.0, 1.0) * 100.0).round(1)
+        frames.append(agg)
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(frames, ignore_index=True)
+    df['MaxGap'] = df['MaxGap'].round(3)
+    return df[columns].sort_values(['Driver', 'LapNumber'], ignore_index=True)
+
+
+def analyze_telemetry_quality(session):
+    """
+    [Feature] Telemetry Quality Report
+    - Per-lap score of every driver's car data (see module docstring)
+    - Prints per-driver averages and the worst laps
+    Returns the session_quality table (None without car data).
+    """
+    print(f"\n[Telemetry Quality] Checking car data of every lap...")
+
+    df = session_quality(session)
+    if df.empty:
+        print("[Error] No car data found.")
+        return None
+
+    summary = df.groupby('Driver').agg(
+        Laps=('LapNumber', 'size'), MeanScore=('Score', 'mean'), MinScore=('Score', 'min'),
+        Spikes=('Spikes', 'sum'), Duplicates=('Duplicates', 'sum'),
+        Backwards=('Backwards', 'sum'), OutOfRange=('OutOfRange', 'sum'), Gaps=('Gaps', 'sum'))
+    print(summary.sort_values('MeanScore').round(1).to_string())
+
+    worst = df.nsmallest(10, 'Score')
+    worst = worst[worst['Score'] < 100.0]
+    if not worst.empty:
+        print("\n[Worst laps]")
+        print(worst.to_string(index=False))
+    return df
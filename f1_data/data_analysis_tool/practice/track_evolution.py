@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+track_evolution.py
+Session-wide track-evolution & weather normalization of lap times.
+
+Practice lap times drift over a session: rubber goes down, the track cools or
+heats up. One least-squares regression over the whole laps table separates
+that drift from car/driver pace:
+
+    LapTime = FE(Driver × Compound) + b_tyre·TyreLife
+              + b_time·SessionMinutes [+ b_temp·TrackTemp] [+ b_rain·Rainfall]
+
+Driver × Compound fixed effects absorb car and tyre pace, so b_time and b_temp
+are estimated from how every car's laps move together. Corrected lap times
+remove the time/temperature terms, i.e. every lap is expressed as if it had
+been driven at the end of the session in end-of-session conditions.
+Fuel load is not observed; it is partly absorbed by TyreLife.
+"""
+
+import numpy as np
+import pandas as pd
+
+from practice import config
+
+
+def _weather_at_laps(session, mid_time: pd.Series) -> pd.DataFrame | None:
+    """TrackTemp / Rainfall at each lap's mid-point (None if weather not loaded)."""
+    try:
+        weather = session.weather_data
+    except Exception:
+        return None
+    if weather is None or weather.empty or 'TrackTemp' not in weather:
+        return None
+
+    cols = [c for c in ('TrackTemp', 'Rainfall') if c in weather]
+    w = weather[['Time'] + cols].dropna(subset=['Time']).sort_values('Time')
+    probe = pd.DataFrame({'Time': mid_time.values, '_row': np.arange(len(mid_time))})
+    valid = probe['Time'].notna()
+    merged = pd.merge_asof(probe[valid].sort_values('Time'), w, on='Time',
+                           direction='nearest')
+    out = pd.DataFrame(index=np.arange(len(mid_time)), columns=cols, dtype=float)
+    out.loc[merged['_row'].values, cols] = merged[cols].astype(float).values
+    out.index = mid_time.index
+    return out
+
+
+def fit_track_evolution(session, laps=None) -> dict:
+    """
+    Fit the evolution model on representative laps.
+
+    Fit set: accurate, non-box laps within TRACK_EVOLUTION_FIT_THRESHOLD of each
+    driver's best. Returns a dict:
+        coef      {'SessionMinutes', 'TyreLife', 'TrackTemp'?, 'Rainfall'?} (s per unit)
+        ref       reference values used for correction
+        laps_used number of laps in the fit
+        rmse      residual RMSE (s)
+        features  frame of per-lap regressors for `laps` (aligned index)
+    Returns None when fewer than TRACK_EVOLUTION_MIN_LAPS laps are usable.
+    """
+    laps = session.laps if laps is None else laps
+
+    lap_s = laps['LapTime'].dt.total_seconds()
+    mid = laps['LapStartTime'] + laps['LapTime'] / 2
+    feats = pd.DataFrame({
+        'SessionMinutes': mid.dt.total_seconds() / 60.0,
+        'TyreLife':       laps['TyreLife'].astype(float),
+    }, index=laps.index)
+
+    weather = _weather_at_laps(session, mid)
+    if weather is not None:
+        feats['TrackTemp'] = weather['TrackTemp']
+        if 'Rainfall' in weather and weather['Rainfall'].fillna(0).any():
+            feats['Rainfall'] = weather['Rainfall'].fillna(0).astype(float)
+
+    # --- Fit set (vectorized masks over the whole table) ---
+    best = lap_s.groupby(laps['Driver']).transform('min')
+    fit_mask = (
+        lap_s.notna() & feats.notna().all(axis=1)
+        & laps['PitInTime'].isna() & laps['PitOutTime'].isna()
+        & (lap_s <= best * config.TRACK_EVOLUTION_FIT_THRESHOLD)
+    )
+    if 'IsAccurate' in laps:
+        fit_mask &= laps['IsAccurate'].fillna(False).astype(bool)
+
+    if fit_mask.sum() < config.TRACK_EVOLUTION_MIN_LAPS:
+        print(f"[Warning] Track evolution: only {int(fit_mask.sum())} usable laps, fit skipped.")
+        return None
+
+    # --- Design matrix: one-hot Driver×Compound + centred continuous terms ---
+    group = (laps['Driver'].astype(str) + '|' + laps['Compound'].fillna('?').astype(str))[fit_mask]
+    codes, _ = pd.factorize(group)
+    X_fe = np.zeros((len(codes), codes.max() + 1))
+    X_fe[np.arange(len(codes)), codes] = 1.0
+
+    names = list(feats.columns)
+    X_cont = feats[fit_mask].to_numpy(dtype=float)
+    centre = X_cont.mean(axis=0)
+    X = np.hstack([X_fe, X_cont - centre])
+    y = lap_s[fit_mask].to_numpy()
+
+    beta, *_ = np.linalg.lstsq(X, y, rcond=None)
+    resid = y - X @ beta
+    coef = {name: float(b) for name, b in zip(names, beta[X_fe.shape[1]:])}
+
+    # Reference conditions: end of the session
+    last = feats[fit_mask].sort_values('SessionMinutes').iloc[-1]
+    ref = {'SessionMinutes': float(feats['SessionMinutes'].max())}
+    for name in ('TrackTemp', 'Rainfall'):
+        if name in coef:
+            ref[name] = float(last[name])
+
+    return {
+        'coef':      coef,
+        'ref':       ref,
+        'laps_used': int(fit_mask.sum()),
+        'rmse':      float(np.sqrt(np.mean(resid ** 2))),
+        'features':  feats,
+    }
+
+
+def corrected_laps(session, verbose: bool = True):
+    """
+    Copy of `session.laps` with LapTime replaced by the evolution-corrected time.
+    The original value is kept in `RawLapTime`.
+
+    Falls back to the uncorrected laps if the fit is not possible, so callers
+    can use it as a drop-in replacement for `session.laps`.
+    """
+    laps = session.laps.copy()
+    fit = fit_track_evolution(session, laps)
+    if fit is None:
+        return laps
+
+    feats = fit['features']
+    correction = pd.Series(0.0, index=laps.index)
+    for name, ref in fit['ref'].items():
+        correction += fit['coef'][name] * (feats[name].fillna(ref) - ref)
+
+    laps['RawLapTime'] = laps['LapTime']
+    laps['LapTime'] = laps['LapTime'] - pd.to_timedelta(correction, unit='s')
+
+    if verbose:
+        terms = ', '.join(f"{k} {v:+.4f}s" for k, v in fit['coef'].items())
+        print(f"[System] Track evolution fit on {fit['laps_used']} laps "
+              f"(RMSE {fit['rmse']:.3f}s): {terms}")
+    return laps
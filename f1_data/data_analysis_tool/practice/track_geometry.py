@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+track_geometry.py
+Circuit geometry cache for track-map visuals.
+
+A CircuitGeometry is a smoothed, rotation-corrected centreline resampled on a
+uniform distance grid (TRACK_GEOMETRY_STEP_M). Its LineCollection segments are
+built once; track maps (dominance, corner metrics, mini-sectors, braking
+points) only map per-distance values onto those segments.
+
+Geometries are cached in memory and as .npz files per circuit/layout, so the
+map looks identical for every driver and every season on the same layout.
+A geometry remembers the events it was matched to, so later lookups for the
+same event do not read any telemetry.
+
+Usage:
+>>> geom = get_circuit_geometry(session)            # fastest lap as reference
+>>> colors = geom.map_values(tel['Distance'], winner_colors, how='nearest')
+>>> geom.plot(ax, colors=colors)
+>>> geom.mark(ax, [350.0, 1220.0], color='black')   # e.g. braking points
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import LineCollection
+
+from practice import config
+from practice.telemetry_quality import repair_telemetry
+
+_MEMORY_CACHE = {}   # {circuit slug: [CircuitGeometry, ...]}
+_CACHE_LOCK = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# 1. Geometry object
+# -----------------------------------------------------------------------------
+
+class CircuitGeometry:
+    """Uniformly resampled centreline of one circuit layout."""
+
+    def __init__(self, circuit: str, x, y, step: float, rotation: float = 0.0,
+                 lap_length: float | None = None, events=()):
+        self.circuit = circuit
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.step = float(step)
+        self.rotation = float(rotation)
+        self.distance = np.arange(len(self.x)) * self.step
+        self.length = float(self.distance[-1]) if len(self.x) else 0.0
+        # Distance of the reference lap (layout matching) and events using this layout
+        self.lap_length = self.length if lap_length is None else float(lap_length)
+        self.events = set(events)
+        self._segments = None
+
+    @property
+    def n_segments(self) -> int:
+        return len(self.x) - 1
+
+    @property
+    def segments(self) -> np.ndarray:
+        """(n_segments, 2, 2) array for LineCollection — built once."""
+        if self._segments is None:
+            points = np.column_stack([self.x, self.y]).reshape(-1, 1, 2)
+            self._segments = np.concatenate([points[:-1], points[1:]], axis=1)
+        return self._segments
+
+    # --- Distance mapping -------------------------------------------------
+
+    def vertex_distance(self, lap_length: float | None = None) -> np.ndarray:
+        """Vertex distances expressed in a lap's own metres (lap lengths differ slightly)."""
+        if lap_length is None or self.length <= 0:
+            return self.distance
+        return self.distance * (lap_length / self.length)
+
+    def segment_index(self, distance, lap_length: float | None = None) -> np.ndarray:
+        """Segment index for each lap distance (vectorized)."""
+        d = np.asarray(distance, dtype=float)
+        if lap_length:
+            d = d * (self.length / lap_length)
+        return np.clip((d // self.step).astype(int), 0, self.n_segments - 1)
+
+    def map_values(self, distance, values, lap_length: float | None = None,
+                   how: str = 'interp') -> np.ndarray:
+        """
+        Per-segment values from a per-sample trace.
+        - how='interp': linear interpolation at segment mid-points (numeric data)
+        - how='nearest': value of the last sample at or before the mid-point
+          (categorical data such as colors or driver ids)
+        """
+        distance = np.asarray(distance, dtype=float)
+        values = np.asarray(values)
+        if lap_length is None:
+            lap_length = float(np.nanmax(distance))
+        vd = self.vertex_distance(lap_length)
+        mid = (vd[:-1] + vd[1:]) / 2
+        if how == 'interp':
+            return np.interp(mid, distance, values.astype(float))
+        idx = np.clip(np.searchsorted(distance, mid, side='right') - 1, 0, len(values) - 1)
+        return values[idx]
+
+    def position(self, distance, lap_length: float | None = None):
+        """(x, y) on the centreline for lap distances."""
+        d = np.asarray(distance, dtype=float)
+        if lap_length:
+            d = d * (self.length / lap_length)
+        return np.interp(d, self.distance, self.x), np.interp(d, self.distance, self.y)
+
+    # --- Drawing ----------------------------------------------------------
+
+    def plot(self, ax, colors=None, values=None, cmap=None, norm=None,
+             linewidth: float = 2.5, **kwargs) -> LineCollection:
+        """Draw the centreline; colors (per segment) or values + cmap."""
+        lc = LineCollection(self.segments, linewidth=linewidth, **kwargs)
+        if values is not None:
+            lc.set_array(np.asarray(values, dtype=float))
+            if cmap is not None:
+                lc.set_cmap(cmap)
+            if norm is not None:
+                lc.set_norm(norm)
+        elif colors is not None:
+            lc.set_color(list(colors))
+        else:
+            lc.set_color('lightgray')
+        ax.add_collection(lc)
+        ax.set_xlim(self.x.min() - 100, self.x.max() + 100)
+        ax.set_ylim(self.y.min() - 100, self.y.max() + 100)
+        ax.set_aspect('equal')
+        ax.set_xticks([]); ax.set_yticks([]); ax.axis('off')
+        return lc
+
+    def mark(self, ax, distance, lap_length: float | None = None, **scatter_kwargs):
+        """Scatter markers (e.g. braking points) at lap distances."""
+        x, y = self.position(distance, lap_length)
+        scatter_kwargs.setdefault('zorder', 5)
+        return ax.scatter(x, y, **scatter_kwargs)
+
+    # --- Persistence ------------------------------------------------------
+
+    def save(self, path: str):
+        np.savez_compressed(path, x=self.x, y=self.y, step=self.step,
+                            rotation=self.rotation, circuit=self.circuit,
+                            lap_length=self.lap_length,
+                            events=np.array(sorted(self.events), dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> "CircuitGeometry":
+        with np.load(path) as data:
+            # Files written before lap_length / events were stored match on length
+            lap_length = float(data['lap_length']) if 'lap_length' in data.files else None
+            events = [str(e) for e in data['events']] if 'events' in data.files else ()
+            return cls(str(data['circuit']), data['x'], data['y'],
+                       float(data['step']), float(data['rotation']), lap_length, events)
+
+
+# -----------------------------------------------------------------------------
+# 2. Building from telemetry
+# -----------------------------------------------------------------------------
+
+def _circular_smooth(values: np.ndarray, window: int) -> np.ndarray:
+    if window < 2:
+        return values
+    pad = window // 2
+    padded = np.r_[values[-pad:], values, values[:pad]]
+    kernel = np.ones(window) / window
+    return np.convolve(padded, kernel, mode='same')[pad:pad + len(values)]
+
+
+def build_geometry(circuit: str, telemetry, rotation: float = 0.0,
+                   step: float | None = None,
+                   smooth_m: float | None = None) -> CircuitGeometry:
+    """Resample X/Y of one lap's telemetry on a uniform distance grid, smooth, rotate."""
+    step = config.TRACK_GEOMETRY_STEP_M if step is None else step
+    smooth_m = config.TRACK_GEOMETRY_SMOOTH_M if smooth_m is None else smooth_m
+    tel = telemetry.dropna(subset=['X', 'Y', 'Distance'])
+    dist = tel['Distance'].to_numpy(dtype=float)
+    keep = np.r_[True, np.diff(dist) > 0]        # np.interp needs increasing x
+    dist = dist[keep]
+    x_raw = tel['X'].to_numpy(dtype=float)[keep]
+    y_raw = tel['Y'].to_numpy(dtype=float)[keep]
+
+    grid = np.arange(0.0, dist[-1] + step / 2, step)
+    x = np.interp(grid, dist, x_raw)
+    y = np.interp(grid, dist, y_raw)
+
+    window = max(int(round(smooth_m / step)), 1)
+    x, y = _circular_smooth(x, window), _circular_smooth(y, window)
+
+    angle = np.deg2rad(rotation)
+    xr = x * np.cos(angle) - y * np.sin(angle)
+    yr = x * np.sin(angle) + y * np.cos(angle)
+    return CircuitGeometry(circuit, xr, yr, step, rotation, lap_length=dist[-1])
+
+
+def _circuit_slug(session) -> str:
+    try:
+        name = session.session_info['Meeting']['Circuit']['ShortName']
+    except Exception:
+        name = session.event['Location']
+    return re.sub(r'[^a-z0-9]+', '_', str(name).lower()).strip('_')
+
+
+def _event_key(session) -> str | None:
+    try:
+        return f"{session.event.year} {session.event['EventName']}"
+    except Exception:
+        return None
+
+
+def _circuit_rotation(session) -> float:
+    try:
+        return float(session.get_circuit_info().rotation)
+    except Exception:
+        return 0.0
+
+
+def circuit_corners(session):
+    """
+    Corner apexes of the circuit (session.get_circuit_info()).
+    Columns: Label ('T1', 'T10A', ...), Distance (m); empty if unavailable.
+    """
+    try:
+        corners = session.get_circuit_info().corners
+    except Exception:
+        return pd.DataFrame(columns=['Label', 'Distance'])
+    letters = corners['Letter'].fillna('').astype(str) if 'Letter' in corners else ''
+    return pd.DataFrame({
+        'Label':    'T' + corners['Number'].astype(str) + letters,
+        'Distance': corners['Distance'].astype(float),
+    }).sort_values('Distance', ignore_index=True)
+
+
+def _lap_length(lap) -> float:
+    return float(lap.get_car_data().add_distance()['Distance'].max())
+
+
+def get_circuit_geometry(session, reference_lap=None,
+                         cache_dir: str | None = None) -> CircuitGeometry:
+    """
+    Cached geometry for the session's circuit/layout.
+
+    Lookup order: memory → disk (the cached layout already used for this
+    event, else any cached layout of the same circuit whose length matches
+    the reference lap within TRACK_GEOMETRY_LAYOUT_TOLERANCE) → build from
+    `reference_lap` (default: session fastest lap) and store. Only the
+    length match and the build read the reference lap's telemetry.
+    """
+    cache_dir = config.TRACK_GEOMETRY_DIR if cache_dir is None else cache_dir
+    slug = _circuit_slug(session)
+    event = _event_key(session)
+
+    with _CACHE_LOCK:
+        candidates = _MEMORY_CACHE.setdefault(slug, [])
+        if not candidates and os.path.isdir(cache_dir):
+            for name in sorted(os.listdir(cache_dir)):
+                if name.startswith(slug + '_') and name.endswith('.npz'):
+                    try:
+                        candidates.append(CircuitGeometry.load(os.path.join(cache_dir, name)))
+                    except Exception as e:
+                        print(f"[Warning] Corrupt geometry cache {name}: {e}")
+
+        for geom in candidates:
+            if event is not None and event in geom.events:
+                return geom
+
+        lap = reference_lap if reference_lap is not None else session.laps.pick_fastest()
+        lap_length = _lap_length(lap)
+        tolerance = lap_length * config.TRACK_GEOMETRY_LAYOUT_TOLERANCE
+        geom = next((g for g in candidates if abs(g.lap_length - lap_length) <= tolerance), None)
+        if geom is None:
+            tel, _ = repair_telemetry(lap.get_telemetry(), lap_time=lap['LapTime'])
+            if 'Distance' not in tel.columns:
+                tel = tel.add_distance()
+            geom = build_geometry(slug, tel, rotation=_circuit_rotation(session))
+            candidates.append(geom)
+            print(f"[System] Circuit geometry built: {slug} ({geom.length:.0f} m)")
+        if event is not None:
+            geom.events.add(event)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            geom.save(os.path.join(cache_dir, f"{slug}_{int(round(geom.length))}.npz"))
+        except OSError as e:
+            print(f"[Warning] Could not store circuit geometry: {e}")
+        return geom
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+traffic.py
+On-track gaps and traffic / tow flags from position data.
+
+Every car's position samples (session.pos_data) are resampled onto one common
+session-time grid and projected onto the cached circuit centreline with a
+single k-d tree query (track_geometry). At every grid time the cars on track
+are sorted by track distance, so the car ahead / behind of each car and the
+distance to it come from one argsort per time step — no per-pair loops.
+
+Distance gaps are converted to time gaps with the speed of the car that has
+to close them (own speed ahead, following car's speed behind).
+
+Per lap (detect_traffic):
+    GapAheadMin / GapBehindMin   smallest time gap during the lap (s)
+    DirtyAirPct                  % of samples close behind a car in corners
+    TowPct                       % of samples close behind a car on straights
+    InTraffic / InTow            DirtyAirPct / TowPct ≥ TRAFFIC_MIN_LAP_SHARE
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from practice import config
+from practice.track_geometry import get_circuit_geometry
+
+# Speeds below this are clamped when converting distance gaps to time (km/h)
+_MIN_GAP_SPEED = 30.0
+
+
+# -----------------------------------------------------------------------------
+# 1. Resampling and projection
+# -----------------------------------------------------------------------------
+
+def _seconds(values) -> np.ndarray:
+    return pd.to_timedelta(values).dt.total_seconds().to_numpy()
+
+
+def _on_lap(grid: np.ndarray, drv_laps: pd.DataFrame) -> np.ndarray:
+    """True where a grid time falls inside one of the driver's laps."""
+    windows = drv_laps.dropna(subset=['LapStartTime', 'Time']).sort_values('LapStartTime')
+    if windows.empty:
+        return np.zeros(len(grid), dtype=bool)
+    starts = _seconds(windows['LapStartTime'])
+    ends = _seconds(windows['Time'])
+    i = np.searchsorted(starts, grid, side='right') - 1
+    return (i >= 0) & (grid <= ends[np.clip(i, 0, None)])
+
+
+def _resample(session, laps, geom, grid: np.ndarray):
+    """
+    (drivers, S, V): track distance (m) and speed (km/h) of every car on the
+    grid, shape (len(grid), n_cars). NaN where a car is not on track.
+    """
+    angle = np.deg2rad(geom.rotation)
+    try:
+        car_data = session.car_data
+    except Exception:
+        car_data = {}
+    drivers, xs, ys, speeds, masks = [], [], [], [], []
+    for drv_num, drv_laps in laps.groupby('DriverNumber'):
+        pos = session.pos_data.get(str(drv_num))
+        if pos is None or pos.empty:
+            continue
+        t = _seconds(pos['SessionTime'])
+        x_raw = pos['X'].to_numpy(dtype=float)
+        y_raw = pos['Y'].to_numpy(dtype=float)
+        xs.append(np.interp(grid, t, x_raw * np.cos(angle) - y_raw * np.sin(angle)))
+        ys.append(np.interp(grid, t, x_raw * np.sin(angle) + y_raw * np.cos(angle)))
+        mask = _on_lap(grid, drv_laps) & (grid >= t[0]) & (grid <= t[-1])
+        if 'Status' in pos.columns:
+            on_track = (pos['Status'] == 'OnTrack').to_numpy()
+            mask &= np.interp(grid, t, on_track.astype(float)) > 0.5
+        masks.append(mask)
+
+        car = car_data.get(str(drv_num))
+        if car is not None and not car.empty:
+            speeds.append(np.interp(grid, _seconds(car['SessionTime']), car['Speed'].to_numpy(dtype=float)))
+        else:
+            speeds.append(np.full(len(grid), np.nan))
+        drivers.append(drv_laps['Driver'].iloc[0])
+
+    if not drivers:
+        return [], np.empty((len(grid), 0)), np.empty((len(grid), 0))
+
+    X, Y = np.column_stack(xs), np.column_stack(ys)
+    mask = np.column_stack(masks)
+
+    # One k-d tree query for every sample of every car
+    tree = cKDTree(np.column_stack([geom.x, geom.y]))
+    offset, idx = tree.query(np.column_stack([X[mask], Y[mask]]))
+    units_per_m = np.median(np.hypot(np.diff(geom.x), np.diff(geom.y))) / geom.step
+
+    S = np.full(X.shape, np.nan)
+    S[mask] = np.where(offset / units_per_m <= config.TRAFFIC_MAX_OFFSET_M,
+                       geom.distance[idx], np.nan)
+
+    V = np.column_stack(speeds)
+    # Cars without car data: speed from the track-distance derivative
+    lap_length = geom.length + geom.step
+    ds = np.mod(np.gradient(np.nan_to_num(S), axis=0), lap_length)
+    derived = np.minimum(ds, lap_length - ds) / config.TRAFFIC_SAMPLE_S * 3.6
+    V = np.where(np.isnan(V), derived, V)
+    return drivers, S, V
+
+
+# -----------------------------------------------------------------------------
+# 2. Gaps ahead / behind
+# -----------------------------------------------------------------------------
+
+def _circular_neighbours(S: np.ndarray, lap_length: float):
+    """
+    For every (time, car): column of the car ahead / behind on track and the
+    distance to it (m). NaN / -1 where fewer than two cars are on track.
+    """
+    n_t, n_cars = S.shape
+    order = np.argsort(np.where(np.isnan(S), np.inf, S), axis=1)
+    s_sorted = np.take_along_axis(S, order, axis=1)
+    n_valid = (~np.isnan(S)).sum(axis=1, keepdims=True)
+
+    rank = np.broadcast_to(np.arange(n_cars), (n_t, n_cars))
+    k = np.maximum(n_valid, 1)
+    ahead_rank = (rank + 1) % k
+    behind_rank = (rank - 1) % k
+    gap_ahead = np.mod(np.take_along_axis(s_sorted, ahead_rank, axis=1) - s_sorted, lap_length)
+    gap_behind = np.mod(s_sorted - np.take_along_axis(s_sorted, behind_rank, axis=1), lap_length)
+    ahead = np.take_along_axis(order, ahead_rank, axis=1)
+    behind = np.take_along_axis(order, behind_rank, axis=1)
+
+    invalid = (rank >= n_valid) | (n_valid < 2)
+    gap_ahead[invalid] = gap_behind[invalid] = np.nan
+    ahead[invalid] = behind[invalid] = -1
+
+    # Back from rank order to car columns
+    rows = np.arange(n_t)[:, None]
+    out = [np.empty_like(a) for a in (gap_ahead, gap_behind, ahead, behind)]
+    for dst, src in zip(out, (gap_ahead, gap_behind, ahead, behind)):
+        dst[rows, order] = src
+    return tuple(out)
+
+
+def compute_track_gaps(session, laps=None) -> pd.DataFrame:
+    """
+    On-track gaps of every car at every grid time.
+
+    Columns: SessionTime (s), Driver, TrackDistance (m), Speed (km/h),
+             CarAhead, GapAhead (s), CarBehind, GapBehind (s).
+    Only samples of cars on track; empty DataFrame without position data.
+    """
+    columns = ['SessionTime', 'Driver', 'TrackDistance', 'Speed',
+               'CarAhead', 'GapAhead', 'CarBehind', 'GapBehind']
+    laps = session.laps if laps is None else laps
+    timed = laps.dropna(subset=['LapStartTime', 'Time'])
+    if timed.empty:
+        return pd.DataFrame(columns=columns)
+
+    geom = get_circuit_geometry(session)
+    grid = np.arange(_seconds(timed['LapStartTime']).min(),
+                     _seconds(timed['Time']).max(), config.TRAFFIC_SAMPLE_S)
+    drivers, S, V = _resample(session, laps, geom, grid)
+    if len(drivers) < 2:
+        return pd.DataFrame(columns=columns)
+
+    gap_ahead_m, gap_behind_m, ahead, behind = _circular_neighbours(S, geom.length + geom.step)
+    v_ms = np.maximum(V, _MIN_GAP_SPEED) / 3.6
+    rows = np.arange(len(grid))[:, None]
+    v_behind = np.where(behind >= 0, v_ms[rows, np.maximum(behind, 0)], np.nan)
+
+    names = np.array(drivers + [None], dtype=object)       # index -1 → None
+    valid = ~np.isnan(S)
+    df = pd.DataFrame({
+        'SessionTime':   np.broadcast_to(grid[:, None], S.shape)[valid],
+        'Driver':        np.broadcast_to(names[:-1], S.shape)[valid],
+        'TrackDistance': S[valid],
+        'Speed':         V[valid],
+        'CarAhead':      names[ahead[valid]],
+        'GapAhead':      (gap_ahead_m / v_ms)[valid],
+        'CarBehind':     names[behind[valid]],
+        'GapBehind':     (gap_behind_m / v_behind)[valid],
+    })
+    return df[columns].sort_values(['Driver', 'SessionTime'], ignore_index=True)
+
+
+# -----------------------------------------------------------------------------
+# 3. Lap flags
+# -----------------------------------------------------------------------------
+
+def detect_traffic(session, laps=None, gaps: pd.DataFrame | None = None):
+    """
+    Returns a copy of `laps` (default: session.laps) with added columns:
+        GapAheadMin, GapBehindMin, DirtyAirPct, TowPct, InTraffic, InTow
+    Laps without position samples get NaN metrics and False flags.
+    """
+    laps = (session.laps if laps is None else laps).copy()
+    gaps = compute_track_gaps(session, laps) if gaps is None else gaps
+
+    for column in ('GapAheadMin', 'GapBehindMin', 'DirtyAirPct', 'TowPct'):
+        laps[column] = np.nan
+    laps['InTraffic'] = False
+    laps['InTow'] = False
+    if gaps.empty:
+        return laps
+
+    # Sample → lap row (label in `laps`), per driver via searchsorted on lap starts
+    lap_label = pd.Series(np.nan, index=gaps.index, dtype=object)
+    timed = laps.dropna(subset=['LapStartTime', 'Time'])
+    for drv, drv_laps in timed.groupby('Driver'):
+        drv_laps = drv_laps.sort_values('LapStartTime')
+        sel = (gaps['Driver'] == drv).to_numpy()
+        t = gaps['SessionTime'].to_numpy()[sel]
+        starts = _seconds(drv_laps['LapStartTime'])
+        ends = _seconds(drv_laps['Time'])
+        i = np.searchsorted(starts, t, side='right') - 1
+        inside = (i >= 0) & (t <= ends[np.clip(i, 0, None)])
+        labels = np.where(inside, drv_laps.index.to_numpy()[np.clip(i, 0, None)], None)
+        lap_label[sel] = labels
+
+    close = gaps['GapAhead'] < config.TRAFFIC_DIRTY_AIR_GAP_S
+    fast = gaps['Speed'] >= config.TRAFFIC_TOW_MIN_SPEED
+    flags = pd.DataFrame({
+        'Lap':       lap_label,
+        'GapAhead':  gaps['GapAhead'],
+        'GapBehind': gaps['GapBehind'],
+        'DirtyAir':  (close & ~fast).astype(float),
+        'Tow':       ((gaps['GapAhead'] < config.TRAFFIC_TOW_GAP_S) & fast).astype(float),
+    }).dropna(subset=['Lap'])
+
+    per_lap = flags.groupby('Lap').agg(
+        GapAheadMin=('GapAhead', 'min'), GapBehindMin=('GapBehind', 'min'),
+        DirtyAirPct=('DirtyAir', 'mean'), TowPct=('Tow', 'mean'))
+    per_lap[['DirtyAirPct', 'TowPct']] *= 100.0
+
+    idx = per_lap.index
+    for column in per_lap.columns:
+        laps.loc[idx, column] = per_lap[column].to_numpy()
+    laps['InTraffic'] = laps['DirtyAirPct'] >= config.TRAFFIC_MIN_LAP_SHARE * 100.0
+    laps['InTow'] = laps['TowPct'] >= config.TRAFFIC_MIN_LAP_SHARE * 100.0
+    return laps
+
+
+def pick_free_air(laps, traffic: bool = True, tow: bool = True):
+    """Laps of detect_traffic without the traffic and/or tow flag."""
+    keep = pd.Series(True, index=laps.index)
+    if traffic:
+        keep &= ~laps['InTraffic']
+    if tow:
+        keep &= ~laps['InTow']
+    return laps[keep]
+
+
+def summarize_traffic(laps) -> pd.DataFrame:
+    """Flagged lap count per driver (rows = Driver): Laps, InTraffic, InTow."""
+    return laps.groupby('Driver').agg(Laps=('LapNumber', 'size'),
+                                      InTraffic=('InTraffic', 'sum'),
+                                      InTow=('InTow', 'sum'))
@@ -0,0 +1,137 @@
+"""
+Report bundles: build, incremental rebuild, selective clean (see practice/report_bundle.py).
+
+    python report.py build --year 2024 --gp mexico --session FP2
+    python report.py build --year 2024 --gp mexico --session FP2 \\
+        --analyses lap_gap,long_runs --param long_runs.corrected=true
+    python report.py rebuild                       # every bundle, stale outputs only
+    python report.py rebuild Saved_photos/bundles/2024_Mexico_City_Grand_Prix_FP2 --force
+    python report.py clean --older-than 30 --dry-run
+    python report.py clean --loose --older-than 7  # loose charts in Saved_photos
+    python report.py list
+
+--recorded uses pickled sessions (practice/recorded_session.py) instead of FastF1.
+"""
+import argparse
+import os
+import sys
+
+import fastf1
+
+from practice import config
+from practice.event_index import resolve_event
+from practice.recorded_session import RecordedSessionLoader
+from practice.report_bundle import (build_bundle, clean_bundles, clean_loose, list_bundles,
+                                    read_manifest, rebuild_bundle)
+from practice.save_utils import DEFAULT_SAVE_DIR
+from practice.session_loader import SessionLoader
+
+
+def _analyses(names: str | None, params: list) -> dict | None:
+    """--analyses a,b and --param a.key=value → {name: params} (None = defaults)."""
+    from practice.analysis_server import parse_params
+
+    selected = [n.strip() for n in names.split(',') if n.strip()] if names else []
+    raw = {}
+    for item in params:
+        target, _, value = item.partition('=')
+        name, _, key = target.partition('.')
+        if not (key and value):
+            raise ValueError(f"Expected --param analysis.key=value, got '{item}'")
+        raw.setdefault(name, {})[key] = value
+        if name not in selected:
+            selected.append(name)
+    if not selected:
+        return None
+    # Same parsers as the server's query parameters; missing ones keep their defaults
+    return {name: {k: v for k, v in parse_params(name, raw.get(name, {})).items()
+                   if k in raw.get(name, {})} for name in selected}
+
+
+def _loader(recorded):
+    if recorded is None:
+        os.makedirs('cache', exist_ok=True)
+        fastf1.Cache.enable_cache('cache')
+        return SessionLoader()
+    return RecordedSessionLoader(recorded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="F1 report bundles")
+    parser.add_argument('--root', default=config.REPORT_BUNDLE_DIR, help="bundle directory")
+    sessions = argparse.ArgumentParser(add_help=False)
+    sessions.add_argument('--recorded', nargs='?', const=config.RECORDED_SESSIONS_DIR,
+                          metavar='DIR', help="use pickled sessions from DIR instead of FastF1")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', parents=[sessions],
+                                help="create / update the bundle of one session")
+    build.add_argument('--year', type=int, required=True)
+    build.add_argument('--gp', required=True)
+    build.add_argument('--session', required=True)
+    build.add_argument('--analyses', help="comma-separated (default: REPORT_BUNDLE_ANALYSES "
+                                          "or the outputs already in the bundle)")
+    build.add_argument('--param', action='append', default=[], metavar='ANALYSIS.KEY=VALUE')
+    build.add_argument('--force', action='store_true', help="rebuild up-to-date outputs too")
+
+    rebuild = commands.add_parser('rebuild', parents=[sessions],
+                                  help="regenerate stale outputs of bundles")
+    rebuild.add_argument('bundles', nargs='*', help="bundle directories (default: all)")
+    rebuild.add_argument('--force', action='store_true')
+
+    clean = commands.add_parser('clean', help="prune orphaned files / old bundles")
+    clean.add_argument('--older-than', type=float, metavar='DAYS')
+    clean.add_argument('--loose', action='store_true',
+                       help=f"clean loose charts in {DEFAULT_SAVE_DIR} instead of bundles")
+    clean.add_argument('--dry-run', action='store_true')
+
+    commands.add_parser('list', help="bundles and their outputs")
+    args = parser.parse_args()
+
+    if args.command == 'clean':
+        if args.loose:
+            clean_loose(DEFAULT_SAVE_DIR, older_than_days=args.older_than, dry_run=args.dry_run)
+        else:
+            clean_bundles(args.root, older_than_days=args.older_than, dry_run=args.dry_run)
+        return
+
+    if args.command == 'list':
+        for path in list_bundles(args.root):
+            outputs = read_manifest(path)['outputs']
+            failed = [k for k, e in outputs.items() if e.get('status') == 'failed']
+            print(f"{path}: {len(outputs)} output(s)"
+                  f"{', failed: ' + ', '.join(failed) if failed else ''}")
+        return
+
+    loader = _loader(args.recorded)
+    failed = False
+    try:
+        if args.command == 'build':
+            try:
+                analyses = _analyses(args.analyses, args.param)
+            except (KeyError, ValueError) as e:
+                sys.exit(f"[Error] Invalid analysis selection: {e}")
+            gp = resolve_event(args.year, args.gp)
+            session = loader.ensure(args.year, gp, args.session.upper(), parts=('laps',))
+            # Recordings hold every data part; only the live loader loads per output
+            reports = [build_bundle(session, analyses, None if args.recorded else loader,
+                                    force=args.force, root=args.root)]
+        else:
+            paths = args.bundles or list_bundles(args.root)
+            if not paths:
+                print(f"[System] No bundles in {args.root}")
+            reports = [rebuild_bundle(path, loader, force=args.force) for path in paths]
+        for report in reports:
+            if report is None:
+                failed = True
+                continue
+            print(report.to_string(index=False))
+            failed |= bool((report['Status'] == 'failed').any())
+    finally:
+        loader.shutdown()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
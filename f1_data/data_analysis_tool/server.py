@@ -0,0 +1,50 @@
+"""
+Local HTTP/JSON analysis server (see practice/analysis_server.py).
+
+    python server.py                                  # live FastF1 sessions
+    python server.py --recorded                       # offline, pickled sessions
+    python server.py --record 2024 "Mexico City Grand Prix" FP2   # create a recording
+"""
+import argparse
+import os
+
+import fastf1
+
+from practice import config
+from practice.analysis_server import serve
+from practice.event_index import resolve_event
+from practice.recorded_session import RecordedSessionLoader, record_session
+from practice.session_loader import SessionLoader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="F1 practice analysis server")
+    parser.add_argument('--host', default=config.SERVER_HOST)
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT)
+    parser.add_argument('--max-sessions', type=int, default=config.SERVER_MAX_SESSIONS)
+    parser.add_argument('--workers', type=int, default=config.SERVER_MAX_WORKERS)
+    parser.add_argument('--recorded', nargs='?', const=config.RECORDED_SESSIONS_DIR,
+                        metavar='DIR', help="serve pickled sessions from DIR instead of FastF1")
+    parser.add_argument('--record', nargs=3, metavar=('YEAR', 'GP', 'SESSION'),
+                        help="load a session once and store it as a recording, then exit")
+    args = parser.parse_args()
+
+    if args.recorded is None or args.record:
+        os.makedirs('cache', exist_ok=True)
+        fastf1.Cache.enable_cache('cache')
+
+    if args.record:
+        year, gp, session_type = args.record
+        # Stored under the resolved event name, which is what requests resolve to
+        record_session(int(year), resolve_event(int(year), gp), session_type.upper(),
+                       directory=args.recorded or config.RECORDED_SESSIONS_DIR)
+        return
+
+    loader = (RecordedSessionLoader(args.recorded) if args.recorded
+              else SessionLoader(max_workers=args.workers))
+    serve(loader, host=args.host, port=args.port,
+          max_sessions=args.max_sessions, max_workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
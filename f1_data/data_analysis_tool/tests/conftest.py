@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic FastF1-like sessions for the practice analyses.
+
+No network and no FastF1 cache: laps and car data are generated, with the
+subset of the Laps / Lap / Telemetry API the analyses call. Laps of a driver
+are contiguous (LapStartTime of lap k+1 = Time of lap k) and every car-data
+stream is one continuous series per driver, like FastF1's.
+"""
+
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEAMS = ['Red Bull Racing', 'Ferrari', 'Mercedes', 'McLaren', 'Alpine', 'Aston Martin',
+         'RB', 'Kick Sauber', 'Williams', 'Haas F1 Team']
+
+SAMPLES_PER_LAP = 400
+
+
+class Telemetry(pd.DataFrame):
+    @property
+    def _constructor(self):
+        return Telemetry
+
+    def add_distance(self):
+        t = self['Time'].dt.total_seconds().to_numpy()
+        v = self['Speed'].to_numpy(dtype=float)
+        out = self.copy()
+        out['Distance'] = np.r_[0.0, np.cumsum(np.diff(t) * v[1:] / 3.6)]
+        return out
+
+
+class Lap(pd.Series):
+    _metadata = ['session']   # carried over from Laps, like FastF1's
+
+    @property
+    def _constructor(self):
+        return type(self)
+
+    def get_car_data(self):
+        tel = self.session.car_data[self['DriverNumber']]
+        start, end = self['LapStartTime'], self['Time']
+        lap = tel[(tel['SessionTime'] >= start) & (tel['SessionTime'] < end)].copy()
+        lap['Time'] = lap['SessionTime'] - start
+        return Telemetry(lap.reset_index(drop=True))
+
+    get_telemetry = get_car_data
+
+
+class Laps(pd.DataFrame):
+    _metadata = ['session']
+
+    @property
+    def _constructor(self):
+        return Laps
+
+    @property
+    def _constructor_sliced(self):
+        return Lap
+
+    def pick_drivers(self, drivers):
+        drivers = [drivers] if isinstance(drivers, str) else list(drivers)
+        return self[self['DriverNumber'].isin(drivers) | self['Driver'].isin(drivers)]
+
+    def pick_fastest(self):
+        return self.loc[self['LapTime'].idxmin()]
+
+    def pick_wo_box(self):
+        return self[self['PitInTime'].isna() & self['PitOutTime'].isna()]
+
+    def pick_accurate(self):
+        return self[self['IsAccurate']]
+
+    def pick_quicklaps(self, threshold=1.07):
+        return self[self['LapTime'] < self['LapTime'].min() * threshold]
+
+    def pick_team(self, team):
+        return self[self['Team'] == team]
+
+
+class Event(dict):
+    __getattr__ = dict.__getitem__
+
+
+class Session:
+    name = 'Practice 2'
+
+
+def _stream(rng, lap_times, starts):
+    """One driver's car data: SAMPLES_PER_LAP samples per lap, none duplicated."""
+    parts = []
+    for lt, t0 in zip(lap_times, starts):
+        t = np.linspace(0, lt, SAMPLES_PER_LAP, endpoint=False)
+        phase = np.linspace(0, 12 * np.pi, SAMPLES_PER_LAP, endpoint=False)
+        speed = 200 + 100 * np.sin(phase) + rng.normal(0, 2, SAMPLES_PER_LAP)
+        parts.append(pd.DataFrame({
+            'SessionTime': pd.to_timedelta(t0 + t, unit='s'),
+            'Speed':       speed,
+            'Throttle':    np.clip(speed / 3, 0, 100),
+            'Brake':       speed < 130,
+            'nGear':       np.clip((speed // 45).astype(int), 1, 8),
+            'RPM':         8000 + speed * 20,
+            'DRS':         np.where(speed > 280, 12, 0),
+            # One loop of a 1.8 km-radius circle per lap
+            'X':           1800 * np.cos(2 * np.pi * t / lt),
+            'Y':           1800 * np.sin(2 * np.pi * t / lt),
+        }))
+    tel = pd.concat(parts, ignore_index=True)
+    tel['Time'] = tel['SessionTime'] - tel['SessionTime'].iloc[0]
+    tel['Date'] = pd.Timestamp('2024-10-25 12:00') + tel['SessionTime']
+    return Telemetry(tel)
+
+
+def make_session(n_drivers: int = 6, laps_per: int = 12, seed: int = 1) -> Session:
+    rng = np.random.default_rng(seed)
+    nums = [str(i + 1) for i in range(n_drivers)]
+    abbs = [f"D{i:02d}" for i in range(n_drivers)]
+    teams = [TEAMS[i // 2 % len(TEAMS)] for i in range(n_drivers)]
+    rows, car_data = [], {}
+    for d, (num, abb, team) in enumerate(zip(nums, abbs, teams)):
+        lap_times = 80 + d * 0.1 + rng.normal(0.5, 0.3, laps_per)
+        lap_times[::6] += 3   # out laps
+        starts = 600.0 + np.r_[0.0, np.cumsum(lap_times)[:-1]]
+        for k, (lt, t0) in enumerate(zip(lap_times, starts)):
+            rows.append(dict(
+                DriverNumber=num, Driver=abb, Team=team, LapNumber=float(k + 1),
+                Stint=float(k // 6 + 1), Compound=['SOFT', 'MEDIUM'][k // 6 % 2],
+                TyreLife=float(k % 6 + 1),
+                LapTime=pd.Timedelta(seconds=lt), LapStartTime=pd.Timedelta(seconds=t0),
+                Time=pd.Timedelta(seconds=t0 + lt),
+                LapStartDate=pd.NaT,
+                Sector1Time=pd.Timedelta(seconds=lt * .3),
+                Sector2Time=pd.Timedelta(seconds=lt * .4),
+                Sector3Time=pd.Timedelta(seconds=lt * .3),
+                PitOutTime=pd.Timedelta(seconds=t0) if k % 6 == 0 else pd.NaT,
+                PitInTime=pd.Timedelta(seconds=t0 + lt) if k % 6 == 5 else pd.NaT,
+                SpeedI1=250 + rng.normal(0, 5), SpeedI2=260 + rng.normal(0, 5),
+                SpeedFL=280 + rng.normal(0, 5), SpeedST=320 - d + rng.normal(0, 1),
+                IsAccurate=True))
+        car_data[num] = _stream(rng, lap_times, starts)
+
+    session = Session()
+    session.laps = Laps(rows)
+    # Propagated to every slice and row, so a Lap can reach its car data
+    session.laps.session = session
+    session.car_data = car_data
+    session.results = pd.DataFrame({'DriverNumber': nums, 'Abbreviation': abbs,
+                                    'TeamName': teams})
+    session.drivers = nums
+    session.event = Event(year=2024, EventName='Test Grand Prix', RoundNumber=1,
+                          Location='Test', Country='Testland')
+    return session
+
+
+@pytest.fixture
+def session():
+    return make_session()
+
+
+@pytest.fixture
+def session_factory():
+    return make_session
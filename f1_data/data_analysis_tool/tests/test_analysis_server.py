@@ -0,0 +1,135 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from conftest import make_session
+from practice import analysis_server
+from practice.analysis_server import ANALYSES, AnalysisService, NoDataError
+from practice.recorded_session import RecordedSessionLoader, recording_path, save_recording
+
+GP = 'Test Grand Prix'
+
+
+class StubLoader:
+    """SessionLoader stand-in: synthetic sessions, every ensure / forget recorded."""
+
+    def __init__(self):
+        self.ensured, self.forgotten = [], []
+
+    def ensure(self, year, gp=None, session_type=None, parts=('laps',)):
+        self.ensured.append((year, gp, session_type))
+        return make_session()
+
+    def loaded_parts(self, session):
+        return ('laps', 'telemetry', 'messages')
+
+    def forget(self, year, gp=None, session_type=None):
+        self.forgotten.append((year, gp, session_type))
+
+    def shutdown(self, wait=False):
+        pass
+
+
+@pytest.fixture
+def service():
+    service = AnalysisService(StubLoader(), max_sessions=2, max_workers=2)
+    yield service
+    service.shutdown()
+
+
+def test_recorded_session_serves_json_and_png(tmp_path):
+    save_recording(make_session(), recording_path(2024, GP, 'FP2', str(tmp_path)))
+    service = AnalysisService(RecordedSessionLoader(str(tmp_path)), max_workers=1)
+    try:
+        rows = json.loads(service.run('sector_ranking', 2024, GP, 'fp2', {}))
+        png = service.run('sector_ranking', 2024, GP, 'FP2', {}, fmt='png')
+    finally:
+        service.shutdown()
+
+    assert {row['Driver'] for row in rows} >= {'D00', 'D05'}
+    assert png.startswith(b'\x89PNG')
+
+
+def test_missing_recording_raises_file_not_found(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        RecordedSessionLoader(str(tmp_path)).ensure(2024, GP, 'FP2')
+
+
+def test_warm_session_computes_and_renders_once(service, monkeypatch):
+    calls = {'compute': 0, 'render': 0}
+    spec = ANALYSES['sector_ranking']
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setitem(spec, 'compute', counted('compute', spec['compute']))
+    monkeypatch.setitem(spec, 'render', counted('render', spec['render']))
+    for _ in range(2):
+        service.run('sector_ranking', 2024, GP, 'FP2', {})
+        service.run('sector_ranking', 2024, GP, 'FP2', {}, fmt='png')
+
+    assert service.cache.loader.ensured == [(2024, GP, 'FP2')]
+    assert calls == {'compute': 1, 'render': 1}
+
+
+def test_least_recently_used_session_is_evicted(service):
+    for session_type in ('FP1', 'FP2', 'FP1', 'FP3'):
+        service.run('sector_ranking', 2024, GP, session_type, {})
+
+    assert service.cache.loader.forgotten == [(2024, GP, 'FP2')]
+    assert [s['session'] for s in service.cache.warm_sessions()] == ['FP1', 'FP3']
+
+
+def test_empty_result_raises_no_data(service, monkeypatch):
+    monkeypatch.setitem(ANALYSES['sector_ranking'], 'compute', lambda s: pd.DataFrame())
+    with pytest.raises(NoDataError):
+        service.run('sector_ranking', 2024, GP, 'FP2', {})
+
+
+@pytest.fixture
+def base_url(service, monkeypatch):
+    monkeypatch.setattr(analysis_server, 'resolve_event', lambda year, gp: gp)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), analysis_server._make_handler(service))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, response.headers['Content-Type'], response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers['Content-Type'], e.read()
+
+
+def test_http_status_codes(base_url, monkeypatch):
+    session = 'year=2024&gp=Test%20Grand%20Prix&session=FP2'
+
+    status, content_type, body = _get(f"{base_url}/analysis/sector_ranking?{session}")
+    assert (status, content_type) == (200, 'application/json')
+    assert json.loads(body)
+    status, content_type, body = _get(f"{base_url}/analysis/sector_ranking?{session}&format=png")
+    assert (status, content_type) == (200, 'image/png')
+
+    assert _get(f"{base_url}/health")[0] == 200
+    assert _get(f"{base_url}/nowhere")[0] == 404
+    assert _get(f"{base_url}/analysis/unknown?{session}")[0] == 404
+    assert _get(f"{base_url}/analysis/sector_ranking?year=2024&gp=X")[0] == 400
+    assert _get(f"{base_url}/analysis/strategy?{session}")[0] == 400   # race_laps required
+    assert _get(f"{base_url}/analysis/sector_ranking?{session}&format=xml")[0] == 400
+    assert _get(f"{base_url}/analysis/quality?{session}&format=png")[0] == 400
+
+    monkeypatch.setitem(ANALYSES['speed_traps'], 'compute', lambda s: pd.DataFrame())
+    status, _, body = _get(f"{base_url}/analysis/speed_traps?{session}")
+    assert status == 422
+    assert 'No data' in json.loads(body)['error']
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from practice.event_index import EventIndex, normalize
+
+EVENTS = [
+    (2024, 19, 'United States Grand Prix', 'FORMULA 1 PIRELLI UNITED STATES GRAND PRIX 2024',
+     'United States', 'Austin'),
+    (2024, 20, 'Mexico City Grand Prix', 'FORMULA 1 GRAN PREMIO DE LA CIUDAD DE MÉXICO 2024',
+     'Mexico', 'Mexico City'),
+    (2024, 21, 'São Paulo Grand Prix', 'FORMULA 1 LENOVO GRANDE PRÊMIO DE SÃO PAULO 2024',
+     'Brazil', 'São Paulo'),
+    (2024, 22, 'Las Vegas Grand Prix', 'FORMULA 1 HEINEKEN SILVER LAS VEGAS GRAND PRIX 2024',
+     'United States', 'Las Vegas'),
+    (2024, 16, 'Italian Grand Prix', 'FORMULA 1 PIRELLI GRAN PREMIO D’ITALIA 2024',
+     'Italy', 'Monza'),
+    (2023, 20, 'Mexico City Grand Prix', 'FORMULA 1 GRAN PREMIO DE LA CIUDAD DE MÉXICO 2023',
+     'Mexico', 'Mexico City'),
+]
+
+
+@pytest.fixture
+def index():
+    events = pd.DataFrame(EVENTS, columns=['Year', 'RoundNumber', 'EventName',
+                                           'OfficialEventName', 'Country', 'Location'])
+    events['EventDate'] = pd.Timestamp('2024-10-27')
+    return EventIndex(events)
+
+
+def test_normalize_folds_accents_and_case():
+    assert normalize('São Paulo  Grand-Prix') == 'sao paulo grand prix'
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('Mexico City Grand Prix', 'Mexico City Grand Prix'),
+    ('sao paulo', 'São Paulo Grand Prix'),
+    ('Brazil', 'São Paulo Grand Prix'),
+    ('monza', 'Italian Grand Prix'),
+    ('vegas', 'Las Vegas Grand Prix'),
+    ('20', 'Mexico City Grand Prix'),
+    ('Mexcio', 'Mexico City Grand Prix'),
+    ('Interlgos', 'São Paulo Grand Prix'),
+])
+def test_resolve(index, query, expected):
+    assert index.resolve(query, 2024) == expected
+
+
+def test_resolve_unknown(index):
+    assert index.resolve('qwerty', 2024) is None
+
+
+def test_search_restricted_to_year(index):
+    hits = index.search('mexico', 2023)
+    assert hits['Year'].tolist() == [2023]
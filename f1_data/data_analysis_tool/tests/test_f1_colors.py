@@ -0,0 +1,35 @@
+import pytest
+
+from practice.f1_colors import (DEFAULT_COLOR, TEAM_COLORS_MAP, clear_driver_index,
+                                get_driver_index, get_team_color)
+
+
+def _scan(team_name):
+    """Reference: first keyword of TEAM_COLORS_MAP contained in the name."""
+    name = team_name.lower()
+    return next((color for keyword, color in TEAM_COLORS_MAP.items() if keyword in name),
+                DEFAULT_COLOR)
+
+
+@pytest.mark.parametrize('team', [
+    'Red Bull Racing', 'Aston Martin Red Bull Racing', 'Racing Point BWT Mercedes',
+    'Kick Sauber', 'Stake F1 Team Kick Sauber', 'Visa Cash App RB', 'RB', 'Racing Bulls',
+    'Alfa Romeo Racing ORLEN', 'Scuderia Toro Rosso', 'Haas F1 Team', 'Unknown Team'])
+def test_team_color_keeps_keyword_priority(team):
+    assert get_team_color(team) == _scan(team)
+
+
+def test_team_color_priority_is_map_order_not_name_position():
+    # 'red bull' comes before 'aston martin' in the map
+    assert get_team_color('Aston Martin Red Bull Racing') == TEAM_COLORS_MAP['red bull']
+    assert get_team_color('') == get_team_color('Nobody') == DEFAULT_COLOR
+
+
+def test_driver_index_rebuilt_after_clear(session):
+    index = get_driver_index(session)
+    assert get_driver_index(session) is index
+
+    session.results.loc[0, 'TeamName'] = 'Williams'
+    assert get_driver_index(session).team('D00') == 'Red Bull Racing'
+    clear_driver_index(session)
+    assert get_driver_index(session).team('D00') == 'Williams'
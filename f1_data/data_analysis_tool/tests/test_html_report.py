@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+from practice import html_report
+
+
+def test_downforce_section_laps_fallback_has_no_driver(session, monkeypatch):
+    # No telemetry: the laps-only table has one row per team and no Driver column
+    monkeypatch.setattr(html_report, 'compute_grid_aero', lambda s: pd.DataFrame())
+    section = html_report._downforce_section(session)
+
+    assert section is not None
+    assert section['xLabel'].startswith('Mean speed index')
+    assert {p['team'] for p in section['points']} == set(session.laps['Team'])
+    assert all(p['driver'] is None for p in section['points'])
+
+
+def test_downforce_section_with_telemetry_keeps_driver(session):
+    section = html_report._downforce_section(session)
+    assert section['xLabel'] == 'Mean speed (km/h)'
+    assert all(p['driver'] for p in section['points'])
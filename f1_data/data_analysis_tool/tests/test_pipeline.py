@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from practice import braking, config, powertrain
+from practice.analysis_server import ANALYSES
+from practice.pipeline import load_pipeline, run_pipeline, validate_pipeline
+
+
+def _spec(**extra):
+    spec = {'pipeline': {'save': False, 'workers': 1},
+            'steps': {'strategy': {'analysis': 'strategy', 'params': {'race_laps': 50}}}}
+    spec.update(extra)
+    validate_pipeline(spec)
+    return spec
+
+
+def test_config_override_reaches_registry_defaults(session, monkeypatch):
+    seen = {}
+
+    def compute(session, race_laps, pit_loss):
+        seen['pit_loss'] = pit_loss
+        return None
+
+    monkeypatch.setitem(ANALYSES['strategy'], 'compute', compute)
+    default = config.STRATEGY_PIT_LOSS
+    out = run_pipeline(_spec(config={'STRATEGY_PIT_LOSS': default + 7.0}), session)
+
+    assert out['report'].set_index('Step').loc['strategy', 'Status'] == 'ok'
+    assert seen['pit_loss'] == default + 7.0
+    assert config.STRATEGY_PIT_LOSS == default
+
+
+def test_process_level_config_override_rejected():
+    with pytest.raises(ValueError, match='SERVER_PORT'):
+        _spec(config={'SERVER_PORT': 9000})
+
+
+def test_session_telemetry_provider_feeds_braking_and_powertrain(session, monkeypatch):
+    calls = []
+    for module in (braking, powertrain):
+        original = module.concat_session_telemetry
+        monkeypatch.setattr(module, 'concat_session_telemetry',
+                            lambda *a, _f=original, **k: calls.append(1) or _f(*a, **k))
+    spec = {'pipeline': {'save': False, 'workers': 2},
+            'steps': {'rep_laps': {'provider': 'representative_laps'},
+                      'rep_tel': {'provider': 'session_telemetry',
+                                  'inputs': {'laps': 'rep_laps'}},
+                      'braking': {'analysis': 'braking', 'inputs': {'tel': 'rep_tel'}},
+                      'powertrain': {'analysis': 'powertrain', 'inputs': {'tel': 'rep_tel'}}}}
+    validate_pipeline(spec)
+    out = run_pipeline(spec, session)
+
+    assert (out['report']['Status'] == 'ok').all(), out['report']
+    assert calls == []
+    direct = braking.compute_braking(session, laps=out['results']['rep_laps'])
+    assert out['results']['braking']['table'].equals(direct['table'])
+
+
+def test_example_pipeline_validates():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    load_pipeline(os.path.join(root, 'pipelines', 'practice_review.toml'))
+
+
+def test_data_parts_loaded_before_steps_run(session, monkeypatch):
+    events = []
+
+    class Loader:
+        def ensure(self, session, parts=('laps',)):
+            events.append(('ensure', tuple(sorted(parts))))
+            return session
+
+    def compute(name):
+        return lambda session, **params: events.append(('step', name))
+
+    monkeypatch.setitem(ANALYSES['sector_ranking'], 'compute', compute('sector_ranking'))
+    monkeypatch.setitem(ANALYSES['telemetry_metrics'], 'compute', compute('telemetry_metrics'))
+    spec = {'pipeline': {'save': False, 'workers': 2},
+            'steps': {'sectors': {'analysis': 'sector_ranking'},
+                      'metrics': {'analysis': 'telemetry_metrics'}}}
+    validate_pipeline(spec)
+    run_pipeline(spec, session, Loader())
+
+    assert events[0] == ('ensure', ('laps', 'telemetry'))
+    assert [e for e in events[1:] if e[0] == 'ensure'] == []
+
+
+def test_low_memory_lone_concatenation_releases_streams(session):
+    class Loader:
+        dropped = ()
+
+        def ensure(self, session, parts=('laps',)):
+            return session
+
+        def drop_parts(self, session, parts):
+            self.dropped = tuple(parts)
+
+    spec = {'pipeline': {'save': False},
+            'config': {'LOW_MEMORY_MODE': True},
+            'steps': {'rep_tel': {'provider': 'session_telemetry'},
+                      'braking': {'analysis': 'braking', 'inputs': {'tel': 'rep_tel'}}}}
+    validate_pipeline(spec)
+    loader = Loader()
+    out = run_pipeline(spec, session, loader)
+
+    assert (out['report']['Status'] == 'ok').all(), out['report']
+    assert session.car_data == {}
+    assert loader.dropped == ('telemetry',)
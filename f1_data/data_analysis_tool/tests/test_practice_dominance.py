@@ -0,0 +1,47 @@
+import pytest
+
+from practice import config, practice_dominance, track_geometry
+from practice.telemetry_quality import TelemetryQualityError
+
+
+def test_bad_telemetry_falls_back_to_teammate(session, monkeypatch):
+    def clean(lap, merged=False):
+        if lap['Driver'] == 'D00':
+            raise TelemetryQualityError('dropout')
+        return lap.get_car_data()
+
+    monkeypatch.setattr(practice_dominance, 'clean_lap_telemetry', clean)
+    laps, tels = practice_dominance._select_team_telemetry(session, n_teams=3)
+
+    drivers = {lap['Team']: lap['Driver'] for lap in laps}
+    assert drivers['Red Bull Racing'] == 'D01'   # D00's teammate
+    assert len(drivers) == len(tels) == 3
+
+
+def test_team_without_valid_telemetry_is_skipped(session, monkeypatch):
+    def clean(lap, merged=False):
+        if lap['Team'] == 'Red Bull Racing':
+            raise TelemetryQualityError('dropout')
+        return lap.get_car_data()
+
+    monkeypatch.setattr(practice_dominance, 'clean_lap_telemetry', clean)
+    laps, _ = practice_dominance._select_team_telemetry(session, n_teams=3)
+
+    assert sorted(lap['Team'] for lap in laps) == ['Ferrari', 'Mercedes']
+
+
+def test_delta_comes_from_repaired_telemetry(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'TRACK_GEOMETRY_DIR', str(tmp_path))
+    monkeypatch.setattr(track_geometry, '_MEMORY_CACHE', {})
+    monkeypatch.setattr(practice_dominance.fastf1.utils, 'delta_time',
+                        lambda *a: pytest.fail('delta_time re-reads raw car data'))
+    result = practice_dominance.compute_track_dominance(session)
+
+    laps = result['laps'].set_index('Driver')
+    delta = result['delta']
+    base = laps.index[0]
+    for drv in laps.index[1:]:
+        gap = (laps.loc[drv, 'LapTime'] - laps.loc[base, 'LapTime']).total_seconds()
+        assert delta[drv].notna().all()
+        # Last baseline sample is one sample short of the line on both laps
+        assert delta[drv].iloc[-1] == pytest.approx(gap, abs=0.5)
@@ -0,0 +1,23 @@
+from practice.f1_colors import resolve_styles
+from practice.practice_downforce import compute_grid_aero, compute_grid_aero_laps
+
+
+def test_laps_variant_uses_session_team_colors(session):
+    df = compute_grid_aero_laps(session)
+    styles = resolve_styles(session)
+    expected = dict(zip(styles['TeamName'], styles['TeamColor']))
+
+    assert len(df) == 3
+    assert df.set_index('Team')['Color'].to_dict() == expected
+
+
+def test_telemetry_variant_uses_team_colors(session):
+    # Second driver of each team quicker on the straights: picked, with a teammate shade
+    for num in ('2', '4', '6'):
+        session.car_data[num]['Speed'] += 20
+    df = compute_grid_aero(session)
+    laps_df = compute_grid_aero_laps(session)
+
+    assert df['Driver'].tolist() == ['D01', 'D03', 'D05']
+    # Same team color whichever driver was picked, matching the laps-only map
+    assert df.set_index('Team')['Color'].to_dict() == laps_df.set_index('Team')['Color'].to_dict()
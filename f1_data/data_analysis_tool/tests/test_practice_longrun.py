@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+from practice import practice_longrun
+
+
+def test_free_air_gaps_use_every_car_on_track(session, monkeypatch):
+    seen = {}
+
+    def gaps_spy(s, laps=None):
+        seen['laps'] = laps
+        return pd.DataFrame(columns=['SessionTime', 'Driver', 'TrackDistance', 'Speed',
+                                     'CarAhead', 'GapAhead', 'CarBehind', 'GapBehind'])
+
+    monkeypatch.setattr(practice_longrun, 'compute_track_gaps', gaps_spy)
+    practice_longrun.extract_long_run_laps(session, free_air=True)
+
+    # Out / push laps of other cars must count as traffic, so the gaps are
+    # computed before the long-run filter
+    assert len(seen['laps']) == len(session.laps)
+
+
+
+def test_classified_long_runs_drop_push_and_cool_down_laps(session_factory):
+    session = session_factory(laps_per=18)
+    laps = session.laps
+    d00 = laps['Driver'] == 'D00'
+    lap_no = laps['LapNumber']
+    # One tyre stint: laps 1-6 a push run (lap 3 a cool-down), laps 7-18 a long run
+    laps.loc[d00, 'Stint'] = 1.0
+    laps.loc[d00 & (lap_no == 3), 'LapTime'] *= 1.15
+    laps.loc[d00 & (lap_no == 12), 'PitInTime'] = pd.NaT
+    laps.loc[d00 & (lap_no == 13), 'PitOutTime'] = pd.NaT
+    laps.loc[d00 & (lap_no == 13), 'LapTime'] -= pd.Timedelta(seconds=3)
+    long_run = laps[d00 & lap_no.between(8, 17)]['LapTime'].dt.total_seconds()
+
+    plain = practice_longrun.extract_long_run_laps(session)
+    classified = practice_longrun.extract_long_run_laps(session, classified=True)
+
+    plain = plain[plain['Driver'] == 'D00']['LapTimeSeconds']
+    classified = classified[classified['Driver'] == 'D00']['LapTimeSeconds']
+    # The plain stint filter keeps the push laps of the first run
+    assert len(plain) > len(long_run)
+    assert sorted(classified) == pytest.approx(sorted(long_run), abs=1e-3)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import Laps, Session
+from practice.practice_race import compute_pit_stops, compute_race_matrix, compute_undercuts
+
+
+@pytest.fixture
+def race(session_factory):
+    return session_factory(n_drivers=20, laps_per=70)
+
+
+def _time_ranking(laps):
+    end = laps.assign(End=laps['Time'].dt.total_seconds())
+    end['Rank'] = end.groupby('LapNumber')['End'].rank(method='first').astype(int)
+    end['Lead'] = end['End'] - end.groupby('LapNumber')['End'].transform('min')
+    return end.set_index(['Driver', 'LapNumber'])
+
+
+def test_position_and_gap_match_time_ranking(race):
+    matrix = compute_race_matrix(race).set_index(['Driver', 'LapNumber'])
+    expected = _time_ranking(race.laps).reindex(matrix.index)
+
+    assert len(matrix) == 20 * 70
+    assert (matrix['Position'] == expected['Rank']).all()
+    assert matrix['Gap'].to_numpy() == pytest.approx(expected['Lead'].to_numpy(), abs=1e-6)
+    interval = matrix.sort_values(['LapNumber', 'Position']).groupby(level='LapNumber')['RaceTime'].diff()
+    assert interval.fillna(0).to_numpy() == \
+        pytest.approx(matrix.loc[interval.index, 'Interval'].to_numpy(), abs=1e-6)
+
+
+def test_missing_lap_one_time_uses_fallback_duration(race):
+    before = compute_race_matrix(race)
+    laps = race.laps
+    laps.loc[laps['LapNumber'] == 1, 'LapTime'] = pd.NaT
+    after = compute_race_matrix(race)
+
+    assert after['RaceTime'].to_numpy() == pytest.approx(before['RaceTime'].to_numpy(), abs=1e-6)
+    assert (after['Position'] == before['Position']).all()
+
+
+def test_lapped_cars_rank_on_the_laps_they_completed(race):
+    laps = race.laps
+    race.laps = laps[~((laps['Driver'] == 'D19') & (laps['LapNumber'] > 68))]
+    matrix = compute_race_matrix(race)
+
+    assert matrix.loc[matrix['Driver'] == 'D19', 'LapNumber'].max() == 68
+    last = matrix[matrix['LapNumber'] == 70]
+    assert sorted(last['Position']) == list(range(1, 20))
+    assert not matrix[['RaceTime', 'Gap', 'Interval']].isna().any().any()
+
+
+def _duel(attacker_new_tyre_pace):
+    """D00 leads D01 by 0.2 s a lap; D01 stops on lap 8, D00 on lap 10."""
+    paces = {'D00': {10: 82.0, 11: 98.0}, 'D01': {8: 82.0, 9: 98.0}}
+    rows = []
+    for num, drv in enumerate(('D00', 'D01'), 1):
+        stop = min(paces[drv])
+        for n in range(1, 21):
+            if n in paces[drv]:
+                lap_time = paces[drv][n]
+            elif drv == 'D01' and n > stop:
+                lap_time = attacker_new_tyre_pace
+            else:
+                lap_time = 80.0 if drv == 'D00' else 80.2
+            rows.append(dict(Driver=drv, DriverNumber=str(num), LapNumber=float(n),
+                             LapTime=pd.Timedelta(seconds=lap_time),
+                             Compound='MEDIUM' if n <= stop else 'HARD',
+                             PitInTime=pd.Timedelta(seconds=n) if n == stop else pd.NaT))
+    laps = Laps(rows)
+    end = laps.groupby('Driver')['LapTime'].cumsum()
+    laps['Time'] = end
+    laps['LapStartTime'] = end - laps['LapTime']
+    session = Session()
+    session.laps = laps
+    matrix = compute_race_matrix(session)
+    stops = compute_pit_stops(session, matrix)
+    return stops, compute_undercuts(matrix, stops)
+
+
+def test_successful_undercut():
+    stops, undercuts = _duel(attacker_new_tyre_pace=78.5)
+
+    assert stops[['Driver', 'Lap', 'Compound']].values.tolist() == \
+        [['D00', 10, 'HARD'], ['D01', 8, 'HARD']]
+    row = undercuts.iloc[0]
+    assert (row['Driver'], row['Rival'], row['Lap'], row['RivalLap']) == ('D01', 'D00', 8, 10)
+    assert row['GapBefore'] == pytest.approx(1.4)
+    assert row['GapAfter'] == pytest.approx(-1.6)
+    assert row['Gain'] == pytest.approx(3.0)
+    assert bool(row['Success'])
+
+
+def test_failed_undercut():
+    _, undercuts = _duel(attacker_new_tyre_pace=80.0)
+
+    assert len(undercuts) == 1
+    assert undercuts['GapAfter'].iloc[0] == pytest.approx(1.4)
+    assert not undercuts['Success'].iloc[0]
+    assert np.isclose(undercuts['Gain'].iloc[0], 0.0)
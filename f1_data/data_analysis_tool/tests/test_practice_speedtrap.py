@@ -0,0 +1,29 @@
+import numpy as np
+
+from practice.practice_speedtrap import (compute_speed_traps, render_speed_traps,
+                                         speed_trap_percentiles)
+
+
+def test_percentiles_per_team(session):
+    stats = speed_trap_percentiles(compute_speed_traps(session, telemetry_fallback=False))
+
+    assert list(stats.columns) == ['Count', 'Mean', 'P50', 'P90', 'P95', 'Max']
+    assert stats['P95'].is_monotonic_decreasing
+    assert stats.index[0] == 'Red Bull Racing'   # SpeedST falls with the driver index
+
+
+def test_percentiles_without_speed_trap_values(session):
+    session.laps['SpeedST'] = np.nan
+    traps = compute_speed_traps(session, telemetry_fallback=False)
+    stats = speed_trap_percentiles(traps)
+
+    assert stats.empty
+    assert list(stats.columns) == ['Count', 'Mean', 'P50', 'P90', 'P95', 'Max']
+    assert not speed_trap_percentiles(traps, trap='I1').empty
+
+
+def test_render_without_speed_trap_values(session):
+    session.laps['SpeedST'] = np.nan
+    figs = render_speed_traps(session, compute_speed_traps(session, telemetry_fallback=False))
+
+    assert len(figs['SpeedTraps'].axes) == 4
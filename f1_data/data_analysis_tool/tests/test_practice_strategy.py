@@ -0,0 +1,102 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from practice.practice_strategy import _grouped_linear_fit, simulate_team_strategies
+
+# (Team, Compound) → (base s, slope s/lap)
+TRUTH = {('Ferrari', 'SOFT'): (80.0, 0.12), ('Ferrari', 'MEDIUM'): (80.6, 0.06),
+         ('Ferrari', 'HARD'): (81.1, 0.02), ('McLaren', 'SOFT'): (79.8, 0.15),
+         ('McLaren', 'MEDIUM'): (80.3, 0.08)}
+
+
+def _long_runs(noise=0.0, laps=12, seed=3):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for (team, compound), (base, slope) in TRUTH.items():
+        for stint in (1, 2):
+            x = np.arange(1, laps + 1)
+            y = base + slope * x + rng.normal(0, noise, laps)
+            rows += [dict(Team=team, Compound=compound, Stint=stint, StintLap=int(i),
+                          LapTimeSeconds=float(t)) for i, t in zip(x, y)]
+    return pd.DataFrame(rows)
+
+
+def test_grouped_fit_recovers_base_and_slope():
+    fit = _grouped_linear_fit(_long_runs(), ['Team', 'Compound']).set_index(['Team', 'Compound'])
+
+    assert len(fit) == len(TRUTH)
+    for key, (base, slope) in TRUTH.items():
+        assert fit.loc[key, 'Base'] == pytest.approx(base)
+        assert fit.loc[key, 'Slope'] == pytest.approx(slope)
+        assert fit.loc[key, 'Sigma'] == pytest.approx(0.0, abs=1e-6)
+    assert (fit['Laps'] == 24).all()
+
+
+def test_grouped_fit_matches_polyfit_with_noise():
+    df = _long_runs(noise=0.3)
+    fit = _grouped_linear_fit(df, ['Team', 'Compound']).set_index(['Team', 'Compound'])
+
+    for key, g in df.groupby(['Team', 'Compound']):
+        slope, base = np.polyfit(g['StintLap'], g['LapTimeSeconds'], 1)
+        residuals = g['LapTimeSeconds'] - (base + slope * g['StintLap'])
+        assert fit.loc[key, ['Base', 'Slope']].tolist() == pytest.approx([base, slope])
+        assert fit.loc[key, 'Sigma'] == pytest.approx(np.sqrt((residuals ** 2).sum() / (len(g) - 2)))
+
+
+def _models(team):
+    return pd.DataFrame([dict(Team=t, Compound=c, Base=b, Deg=s, Sigma=0.0, BaseStd=0.0,
+                              DegStd=0.0, Laps=24, Source='team')
+                         for (t, c), (b, s) in TRUTH.items() if t == team])
+
+
+def _brute_force_best(models, race_laps, pit_loss, min_stint):
+    pace = models.set_index('Compound')[['Base', 'Deg']].to_dict('index')
+    best = (np.inf, None)
+    for n_stints in (2, 3):
+        for compounds in itertools.product(pace, repeat=n_stints):
+            if len(set(compounds)) < 2:
+                continue
+            for lengths in itertools.product(range(min_stint, race_laps + 1), repeat=n_stints):
+                if sum(lengths) != race_laps:
+                    continue
+                total = sum(n * pace[c]['Base'] + pace[c]['Deg'] * n * (n + 1) / 2
+                            for c, n in zip(compounds, lengths)) + (n_stints - 1) * pit_loss
+                best = min(best, (total, compounds), key=lambda b: b[0])
+    return best
+
+
+@pytest.mark.parametrize('team', ['Ferrari', 'McLaren'])
+def test_best_split_is_ranked_first(team):
+    models = _models(team)
+    ranked = simulate_team_strategies(models, race_laps=30, pit_loss=20.0, n_sims=200,
+                                      min_stint=4, fuel_effect=0.0)
+    total, compounds = _brute_force_best(models, race_laps=30, pit_loss=20.0, min_stint=4)
+
+    top = ranked.iloc[0]
+    assert top['Rank'] == 1
+    assert top['ExpectedTime'] == pytest.approx(total)
+    assert sorted(top['Strategy'].split('-')) == sorted(c[0] for c in compounds)
+    assert ranked['ExpectedTime'].is_monotonic_increasing
+    # No pace uncertainty: every draw picks the same strategy
+    assert top['WinProb'] == pytest.approx(1.0)
+    assert ranked['Std'].max() == pytest.approx(0.0, abs=1e-6)
+
+
+def test_monte_carlo_spread_follows_pace_uncertainty():
+    models = _models('Ferrari').assign(BaseStd=0.05, DegStd=0.005, Sigma=0.3)
+    ranked = simulate_team_strategies(models, race_laps=30, pit_loss=20.0, n_sims=4000,
+                                      min_stint=4, fuel_effect=0.0,
+                                      rng=np.random.default_rng(0))
+    exact = simulate_team_strategies(models.assign(BaseStd=0.0, DegStd=0.0, Sigma=0.0),
+                                     race_laps=30, pit_loss=20.0, n_sims=10,
+                                     min_stint=4, fuel_effect=0.0).set_index('Strategy')
+
+    assert ranked['WinProb'].sum() == pytest.approx(1.0)
+    assert (ranked['Std'] > 0).all()
+    assert (ranked['P10'] < ranked['ExpectedTime']).all()
+    assert (ranked['ExpectedTime'] < ranked['P90']).all()
+    error = ranked.set_index('Strategy')['ExpectedTime'] - exact['ExpectedTime']
+    assert error.abs().max() < 0.5
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from practice.report_bundle import inputs_hash
+
+
+def test_inputs_hash_ignores_columns_derived_from_other_parts(session):
+    before = inputs_hash(session)
+    # FastF1 fills LapStartDate once telemetry is loaded
+    session.laps['LapStartDate'] = pd.Timestamp('2024-10-25 12:00') + session.laps['LapStartTime']
+    assert inputs_hash(session) == before
+
+
+def test_inputs_hash_follows_timing_data_and_parts(session):
+    before = inputs_hash(session)
+    assert inputs_hash(session, ('laps', 'telemetry')) != before
+    session.laps.loc[0, 'LapTime'] += pd.Timedelta(seconds=1)
+    assert inputs_hash(session) != before
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from practice.run_classifier import classify_runs
+
+
+def _programmes(laps, driver):
+    return laps[laps['Driver'] == driver].sort_values('LapNumber')['Programme'].tolist()
+
+
+def test_runs_split_at_pit_laps(session):
+    laps = classify_runs(session, use_telemetry=False)
+
+    assert _programmes(laps, 'D00') == ['out', 'push', 'push', 'push', 'push', 'in'] * 2
+    assert laps.groupby('Driver')['RunId'].max().eq(2).all()
+
+
+def test_long_run(session):
+    laps = session.laps
+    d00 = laps['Driver'] == 'D00'
+    # Lap 6 → 7 without a pit stop: one run of 12 laps
+    laps.loc[d00 & (laps['LapNumber'] == 6), 'PitInTime'] = pd.NaT
+    laps.loc[d00 & (laps['LapNumber'] == 7), 'PitOutTime'] = pd.NaT
+    laps.loc[d00 & (laps['LapNumber'] == 7), 'LapTime'] -= pd.Timedelta(seconds=3)
+    classified = classify_runs(session, use_telemetry=False)
+
+    assert _programmes(classified, 'D00') == ['out'] + ['long'] * 10 + ['in']
+
+
+def _short_slow_run(session):
+    laps = session.laps
+    d00 = laps['Driver'] == 'D00'
+    # Laps 1-3: out, one slow lap, in
+    laps.loc[d00 & (laps['LapNumber'] == 3), 'PitInTime'] = laps.loc[d00, 'Time']
+    laps.loc[d00 & (laps['LapNumber'] == 4), 'PitOutTime'] = laps.loc[d00, 'LapStartTime']
+    laps.loc[d00 & (laps['LapNumber'] == 2), 'LapTime'] *= 1.2
+
+
+def test_short_slow_run_without_telemetry_is_not_aero(session):
+    _short_slow_run(session)
+    laps = classify_runs(session, use_telemetry=False)
+
+    assert _programmes(laps, 'D00')[:3] == ['out', 'cool', 'in']
+
+
+def test_short_part_throttle_run_is_aero(session):
+    _short_slow_run(session)
+    laps = classify_runs(session, use_telemetry=True)
+
+    assert _programmes(laps, 'D00')[:3] == ['out', 'aero', 'in']
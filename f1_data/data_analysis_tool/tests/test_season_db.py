@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from conftest import Event
+from practice.practice_longrun import extract_long_run_laps
+from practice.season_db import SeasonDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    with SeasonDB(str(tmp_path / 'season.sqlite')) as db:
+        yield db
+
+
+def test_reingest_replaces_session_rows(db, session):
+    db.ingest_session(session)
+    db.ingest_session(session)
+
+    assert len(db.sessions(2024)) == 1
+    assert db.query('SELECT COUNT(*) AS n FROM laps')['n'].iloc[0] == len(session.laps)
+    assert db.sessions(2024)['session'].tolist() == ['FP2']
+
+
+def test_best_laps_and_gaps(db, session):
+    db.ingest_session(session)
+    best = db.best_laps(2024, 'FP2')
+
+    expected = session.laps.groupby('Driver')['LapTime'].min().dt.total_seconds().sort_values()
+    assert best['driver'].tolist() == expected.index.tolist()
+    assert best['best_lap'].to_numpy() == pytest.approx(expected.to_numpy())
+    assert best['gap'].to_numpy() == pytest.approx((expected - expected.min()).to_numpy())
+    assert db.best_laps(2024, 'FP2', team='Ferrari')['driver'].tolist() == \
+        [d for d in expected.index if d in ('D02', 'D03')]
+
+
+def test_top_speeds_per_event_and_team(db, session_factory):
+    for round_number, seed in ((1, 1), (2, 2)):
+        session = session_factory(seed=seed)
+        session.event = Event(year=2024, EventName=f'Test {round_number} Grand Prix',
+                              RoundNumber=round_number, Location='Test', Country='Testland')
+        db.ingest_session(session)
+    speeds = db.top_speeds(2024, 'FP2', team='Mercedes')
+
+    assert speeds['round'].tolist() == [1, 2]
+    laps = session.laps.pick_wo_box().pick_team('Mercedes')
+    assert speeds['top_speed'].iloc[1] == pytest.approx(laps['SpeedST'].max())
+
+
+def test_long_run_pace_per_team_and_driver(db, session):
+    # One 12-lap run on mediums per driver (no stop after lap 6)
+    laps = session.laps
+    laps.loc[laps['LapNumber'] == 6, 'PitInTime'] = pd.NaT
+    lap7 = laps['LapNumber'] == 7
+    laps.loc[lap7, 'PitOutTime'] = pd.NaT
+    laps.loc[lap7, 'LapTime'] -= pd.Timedelta(seconds=3)
+    laps['Stint'] = 1.0
+    laps['Compound'] = 'MEDIUM'
+    db.ingest_session(session)
+
+    stored = extract_long_run_laps(session)
+    pace = db.long_run_pace(2024, 'FP2')
+    assert sorted(pace['team']) == ['Ferrari', 'Mercedes', 'Red Bull Racing']
+    assert pace.set_index('team')['laps'].to_dict() == stored.groupby('Team').size().to_dict()
+    assert pace['gap_to_best'].iloc[0] == pytest.approx(0.0)
+    assert pace['gap_to_best'].is_monotonic_increasing
+
+    drivers = db.long_run_pace(2024, 'FP2', team='Ferrari', driver='D02')
+    assert drivers[['team', 'driver', 'laps']].values.tolist() == \
+        [['Ferrari', 'D02', (stored['Driver'] == 'D02').sum()]]
+    assert db.long_run_pace(2024, 'FP2', compound='HARD').empty
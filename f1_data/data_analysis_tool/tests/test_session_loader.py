@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from practice import session_loader
+from practice.session_loader import SessionLoader
+
+
+class SlowSession:
+    """Records Session.load calls; a telemetry load blocks until released."""
+
+    release = None   # threading.Event shared by the sessions of a test
+
+    def __init__(self):
+        self.calls = []
+        self._laps = {'LapStartTime': 0}
+
+    def load(self, **parts):
+        self.calls.append(parts)
+        if parts.get('telemetry'):
+            assert self.release.wait(5)
+            self._car_data = {'1': Stream()}
+            self._pos_data = {}
+            self._t0_date = 0
+
+
+class Stream:
+    session = None
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    created = []
+    monkeypatch.setattr(SlowSession, 'release', threading.Event())
+    monkeypatch.setattr(session_loader.fastf1, 'get_session',
+                        lambda *key: created.append(SlowSession()) or created[-1])
+    loader = SessionLoader(max_workers=2)
+    yield loader
+    loader.shutdown(wait=True)
+
+
+def test_laps_are_loaded_with_race_control_messages(loader):
+    session = loader.ensure(2024, 'Test Grand Prix', 'FP2', parts=('laps',))
+    # Deleted laps are only flagged when laps and messages load in one call
+    assert session.calls == [{'laps': True, 'telemetry': False, 'weather': False,
+                              'messages': True}]
+
+
+def test_laps_ensure_returns_while_telemetry_prefetch_blocks(loader):
+    session = loader.ensure(2024, 'Test Grand Prix', 'FP2', parts=('laps',))
+    future = loader.prefetch(session, parts=('telemetry',))
+
+    done = threading.Event()
+    threading.Thread(target=lambda: loader.ensure(session, parts=('laps',)) and done.set(),
+                     daemon=True).start()
+    assert done.wait(2)
+    assert not future.done()
+
+    SlowSession.release.set()
+    assert loader.ensure(session, parts=('telemetry',)) is session
+    # Telemetry came from a separate Session: the live laps were loaded once
+    assert session.calls == [{'laps': True, 'telemetry': False, 'weather': False,
+                              'messages': True}]
+    assert session._car_data['1'].session is session
+    assert session._laps['LapStartDate'] == 0
+    assert loader.loaded_parts(session) == ('laps', 'telemetry', 'messages')
+
+
+def test_ensure_waits_for_prefetch_rewriting_the_laps(loader):
+    SlowSession.release.set()
+    future = loader.prefetch(2024, 'Test Grand Prix', 'FP2', parts=('telemetry',))
+    session = loader.ensure(2024, 'Test Grand Prix', 'FP2', parts=('laps',))
+    # Nothing was loaded yet: one in-place load of laps and telemetry
+    assert future.done()
+    assert session.calls == [{'laps': True, 'telemetry': True, 'weather': False,
+                              'messages': True}]
+
+
+def test_in_place_load_clears_driver_index(loader, monkeypatch):
+    cleared = []
+    monkeypatch.setattr(session_loader, 'clear_driver_index', cleared.append)
+    SlowSession.release.set()
+    session = loader.ensure(2024, 'Test Grand Prix', 'FP2', parts=('laps',))
+    assert cleared == [session]
+
+    # Telemetry on a separate Session leaves results and laps alone
+    loader.ensure(session, parts=('telemetry',))
+    assert cleared == [session]
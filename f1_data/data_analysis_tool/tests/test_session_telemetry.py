@@ -0,0 +1,19 @@
+from conftest import SAMPLES_PER_LAP
+from practice.session_telemetry import concat_session_telemetry
+
+
+def test_release_drops_each_driver_stream(session_factory):
+    kept = concat_session_telemetry(session_factory())
+    session = session_factory()
+    released = concat_session_telemetry(session, release=True)
+
+    assert session.car_data == {}
+    assert released.equals(kept)
+
+
+def test_lap_boundary_samples_counted_once(session):
+    tel = concat_session_telemetry(session)
+
+    assert len(tel) == len(session.laps) * SAMPLES_PER_LAP
+    assert not tel.duplicated(['Driver', 'SessionTime']).any()
+    assert (tel['Time'] >= 0).all()
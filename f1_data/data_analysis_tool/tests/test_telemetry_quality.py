@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from practice.telemetry_quality import check_usable, repair_telemetry, session_quality
+
+
+def _lap(samples=320, lap_time=80.0):
+    t = np.linspace(0, lap_time, samples, endpoint=False)
+    speed = 200 + 50 * np.sin(t)
+    return pd.DataFrame({'Time': pd.to_timedelta(t, unit='s'), 'Speed': speed,
+                         'Throttle': np.clip(speed / 3, 0, 100), 'nGear': 6})
+
+
+def test_forward_time_spike_drops_one_sample():
+    tel = _lap()
+    tel.loc[10, 'Time'] = pd.Timedelta(seconds=500)
+
+    repaired, report = repair_telemetry(tel, lap_time=pd.Timedelta(seconds=80))
+    check_usable(repaired, report)
+
+    assert (report['Spikes'], report['Backwards'], report['Gaps']) == (1, 0, 0)
+    assert len(repaired) == 319
+    assert report['Score'] > 99
+
+
+def test_backwards_step_measured_against_previous_kept_sample():
+    tel = _lap()
+    tel.loc[10, 'Time'] = pd.Timedelta(seconds=1)   # sample 10 is at 2.5 s
+
+    repaired, report = repair_telemetry(tel)
+
+    assert (report['Spikes'], report['Backwards']) == (0, 1)
+    assert len(repaired) == 319
+
+
+def test_session_quality_spike_keeps_lap_assignment(session):
+    tel = session.car_data['1']
+    tel.loc[10, 'SessionTime'] = tel['SessionTime'].iloc[-1] + pd.Timedelta(seconds=60)
+
+    df = session_quality(session)
+    d00 = df[df['Driver'] == 'D00']
+
+    assert d00['Spikes'].sum() == 1
+    assert d00['Backwards'].sum() == 0
+    assert (d00['Samples'] == 400).all()
+    assert d00['Score'].min() > 99
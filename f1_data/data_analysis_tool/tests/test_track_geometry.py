@@ -0,0 +1,39 @@
+import pytest
+
+from conftest import Event
+from practice import track_geometry
+
+
+@pytest.fixture
+def lap_lengths(monkeypatch):
+    calls = []
+    original = track_geometry._lap_length
+    monkeypatch.setattr(track_geometry, '_lap_length',
+                        lambda lap: calls.append(lap['Driver']) or original(lap))
+    monkeypatch.setattr(track_geometry, '_MEMORY_CACHE', {})
+    return calls
+
+
+def test_cache_hit_reads_no_telemetry(session, tmp_path, lap_lengths):
+    geom = track_geometry.get_circuit_geometry(session, cache_dir=str(tmp_path))
+    assert len(lap_lengths) == 1
+    assert geom.events == {'2024 Test Grand Prix'}
+
+    assert track_geometry.get_circuit_geometry(session, cache_dir=str(tmp_path)) is geom
+    # From disk in a new process
+    track_geometry._MEMORY_CACHE.clear()
+    loaded = track_geometry.get_circuit_geometry(session, cache_dir=str(tmp_path))
+    assert len(lap_lengths) == 1
+    assert loaded.lap_length == pytest.approx(geom.lap_length)
+
+
+def test_new_event_matches_cached_layout(session_factory, tmp_path, lap_lengths):
+    geom = track_geometry.get_circuit_geometry(session_factory(), cache_dir=str(tmp_path))
+    other = session_factory(seed=2)
+    other.event = Event(year=2025, EventName='Test Grand Prix', RoundNumber=1,
+                        Location='Test', Country='Testland')
+
+    assert track_geometry.get_circuit_geometry(other, cache_dir=str(tmp_path)) is geom
+    assert len(lap_lengths) == 2
+    assert geom.events == {'2024 Test Grand Prix', '2025 Test Grand Prix'}
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import Laps, Session
+from practice import traffic
+from practice.track_geometry import CircuitGeometry
+
+LAP_M = 5000.0
+SPEED = 180.0   # km/h = 50 m/s
+
+
+def _circle(distance):
+    theta = np.asarray(distance) / LAP_M * 2 * np.pi
+    radius = LAP_M / (2 * np.pi)
+    return radius * np.cos(theta), radius * np.sin(theta)
+
+
+@pytest.fixture
+def convoy(monkeypatch):
+    """Three cars at 180 km/h on a 5 km circle, starting 0 m, 100 m and 400 m round."""
+    step = 5.0
+    geom = CircuitGeometry('circle', *_circle(np.arange(0.0, LAP_M, step)), step)
+    monkeypatch.setattr(traffic, 'get_circuit_geometry', lambda session: geom)
+
+    t = np.arange(0.0, 100.0, 0.1)
+    session = Session()
+    session.pos_data, session.car_data, rows = {}, {}, []
+    for num, (abb, start) in enumerate([('AAA', 0.0), ('BBB', 100.0), ('CCC', 400.0)], 1):
+        x, y = _circle(start + SPEED / 3.6 * t)
+        time = pd.to_timedelta(t, unit='s')
+        session.pos_data[str(num)] = pd.DataFrame({'SessionTime': time, 'X': x, 'Y': y,
+                                                   'Status': 'OnTrack'})
+        session.car_data[str(num)] = pd.DataFrame({'SessionTime': time, 'Speed': SPEED})
+        rows.append(dict(DriverNumber=str(num), Driver=abb, LapNumber=1.0,
+                         LapStartTime=pd.Timedelta(0), Time=pd.Timedelta(seconds=99)))
+    session.laps = Laps(rows)
+    return session
+
+
+def test_gaps_to_cars_ahead_and_behind(convoy):
+    gaps = traffic.compute_track_gaps(convoy).groupby('Driver')
+
+    expected = {'AAA': ('BBB', 2.0, 'CCC', 92.0),   # 100 m / 50 m/s ahead, 4600 m behind
+                'BBB': ('CCC', 6.0, 'AAA', 2.0),
+                'CCC': ('AAA', 92.0, 'BBB', 6.0)}
+    for drv, (ahead, gap_ahead, behind, gap_behind) in expected.items():
+        g = gaps.get_group(drv)
+        assert (g['CarAhead'] == ahead).all()
+        assert (g['CarBehind'] == behind).all()
+        assert g['GapAhead'].to_numpy() == pytest.approx(gap_ahead, abs=0.15)
+        assert g['GapBehind'].to_numpy() == pytest.approx(gap_behind, abs=0.15)
+
+
+def test_cars_off_track_are_left_out(convoy):
+    convoy.pos_data['3']['Status'] = 'OffTrack'
+    gaps = traffic.compute_track_gaps(convoy)
+
+    assert set(gaps['Driver']) == {'AAA', 'BBB'}
+    a = gaps[gaps['Driver'] == 'AAA']
+    assert (a['CarBehind'] == 'BBB').all()
+    assert a['GapBehind'].to_numpy() == pytest.approx(98.0, abs=0.15)   # 4900 m